@@ -238,6 +238,8 @@ class CdkStack(Stack):
                     actions=[
                         "dynamodb:PutItem",
                         "dynamodb:GetItem",
+                        "dynamodb:BatchWriteItem",
+                        "dynamodb:BatchGetItem",
                         "dynamodb:DeleteItem",
                         "dynamodb:Query",
                         "dynamodb:Scan"
@@ -115,6 +115,9 @@ class TelemetryStack(Stack):
                         glue.CfnTable.ColumnProperty(name="timestamp", type="bigint"),
                         glue.CfnTable.ColumnProperty(name="user_id", type="string"),
                         glue.CfnTable.ColumnProperty(name="event_type", type="string"),
+                        glue.CfnTable.ColumnProperty(name="query_hash", type="string"),
+                        # Only populated when the app runs with TELEMETRY_LOG_QUERY_TEXT=true
+                        glue.CfnTable.ColumnProperty(name="query", type="string"),
                         glue.CfnTable.ColumnProperty(name="query_length", type="int"),
                         glue.CfnTable.ColumnProperty(name="query_type", type="string"),
                         glue.CfnTable.ColumnProperty(name="assistant_used", type="string"),
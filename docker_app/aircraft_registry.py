@@ -3,7 +3,8 @@ Aircraft Registry Lookup System
 Provides dynamic lookup for aircraft by owner, nickname, or other identifiers
 """
 
-import requests
+from http_client import MISSING_ENDPOINT_STATUSES, http_client
+from circuit_breaker import circuit_breakers
 import re
 import json
 from typing import Optional, Dict, List, Tuple
@@ -13,10 +14,7 @@ class AircraftRegistry:
     """Dynamic aircraft registry lookup system"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = http_client  # Shared pooled session
         self.timeout = 10
         self.cache = {}
         self.cache_time = {}
@@ -72,30 +70,16 @@ class AircraftRegistry:
         return None
     
     def _search_registry_apis(self, query: str) -> Optional[str]:
-        """Search multiple registry APIs for aircraft"""
-        # Try public aircraft registry APIs
-        try:
-            # First try the FAA registry API
-            url = f"https://registry.faa.gov/api/aircraft/search?q={query}"
-            response = self.session.get(url, timeout=self.timeout)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data and 'results' in data and data['results']:
-                    # Return the first match
-                    return data['results'][0].get('registration')
-        except:
-            pass
-        
-        # Try alternative sources
+        """Search multiple registry APIs for aircraft, healthiest host first"""
         sources = [
-            self._search_jetphotos,
-            self._search_flightaware,
-            self._search_planespotters,
-            self._search_adsbexchange
+            ("registry.faa.gov", self._search_faa_registry),
+            ("www.jetphotos.com", self._search_jetphotos),
+            ("flightaware.com", self._search_flightaware),
+            ("api.planespotters.net", self._search_planespotters),
+            ("adsbexchange-api.example.com", self._search_adsbexchange)
         ]
         
-        for source in sources:
+        for host, source in circuit_breakers.order_by_health(sources, host_of=lambda item: item[0]):
             try:
                 result = source(query)
                 if result:
@@ -105,11 +89,23 @@ class AircraftRegistry:
         
         return None
     
+    def _search_faa_registry(self, query: str) -> Optional[str]:
+        """Try the FAA registry API"""
+        url = f"https://registry.faa.gov/api/aircraft/search?q={query}"
+        response = self.session.get(url, timeout=self.timeout, failure_statuses=MISSING_ENDPOINT_STATUSES)
+        
+        if response.status_code == 200:
+            data = response.json()
+            if data and 'results' in data and data['results']:
+                # Return the first match
+                return data['results'][0].get('registration')
+        return None
+    
     def _search_jetphotos(self, query: str) -> Optional[str]:
         """Search JetPhotos for aircraft"""
         try:
             url = f"https://www.jetphotos.com/api/v1/search?keyword={query}"
-            response = self.session.get(url, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout, failure_statuses=MISSING_ENDPOINT_STATUSES)
             
             if response.status_code == 200:
                 data = response.json()
@@ -146,7 +142,7 @@ class AircraftRegistry:
         """Search Planespotters for aircraft"""
         try:
             url = f"https://api.planespotters.net/pub/photos/search?query={query}"
-            response = self.session.get(url, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout, failure_statuses=MISSING_ENDPOINT_STATUSES)
             
             if response.status_code == 200:
                 data = response.json()
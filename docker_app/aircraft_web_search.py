@@ -3,7 +3,7 @@ Aircraft Web Search Module
 Searches the web for aircraft information based on registration or name
 """
 
-import requests
+from http_client import http_client
 import re
 from typing import Optional, Dict, List
 from bs4 import BeautifulSoup
@@ -12,10 +12,7 @@ class AircraftWebSearch:
     """Search the web for aircraft information"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = http_client  # Shared pooled session
         self.timeout = 10
     
     def search_by_registration(self, registration: str) -> Dict:
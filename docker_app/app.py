@@ -8,6 +8,9 @@ from auto_learning_system import initialize_auto_learning, trigger_manual_learni
 from enhanced_learning_system import initialize_enhanced_learning, trigger_enhanced_learning
 from personalized_intelligence import get_personalized_response, get_user_insights
 from proactive_intelligence import initialize_proactive_intelligence, get_proactive_alerts, get_intelligence_brief, trigger_market_analysis
+from market_snapshot_service import initialize_market_snapshots
+from circuit_breaker import circuit_breakers
+from ticker_stream import initialize_ticker_stream
 # Import lazy loading wrapper
 from lazy_assistant import LazyAssistant
 
@@ -210,6 +213,9 @@ if 'intelligence_initialized' not in st.session_state:
     auto_status = initialize_auto_learning()
     enhanced_status = initialize_enhanced_learning()
     proactive_status = initialize_proactive_intelligence()
+    snapshot_status = initialize_market_snapshots()
+    circuit_breakers.start_reporting()
+    ticker_status = initialize_ticker_stream()
     st.session_state.intelligence_initialized = True
     st.success("🤖 Advanced Intelligence Systems Active")
     st.info("✨ Cross-domain synthesis, personalization, and proactive monitoring enabled")
@@ -450,8 +456,11 @@ if prompt := st.chat_input("Ask your question here..."):
                     query_context = f"User query at {get_current_datetime()}: {prompt}"
                     
                     if action == "teacher":
-                        from unified_router import unified_route
+                        from unified_router import unified_route_with_freshness
                         from response_cache import response_cache
+                        from semantic_cache import semantic_cache
+                        from cache_freshness import data_versions, dependent_versions, get_freshness
+                        from single_flight import request_flight
                         
                         # Use Claude 4.0 for aviation if selected
                         use_claude = selected_model == "anthropic.claude-4-0:0"
@@ -459,6 +468,11 @@ if prompt := st.chat_input("Ask your question here..."):
                         # Check cache first
                         cache_key = response_cache.get_cache_key(prompt, selected_model, user_id)
                         cached_response = response_cache.get(cache_key)
+                        if not cached_response:
+                            # Popular questions are pre-warmed in their own key namespace (see cache_prewarm.py)
+                            from cache_prewarm import PREWARM_NAMESPACE
+                            cached_response = response_cache.get(
+                                response_cache.get_cache_key(prompt, selected_model, namespace=PREWARM_NAMESPACE))
                         
                         if cached_response:
                             # Use cached response
@@ -489,29 +503,54 @@ if prompt := st.chat_input("Ask your question here..."):
                                 'research': research_assistant
                             }
                             
-                            # Unified routing with tracking
-                            assistant_func, enhanced_prompt = unified_route(prompt, get_current_datetime(), assistants)
-                            
-                            # Track routing decision
-                            if assistant_func:
-                                assistant_name = assistant_func.__name__ if hasattr(assistant_func, "__name__") else str(assistant_func)
-                                matched_rule = "direct" if assistant_name == "direct_response" else assistant_name.replace("_assistant", "")
-                                track_router_decision(prompt, matched_rule, assistant_name, 0.8)
-                            
-                            if assistant_func:
-                                content = assistant_func(enhanced_prompt)
-                            elif enhanced_prompt:
-                                content = enhanced_prompt  # Direct response (like time queries)
-                            else:
-                                # Default to teacher agent with streaming
-                                from streaming import get_streaming_response
-                                teacher_agent = create_teacher_agent_with_datetime()
-                                content = get_streaming_response(teacher_agent, full_prompt)
-                                store_knowledge(content, query_context)
-                            
-                            # Cache the response if it's not time-sensitive
-                            if not any(time_term in prompt.lower() for time_term in ['time', 'date', 'today', 'now', 'current']):
-                                response_cache.set(cache_key, content)
+                            # Every real-time read from routing to the answer is logged for the cache tags
+                            with data_versions.capture() as read_versions:
+                                # Unified routing with tracking
+                                assistant_func, enhanced_prompt, freshness = unified_route_with_freshness(prompt, get_current_datetime(), assistants)
+                                
+                                # Track routing decision
+                                if assistant_func:
+                                    assistant_name = assistant_func.__name__ if hasattr(assistant_func, "__name__") else str(assistant_func)
+                                    matched_rule = "direct" if assistant_name == "direct_response" else assistant_name.replace("_assistant", "")
+                                    track_router_decision(prompt, matched_rule, assistant_name, 0.8)
+                                
+                                # Near-duplicate lookup within the routed assistant's partition
+                                assistant_partition = assistant_func.__name__ if hasattr(assistant_func, "__name__") else str(assistant_func)
+                                semantic_response = None
+                                if assistant_func:
+                                    semantic_hit = semantic_cache.lookup(prompt, selected_model, assistant_partition, user_id)
+                                    if semantic_hit:
+                                        semantic_response = response_cache.get(semantic_hit[0])
+                                
+                                if semantic_response:
+                                    content = semantic_response
+                                elif assistant_func:
+                                    # Identical assistant inputs in flight across sessions share one call. The
+                                    # enhanced prompt carries the user's timezone and datetime, so key on it
+                                    import hashlib
+                                    prompt_digest = hashlib.sha256(str(enhanced_prompt).encode("utf-8")).hexdigest()
+                                    flight_key = f"{selected_model}:{assistant_partition}:{prompt_digest}"
+                                    # The leader's reads travel with its answer, so every session tags it alike
+                                    content, answer_reads = request_flight.do(flight_key, data_versions.call_capturing,
+                                                                              assistant_func, enhanced_prompt)
+                                    read_versions.update(answer_reads)
+                                elif enhanced_prompt:
+                                    content = enhanced_prompt  # Direct response (like time queries)
+                                else:
+                                    # Default to teacher agent with streaming
+                                    from streaming import get_streaming_response
+                                    teacher_agent = create_teacher_agent_with_datetime()
+                                    content = get_streaming_response(teacher_agent, full_prompt)
+                                    store_knowledge(content, query_context)
+                                
+                            # Cache the response for its freshness class, tagged with the data it was built on.
+                            # A semantic hit stays under its original entry so it keeps that expiry and tags
+                            freshness_class = get_freshness(freshness)
+                            if freshness_class['ttl'] > 0 and not semantic_response:
+                                response_cache.set(cache_key, content, ttl=freshness_class['ttl'],
+                                                   data_versions=dependent_versions(read_versions, freshness))
+                                if assistant_func:
+                                    semantic_cache.add(prompt, cache_key, selected_model, assistant_partition, user_id)
                     else:
                         if memory_backend == "OpenSearch Memory":
                             content = run_memory_agent(full_prompt, datetime_context)
@@ -5,6 +5,7 @@ Telemetry integration for app.py
 import time
 import uuid
 import os
+from router_config import detect_query_type  # Shared compiled keyword tables
 
 # Import telemetry (conditionally)
 try:
@@ -125,27 +126,6 @@ def track_error(user_id: str, query: str, error_message: str, tab_id: int):
         }
     )
 
-def detect_query_type(query: str) -> str:
-    """Detect the type of query based on content"""
-    query_lower = query.lower()
-    
-    # Define patterns for different query types
-    patterns = {
-        "crypto": ["crypto", "bitcoin", "ethereum", "token", "blockchain", "coin"],
-        "finance": ["finance", "stock", "market", "investment", "portfolio"],
-        "aviation": ["flight", "aircraft", "airport", "aviation", "plane"],
-        "formula1": ["f1", "formula 1", "racing", "grand prix", "driver"],
-        "tech": ["code", "programming", "software", "algorithm", "api"],
-        "prediction": ["predict", "forecast", "future", "will", "expect"]
-    }
-    
-    # Check for matches
-    for query_type, keywords in patterns.items():
-        if any(keyword in query_lower for keyword in keywords):
-            return query_type
-    
-    return "general"
-
 def estimate_token_count(text: str) -> int:
     """Estimate token count based on text length"""
     # Rough estimate: 1 token ≈ 4 characters for English text
@@ -3,17 +3,14 @@ Aviation Data Access Module
 Integrates FAA and flight data for real-time aviation information
 """
 
-import requests
+from http_client import http_client
 import json
 from datetime import datetime
 from typing import Optional, Dict, List
 
 class AviationDataAccess:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = http_client  # Shared pooled session
         self.timeout = 10
         
     def get_flight_position(self, flight_id: str) -> str:
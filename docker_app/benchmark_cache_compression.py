@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark for cached response compression - bytes saved and (de)compression cost per entry
+"""
+
+import json
+import random
+import sys
+import time
+import zlib
+
+from cache_compression import DEFAULT_ZDICT_SEED, PayloadCodec, build_zdict
+
+COINS = [("Bitcoin", "BTC"), ("Ethereum", "ETH"), ("Solana", "SOL"), ("Cardano", "ADA"), ("Dogecoin", "DOGE")]
+DRIVERS = ["Verstappen", "Norris", "Leclerc", "Piastri", "Hamilton", "Russell", "Sainz", "Alonso"]
+
+
+def synthetic_corpus(count: int, seed: int = 7) -> list:
+    """Markdown answers shaped like our crypto and F1 analyses"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        if i % 2 == 0:
+            name, symbol = rng.choice(COINS)
+            price = rng.uniform(0.1, 100000)
+            lines = [
+                f"## {name} ({symbol}) Analysis", "", "### Current Market Data",
+                f"**Current Price:** ${price:,.2f}", f"**24h Change:** {rng.uniform(-8, 8):+.2f}%",
+                f"**Market Cap:** ${price * rng.uniform(1e6, 2e7):,.0f}", f"**24h Volume:** ${rng.uniform(1e8, 5e10):,.0f}",
+                "", "### Technical Analysis",
+                f"**Support Level:** ${price * 0.95:,.2f}", f"**Resistance Level:** ${price * 1.05:,.2f}",
+                f"RSI is {rng.uniform(20, 80):.1f}, momentum is {rng.choice(['bullish', 'bearish', 'neutral'])}.",
+                "", "### Risk Factors",
+                "- Regulatory uncertainty remains elevated",
+                "- Liquidity is thinner outside US trading hours",
+                "", f"**Confidence:** {rng.choice(['Low', 'Medium', 'High'])}",
+                "Data source: Coinbase", f"Last updated: 2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "", "This is not financial advice. Cryptocurrency markets are highly volatile."
+            ]
+            lines += [f"- Scenario {k}: {symbol} trades between ${price * (1 - k / 50):,.2f} and ${price * (1 + k / 40):,.2f}"
+                      for k in range(rng.randint(3, 40))]
+        else:
+            order = rng.sample(DRIVERS, len(DRIVERS))
+            lines = ["## Grand Prix Weekend Summary", "", "### Race Results",
+                     "| Pos | Driver | Gap |", "|-----|--------|-----|"]
+            lines += [f"| {p + 1} | {d} | +{rng.uniform(0, 60):.3f}s |" for p, d in enumerate(order)]
+            lines += ["", "### Driver Standings"] + [f"{p + 1}. {d} - {rng.randint(50, 400)} pts" for p, d in enumerate(order)]
+            lines += ["", "Based on the current real-time data, the championship remains open."]
+        corpus.append("\n".join(lines))
+    return corpus
+
+
+def measure(label: str, codec: PayloadCodec, samples: list) -> dict:
+    """Encode and decode every sample and report per-entry figures"""
+    payloads = [codec.encode(sample) for sample in samples]
+    assert all(codec.decode(p) == s for p, s in zip(payloads, samples))
+    stats = codec.get_stats()
+    result = {
+        'codec': label,
+        'entries': len(samples),
+        'avg_raw_bytes': stats['bytes_in'] / len(samples),
+        'avg_stored_bytes': stats['bytes_out'] / len(samples),
+        'bytes_saved_pct': 100.0 * stats['bytes_saved'] / stats['bytes_in'],
+        'avg_encode_us': stats['avg_encode_us'],
+        'avg_decode_us': stats['avg_decode_us']
+    }
+    print(f"{label:<22} {result['avg_raw_bytes']:>9.0f} {result['avg_stored_bytes']:>9.0f} "
+          f"{result['bytes_saved_pct']:>7.1f}% {result['avg_encode_us']:>9.1f} {result['avg_decode_us']:>9.1f}")
+    return result
+
+
+def run_benchmark(corpus: list) -> list:
+    """Compare no dictionary, the built-in seed and a dictionary trained on half the corpus"""
+    half = len(corpus) // 2
+    train, test = corpus[:half], corpus[half:]
+    trained = build_zdict(train)
+
+    print(f"Corpus: {len(corpus)} responses (train {len(train)}, test {len(test)}); "
+          f"trained dictionary {len(trained)} bytes")
+    print(f"{'codec':<22} {'raw B':>9} {'stored B':>9} {'saved':>8} {'enc us':>9} {'dec us':>9}")
+
+    return [
+        measure("stored as text", PayloadCodec(min_size=sys.maxsize), test),
+        measure("zlib, no dictionary", PayloadCodec(zdict=b"", min_size=0), test),
+        measure("zlib, seed dictionary", PayloadCodec(zdict=DEFAULT_ZDICT_SEED, min_size=0), test),
+        measure("zlib, trained dict", PayloadCodec(zdict=trained, min_size=0), test),
+        measure("policy (min 512 B)", PayloadCodec(zdict=trained), test)
+    ]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Real responses: JSONL of {"response": ...} objects or JSON strings
+        with open(sys.argv[1]) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        corpus = [r["response"] if isinstance(r, dict) else r for r in records]
+    else:
+        corpus = synthetic_corpus(400)
+    print(f"zlib {zlib.ZLIB_RUNTIME_VERSION}, {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    run_benchmark(corpus)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Coinbase quote batching - upstream calls and wall time per query, before and after
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from coinbase_api_service import CoinbaseAPIService
+from ohlcv_store import OHLCVStore
+
+RATES = {"USD": "1", "EUR": "0.92", "BTC": "0.0000155", "ETH": "0.00031", "SOL": "0.0068",
+         "ADA": "2.2", "DOT": "0.14"}
+
+
+class _FakeResponse:
+    def __init__(self, payload: Dict[str, Any], status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def json(self) -> Dict[str, Any]:
+        return self._payload
+
+
+class CountingSession:
+    """Stands in for the shared HTTP client: canned Coinbase payloads, a fixed latency, and a call log"""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.calls: List[str] = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, **kwargs: Any) -> _FakeResponse:
+        with self._lock:
+            self.calls.append(url)
+        time.sleep(self.latency)
+        if url.endswith("/exchange-rates"):
+            return _FakeResponse({"data": {"currency": "USD", "rates": RATES}})
+        if url.endswith("/spot"):
+            base = url.rsplit("/", 2)[-2].split("-")[0]
+            return _FakeResponse({"data": {"amount": str(1 / float(RATES.get(base, "1")))}})
+        if url.endswith("/candles"):
+            base = url.rsplit("/", 2)[-2].split("-")[0]
+            price = 1 / float(RATES.get(base, "1"))
+            params = kwargs.get("params", {})
+            seconds = params["granularity"]
+            start, end = (int(datetime.fromisoformat(params[k]).timestamp()) for k in ("start", "end"))
+            return _FakeResponse([[t, price, price, price, price, 1.0]
+                                  for t in range(end - end % seconds - seconds, start - 1, -seconds)])
+        if url.endswith("/historic"):
+            base = url.rsplit("/", 2)[-2].split("-")[0]
+            price = 1 / float(RATES.get(base, "1"))
+            return _FakeResponse({"data": {"prices": [{"time": f"day-{i}", "price": str(price * (1 - i / 100))}
+                                                      for i in range(30)]}})
+        return _FakeResponse({}, 404)
+
+    def endpoints(self) -> Dict[str, int]:
+        return dict(Counter(url.rsplit("/", 1)[-1] for url in self.calls))
+
+
+def _legacy_prices(service: CoinbaseAPIService, symbols: List[str]) -> List[str]:
+    """Per-symbol pattern the service used before batching: spot, then stats (which re-fetched spot)"""
+    lines = []
+    for symbol in symbols:
+        pair = f"{symbol}-USD"
+        price = service.get_spot_price(pair)
+        service.get_price_stats(pair)
+        lines.append(f"{symbol}: ${price['price']:,.2f}" if price else f"{symbol}: unavailable")
+    return lines
+
+
+def _legacy_trend(service: CoinbaseAPIService, symbols: List[str]) -> List[str]:
+    """Per-symbol history download and spot price, one after another"""
+    return [str((service._get_historic_spot_prices(f"{symbol}-USD", 7), service.get_spot_price(f"{symbol}-USD")))
+            for symbol in symbols]
+
+
+SCENARIOS = [
+    # (name, before, after, symbols)
+    ("one price", _legacy_prices, lambda service, symbols: service.format_prices(symbols), ["BTC"]),
+    ("five prices", _legacy_prices, lambda service, symbols: service.format_prices(symbols),
+     ["BTC", "ETH", "SOL", "ADA", "DOT"]),
+    ("market data", _legacy_prices, lambda service, symbols: service.get_market_data(symbols),
+     ["BTC", "ETH", "SOL", "ADA", "DOT"]),
+    ("weekly trend", _legacy_trend, lambda service, symbols: service.get_trending_analysis(symbols, 7),
+     ["BTC", "ETH", "SOL"]),
+]
+
+
+def _run(service: CoinbaseAPIService, func: Callable, symbols: List[str], queries: int) -> Dict[str, Any]:
+    session = service.session
+    session.calls.clear()
+    start = time.perf_counter()
+    for _ in range(queries):
+        func(service, symbols)
+    elapsed = time.perf_counter() - start
+    return {'calls_per_query': round(len(session.calls) / queries, 2),
+            'ms_per_query': round(elapsed / queries * 1000, 1),
+            'endpoints': session.endpoints()}
+
+
+def run_benchmark(queries: int = 5, latency: float = 0.02) -> List[Dict[str, Any]]:
+    """Calls-per-query of every scenario with the old and the batched access pattern"""
+    # The old code downloaded the rates table on every spot lookup: a zero freshness window reproduces that
+    legacy = CoinbaseAPIService(rates_max_age=0)
+    # Candle history goes to a scratch store, backfilled on the first query and local after that
+    batched = CoinbaseAPIService(candle_store=OHLCVStore(tempfile.mkdtemp(prefix="ohlcv-bench-")))
+    results = []
+    for name, before, after, symbols in SCENARIOS:
+        legacy.session = CountingSession(latency)
+        batched.session = CountingSession(latency)
+        # Each query starts from a cold table, as if a freshness window had just expired
+        batched._rates = None
+        old = _run(legacy, before, symbols, 1)
+        new = _run(batched, after, symbols, 1)
+        warm = _run(batched, after, symbols, queries)
+        results.append({'scenario': name, 'symbols': len(symbols), 'before': old, 'after': new, 'after_warm': warm})
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Coinbase upstream calls per query")
+    parser.add_argument("--queries", type=int, default=5, help="Warm queries per scenario")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Simulated latency of each upstream call")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.queries, args.latency_ms / 1000)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'scenario':<14}{'symbols':>8}{'calls before':>14}{'calls after':>13}{'warm':>6}"
+          f"{'ms before':>11}{'ms after':>10}")
+    for result in results:
+        print(f"{result['scenario']:<14}{result['symbols']:>8}"
+              f"{result['before']['calls_per_query']:>14}{result['after']['calls_per_query']:>13}"
+              f"{result['after_warm']['calls_per_query']:>6}"
+              f"{result['before']['ms_per_query']:>11}{result['after']['ms_per_query']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark for high-potential coin screening - wall time and upstream calls, per-coin loop vs bulk screening
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from coinbase_api_service import coinbase_service
+from crypto_data_service import crypto_data_service
+from crypto_prediction_engine import CryptoPredictionEngine
+from direct_crypto_api import direct_crypto_api
+from ohlcv_store import OHLCVStore
+from quote_store import quote_store
+from technical_indicators import indicator_engine
+
+# (CoinGecko id, symbol, price, market cap, 24h change)
+COINS = [("pepe", "PEPE", 0.0000123, 5.2e9, 6.1), ("sui", "SUI", 1.84, 5.6e9, -2.3),
+         ("bonk", "BONK", 0.000021, 1.4e9, 3.4), ("render-token", "RENDER", 7.1, 2.8e9, 1.2),
+         ("injective-protocol", "INJ", 24.5, 2.3e9, -6.8)]
+
+
+class _FakeResponse:
+    def __init__(self, payload: Any, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def json(self) -> Any:
+        return self._payload
+
+
+class MarketSession:
+    """Stands in for the shared HTTP client: canned CoinGecko, Binance and Coinbase payloads and a call log"""
+
+    def __init__(self, latency: float = 0.03, coins=COINS):
+        self.latency = latency
+        self.coins = {coin[0]: coin for coin in coins}
+        self.fail_markets = False
+        self.calls: List[str] = []
+        self._lock = threading.Lock()
+
+    def _route(self, url: str, params: Dict[str, Any]) -> _FakeResponse:
+        by_symbol = {coin[1]: coin for coin in self.coins.values()}
+        if "/search/trending" in url:
+            return _FakeResponse({"coins": [{"item": {"id": c[0], "name": c[0].title(), "symbol": c[1],
+                                                      "market_cap_rank": i + 20}}
+                                            for i, c in enumerate(self.coins.values())]})
+        if url.endswith("/global"):
+            return _FakeResponse({"data": {"total_market_cap": {"usd": 2.4e12}, "total_volume": {"usd": 9e10},
+                                           "market_cap_percentage": {"btc": 54.2, "eth": 16.8},
+                                           "active_cryptocurrencies": 12000}})
+        if url.endswith("/coins/markets"):
+            if self.fail_markets:
+                return _FakeResponse({}, 503)
+            return _FakeResponse([{"id": c[0], "symbol": c[1].lower(), "name": c[0].title(), "current_price": c[2],
+                                   "market_cap": c[3], "market_cap_rank": 30, "total_volume": c[3] / 20,
+                                   "price_change_percentage_24h": c[4]}
+                                  for coin_id in params.get("ids", "").split(",")
+                                  for c in [self.coins.get(coin_id)] if c])
+        if "api.binance.com" in url:
+            coin = by_symbol.get(url.rsplit("symbol=", 1)[-1].replace("USDT", ""))
+            if coin:
+                return _FakeResponse({"lastPrice": str(coin[2]), "priceChangePercent": str(coin[4])})
+        if url.endswith("/candles"):
+            coin = by_symbol.get(url.rsplit("/", 2)[-2].split("-")[0])
+            if coin:
+                seconds = params["granularity"]
+                start, end = (int(datetime.fromisoformat(params[k]).timestamp()) for k in ("start", "end"))
+                return _FakeResponse([[t, coin[2] * 0.97, coin[2] * 1.03, coin[2],
+                                       coin[2] * (1 + (t // seconds) % 7 / 100), 1e6]
+                                      for t in range(end - end % seconds - seconds, start - 1, -seconds)])
+        return _FakeResponse({}, 404)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> _FakeResponse:
+        with self._lock:
+            self.calls.append(url)
+        time.sleep(self.latency)
+        return self._route(url, params or {})
+
+    def endpoints(self) -> Dict[str, int]:
+        names = {"/search/trending": "trending", "/global": "global", "/coins/markets": "markets",
+                 "api.binance.com": "binance", "/candles": "candles"}
+        return dict(Counter(next((name for part, name in names.items() if part in url), "other")
+                            for url in self.calls))
+
+
+def install(session: MarketSession, candle_root: str) -> None:
+    """Point every data path the engine uses at the fake session and a scratch candle store"""
+    crypto_data_service.session = session
+    direct_crypto_api.session = session
+    coinbase_service.session = session
+    indicator_engine.store = OHLCVStore(candle_root, fetcher=coinbase_service.get_candles, request_pause=0)
+    quote_store.clear()
+    with crypto_data_service._windows_lock:
+        crypto_data_service._windows.clear()
+
+
+def legacy_screen(engine: CryptoPredictionEngine) -> List[Dict[str, Any]]:
+    """The per-coin loop screening used before: every coin fetches its own price, overview and history"""
+    results = []
+    for coin in crypto_data_service.get_trending_coins()[:10]:
+        symbol = coin.get("symbol", "").upper()
+        if symbol:
+            analysis = engine.analyze_growth_potential(symbol, engine.HORIZON_MEDIUM)
+            if analysis.get("potential_multiple", 0) >= 1.0:
+                results.append(analysis)
+    return results
+
+
+def _run(func, session: MarketSession) -> Dict[str, Any]:
+    session.calls.clear()
+    start = time.perf_counter()
+    results = func()
+    return {'ms': round((time.perf_counter() - start) * 1000, 1), 'calls': len(session.calls),
+            'endpoints': session.endpoints(), 'coins': len(results)}
+
+
+def run_benchmark(latency: float = 0.03) -> Dict[str, Any]:
+    session = MarketSession(latency)
+    saved = (crypto_data_service.session, direct_crypto_api.session, coinbase_service.session,
+             indicator_engine.store, crypto_data_service.overview_max_age)
+    try:
+        with tempfile.TemporaryDirectory() as before_root, tempfile.TemporaryDirectory() as after_root:
+            # Before: no overview window, so every coin re-fetches it as the old code did
+            install(session, before_root)
+            crypto_data_service.overview_max_age = 0
+            before = _run(lambda: legacy_screen(CryptoPredictionEngine()), session)
+
+            install(session, after_root)
+            crypto_data_service.overview_max_age = saved[4]
+            engine = CryptoPredictionEngine()
+            after = _run(engine.identify_high_potential_coins, session)
+            warm = _run(engine.identify_high_potential_coins, session)
+            return {'before': before, 'after': after, 'after_warm': warm, 'engine': dict(engine.stats)}
+    finally:
+        (crypto_data_service.session, direct_crypto_api.session, coinbase_service.session,
+         indicator_engine.store, crypto_data_service.overview_max_age) = saved
+        quote_store.clear()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark crypto screening wall time and upstream calls")
+    parser.add_argument("--latency-ms", type=float, default=30, help="Simulated latency of each upstream call")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.latency_ms / 1000)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    for name in ("before", "after", "after_warm"):
+        result = results[name]
+        print(f"{name:<11} {result['ms']:>8} ms  {result['calls']:>3} calls  {result['endpoints']}")
+    print(f"engine      {results['engine']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the forecast backtest - vectorized replay vs scoring each window through the live engine
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from crypto_prediction_engine import CryptoPredictionEngine
+from forecast_backtest import HORIZON_MEDIUM, MIN_HISTORY, ForecastBacktest
+from ohlcv_store import OHLCVStore
+from technical_indicators import LOOKBACK_DAYS, compute_indicators, stack
+
+START = 1_577_836_800  # 2020-01-01 UTC
+SYMBOLS = ["BTC", "ETH", "SOL", "BNB", "XRP", "ADA", "DOGE", "AVAX", "SHIB", "LINK"]
+
+
+def synthetic_history(days: int, seed: int, start_price: float = 100.0) -> Dict[str, np.ndarray]:
+    """A random walk with regime-switching drift, so trends and RSI extremes both occur"""
+    rng = np.random.default_rng(seed)
+    drift = np.repeat(rng.normal(0, 0.004, days // 60 + 1), 60)[:days]
+    close = start_price * np.exp(np.cumsum(drift + rng.normal(0, 0.035, days)))
+    swing = np.abs(rng.normal(0, 0.02, days))
+    return {"time": START + 86400 * np.arange(days, dtype=np.int64), "open": close, "high": close * (1 + swing),
+            "low": close * (1 - swing), "close": close, "volume": rng.gamma(2.0, 1e6, days)}
+
+
+def fill_store(store: OHLCVStore, symbols: List[str], days: int) -> None:
+    for index, symbol in enumerate(symbols):
+        store.append(symbol, "1d", synthetic_history(days, index))
+
+
+def window_indicators(history: Dict[str, np.ndarray], t: int) -> Dict[str, Any]:
+    """What indicator_engine.snapshot would have returned on day t"""
+    tail = {field: values[max(0, t + 1 - LOOKBACK_DAYS):t + 1] for field, values in history.items()}
+    values = compute_indicators(stack([tail]))
+    return {name: None if np.isnan(v[0]) else float(v[0]) for name, v in values.items()}
+
+
+def scalar_forecast(engine: CryptoPredictionEngine, symbol: str, history: Dict[str, np.ndarray], t: int,
+                    market_cap: float, horizon: str = HORIZON_MEDIUM) -> Dict[str, Any]:
+    """One window through the live scoring code, as a per-window replay would run it"""
+    close = history["close"]
+    price_data = {"price_usd": float(close[t]), "change_24h": float((close[t] / close[t - 1] - 1) * 100),
+                  "market_cap": market_cap}
+    return engine.score_growth_potential(symbol, horizon, price_data, None, window_indicators(history, t))
+
+
+def run_benchmark(symbols: int = 10, days: int = 2000, samples: int = 300,
+                  store_root: Optional[str] = None) -> Dict[str, Any]:
+    names = SYMBOLS[:symbols] + [f"C{i:03d}" for i in range(max(0, symbols - len(SYMBOLS)))]
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(store_root or root)
+        if not store_root:
+            fill_store(store, names, days)
+        backtest = ForecastBacktest(store)
+        results: Dict[str, Any] = {'symbols': len(names), 'days': days}
+        for model in ("prediction_engine", "direct_forecast"):
+            backtest.run(names, model)  # warm the memmaps
+            results[model] = backtest.run(names, model)
+
+        # Per-window replay through the live engine, timed on a sample
+        histories = backtest.load(names)
+        engine = CryptoPredictionEngine()
+        rng = np.random.default_rng(0)
+        picks = [(symbol, int(rng.integers(MIN_HISTORY, len(history["close"]))))
+                 for symbol, history in ((s, histories[s]) for s in rng.choice(list(histories), samples))]
+        started = time.perf_counter()
+        for symbol, t in picks:
+            scalar_forecast(engine, symbol, histories[symbol], t, backtest.market_cap(symbol))
+        per_window_us = (time.perf_counter() - started) * 1e6 / len(picks)
+
+    vectorized_us = results['prediction_engine']['per_forecast_us']
+    results['scalar_per_forecast_us'] = round(per_window_us, 1)
+    results['speedup'] = round(per_window_us / vectorized_us, 1) if vectorized_us else None
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized forecast backtest")
+    parser.add_argument("--symbols", type=int, default=10, help="Synthetic symbols")
+    parser.add_argument("--days", type=int, default=2000, help="Daily candles per symbol")
+    parser.add_argument("--samples", type=int, default=300, help="Windows timed through the live engine")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.symbols, args.days, args.samples)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{results['symbols']} symbols x {results['days']} daily candles")
+    for model in ("prediction_engine", "direct_forecast"):
+        report = results[model]
+        print(f"{model:<18} {report['forecasts']:>7} forecasts  {report['compute_ms']:>8} ms  "
+              f"{report['per_forecast_us']:>7} µs/forecast")
+        for horizon, result in report['horizons'].items():
+            print(f"  {horizon:<12} hit {result['direction_hit_rate']:.1%}  target {result['target_hit_rate']:.1%}  "
+                  f"calibration error {result['calibration_error_pct']} pts")
+    print(f"live engine, per window {results['scalar_per_forecast_us']:>7} µs/forecast  "
+          f"({results['speedup']}x slower)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
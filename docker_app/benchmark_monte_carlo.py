@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Monte Carlo scenario engine - 10k vectorized paths per symbol vs a per-path Python loop
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+from benchmark_forecast_backtest import synthetic_history
+from monte_carlo import (DEFAULT_PATHS, HORIZONS, LOOKBACK_DAYS, METHOD_BOOTSTRAP, METHOD_GBM, MonteCarloEngine,
+                         log_returns)
+from ohlcv_store import OHLCVStore
+
+
+def python_loop_bands(returns, spot: float, paths: int, days: int = 30) -> Dict[str, float]:
+    """Per-path loop: the shape of a hand-written simulation"""
+    returns = returns.tolist()
+    finals = []
+    for _ in range(paths):
+        total = 0.0
+        for _ in range(days):
+            total += random.choice(returns)
+        finals.append(spot * math.exp(total))
+    finals.sort()
+    return {f"p{p}": finals[int(p / 100 * (paths - 1))] for p in (5, 50, 95)}
+
+
+def _timed(func, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return round(sorted(samples)[len(samples) // 2] * 1000, 2)
+
+
+def run_benchmark(paths: int = DEFAULT_PATHS, repeats: int = 15) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root)
+        store.append("BTC", "1d", synthetic_history(LOOKBACK_DAYS + 30, 0, 60000))
+        engine = MonteCarloEngine(store, paths=paths)
+        results: Dict[str, Any] = {'paths': paths, 'days': max(HORIZONS.values())}
+        for method in (METHOD_BOOTSTRAP, METHOD_GBM):
+            results[f'{method}_ms'] = _timed(lambda: engine.simulate("BTC", method=method, refresh=False), repeats)
+        results['bands'] = engine.simulate("BTC", refresh=False, seed=0)['horizons']
+        returns = log_returns(store.range("BTC", "1d")["close"][-LOOKBACK_DAYS:])
+    results['python_loop_ms'] = _timed(lambda: python_loop_bands(returns, 60000, paths), 3)
+    results['speedup'] = round(results['python_loop_ms'] / results[f'{METHOD_BOOTSTRAP}_ms'], 1)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Monte Carlo price scenarios")
+    parser.add_argument("--paths", type=int, default=DEFAULT_PATHS, help="Simulated paths per symbol")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.paths)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{results['paths']:,} paths x {results['days']} days, one symbol")
+    print(f"bootstrap (store read + simulate) {results['bootstrap_ms']:>8} ms")
+    print(f"gbm (store read + simulate)       {results['gbm_ms']:>8} ms")
+    print(f"per-path Python loop              {results['python_loop_ms']:>8} ms  ({results['speedup']}x slower)")
+    for name, band in results['bands'].items():
+        print(f"  {name:<4} p5 {band['p5']:>10,.0f}  p50 {band['p50']:>10,.0f}  p95 {band['p95']:>10,.0f}  "
+              f"up {band['prob_up']:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the OHLCV store - a year of 1-minute candles: ingest, range queries and downsampling
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ohlcv_store import CANDLES_PER_REQUEST, OHLCVStore
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+START = 1_672_531_200  # 2023-01-01 UTC
+
+
+def synthetic_year(minutes: int = MINUTES_PER_YEAR, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Random-walk 1-minute candles"""
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.0008, minutes)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.0004, minutes)) * close
+    return {"time": START + 60 * np.arange(minutes, dtype=np.int64), "open": open_,
+            "high": np.maximum(open_, close) + spread, "low": np.minimum(open_, close) - spread,
+            "close": close, "volume": rng.gamma(2.0, 5.0, minutes)}
+
+
+def _timed(func, repeats: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {'p50_ms': round(samples[len(samples) // 2] * 1000, 3), 'max_ms': round(samples[-1] * 1000, 3)}
+
+
+def run_benchmark(minutes: int = MINUTES_PER_YEAR, queries: int = 200) -> Dict[str, Any]:
+    candles = synthetic_year(minutes)
+    rng = np.random.default_rng(1)
+    results: Dict[str, Any] = {'candles': minutes}
+
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root)
+        start = time.perf_counter()
+        for lo in range(0, minutes, CANDLES_PER_REQUEST):  # Backfill-sized appends
+            store.append("BTC", "1m", {k: v[lo:lo + CANDLES_PER_REQUEST] for k, v in candles.items()})
+        results['ingest_s'] = round(time.perf_counter() - start, 3)
+        results['disk_mb'] = round(sum(os.path.getsize(os.path.join(dirpath, name))
+                                       for dirpath, _, names in os.walk(root) for name in names) / 1e6, 1)
+
+        start = time.perf_counter()
+        cold = OHLCVStore(root)
+        cold.range("BTC", "1m", START, START + 3600)
+        results['cold_open_ms'] = round((time.perf_counter() - start) * 1000, 3)
+
+        end_time = START + 60 * minutes
+        for label, width in (("1h", 3600), ("1d", 86400), ("30d", 30 * 86400)):
+            starts = rng.integers(START, max(START + 1, end_time - width), queries)
+            queue = iter(starts.tolist() * 2)
+
+            def query(width=width):
+                t = next(queue)
+                return float(store.range("BTC", "1m", t, t + width)["close"].mean())
+            results[f'range_{label}'] = _timed(query, queries)
+
+        results['downsample_year_1h'] = _timed(lambda: store.range("BTC", "1h"), 5)
+        results['downsample_year_1d'] = _timed(lambda: store.range("BTC", "1d"), 5)
+
+    # What a query costs when history is a list of dicts filtered in Python
+    records: List[Dict[str, float]] = [{'time': int(t), 'close': float(c)}
+                                       for t, c in zip(candles["time"], candles["close"])]
+    lo = START + 60 * (minutes // 2)
+    results['python_scan_1d'] = _timed(
+        lambda: [r['close'] for r in records if lo <= r['time'] < lo + 86400], 5)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the OHLCV store with a year of 1-minute candles")
+    parser.add_argument("--minutes", type=int, default=MINUTES_PER_YEAR, help="1-minute candles to store")
+    parser.add_argument("--queries", type=int, default=200, help="Range queries per window size")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.minutes, args.queries)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{results['candles']:,} candles: ingest {results['ingest_s']}s, {results['disk_mb']} MB on disk, "
+          f"cold open {results['cold_open_ms']} ms")
+    for key in ("range_1h", "range_1d", "range_30d", "downsample_year_1h", "downsample_year_1d", "python_scan_1d"):
+        print(f"{key:<20} p50 {results[key]['p50_ms']:>9} ms   max {results[key]['max_ms']:>9} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
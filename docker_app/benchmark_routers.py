@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Router Benchmark - Accuracy, confusion matrix and decision latency for every routing implementation
+
+Evaluates optimized_router.smart_route, smart_router.smart_route and
+unified_router.unified_route against the labelled routing corpus, or replays
+production query logs through all of them to catch routing regressions
+before deploy.
+
+Usage:
+    python benchmark_routers.py [routing_corpus.jsonl] [--repeat 5]
+    python benchmark_routers.py --replay s3://bucket/telemetry/ --save-baseline routes.json
+    python benchmark_routers.py --replay events.jsonl --baseline routes.json --max-changed 0.02
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from intent_classifier import INTENT_LABELS, label_from_assistant, load_labelled_queries
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routing_corpus.jsonl")
+
+# Fixed context so every router formats identical prompts
+DATETIME_CONTEXT = "Current date and time: Monday, January 06, 2025 at 09:00 AM UTC\n\n"
+
+# Router name -> (module, entry point)
+ROUTERS = {
+    "optimized_router": ("optimized_router", "smart_route"),
+    "smart_router": ("smart_router", "smart_route"),
+    "unified_router": ("unified_router", "unified_route"),
+}
+
+# Assistant keys used by the legacy rule table, mapped onto the routing domains
+LEGACY_KEY_LABELS = {
+    "financial": "business_finance",
+    "aws": "tech_security",
+    "math": "research_knowledge",
+    "english": "research_knowledge",
+    "research": "research_knowledge",
+    "web_browser": "research_knowledge",
+    "louisiana_legal": "specialized_industries",
+}
+
+# Decisions that do not name an assistant
+DIRECT_RESPONSE = "direct_response"
+TEACHER = "teacher"
+PARALLEL = "parallel"
+
+_ANSWER_MARKER = "routed-to:"
+
+
+class _RouteTarget:
+    """Named callable standing in for an assistant; routers only inspect the key it is stored under"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.__name__ = f"{key}_assistant"
+
+    def __call__(self, prompt: str) -> str:
+        return f"{_ANSWER_MARKER}{self.key}"
+
+
+def route_targets() -> Dict[str, _RouteTarget]:
+    """One target per assistant key any router may pick"""
+    keys = set(INTENT_LABELS) | set(LEGACY_KEY_LABELS)
+    return {key: _RouteTarget(key) for key in sorted(keys)}
+
+
+def decision_label(assistant_func: Optional[Callable], enhanced_prompt: Optional[str]) -> str:
+    """Map a router's (assistant_function, enhanced_prompt) result to a corpus label"""
+    if isinstance(assistant_func, _RouteTarget):
+        return LEGACY_KEY_LABELS.get(assistant_func.key, assistant_func.key)
+    if assistant_func is not None:
+        return getattr(assistant_func, "__name__", str(assistant_func))
+    if enhanced_prompt is None:
+        return TEACHER
+    if enhanced_prompt.startswith(_ANSWER_MARKER):
+        return PARALLEL
+    return DIRECT_RESPONSE
+
+
+def load_routers(names: Optional[Iterable[str]] = None) -> Dict[str, Callable]:
+    """Import the requested routers; ones that cannot be imported here are reported and left out"""
+    # Benchmarks never export telemetry, and without this the telemetry module
+    # creates its CloudWatch log group on import, which fails without AWS credentials
+    os.environ["ENABLE_TELEMETRY"] = "false"
+    routers = {}
+    for name in names or ROUTERS:
+        module_name, function_name = ROUTERS[name]
+        try:
+            routers[name] = getattr(importlib.import_module(module_name), function_name)
+        except Exception as e:
+            print(f"Failed to load {name}: {type(e).__name__}: {str(e)}")
+    return routers
+
+
+@contextlib.contextmanager
+def quiet_routing():
+    """
+    Silence router logging and side effects for the duration of a benchmark
+
+    Telemetry and the direct crypto forecast (which calls external price APIs)
+    are switched off in unified_router, so crypto forecast prompts are scored
+    on the keyword route they fall through to.
+    """
+    unified = sys.modules.get("unified_router")
+    saved = {}
+    if unified is not None:
+        for flag in ("TELEMETRY_ENABLED", "DIRECT_FORECAST_AVAILABLE"):
+            saved[flag] = getattr(unified, flag)
+            setattr(unified, flag, False)
+    logging.disable(logging.CRITICAL)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+        for flag, value in saved.items():
+            setattr(unified, flag, value)
+
+
+def clear_memos() -> None:
+    """Drop memoized tokenization/classification so every timed decision is a cold prompt"""
+    from keyword_classifier import tokenize
+
+    tokenize.cache_clear()
+    # One classifier compiled from every router's keyword tables
+    classifier = getattr(sys.modules.get("router_config"), "_classifier", None)
+    if classifier is not None:
+        classifier.classify.cache_clear()
+
+
+@dataclass
+class RouterReport:
+    router: str
+    predictions: List[str] = field(default_factory=list)
+    latencies_us: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def accuracy(self, labels: Sequence[str]) -> float:
+        correct = sum(p == l for p, l in zip(self.predictions, labels))
+        return correct / max(len(labels), 1)
+
+    def confusion(self, labels: Sequence[str]) -> Counter:
+        """(expected, predicted) -> count"""
+        return Counter(zip(labels, self.predictions))
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        if not self.latencies_us:
+            return {"p50_us": 0.0, "p99_us": 0.0, "mean_us": 0.0}
+        values = np.asarray(self.latencies_us)
+        return {
+            "p50_us": float(np.percentile(values, 50)),
+            "p99_us": float(np.percentile(values, 99)),
+            "mean_us": float(values.mean()),
+        }
+
+
+def run_router(name: str, router: Callable, queries: Sequence[str], repeat: int = 3) -> RouterReport:
+    """
+    Route every query and time each decision
+
+    Each query is timed `repeat` times from a cold memo; the decision from
+    the first run is kept and all runs contribute to the latency distribution.
+    """
+    report = RouterReport(name)
+    assistants = route_targets()
+    with quiet_routing():
+        for query in queries:
+            label = None
+            for _ in range(max(repeat, 1)):
+                clear_memos()
+                start = time.perf_counter_ns()
+                try:
+                    result = router(query, DATETIME_CONTEXT, assistants)
+                except Exception:
+                    result = None
+                report.latencies_us.append((time.perf_counter_ns() - start) / 1000)
+                if label is None:
+                    if result is None:
+                        report.errors += 1
+                        label = "error"
+                    else:
+                        label = decision_label(*result)
+            report.predictions.append(label)
+    return report
+
+
+def format_confusion(report: RouterReport, labels: Sequence[str]) -> str:
+    """Confusion matrix as text: rows are expected labels, columns are predictions"""
+    matrix = report.confusion(labels)
+    rows = sorted(set(labels))
+    columns = sorted(set(report.predictions) | set(rows))
+    width = max(len(c) for c in columns + rows) + 1
+    short = {c: c[:8] for c in columns}
+    lines = [" " * width + "".join(f"{short[c]:>9}" for c in columns)]
+    for row in rows:
+        lines.append(f"{row:<{width}}" + "".join(f"{matrix.get((row, c), 0):>9}" for c in columns))
+    return "\n".join(lines)
+
+
+def summarize(report: RouterReport, labels: Optional[Sequence[str]] = None) -> Dict:
+    summary = {"router": report.router, "queries": len(report.predictions), "errors": report.errors,
+               **{k: round(v, 1) for k, v in report.latency_percentiles().items()}}
+    if labels is not None:
+        summary["accuracy"] = round(report.accuracy(labels), 3)
+    return summary
+
+
+def benchmark_corpus(corpus_path: str, routers: Dict[str, Callable], repeat: int = 3) -> List[Dict]:
+    """Accuracy, confusion matrix and latency of every router on a labelled corpus"""
+    queries, labels = load_labelled_queries([corpus_path])
+    print(f"Corpus: {len(queries)} labelled queries from {corpus_path}")
+    summaries = []
+    for name, router in routers.items():
+        report = run_router(name, router, queries, repeat)
+        summary = summarize(report, labels)
+        summaries.append(summary)
+        print(f"\n{'=' * 60}\n{name}\n{'=' * 60}")
+        print(f"Accuracy: {summary['accuracy']:.1%}  p50: {summary['p50_us']}µs  "
+              f"p99: {summary['p99_us']}µs  errors: {summary['errors']}")
+        print(format_confusion(report, labels))
+    return summaries
+
+
+def replay(events: Iterable[Dict], routers: Dict[str, Callable], repeat: int = 1) -> Tuple[List[str], Dict[str, RouterReport], List[Optional[str]]]:
+    """
+    Run logged production queries through every router
+
+    Only events that carry query text (TELEMETRY_LOG_QUERY_TEXT) can be replayed.
+
+    Returns:
+        Tuple of (queries, router name -> report, label logged by production for each query)
+    """
+    queries, logged = [], []
+    seen = set()
+    for event in events:
+        query = event.get("query")
+        if not query or event.get("event_type") != "response" or event.get("query_length", 0) > 100:
+            continue
+        if query in seen:
+            continue
+        seen.add(query)
+        queries.append(query)
+        logged.append(label_from_assistant(event.get("assistant_used")))
+    reports = {name: run_router(name, router, queries, repeat) for name, router in routers.items()}
+    return queries, reports, logged
+
+
+def compare_to_baseline(queries: Sequence[str], reports: Dict[str, RouterReport], baseline: Dict[str, Dict[str, str]]) -> Dict[str, List[Tuple[str, str, str]]]:
+    """Per router, the queries whose decision differs from the saved baseline as (query, before, after)"""
+    changes = {}
+    for name, report in reports.items():
+        before = baseline.get(name, {})
+        changes[name] = [(q, before[q], p) for q, p in zip(queries, report.predictions)
+                         if q in before and before[q] != p]
+    return changes
+
+
+def _replay_main(args, routers: Dict[str, Callable]) -> int:
+    from cache_prewarm import read_events
+
+    queries, reports, logged = replay(read_events(args.replay), routers, args.repeat)
+    print(f"Replayed {len(queries)} distinct production queries from {args.replay}")
+
+    for name, report in reports.items():
+        summary = summarize(report)
+        known = [(p, l) for p, l in zip(report.predictions, logged) if l]
+        agreement = sum(p == l for p, l in known) / max(len(known), 1)
+        print(f"\n{name}: p50 {summary['p50_us']}µs  p99 {summary['p99_us']}µs  errors {summary['errors']}  "
+              f"agreement with logged assistant {agreement:.1%} ({len(known)} labelled)")
+        for label, count in Counter(report.predictions).most_common():
+            print(f"   {label:<24} {count}")
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for name, changed in compare_to_baseline(queries, reports, baseline).items():
+            compared = sum(q in baseline.get(name, {}) for q in queries)
+            fraction = len(changed) / max(compared, 1)
+            flag = "REGRESSION" if fraction > args.max_changed else "ok"
+            print(f"\n{name}: {len(changed)}/{compared} decisions changed ({fraction:.1%}) [{flag}]")
+            for query, before, after in changed[:20]:
+                print(f"   {before} -> {after}: {query[:70]}")
+            if fraction > args.max_changed:
+                status = 1
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({name: dict(zip(queries, report.predictions)) for name, report in reports.items()}, f, indent=1)
+        print(f"\nSaved routing decisions to {args.save_baseline}")
+    return status
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark routing accuracy and decision latency")
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, help="Labelled JSONL corpus")
+    parser.add_argument("--routers", nargs="+", choices=sorted(ROUTERS), help="Routers to evaluate (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per query")
+    parser.add_argument("--replay", help="Telemetry events to replay (JSONL file or s3://bucket/prefix)")
+    parser.add_argument("--baseline", help="Saved routing decisions to compare the replay against")
+    parser.add_argument("--save-baseline", help="Write the replay's routing decisions to this file")
+    parser.add_argument("--max-changed", type=float, default=0.02,
+                        help="Fraction of changed decisions that fails the replay")
+    parser.add_argument("--json", action="store_true", help="Print corpus summaries as JSON")
+    args = parser.parse_args(argv)
+
+    requested = args.routers or list(ROUTERS)
+    routers = load_routers(requested)
+    if len(routers) < len(set(requested)):
+        print(f"Could not load: {', '.join(sorted(set(requested) - set(routers)))}")
+        return 1
+
+    if args.replay:
+        return _replay_main(args, routers)
+
+    summaries = benchmark_corpus(args.corpus, routers, args.repeat)
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the technical indicator engine - a top-100 universe in one pass vs a per-symbol Python loop
+"""
+
+import argparse
+import json
+import math
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ohlcv_store import OHLCVStore
+from technical_indicators import LOOKBACK_DAYS, TechnicalIndicatorEngine, compute_indicators, stack
+
+START = 1_672_531_200  # 2023-01-01 UTC
+
+
+def synthetic_universe(symbols: int, days: int, seed: int = 0) -> Dict[str, Dict[str, np.ndarray]]:
+    rng = np.random.default_rng(seed)
+    universe = {}
+    for index in range(symbols):
+        close = rng.uniform(0.1, 50000) * np.exp(np.cumsum(rng.normal(0, 0.04, days)))
+        universe[f"C{index:03d}"] = {"time": START + 86400 * np.arange(days, dtype=np.int64), "open": close,
+                                     "high": close * 1.03, "low": close * 0.97, "close": close,
+                                     "volume": rng.gamma(2.0, 1e6, days)}
+    return universe
+
+
+def _python_indicators(close: List[float], high: List[float], low: List[float]) -> Dict[str, float]:
+    """Per-symbol loop: the shape of a hand-written implementation"""
+    def ema(values, span):
+        alpha, out = 2 / (span + 1), [values[0]]
+        for value in values[1:]:
+            out.append(alpha * value + (1 - alpha) * out[-1])
+        return out
+
+    gains = losses = tr = None
+    for i in range(1, len(close)):
+        delta = close[i] - close[i - 1]
+        g, l = max(delta, 0.0), max(-delta, 0.0)
+        r = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+        gains = g if gains is None else gains + (g - gains) / 14
+        losses = l if losses is None else losses + (l - losses) / 14
+        tr = r if tr is None else tr + (r - tr) / 14
+    line = [a - b for a, b in zip(ema(close, 12), ema(close, 26))]
+    window = close[-20:]
+    mean = sum(window) / 20
+    returns = [math.log(close[i] / close[i - 1]) for i in range(len(close) - 30, len(close))]
+    return {'rsi': 100 - 100 / (1 + gains / losses) if losses else 100.0, 'macd': line[-1] - ema(line, 9)[-1],
+            'sma_50': sum(close[-50:]) / 50, 'sma_200': sum(close[-200:]) / 200, 'atr': tr,
+            'bollinger_std': math.sqrt(sum((c - mean) ** 2 for c in window) / 20),
+            'volatility': math.sqrt(sum((r - sum(returns) / 30) ** 2 for r in returns) / 29 * 365)}
+
+
+def _timed(func, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return round(sorted(samples)[len(samples) // 2] * 1000, 2)
+
+
+def run_benchmark(symbols: int = 100, days: int = LOOKBACK_DAYS, repeats: int = 7) -> Dict[str, Any]:
+    universe = synthetic_universe(symbols, days)
+    histories = list(universe.values())
+    matrices = stack(histories)
+    lists = [(h["close"].tolist(), h["high"].tolist(), h["low"].tolist()) for h in histories]
+
+    results: Dict[str, Any] = {'symbols': symbols, 'days': days}
+    results['vectorized_ms'] = _timed(lambda: compute_indicators(matrices), repeats)
+    results['python_loop_ms'] = _timed(lambda: [_python_indicators(*columns) for columns in lists], repeats)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root)
+        for symbol, candles in universe.items():
+            store.append(symbol, "1d", candles)
+        engine = TechnicalIndicatorEngine(store)
+        results['engine_from_store_ms'] = _timed(lambda: engine.universe(universe, refresh=False), repeats)
+    results['speedup'] = round(results['python_loop_ms'] / results['vectorized_ms'], 1)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark technical indicators over a coin universe")
+    parser.add_argument("--symbols", type=int, default=100, help="Coins in the universe")
+    parser.add_argument("--days", type=int, default=LOOKBACK_DAYS, help="Daily candles per coin")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.symbols, args.days)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{results['symbols']} symbols x {results['days']} daily candles")
+    print(f"vectorized pass        {results['vectorized_ms']:>8} ms")
+    print(f"engine incl. store     {results['engine_from_store_ms']:>8} ms")
+    print(f"per-symbol Python loop {results['python_loop_ms']:>8} ms  ({results['speedup']}x slower)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
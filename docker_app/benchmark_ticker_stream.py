@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the streaming ticker ingest - replay throughput and quote read latency from the store
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+from quote_store import QuoteStore
+from ticker_stream import DEFAULT_PRODUCTS, ReplayServer, TickerStream, WEBSOCKET_AVAILABLE, \
+    replay_source, synthetic_ticks, websocket_source
+
+
+def _ingest(source, products: List[str], ticks: int, store: QuoteStore) -> Dict[str, Any]:
+    stream = TickerStream(source, products, store=store)
+    start = time.perf_counter()
+    stream.start()
+    while stream.get_stats()['ticks'] < ticks and time.perf_counter() - start < 60:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    stream.stop()
+    stats = stream.get_stats()
+    return {'ticks': stats['ticks'], 'seconds': round(elapsed, 3),
+            'ticks_per_sec': round(stats['ticks'] / elapsed) if elapsed else 0, 'gaps': stats['gaps']}
+
+
+def _read_latency(store: QuoteStore, symbols: List[str], reads: int) -> Dict[str, float]:
+    samples = []
+    for i in range(reads):
+        symbol = symbols[i % len(symbols)]
+        start = time.perf_counter_ns()
+        store.get(symbol, max_age=3600)
+        samples.append(time.perf_counter_ns() - start)
+    samples.sort()
+    return {'p50_us': round(samples[len(samples) // 2] / 1000, 2),
+            'p99_us': round(samples[int(len(samples) * 0.99)] / 1000, 2)}
+
+
+def run_benchmark(ticks: int = 50000, reads: int = 100000) -> Dict[str, Any]:
+    products = list(DEFAULT_PRODUCTS)
+    recording = synthetic_ticks(products, count=ticks)
+    store = QuoteStore()
+    results = {'in_process': _ingest(replay_source(recording), products, ticks, store)}
+    if WEBSOCKET_AVAILABLE:
+        server = ReplayServer(recording).start()
+        try:
+            results['websocket'] = _ingest(websocket_source(server.url), products, ticks, QuoteStore())
+        finally:
+            server.stop()
+    results['quote_read'] = _read_latency(store, [p.split("-")[0] for p in products], reads)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ticker ingest and quote reads")
+    parser.add_argument("--ticks", type=int, default=50000, help="Recorded ticks to replay")
+    parser.add_argument("--reads", type=int, default=100000, help="Quote reads to time")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.ticks, args.reads)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    for feed in ("in_process", "websocket"):
+        if feed in results:
+            result = results[feed]
+            print(f"{feed:<12} {result['ticks']:>8} ticks in {result['seconds']:>7}s "
+                  f"({result['ticks_per_sec']:,} ticks/s, {result['gaps']} gaps)")
+    if 'websocket' not in results:
+        print("websocket    skipped (websocket-client not installed)")
+    read = results['quote_read']
+    print(f"quote read   p50 {read['p50_us']} us, p99 {read['p99_us']} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 from strands import Agent, tool
 from realtime_data_access import enhance_query_with_realtime
-import requests
+from http_client import http_client
 import re
 
 BUSINESS_CONTACT_SYSTEM_PROMPT = """
@@ -100,7 +100,7 @@ def find_company_website(company_name):
         for domain in domains:
             try:
                 headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-                response = requests.get(domain, headers=headers, timeout=10)
+                response = http_client.get(domain, headers=headers, timeout=10)
                 if response.status_code == 200:
                     return f"Official Website: {domain}\nStatus: Accessible\nNote: Check contact/about pages for business contact information"
             except:
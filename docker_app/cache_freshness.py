@@ -0,0 +1,156 @@
+"""
+Cache Freshness - Per-domain TTL classes and real-time data versions for cached answers
+
+Sources are versioned per entity ("crypto:BTC", "aviation:N12345"), so new
+data about one coin or flight leaves answers about the others alone. A
+request records the version of every source it reads while it runs, and
+its cached answer is tagged with exactly those. Versions are fingerprints
+held by one process; entries written by another process (another task,
+the prewarm job) are not version-checked and expire by TTL.
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# TTL and real-time data dependencies for each class of answer
+FRESHNESS_CLASSES = {
+    "no_cache": {"ttl": 0, "data_sources": []},                   # Time/date answers
+    "live_market": {"ttl": 30, "data_sources": ["crypto"]},       # Built on 30s quotes
+    "aviation_live": {"ttl": 60, "data_sources": ["aviation"]},
+    "f1_weekend": {"ttl": 300, "data_sources": ["f1", "f1_standings"]},
+    "news": {"ttl": 300, "data_sources": []},
+    "standard": {"ttl": 300, "data_sources": []},
+    "evergreen": {"ttl": 86400, "data_sources": []}                # General knowledge
+}
+
+DEFAULT_FRESHNESS = "standard"
+
+# Words that make an otherwise evergreen answer time-sensitive
+TIME_SENSITIVE_TERMS = {"today", "now", "current", "currently", "latest", "recent", "tonight", "yesterday"}
+
+
+def get_freshness(name: Optional[str]) -> Dict[str, Any]:
+    """Get the TTL and data sources for a freshness class"""
+    return FRESHNESS_CLASSES.get(name or DEFAULT_FRESHNESS, FRESHNESS_CLASSES[DEFAULT_FRESHNESS])
+
+
+def entity_source(family: str, entity: Optional[str] = None) -> str:
+    """Source name for one entity of a data family, e.g. crypto:BTC or aviation:N12345"""
+    entity = str(entity).strip().upper() if entity else ""
+    return f"{family}:{entity}" if entity else family
+
+
+def dependent_versions(reads: Dict[str, str], name: Optional[str]) -> Dict[str, str]:
+    """The recorded reads an answer of the given freshness class depends on"""
+    families = set(get_freshness(name)["data_sources"])
+    return {source: version for source, version in reads.items() if source.split(":", 1)[0] in families}
+
+
+def adjust_for_time_sensitivity(name: str, prompt: str) -> str:
+    """Downgrade evergreen answers for prompts about the present moment"""
+    if name == "evergreen" and TIME_SENSITIVE_TERMS.intersection(prompt.lower().split()):
+        return "news"
+    return name
+
+
+# Versions read by the current request (see DataVersionRegistry.capture)
+_request_reads: contextvars.ContextVar = contextvars.ContextVar("data_version_reads", default=None)
+
+
+class DataVersionRegistry:
+    """Tracks a content fingerprint of the latest snapshot of each real-time data source"""
+
+    def __init__(self):
+        self._versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        # Identifies whose fingerprints an entry carries; other processes' can't be compared here
+        self.owner = uuid.uuid4().hex[:12]
+
+    @staticmethod
+    def fingerprint(payload: Any) -> str:
+        """Stable short hash of a data payload"""
+        if not isinstance(payload, (str, bytes)):
+            payload = json.dumps(payload, sort_keys=True, default=str)
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        return hashlib.sha1(payload).hexdigest()[:12]
+
+    def publish(self, source: str, payload: Any, reads: Optional[Dict[str, str]] = None) -> str:
+        """Record a new snapshot of a source, read by the current request; returns its version"""
+        version = self.fingerprint(payload)
+        with self._lock:
+            self._versions[source] = version
+        self._note(source, version, reads)
+        return version
+
+    def record(self, source: str, payload: Any, reads: Optional[Dict[str, str]] = None) -> str:
+        """Note that the current request read payload (e.g. a delayed snapshot) without publishing it"""
+        version = self.fingerprint(payload)
+        self._note(source, version, reads)
+        return version
+
+    def note_current(self, source: str, reads: Optional[Dict[str, str]] = None) -> None:
+        """Note that the current request read the latest published snapshot of a source"""
+        version = self.get(source)
+        if version is not None:
+            self._note(source, version, reads)
+
+    @staticmethod
+    def _note(source: str, version: str, reads: Optional[Dict[str, str]]) -> None:
+        reads = reads if reads is not None else _request_reads.get()
+        if reads is not None:
+            reads[source] = version
+
+    @staticmethod
+    def active_reads() -> Optional[Dict[str, str]]:
+        """The current request's read log, for code that reads data on other threads"""
+        return _request_reads.get()
+
+    @contextlib.contextmanager
+    def capture(self) -> Iterator[Dict[str, str]]:
+        """Collect the versions of every source read inside the block (nested blocks also report outward)"""
+        outer = _request_reads.get()
+        reads: Dict[str, str] = {}
+        token = _request_reads.set(reads)
+        try:
+            yield reads
+        finally:
+            _request_reads.reset(token)
+            if outer is not None:
+                outer.update(reads)
+
+    def call_capturing(self, fn: Callable, *args: Any, **kwargs: Any) -> Tuple[Any, Dict[str, str]]:
+        """fn's result and the versions it read, so callers sharing the result can share the tags"""
+        with self.capture() as reads:
+            result = fn(*args, **kwargs)
+        return result, dict(reads)
+
+    def get(self, source: str) -> Optional[str]:
+        """Get the current version of a source, or None if never fetched"""
+        with self._lock:
+            return self._versions.get(source)
+
+    def snapshot(self, sources: List[str]) -> Dict[str, str]:
+        """Current versions of the given sources, for tagging a cache entry"""
+        with self._lock:
+            return {source: self._versions[source] for source in sources if source in self._versions}
+
+    def is_current(self, versions: Optional[Dict[str, str]]) -> bool:
+        """Whether an entry's data versions (written by this process) still match the latest snapshots"""
+        if not versions:
+            return True
+        with self._lock:
+            for source, version in versions.items():
+                current = self._versions.get(source)
+                # A source this process has not fetched yet gives no evidence of newer data
+                if current is not None and current != version:
+                    return False
+        return True
+
+# Global instance
+data_versions = DataVersionRegistry()
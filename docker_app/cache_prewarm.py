@@ -0,0 +1,316 @@
+"""
+Cache Prewarm - Keep answers to the most frequent queries warm in ResponseCache
+
+Mines the telemetry interaction log (the Firehose S3 export or a local JSONL
+file) for the most frequent normalized queries per domain, computes their
+answers and refreshes them ahead of expiry. Queries are counted by their
+hash; only those whose text was logged (TELEMETRY_LOG_QUERY_TEXT opt-in)
+can be answered. Answers live under their own cache-key namespace, never
+under a user's or the anonymous session's key.
+"""
+
+import gzip
+import heapq
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from response_cache import normalize_query, query_fingerprint
+from cache_freshness import data_versions, dependent_versions, get_freshness
+
+# Telemetry only records the first 100 characters of a query
+MAX_LOGGED_QUERY_LENGTH = 100
+
+# Cache-key namespace of pre-warmed answers (ResponseCache.get_cache_key namespace=)
+PREWARM_NAMESPACE = "prewarm"
+
+
+@dataclass
+class PrewarmQuery:
+    """A frequent query and where it was seen"""
+    query: str
+    domain: str
+    count: int
+    users: int
+    assistants: List[str] = field(default_factory=list)
+
+
+def read_events(source: str) -> Iterator[Dict]:
+    """
+    Read telemetry events from a local JSONL file (optionally gzipped)
+    or an s3://bucket/prefix of Firehose deliveries
+    """
+    if source.startswith("s3://"):
+        yield from _read_s3_events(source)
+        return
+
+    opener = gzip.open if source.endswith(".gz") else open
+    with opener(source, "rt", encoding="utf-8") as f:
+        yield from _parse_lines(f)
+
+
+def _read_s3_events(source: str) -> Iterator[Dict]:
+    import boto3
+
+    bucket, _, prefix = source[len("s3://"):].partition("/")
+    s3 = boto3.client("s3", region_name=os.environ.get("AWS_REGION", "us-west-2"))
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            body = s3.get_object(Bucket=bucket, Key=obj["Key"])["Body"].read()
+            # Firehose delivers GZIP-compressed objects
+            if body[:2] == b"\x1f\x8b":
+                body = gzip.decompress(body)
+            yield from _parse_lines(body.decode("utf-8").splitlines())
+
+
+def _parse_lines(lines: Iterable[str]) -> Iterator[Dict]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(event, dict):
+            yield event
+
+
+def mine_top_queries(events: Iterable[Dict], top_n: int = 20, min_count: int = 3,
+                     min_users: int = 2, since_ms: Optional[int] = None) -> Dict[str, List[PrewarmQuery]]:
+    """
+    Most frequent normalized queries per domain (telemetry query_type)
+
+    Only answered queries are counted, grouped by query hash. Queries asked
+    by fewer than min_users distinct users are dropped, which keeps one
+    user's personal questions out of the shared cache, and so are queries
+    whose text never appeared in the log.
+    """
+    counts = defaultdict(Counter)
+    users = defaultdict(set)
+    assistants = defaultdict(Counter)
+    texts = {}
+
+    for event in events:
+        if event.get("event_type") != "response" or not (event.get("query_hash") or event.get("query")):
+            continue
+        if event.get("query_length", 0) > MAX_LOGGED_QUERY_LENGTH:
+            continue  # Truncated in the log; the original can't be reconstructed
+        if since_ms and event.get("timestamp", 0) < since_ms:
+            continue
+
+        fingerprint = event.get("query_hash") or query_fingerprint(event["query"])
+        if event.get("query"):
+            texts[fingerprint] = normalize_query(event["query"])
+        domain = event.get("query_type", "general")
+        counts[domain][fingerprint] += 1
+        users[(domain, fingerprint)].add(event.get("user_id"))
+        assistants[(domain, fingerprint)][event.get("assistant_used", "unknown")] += 1
+
+    top = {}
+    for domain, domain_counts in counts.items():
+        ranked = []
+        for fingerprint, count in domain_counts.most_common():
+            if count < min_count:
+                break
+            distinct_users = len(users[(domain, fingerprint)])
+            if distinct_users < min_users or fingerprint not in texts:
+                continue
+            ranked.append(PrewarmQuery(texts[fingerprint], domain, count, distinct_users,
+                                       [name for name, _ in assistants[(domain, fingerprint)].most_common()]))
+            if len(ranked) >= top_n:
+                break
+        if ranked:
+            top[domain] = ranked
+    return top
+
+
+def _default_answer(query: str) -> Tuple[Optional[str], str]:
+    """Answer a query the way the app does for routed assistants"""
+    from lazy_assistant import LazyAssistant
+    from unified_router import unified_route_with_freshness
+
+    assistants = {
+        'business_finance': LazyAssistant('unified_assistants', 'business_finance_assistant'),
+        'tech_security': LazyAssistant('unified_assistants', 'tech_security_assistant'),
+        'research_knowledge': LazyAssistant('unified_assistants', 'research_knowledge_assistant'),
+        'specialized_industries': LazyAssistant('unified_assistants', 'specialized_industries_assistant'),
+        'universal': LazyAssistant('unified_assistants', 'universal_assistant'),
+        'aviation': LazyAssistant('aviation_assistant', 'aviation_assistant'),
+        'formula1': LazyAssistant('formula1_assistant', 'formula1_assistant')
+    }
+    datetime_context = datetime.now(timezone.utc).strftime("%A, %B %d, %Y at %I:%M %p UTC")
+    assistant_func, enhanced_prompt, freshness = unified_route_with_freshness(query, datetime_context, assistants)
+
+    # Teacher fallback answers use conversation context and are never shared
+    if not assistant_func:
+        return None, freshness
+    return str(assistant_func(enhanced_prompt)), freshness
+
+
+class CachePrewarmer:
+    """Computes answers for frequent queries and refreshes them before they expire"""
+
+    def __init__(self, source: str, cache=None, models: Optional[List[str]] = None,
+                 answer_fn: Callable[[str], Tuple[Optional[str], str]] = None,
+                 top_n: int = 20, min_count: int = 3, min_users: int = 2,
+                 lookback_hours: float = 24, mine_interval: float = 3600, refresh_lead: float = 0.2):
+        if cache is None:
+            from response_cache import response_cache as cache
+        if models is None:
+            from model_options import get_default_model
+            models = [get_default_model()]
+
+        self.source = source
+        self.cache = cache
+        self.models = models
+        self.answer_fn = answer_fn or _default_answer
+        self.top_n = top_n
+        self.min_count = min_count
+        self.min_users = min_users
+        self.lookback_hours = lookback_hours
+        self.mine_interval = mine_interval
+        self.refresh_lead = refresh_lead  # Fraction of the TTL to refresh ahead of expiry
+
+        self.queries: Dict[str, PrewarmQuery] = {}
+        self._schedule: List[Tuple[float, str]] = []  # (refresh_at, query) min-heap
+        self._scheduled = set()
+        self._uncacheable = set()  # Routed to no_cache or the teacher fallback
+        self._next_mine = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'mined': 0, 'refreshed': 0, 'skipped': 0, 'errors': 0}
+
+    def mine(self, now: Optional[float] = None) -> Dict[str, List[PrewarmQuery]]:
+        """Re-read the log and schedule new head queries for immediate warming"""
+        now = now if now is not None else time.time()
+        since_ms = int((now - self.lookback_hours * 3600) * 1000) if self.lookback_hours else None
+        top = mine_top_queries(read_events(self.source), self.top_n, self.min_count, self.min_users, since_ms)
+
+        current = {q.query: q for ranked in top.values() for q in ranked}
+        for query in current:
+            if query not in self._scheduled and query not in self._uncacheable:
+                heapq.heappush(self._schedule, (now, query))
+                self._scheduled.add(query)
+        self.queries = current
+        self.stats['mined'] = len(current)
+        self._next_mine = now + self.mine_interval
+        return top
+
+    def refresh(self, query: str, now: Optional[float] = None) -> Optional[float]:
+        """
+        Compute and cache one query for every model
+
+        Returns:
+            When the query should next be refreshed, or None to stop refreshing it
+        """
+        now = now if now is not None else time.time()
+        try:
+            (content, freshness), reads = data_versions.call_capturing(self.answer_fn, query)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"Prewarm error for '{query}': {str(e)}")
+            return now + 60
+
+        freshness_class = get_freshness(freshness)
+        if not content or freshness_class['ttl'] <= 0:
+            self.stats['skipped'] += 1
+            self._uncacheable.add(query)
+            return None
+
+        versions = dependent_versions(reads, freshness)
+        for model in self.models:
+            # Own namespace, checked by the app after a miss on the session's key
+            self.cache.set(self.cache.get_cache_key(query, model, namespace=PREWARM_NAMESPACE), content,
+                           ttl=freshness_class['ttl'], data_versions=versions)
+        self.stats['refreshed'] += 1
+
+        ttl = freshness_class['ttl']
+        return now + max(ttl * (1 - self.refresh_lead), 1)
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """Mine if due and refresh every query whose refresh time has come"""
+        now = now if now is not None else time.time()
+        if now >= self._next_mine:
+            self.mine(now)
+
+        refreshed = 0
+        while self._schedule and self._schedule[0][0] <= now:
+            _, query = heapq.heappop(self._schedule)
+            if query not in self.queries:
+                self._scheduled.discard(query)  # Fell out of the head of the distribution
+                continue
+            next_refresh = self.refresh(query, now)
+            refreshed += 1
+            if next_refresh is not None:
+                heapq.heappush(self._schedule, (next_refresh, query))
+            else:
+                self._scheduled.discard(query)
+        return refreshed
+
+    def seconds_until_due(self, now: Optional[float] = None) -> float:
+        """Time until the next refresh or re-mine"""
+        now = now if now is not None else time.time()
+        next_due = self._next_mine
+        if self._schedule:
+            next_due = min(next_due, self._schedule[0][0])
+        return max(0.0, next_due - now)
+
+    def run_forever(self):
+        """Refresh on schedule until stop() is called"""
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"Prewarm cycle error: {str(e)}")
+            self._stop.wait(min(self.seconds_until_due(), 60))
+
+    def start(self) -> threading.Thread:
+        """Run the schedule on a background thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-warm ResponseCache with the most frequent queries")
+    parser.add_argument("source", help="Telemetry JSONL file or s3://bucket/prefix of Firehose deliveries")
+    parser.add_argument("--top", type=int, default=20, help="Queries per domain")
+    parser.add_argument("--min-count", type=int, default=3)
+    parser.add_argument("--min-users", type=int, default=2)
+    parser.add_argument("--lookback-hours", type=float, default=24, help="0 reads the whole log")
+    parser.add_argument("--model", action="append", help="Model to warm for (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the mined queries")
+    parser.add_argument("--once", action="store_true", help="Warm once and exit instead of refreshing")
+    args = parser.parse_args()
+
+    prewarmer = CachePrewarmer(args.source, models=args.model, top_n=args.top, min_count=args.min_count,
+                               min_users=args.min_users, lookback_hours=args.lookback_hours)
+    top = prewarmer.mine()
+    for domain, ranked in sorted(top.items()):
+        print(f"\n{domain}:")
+        for q in ranked:
+            print(f"  {q.count:>6}  {q.users:>4} users  {q.query}")
+
+    if args.dry_run:
+        raise SystemExit(0)
+    if args.once:
+        prewarmer.run_pending()
+        prewarmer.cache.flush()
+        print(f"\nPrewarm stats: {prewarmer.stats}")
+    else:
+        prewarmer.run_forever()
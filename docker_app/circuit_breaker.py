@@ -0,0 +1,226 @@
+"""
+Circuit Breaker - Per-host breakers and health scores for external APIs
+
+A host whose recent calls mostly fail is opened and short-circuited for a
+cool-down, so a dead endpoint costs nothing instead of a full timeout on every
+request. After the cool-down one probe is let through (half-open); success
+closes the breaker, failure re-opens it with a doubled cool-down. Health
+scores combine the rolling error rate and a latency EWMA and drive the order
+in which fallback providers are tried.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Numeric state for metrics dashboards
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(ConnectionError):
+    """Call refused because the breaker for its host is open"""
+
+
+class CircuitBreaker:
+    """
+    Rolling-window breaker for one host
+
+    Args:
+        name: Host (or provider) the breaker guards
+        failure_threshold: Error rate over the window that opens the breaker
+        min_calls: Calls needed in the window before it can open
+        window: Number of most recent outcomes considered
+        open_seconds: First cool-down; doubles on each failed probe up to max_open_seconds
+        latency_alpha: Weight of the newest sample in the latency EWMA
+    """
+
+    # Latency at which a healthy host's score halves, in seconds
+    LATENCY_SCALE = 2.0
+
+    def __init__(self, name: str, failure_threshold: float = 0.5, min_calls: int = 5, window: int = 20,
+                 open_seconds: float = 30.0, max_open_seconds: float = 600.0, latency_alpha: float = 0.2,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.latency_alpha = latency_alpha
+        self._clock = clock
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+        self.state = CLOSED
+        self.latency_ewma: Optional[float] = None
+        self._cooldown = open_seconds
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self.stats = {'successes': 0, 'failures': 0, 'short_circuited': 0, 'opened': 0}
+
+    def allow_request(self) -> bool:
+        """Whether a call may go out now; an expired open breaker admits one probe"""
+        with self._lock:
+            if self.state == OPEN and self._clock() >= self._open_until:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.stats['short_circuited'] += 1
+            return False
+
+    def record_success(self, latency: Optional[float] = None) -> None:
+        with self._lock:
+            self.stats['successes'] += 1
+            self._observe_latency(latency)
+            if self.state == HALF_OPEN:
+                self._outcomes.clear()
+                self._cooldown = self.open_seconds
+                self._probe_in_flight = False
+                self._transition(CLOSED)
+            self._outcomes.append(True)
+
+    def record_failure(self, latency: Optional[float] = None) -> None:
+        with self._lock:
+            self.stats['failures'] += 1
+            self._observe_latency(latency)
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                self._cooldown = min(self._cooldown * 2, self.max_open_seconds)
+                self._open()
+                return
+            self._outcomes.append(False)
+            if self.state == CLOSED and len(self._outcomes) >= self.min_calls and \
+                    self._error_rate() >= self.failure_threshold:
+                self._open()
+
+    def _observe_latency(self, latency: Optional[float]) -> None:
+        if latency is None:
+            return
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.latency_alpha * (latency - self.latency_ewma)
+
+    def _open(self) -> None:
+        self._open_until = self._clock() + self._cooldown
+        self.stats['opened'] += 1
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            print(f"Circuit breaker {self.name}: {self.state} -> {state}"
+                  + (f" for {self._cooldown:.0f}s" if state == OPEN else ""))
+            self.state = state
+
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            return self._error_rate()
+
+    def health_score(self) -> float:
+        """0 (open) to 1 (no errors, instant responses)"""
+        with self._lock:
+            if self.state == OPEN and self._clock() < self._open_until:
+                return 0.0
+            if self.state != CLOSED:
+                return 0.1
+            latency_factor = 1.0 / (1.0 + (self.latency_ewma or 0.0) / self.LATENCY_SCALE)
+            return (1.0 - self._error_rate()) * latency_factor
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state, error_rate, latency = self.state, self._error_rate(), self.latency_ewma
+            retry_in = max(0.0, self._open_until - self._clock()) if state == OPEN else 0.0
+            stats = dict(self.stats)
+        return {
+            'state': state,
+            'error_rate': round(error_rate, 3),
+            'latency_ewma_ms': round(latency * 1000, 1) if latency is not None else None,
+            'health': round(self.health_score(), 3),
+            'retry_in_s': round(retry_in, 1),
+            **stats
+        }
+
+
+class CircuitBreakerRegistry:
+    """Breakers created on demand per host, with health-ordered fallbacks and metrics"""
+
+    def __init__(self, **breaker_options: Any):
+        self.breaker_options = breaker_options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._reporter: Optional[threading.Thread] = None
+
+    def get(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(host, **self.breaker_options)
+                self._breakers[host] = breaker
+            return breaker
+
+    def health(self, host: str) -> float:
+        """Health score of a host; hosts never called count as healthy"""
+        with self._lock:
+            breaker = self._breakers.get(host)
+        return breaker.health_score() if breaker else 1.0
+
+    def order_by_health(self, items: Iterable[T], host_of: Callable[[T], str] = str) -> List[T]:
+        """
+        Sort fallback providers healthiest first
+
+        Scores are rounded to quarters, so providers with similar health keep
+        their preference order and only a clearly degraded or open host moves down.
+        """
+        return sorted(items, key=lambda item: -round(self.health(host_of(item)) * 4) / 4)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.snapshot() for host, breaker in breakers.items()}
+
+    def report_metrics(self) -> None:
+        """Publish every breaker's state to CloudWatch through telemetry"""
+        try:
+            from telemetry import track_circuit_breakers
+        except Exception as e:
+            print(f"Circuit breaker metrics unavailable: {str(e)}")
+            return
+        track_circuit_breakers(self.get_metrics())
+
+    def start_reporting(self, interval: float = 60.0) -> bool:
+        """Report metrics periodically in the background; returns False if already running"""
+        with self._lock:
+            if self._reporter is not None:
+                return False
+
+            def run():
+                while True:
+                    time.sleep(interval)
+                    self.report_metrics()
+
+            self._reporter = threading.Thread(target=run, name="circuit-breaker-metrics", daemon=True)
+        self._reporter.start()
+        return True
+
+
+# Global instance used by the shared HTTP client
+circuit_breakers = CircuitBreakerRegistry(
+    failure_threshold=float(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "0.5")),
+    open_seconds=float(os.environ.get("CIRCUIT_OPEN_SECONDS", "30"))
+)
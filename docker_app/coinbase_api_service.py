@@ -4,24 +4,46 @@ Coinbase API Service - Real-time and historical cryptocurrency data access
 
 import boto3
 import json
-import requests
+import os
+from http_client import http_client
 import time
 import hmac
 import hashlib
 import base64
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Any
 from functools import lru_cache
+from single_flight import fetch_flight
+from quote_store import quote_store
+from ohlcv_store import OHLCVStore, candles_to_records, ohlcv_store
+
+# Seconds one /exchange-rates table is reused for every spot price
+RATES_MAX_AGE = float(os.environ.get("COINBASE_RATES_MAX_AGE", "15"))
+# Seconds a failed table download is remembered before it is retried
+RATES_FAILURE_BACKOFF = float(os.environ.get("COINBASE_RATES_FAILURE_BACKOFF", "10"))
+
+# Per-pair requests (stats, history, spot fallbacks) run concurrently here
+_pair_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="coinbase-pair")
 
 class CoinbaseAPIService:
     """Coinbase API service for real-time and historical crypto data"""
     
-    def __init__(self, region_name='us-west-2'):
+    def __init__(self, region_name='us-west-2', rates_max_age: float = RATES_MAX_AGE,
+                 candle_store: Optional[OHLCVStore] = None):
         self.region_name = region_name
         self.base_url = "https://api.coinbase.com/v2"
         self.pro_base_url = "https://api.exchange.coinbase.com"
-        self.session = requests.Session()
+        self.session = http_client  # Shared pooled session
         self.timeout = 10
+        self.rates_max_age = rates_max_age
+        self._rates: Optional[Dict[str, str]] = None
+        self._rates_at = 0.0
+        self._rates_failed_at = 0.0
+        self._rates_lock = threading.Lock()
+        self.candle_store = candle_store or ohlcv_store
+        self.stats = {'rates_fetches': 0, 'rates_reused': 0, 'rates_backoffs': 0, 'spot_fallbacks': 0}
         
         # Initialize credentials
         self.api_key = None
@@ -85,35 +107,42 @@ class CoinbaseAPIService:
             print(f"Error creating auth headers: {e}")
             return {}
     
-    def get_spot_price(self, currency_pair: str = 'BTC-USD') -> Optional[Dict[str, Any]]:
-        """Get current spot price for a currency pair"""
+    def _rates_table(self) -> Optional[Dict[str, str]]:
+        """USD exchange rates for every currency, downloaded at most once per freshness window"""
+        with self._rates_lock:
+            if self._rates is not None and time.time() - self._rates_at < self.rates_max_age:
+                self.stats['rates_reused'] += 1
+                return self._rates
+            if time.time() - self._rates_failed_at < RATES_FAILURE_BACKOFF:
+                # Don't hammer an endpoint that just failed; callers use the spot fallback
+                self.stats['rates_backoffs'] += 1
+                return None
+        # Concurrent callers share one download
+        return fetch_flight.do(f"coinbase:exchange_rates:{id(self)}", self._fetch_rates_table)
+    
+    def _fetch_rates_table(self) -> Optional[Dict[str, str]]:
         try:
-            # Try the public exchange rates endpoint first
-            url = f"{self.base_url}/exchange-rates"
-            response = self.session.get(url, timeout=self.timeout)
-            
+            response = self.session.get(f"{self.base_url}/exchange-rates", timeout=self.timeout)
+            with self._rates_lock:
+                self.stats['rates_fetches'] += 1
             if response.status_code == 200:
                 data = response.json()
                 if 'data' in data and 'rates' in data['data']:
-                    rates = data['data']['rates']
-                    
-                    # Extract base currency from pair
-                    base_currency = currency_pair.split('-')[0]
-                    
-                    if base_currency in rates:
-                        price = float(rates[base_currency])
-                        # Convert from rate to price (rates are inverted)
-                        if price > 0:
-                            price = 1.0 / price
-                        
-                        return {
-                            'currency_pair': currency_pair,
-                            'price': price,
-                            'timestamp': datetime.now().isoformat(),
-                            'source': 'coinbase_public'
-                        }
-            
-            # Fallback: Try the prices endpoint
+                    with self._rates_lock:
+                        self._rates = data['data']['rates']
+                        self._rates_at = time.time()
+                    return self._rates
+        except Exception as e:
+            print(f"Error fetching Coinbase exchange rates: {e}")
+        with self._rates_lock:
+            self._rates_failed_at = time.time()
+        return None
+    
+    def _fetch_spot(self, currency_pair: str) -> Optional[Dict[str, Any]]:
+        """Single-pair spot endpoint, for currencies missing from the rates table"""
+        with self._rates_lock:
+            self.stats['spot_fallbacks'] += 1
+        try:
             base_currency = currency_pair.split('-')[0]
             url = f"{self.base_url}/prices/{base_currency}-USD/spot"
             response = self.session.get(url, timeout=self.timeout)
@@ -127,36 +156,90 @@ class CoinbaseAPIService:
                         'timestamp': datetime.now().isoformat(),
                         'source': 'coinbase_spot'
                     }
-                    
         except Exception as e:
             print(f"Error fetching spot price for {currency_pair}: {e}")
-        
         return None
     
-    def get_current_prices(self, symbols: List[str]) -> Dict[str, Any]:
-        """Get current prices for multiple cryptocurrencies"""
-        prices = {}
+    def get_spot_prices(self, currency_pairs: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Spot prices for any number of pairs from one exchange-rates table
         
-        for symbol in symbols:
-            currency_pair = f"{symbol.upper()}-USD"
-            price_data = self.get_spot_price(currency_pair)
+        Rates are units of each currency per USD, so a pair's price is the
+        quote currency's rate over the base currency's rate. Pairs the table
+        cannot answer fall back to the per-pair spot endpoint, concurrently.
+        """
+        pairs = list(dict.fromkeys(pair.upper() for pair in currency_pairs))
+        rates = self._rates_table() or {}
+        timestamp = datetime.now().isoformat()
+        prices, missing = {}, []
+        
+        for pair in pairs:
+            base_currency, _, quote_currency = pair.partition('-')
+            try:
+                base_rate = float(rates.get(base_currency, 0))
+                quote_rate = 1.0 if quote_currency in ('', 'USD') else float(rates.get(quote_currency, 0))
+            except (TypeError, ValueError):
+                base_rate = quote_rate = 0.0
+            if base_rate > 0 and quote_rate > 0:
+                prices[pair] = {
+                    'currency_pair': pair,
+                    'price': quote_rate / base_rate,
+                    'timestamp': timestamp,
+                    'source': 'coinbase_public'
+                }
+            else:
+                missing.append(pair)
+        
+        for pair, price_data in zip(missing, _pair_pool.map(self._fetch_spot, missing)):
             if price_data:
-                prices[symbol.upper()] = price_data
+                prices[pair] = price_data
         
+        # Other price paths read these from the shared store instead of fetching again
+        for pair, price_data in prices.items():
+            base_currency, _, quote_currency = pair.partition('-')
+            quote_store.put(base_currency, price_data['price'], price_data['source'], quote_currency or 'USD')
         return prices
     
+    def get_spot_price(self, currency_pair: str = 'BTC-USD') -> Optional[Dict[str, Any]]:
+        """Get current spot price for a currency pair"""
+        return self.get_spot_prices([currency_pair]).get(currency_pair.upper())
+    
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, Any]:
+        """Get current prices for multiple cryptocurrencies"""
+        spot = self.get_spot_prices(f"{symbol.upper()}-USD" for symbol in symbols)
+        return {pair.split('-')[0]: price_data for pair, price_data in spot.items()}
+    
+    def get_candles(self, currency_pair: str, granularity: int, start: int, end: int) -> Optional[List[List[float]]]:
+        """Raw [time, low, high, open, close, volume] candles in [start, end), newest first (max 300)"""
+        try:
+            url = f"{self.pro_base_url}/products/{currency_pair}/candles"
+            params = {
+                'granularity': granularity,
+                'start': datetime.fromtimestamp(start, timezone.utc).isoformat(),
+                'end': datetime.fromtimestamp(end, timezone.utc).isoformat()
+            }
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            if response.status_code == 200:
+                return response.json()
+        except Exception as e:
+            print(f"Error fetching candles for {currency_pair}: {e}")
+        return None
+
     def get_historical_prices(self, currency_pair: str = 'BTC-USD', 
                             days: int = 30) -> Optional[List[Dict[str, Any]]]:
-        """Get historical price data"""
+        """Get daily closing prices from the local candle store, backfilling only missing days"""
+        base_currency = currency_pair.split('-')[0]
+        candles = self.candle_store.history(f"{base_currency}-USD", "1d", days, fetcher=self.get_candles)
+        if len(candles['time']):
+            return candles_to_records(candles, currency_pair)
+        return self._get_historic_spot_prices(currency_pair, days)
+
+    def _get_historic_spot_prices(self, currency_pair: str, days: int) -> Optional[List[Dict[str, Any]]]:
+        """Daily prices from the public v2 endpoint, for products the exchange has no candles for"""
         try:
-            # Use public API for historical data
             base_currency = currency_pair.split('-')[0]
             url = f"{self.base_url}/prices/{base_currency}-USD/historic"
             
-            # Calculate date range
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
             params = {
                 'period': 'day'
             }
@@ -184,8 +267,14 @@ class CoinbaseAPIService:
         
         return None
     
-    def get_price_stats(self, currency_pair: str = 'BTC-USD') -> Optional[Dict[str, Any]]:
-        """Get 24hr price statistics"""
+    def get_price_stats(self, currency_pair: str = 'BTC-USD',
+                        spot_price: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get 24hr price statistics; spot_price saves a lookup for the unauthenticated fallback
+
+        An empty spot_price dict marks the spot price as already looked up and
+        unavailable, so it is not fetched again.
+        """
         try:
             # Try to use Pro API if authenticated
             if self.api_key and self.api_secret:
@@ -209,7 +298,8 @@ class CoinbaseAPIService:
                     }
             
             # Fallback to basic price data
-            spot_price = self.get_spot_price(currency_pair)
+            if spot_price is None:
+                spot_price = self.get_spot_price(currency_pair)
             if spot_price:
                 return {
                     'currency_pair': currency_pair,
@@ -223,40 +313,41 @@ class CoinbaseAPIService:
         
         return None
     
+    def get_price_stats_many(self, currency_pairs: Iterable[str],
+                             spot_prices: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """24hr statistics for several pairs, fetched concurrently"""
+        pairs = list(dict.fromkeys(pair.upper() for pair in currency_pairs))
+        spot_prices = spot_prices if spot_prices is not None else self.get_spot_prices(pairs)
+        # Pairs the batch already missed are not looked up again one by one
+        results = _pair_pool.map(lambda pair: self.get_price_stats(pair, spot_prices.get(pair, {})), pairs)
+        return {pair: stats for pair, stats in zip(pairs, results) if stats}
+    
     def get_market_data(self, symbols: List[str] = None) -> Dict[str, Any]:
         """Get comprehensive market data for specified symbols"""
         if symbols is None:
             symbols = ['BTC', 'ETH', 'SOL', 'ADA', 'DOT']
         
-        market_data = {
+        pairs = {symbol: f"{symbol.upper()}-USD" for symbol in symbols}
+        spot = self.get_spot_prices(pairs.values())
+        stats = self.get_price_stats_many(pairs.values(), spot)
+        
+        return {
             'timestamp': datetime.now().isoformat(),
-            'prices': {},
-            'stats': {}
+            'prices': {symbol: spot[pair] for symbol, pair in pairs.items() if pair in spot},
+            'stats': {symbol: stats[pair] for symbol, pair in pairs.items() if pair in stats}
         }
-        
-        for symbol in symbols:
-            currency_pair = f"{symbol.upper()}-USD"
-            
-            # Get current price
-            price_data = self.get_spot_price(currency_pair)
-            if price_data:
-                market_data['prices'][symbol] = price_data
-            
-            # Get price statistics
-            stats_data = self.get_price_stats(currency_pair)
-            if stats_data:
-                market_data['stats'][symbol] = stats_data
-        
-        return market_data
     
-    def format_price_data(self, symbol: str) -> str:
+    def format_price_data(self, symbol: str, price_data: Optional[Dict[str, Any]] = None,
+                          stats_data: Optional[Dict[str, Any]] = None) -> str:
         """Format price data for display in assistant responses"""
         try:
             currency_pair = f"{symbol.upper()}-USD"
             
-            # Get current price and stats
-            price_data = self.get_spot_price(currency_pair)
-            stats_data = self.get_price_stats(currency_pair)
+            # Get current price and stats unless the caller already batched them
+            if price_data is None:
+                price_data = self.get_spot_price(currency_pair)
+            if stats_data is None and price_data:
+                stats_data = self.get_price_stats(currency_pair, price_data)
             
             if not price_data:
                 return f"{symbol.upper()}: Price data unavailable"
@@ -279,15 +370,25 @@ class CoinbaseAPIService:
         except Exception as e:
             return f"{symbol.upper()}: Error fetching price data - {str(e)}"
     
+    def format_prices(self, symbols: List[str]) -> List[str]:
+        """Formatted price lines for several symbols from one batched fetch"""
+        pairs = [f"{symbol.upper()}-USD" for symbol in symbols]
+        spot = self.get_spot_prices(pairs)
+        stats = self.get_price_stats_many([pair for pair in pairs if pair in spot], spot)
+        # Empty dicts mark data as already looked up, so nothing is fetched twice
+        return [self.format_price_data(symbol, spot.get(pair) or {}, stats.get(pair, {}))
+                for symbol, pair in zip(symbols, pairs)]
+    
     def get_trending_analysis(self, symbols: List[str], days: int = 7) -> str:
         """Get trending analysis for multiple symbols"""
+        pairs = [f"{symbol.upper()}-USD" for symbol in symbols]
+        spot = self.get_spot_prices(pairs)
+        histories = list(_pair_pool.map(lambda pair: self.get_historical_prices(pair, days), pairs))
         analysis_parts = []
         
-        for symbol in symbols:
+        for symbol, pair, historical in zip(symbols, pairs, histories):
             try:
-                # Get historical data for trend analysis
-                historical = self.get_historical_prices(f"{symbol.upper()}-USD", days)
-                current_price = self.get_spot_price(f"{symbol.upper()}-USD")
+                current_price = spot.get(pair)
                 
                 if historical and current_price and len(historical) >= 2:
                     start_price = historical[0]['price']
@@ -297,13 +398,17 @@ class CoinbaseAPIService:
                     trend = "📈" if change > 0 else "📉"
                     analysis_parts.append(f"{symbol.upper()}: {trend} {change:+.1f}% ({days}d)")
                 else:
-                    formatted_price = self.format_price_data(symbol)
+                    formatted_price = self.format_price_data(symbol, current_price or {})
                     analysis_parts.append(formatted_price)
                     
             except Exception as e:
                 analysis_parts.append(f"{symbol.upper()}: Analysis error")
         
         return " | ".join(analysis_parts)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._rates_lock:
+            return {**self.stats, 'rates_age_s': round(time.time() - self._rates_at, 1) if self._rates else None}
 
 # Create singleton instance
 coinbase_service = CoinbaseAPIService()
@@ -341,12 +446,7 @@ def get_coinbase_price_data(query: str) -> str:
         return coinbase_service.get_trending_analysis(crypto_symbols, days)
     else:
         # Get current price data
-        price_data = []
-        for symbol in crypto_symbols[:5]:  # Limit to 5 symbols
-            formatted_price = coinbase_service.format_price_data(symbol)
-            price_data.append(formatted_price)
-        
-        return " | ".join(price_data)
+        return " | ".join(coinbase_service.format_prices(crypto_symbols[:5]))  # Limit to 5 symbols
 
 # Test function
 if __name__ == "__main__":
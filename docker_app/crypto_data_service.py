@@ -2,25 +2,53 @@
 Crypto Data Service - Enhanced real-time cryptocurrency data access
 """
 
-import requests
+from http_client import http_client
+from circuit_breaker import circuit_breakers
+from quote_store import MAX_AGE_STANDARD, quote_store
 import json
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 from datetime import datetime
 import os
 from functools import lru_cache
 from coinbase_api_service import coinbase_service, get_coinbase_price_data
+from cache_freshness import data_versions, entity_source
+from single_flight import fetch_flight
+
+# Seconds the global market overview, trending list and bulk coin market rows are reused
+OVERVIEW_MAX_AGE = float(os.environ.get("CRYPTO_OVERVIEW_MAX_AGE", "120"))
+TRENDING_MAX_AGE = float(os.environ.get("CRYPTO_TRENDING_MAX_AGE", "300"))
+MARKETS_MAX_AGE = float(os.environ.get("CRYPTO_MARKETS_MAX_AGE", "30"))
+
+# Names and tickers recognised in queries
+CRYPTO_KEYWORDS = {
+    'bitcoin': 'BTC', 'btc': 'BTC',
+    'ethereum': 'ETH', 'eth': 'ETH',
+    'solana': 'SOL', 'sol': 'SOL',
+    'binance': 'BNB', 'bnb': 'BNB',
+    'ripple': 'XRP', 'xrp': 'XRP',
+    'cardano': 'ADA', 'ada': 'ADA',
+    'dogecoin': 'DOGE', 'doge': 'DOGE'
+}
 
 class CryptoDataService:
     """Enhanced cryptocurrency data service with caching and multiple API sources"""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, overview_max_age: float = OVERVIEW_MAX_AGE, markets_max_age: float = MARKETS_MAX_AGE):
+        self.session = http_client  # Shared pooled session
         self.timeout = 5  # Reduced timeout for faster responses
-        self.cache_ttl = 60  # Cache TTL in seconds
+        self.overview_max_age = overview_max_age
+        self.trending_max_age = TRENDING_MAX_AGE
+        self.markets_max_age = markets_max_age
+        self._windows: Dict[str, Any] = {}
+        self._windows_lock = threading.Lock()
+        self.price_sources = [
+            ("api.coinbase.com", self._fetch_from_coinbase),
+            ("api.coingecko.com", self._fetch_from_coingecko),
+            ("pro-api.coinmarketcap.com", self._fetch_from_coinmarketcap),
+            ("query1.finance.yahoo.com", self._fetch_from_yahoo)
+        ]
         
         # API keys (would be stored in AWS Secrets Manager in production)
         self.coingecko_api_key = os.environ.get('COINGECKO_API_KEY', '')
@@ -32,43 +60,25 @@ class CryptoDataService:
             'SHIB', 'DOT', 'TRX', 'LINK', 'TON', 'MATIC', 'WBTC', 'DAI', 'BCH', 'LTC'
         ]
     
-    def get_crypto_price(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get cryptocurrency price with minimal caching for real-time data"""
-        # Reduced cache TTL to ensure fresh data
-        self.cache_ttl = 30  # 30 seconds max cache time
-        
-        # Force cache invalidation for critical requests
-        self._price_cache = getattr(self, '_price_cache', {})
-        cache_key = symbol.upper()
-        
-        # Check if we have a recent cache entry
-        now = time.time()
-        if cache_key in self._price_cache:
-            timestamp, data = self._price_cache[cache_key]
-            if now - timestamp < self.cache_ttl:
-                return data
-        
-        # No valid cache entry, fetch fresh data
+    def get_crypto_price(self, symbol: str, max_age: float = MAX_AGE_STANDARD) -> Optional[Dict[str, Any]]:
+        """Get cryptocurrency price no older than max_age seconds from the shared quote store"""
+        # Concurrent requests for the same symbol share one fetch
+        quote = quote_store.get_or_fetch(symbol, self._fetch_price, max_age)
+        return quote.as_dict() if quote else None
+    
+    def _fetch_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch a fresh price through the source fallback chain"""
         result = None
         
-        # Try Coinbase first (most reliable for major cryptos)
-        result = self._fetch_from_coinbase(symbol)
-        
-        # Fallback to CoinGecko if Coinbase fails
-        if not result:
-            result = self._fetch_from_coingecko(symbol)
-        
-        # Fallback to CoinMarketCap if needed
-        if not result:
-            result = self._fetch_from_coinmarketcap(symbol)
-        
-        # Last resort fallback to Yahoo Finance
-        if not result:
-            result = self._fetch_from_yahoo(symbol)
+        # Coinbase, CoinGecko, CoinMarketCap, then Yahoo Finance; unhealthy hosts move to the back
+        for host, source in circuit_breakers.order_by_health(self.price_sources, host_of=lambda item: item[0]):
+            result = source(symbol)
+            if result:
+                break
         
-        # Update cache with fresh data
-        if result:
-            self._price_cache[cache_key] = (now, result)
+        if result and result.get('price_usd'):
+            # New price invalidates cached answers built on this coin's previous one
+            data_versions.publish(entity_source('crypto', symbol), float(result['price_usd']))
             
         return result
     
@@ -83,7 +93,7 @@ class CryptoDataService:
                 return None
             
             # Get additional stats if available
-            stats_data = coinbase_service.get_price_stats(currency_pair)
+            stats_data = coinbase_service.get_price_stats(currency_pair, spot_data)
             
             price = spot_data['price']
             change_24h = 0
@@ -125,20 +135,12 @@ class CryptoDataService:
             if not coin_id:
                 return None
             
-            # Add timestamp to prevent caching
-            timestamp = int(time.time())
-            url = f"https://api.coingecko.com/api/v3/coins/{coin_id}?timestamp={timestamp}"
+            # The shared client revalidates this endpoint after 30s (see http_cache)
+            url = f"https://api.coingecko.com/api/v3/coins/{coin_id}"
             if self.coingecko_api_key:
-                url += f"&x_cg_pro_api_key={self.coingecko_api_key}"
-            
-            # Add cache control headers
-            headers = {
-                'Cache-Control': 'no-cache, no-store, must-revalidate',
-                'Pragma': 'no-cache',
-                'Expires': '0'
-            }
+                url += f"?x_cg_pro_api_key={self.coingecko_api_key}"
             
-            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -228,8 +230,79 @@ class CryptoDataService:
             
         return None
     
+    def _windowed(self, key: str, max_age: float, fetch) -> Any:
+        """fetch() result reused for max_age seconds; failed or empty results are not kept"""
+        with self._windows_lock:
+            entry = self._windows.get(key)
+            if entry is not None and time.time() - entry[0] < max_age:
+                return entry[1]
+        value = fetch_flight.do(f"crypto_data_service:{key}", fetch)
+        if value and not (isinstance(value, dict) and 'error' in value):
+            with self._windows_lock:
+                self._windows[key] = (time.time(), value)
+        return value
+    
     def get_market_overview(self) -> Dict[str, Any]:
-        """Get overall crypto market data"""
+        """Get overall crypto market data, refreshed at most once per overview window"""
+        return self._windowed("market_overview", self.overview_max_age, self._fetch_market_overview)
+    
+    def get_coin_markets(self, coin_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Price, 24h change, market cap and volume for many coins in one request
+
+        Args:
+            coin_ids: CoinGecko ids, e.g. "bitcoin"
+
+        Returns:
+            Market data keyed by upper-case symbol
+        """
+        ids = sorted(set(coin_ids))
+        if not ids:
+            return {}
+        return self._windowed(f"markets:{','.join(ids)}", self.markets_max_age,
+                              lambda: self._fetch_coin_markets(ids))
+    
+    def _fetch_coin_markets(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch market rows from CoinGecko's bulk markets endpoint"""
+        try:
+            params = {'vs_currency': 'usd', 'ids': ','.join(ids), 'price_change_percentage': '24h'}
+            if self.coingecko_api_key:
+                params['x_cg_pro_api_key'] = self.coingecko_api_key
+            response = self.session.get("https://api.coingecko.com/api/v3/coins/markets", params=params,
+                                        timeout=self.timeout)
+            if response.status_code != 200:
+                return {}
+            
+            current_time = datetime.now().isoformat()
+            markets = {}
+            for row in response.json():
+                if not row.get('current_price'):
+                    continue
+                symbol = row['symbol'].upper()
+                markets[symbol] = {
+                    'symbol': symbol,
+                    'id': row['id'],
+                    'name': row.get('name', symbol),
+                    'price_usd': row['current_price'],
+                    'change_24h': row.get('price_change_percentage_24h') or 0,
+                    'market_cap': row.get('market_cap') or 0,
+                    'market_cap_rank': row.get('market_cap_rank'),
+                    'volume_24h': row.get('total_volume') or 0,
+                    'timestamp': current_time,
+                    'source': 'coingecko'
+                }
+                quote_store.put_payload(symbol, markets[symbol])
+            
+            for symbol, market in markets.items():
+                data_versions.publish(entity_source('crypto', symbol), float(market['price_usd']))
+            return markets
+        except Exception as e:
+            print(f"CoinGecko markets error: {str(e)}")
+        
+        return {}
+    
+    def _fetch_market_overview(self) -> Dict[str, Any]:
+        """Fetch global market data from CoinGecko"""
         try:
             url = "https://api.coingecko.com/api/v3/global"
             if self.coingecko_api_key:
@@ -257,7 +330,11 @@ class CryptoDataService:
         }
     
     def get_trending_coins(self) -> List[Dict[str, Any]]:
-        """Get trending cryptocurrencies"""
+        """Get trending cryptocurrencies, refreshed at most once per trending window"""
+        return self._windowed("trending", self.trending_max_age, self._fetch_trending_coins)
+    
+    def _fetch_trending_coins(self) -> List[Dict[str, Any]]:
+        """Fetch trending coins from CoinGecko"""
         try:
             url = "https://api.coingecko.com/api/v3/search/trending"
             if self.coingecko_api_key:
@@ -283,23 +360,12 @@ class CryptoDataService:
             
         return []
     
-    def format_crypto_data_for_context(self, query: str) -> str:
-        """Format cryptocurrency data for context enhancement"""
-        # Extract mentioned crypto symbols
+    def mentioned_symbols(self, query: str) -> List[str]:
+        """Crypto symbols a query asks about, or the top coins for general crypto questions"""
         query_lower = query.lower()
         mentioned_symbols = []
         
-        crypto_keywords = {
-            'bitcoin': 'BTC', 'btc': 'BTC',
-            'ethereum': 'ETH', 'eth': 'ETH',
-            'solana': 'SOL', 'sol': 'SOL',
-            'binance': 'BNB', 'bnb': 'BNB',
-            'ripple': 'XRP', 'xrp': 'XRP',
-            'cardano': 'ADA', 'ada': 'ADA',
-            'dogecoin': 'DOGE', 'doge': 'DOGE'
-        }
-        
-        for keyword, symbol in crypto_keywords.items():
+        for keyword, symbol in CRYPTO_KEYWORDS.items():
             if keyword in query_lower and symbol not in mentioned_symbols:
                 mentioned_symbols.append(symbol)
         
@@ -309,6 +375,13 @@ class CryptoDataService:
                                          ['crypto', 'cryptocurrency', 'token', 'coin', 'blockchain']):
             mentioned_symbols = self.top_cryptos[:3]  # Top 3 cryptos
         
+        return mentioned_symbols
+    
+    def format_crypto_data_for_context(self, query: str) -> str:
+        """Format cryptocurrency data for context enhancement"""
+        query_lower = query.lower()
+        mentioned_symbols = self.mentioned_symbols(query)
+        
         # Get data for mentioned symbols
         crypto_data = []
         for symbol in mentioned_symbols[:5]:  # Limit to 5 cryptos
@@ -3,10 +3,25 @@ Crypto Prediction Engine - Enhanced forecasting capabilities for cryptocurrency
 """
 
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from direct_crypto_api import get_realtime_price
 from crypto_data_service import crypto_data_service
+from cache_freshness import DataVersionRegistry
+from technical_indicators import HIGH_VOLATILITY, RSI_OVERBOUGHT, RSI_OVERSOLD, indicator_engine, summarize
+
+# Most screening scores kept; the memo is cleared when it grows past this
+SCORE_MEMO_SIZE = 512
+
+# Per-coin price lookups for candidates the bulk markets request missed
+_screen_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="crypto-screen")
+
+def _data_version(payload: Optional[Dict[str, Any]]) -> str:
+    """Fingerprint of a data row, ignoring when it was fetched"""
+    return DataVersionRegistry.fingerprint({k: v for k, v in (payload or {}).items() if k != "timestamp"})
 
 class CryptoPredictionEngine:
     """Engine for cryptocurrency trend analysis and forecasting"""
@@ -26,33 +41,55 @@ class CryptoPredictionEngine:
         self.HORIZON_SHORT = "short-term"  # Days to weeks
         self.HORIZON_MEDIUM = "medium-term"  # Weeks to months
         self.HORIZON_LONG = "long-term"  # Months+
+        
+        # Screening scores keyed by (symbol, horizon, data versions)
+        self._score_memo: Dict[Tuple, Dict[str, Any]] = {}
+        self._memo_lock = threading.Lock()
+        self.stats = {'screens': 0, 'scored': 0, 'memo_hits': 0}
     
-    def analyze_growth_potential(self, symbol: str, time_horizon: str) -> Dict[str, Any]:
+    def analyze_growth_potential(self, symbol: str, time_horizon: str,
+                                 indicators: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Analyze growth potential for a specific cryptocurrency
         
         Args:
             symbol: Cryptocurrency symbol (e.g., BTC)
             time_horizon: Time horizon for analysis (short/medium/long-term)
+            indicators: Precomputed technical indicators (looked up if not given)
             
         Returns:
             Dictionary with growth analysis
         """
-        # Get current price data directly from API
-        price_data = get_realtime_price(symbol)
+        price_data = self._price_data(symbol)
         if not price_data:
-            # Fall back to crypto_data_service if direct API fails
-            price_data = crypto_data_service.get_crypto_price(symbol)
-            if not price_data:
-                return {
-                    "symbol": symbol,
-                    "error": "Unable to retrieve price data",
-                    "timestamp": datetime.now().isoformat()
-                }
+            return {
+                "symbol": symbol,
+                "error": "Unable to retrieve price data",
+                "timestamp": datetime.now().isoformat()
+            }
         
         # Get market overview for context
         market_data = crypto_data_service.get_market_overview()
         
+        return self.score_growth_potential(symbol, time_horizon, price_data, market_data, indicators)
+    
+    def _price_data(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Current price data directly from the exchange APIs, then from crypto_data_service"""
+        return get_realtime_price(symbol) or crypto_data_service.get_crypto_price(symbol)
+    
+    def score_growth_potential(self, symbol: str, time_horizon: str, price_data: Dict[str, Any],
+                               market_data: Optional[Dict[str, Any]],
+                               indicators: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Score growth potential from already-fetched data
+        
+        Args:
+            symbol: Cryptocurrency symbol (e.g., BTC)
+            time_horizon: Time horizon for analysis (short/medium/long-term)
+            price_data: Price, 24h change and (ideally) market cap
+            market_data: Global market overview
+            indicators: Precomputed technical indicators (looked up if not given)
+        """
         # Determine base metrics
         current_price = price_data.get("price_usd", 0)
         change_24h = price_data.get("change_24h", 0)
@@ -120,6 +157,30 @@ class CryptoPredictionEngine:
             growth_potential *= 0.8
             factors.append("Bearish sentiment decreases growth potential")
         
+        # Adjust for momentum and risk from daily-candle indicators
+        if indicators is None:
+            indicators = indicator_engine.snapshot(symbol)
+        if indicators and indicators.get("periods", 0) > 14:
+            factors.append(f"Technicals: {summarize(indicators)}")
+            change_30d = indicators.get("change_30d")
+            if change_30d is not None and change_30d > 20:
+                growth_potential *= 1.1
+                factors.append(f"Sustained uptrend: {change_30d:+.1f}% over 30 days")
+            elif change_30d is not None and change_30d < -20:
+                growth_potential *= 0.9
+                factors.append(f"Sustained downtrend: {change_30d:+.1f}% over 30 days")
+            rsi_value = indicators.get("rsi_14")
+            if rsi_value is not None and rsi_value >= RSI_OVERBOUGHT:
+                growth_potential *= 0.9
+                factors.append("Overbought RSI raises pullback risk")
+            elif rsi_value is not None and rsi_value <= RSI_OVERSOLD:
+                growth_potential *= 1.1
+                factors.append("Oversold RSI suggests rebound potential")
+            volatility = indicators.get("volatility_30d")
+            if volatility is not None and volatility > HIGH_VOLATILITY and confidence != self.CONFIDENCE_LOW:
+                confidence = self.CONFIDENCE_MEDIUM if confidence == self.CONFIDENCE_HIGH else self.CONFIDENCE_LOW
+                factors.append(f"High realized volatility ({volatility * 100:.0f}% annualized) lowers confidence")
+        
         # Adjust for overall market conditions
         if market_data and "btc_dominance" in market_data:
             btc_dominance = market_data.get("btc_dominance", 50)
@@ -151,6 +212,7 @@ class CryptoPredictionEngine:
             "potential_price": potential_price,
             "confidence": confidence,
             "sentiment": sentiment,
+            "indicators": indicators,
             "factors": factors,
             "timestamp": datetime.now().isoformat()
         }
@@ -167,23 +229,61 @@ class CryptoPredictionEngine:
             List of cryptocurrencies with high growth potential
         """
         results = []
+        with self._memo_lock:
+            self.stats['screens'] += 1
         
         # Get trending coins as starting point
-        trending = crypto_data_service.get_trending_coins()
+        trending = [coin for coin in crypto_data_service.get_trending_coins()[:10] if coin.get("symbol")]
+        
+        # One overview and one bulk markets request cover every candidate
+        market_data = crypto_data_service.get_market_overview()
+        markets = crypto_data_service.get_coin_markets(coin["id"] for coin in trending if coin.get("id"))
+        market_version = _data_version(market_data)
+        candle_day = int(time.time() // 86400)  # Daily candles, and so indicators, change once a day
+        
+        # Candidates the bulk request missed are looked up concurrently
+        symbols = [coin["symbol"].upper() for coin in trending]
+        missing = [symbol for symbol in symbols if symbol not in markets]
+        prices = {**dict(zip(missing, _screen_pool.map(self._price_data, missing))), **markets}
         
-        # Analyze each trending coin
-        for coin in trending[:10]:  # Limit to top 10 trending
-            symbol = coin.get("symbol", "").upper()
-            if not symbol:
+        # Reuse scores whose inputs have not changed
+        pending = []
+        for symbol in symbols:
+            price_data = prices.get(symbol)
+            if not price_data:
                 continue
-                
-            # Analyze medium-term potential
-            analysis = self.analyze_growth_potential(symbol, self.HORIZON_MEDIUM)
+            key = (symbol, self.HORIZON_MEDIUM, _data_version(price_data), market_version, candle_day)
+            with self._memo_lock:
+                analysis = self._score_memo.get(key)
+                if analysis is not None:
+                    self.stats['memo_hits'] += 1
+            if analysis is None:
+                pending.append((key, symbol, price_data))
+            else:
+                results.append(analysis)
+        
+        if pending:
+            # Candle backfills run concurrently; indicators for every candidate come from one pass
+            try:
+                indicators = indicator_engine.universe(symbol for _, symbol, _ in pending)
+            except Exception as e:
+                print(f"Technical indicators unavailable: {str(e)}")
+                indicators = {}
             
-            # Filter by minimum potential
-            if analysis.get("potential_multiple", 0) >= min_potential:
+            for key, symbol, price_data in pending:
+                # Analyze medium-term potential
+                analysis = self.score_growth_potential(symbol, self.HORIZON_MEDIUM, price_data, market_data,
+                                                       indicators.get(symbol) or {})
+                with self._memo_lock:
+                    if len(self._score_memo) >= SCORE_MEMO_SIZE:
+                        self._score_memo.clear()
+                    self._score_memo[key] = analysis
+                    self.stats['scored'] += 1
                 results.append(analysis)
         
+        # Filter by minimum potential
+        results = [analysis for analysis in results if analysis.get("potential_multiple", 0) >= min_potential]
+        
         # Sort by growth potential (descending)
         results.sort(key=lambda x: x.get("potential_multiple", 0), reverse=True)
         
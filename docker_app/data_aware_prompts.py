@@ -16,4 +16,12 @@ def inject_prediction_capability(prompt: str) -> str:
     prediction_addon = """
 For predictions: Use provided data to make informed forecasts with confidence levels and reasoning.
 """
-    return f"{prompt}\n{prediction_addon}"
\ No newline at end of file
+    return f"{prompt}\n{prediction_addon}"
+
+def make_tool_aware(base_prompt: str, tool_names) -> str:
+    """Point the model at its live-data tools instead of data in the query"""
+    tool_acknowledgment = f"""
+LIVE DATA: Call your data tools ({", ".join(tool_names)}) when a question needs current prices, standings, positions or web content.
+Answer directly without calling them when it does not. Never claim you lack access to current information.
+"""
+    return f"{tool_acknowledgment}\n{base_prompt}"
@@ -0,0 +1,233 @@
+"""
+Data Tools - On-demand live data lookups exposed to assistants as Strands tools
+
+Instead of pre-fetching real-time context for every query, assistants get a
+small set of tools (crypto quotes and technicals, market overview, F1
+standings, flight position, website fetch) that the model calls only when a
+question needs live data. Results are memoized for the lifetime of one request, so a model
+that asks twice for the same quote costs one upstream call.
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from cache_freshness import data_versions, entity_source
+from market_snapshot_service import MarketSnapshotService, market_snapshots
+
+DATA_TOOL_NAMES = ("crypto_quote", "crypto_indicators", "market_overview", "f1_standings", "flight_position",
+                   "fetch_website")
+
+# Most coins one crypto_quote call will look up
+MAX_QUOTE_SYMBOLS = 5
+
+
+class RequestMemo:
+    """Results of data lookups within one request"""
+
+    def __init__(self):
+        self._results: Dict[Hashable, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'hits': 0, 'errors': 0}
+
+    def get(self, key: Hashable, fetch: Callable[..., str], *args: Any) -> str:
+        """Memoized result of fetch(*args); failures are reported but not memoized"""
+        with self._lock:
+            self.stats['calls'] += 1
+            if key in self._results:
+                self.stats['hits'] += 1
+                return self._results[key]
+        try:
+            result = fetch(*args)
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += 1
+            print(f"Data tool {key[0] if isinstance(key, tuple) else key} error: {str(e)}")
+            return f"Data unavailable: {str(e)}"
+        with self._lock:
+            self._results[key] = result
+        return result
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, 'upstream_calls': self.stats['calls'] - self.stats['hits']}
+
+
+class DataToolbox:
+    """Live data lookups for one request, backed by the snapshot service and the data modules"""
+
+    def __init__(self, memo: Optional[RequestMemo] = None, snapshots: Optional[MarketSnapshotService] = None):
+        self.memo = memo or RequestMemo()
+        self.snapshots = snapshots or market_snapshots
+        # Tools may run on other threads; versions they read are logged to the creating request
+        self.reads = data_versions.active_reads()
+
+    @staticmethod
+    def _normalize_symbols(symbols: str) -> List[str]:
+        from crypto_data_service import CRYPTO_KEYWORDS
+
+        normalized = []
+        for token in symbols.replace(" ", ",").split(","):
+            token = token.strip()
+            if not token:
+                continue
+            symbol = CRYPTO_KEYWORDS.get(token.lower(), token.upper())
+            if symbol not in normalized:
+                normalized.append(symbol)
+        return normalized[:MAX_QUOTE_SYMBOLS]
+
+    def crypto_quote(self, symbols: str) -> str:
+        wanted = tuple(sorted(self._normalize_symbols(symbols)))
+        if not wanted:
+            return "No cryptocurrency symbols given"
+        return self.memo.get(("crypto_quote", wanted), self._crypto_quote, wanted)
+
+    def _crypto_quote(self, symbols: Iterable[str]) -> str:
+        quotes = self.snapshots.get("crypto_quotes")
+        lines = []
+        for symbol in symbols:
+            data = quotes.data.get(symbol) if quotes is not None else None
+            if data is None:
+                from crypto_data_service import crypto_data_service
+                data = crypto_data_service.get_crypto_price(symbol)
+            if not data:
+                lines.append(f"{symbol}: unavailable")
+                continue
+            price = data['price_usd']
+            data_versions.publish(entity_source("crypto", symbol), float(price), self.reads)
+            price_str = f"${price:,.4f}" if price < 1 else f"${price:,.2f}"
+            change_str = f"{data['change_24h']:+.2f}%" if data.get('change_24h') is not None else "N/A"
+            lines.append(f"{symbol}: {price_str} ({change_str})")
+        return f"{' | '.join(lines)} (as of {datetime.now().strftime('%H:%M:%S UTC')})"
+
+    def crypto_indicators(self, symbols: str) -> str:
+        wanted = tuple(sorted(self._normalize_symbols(symbols)))
+        if not wanted:
+            return "No cryptocurrency symbols given"
+        return self.memo.get(("crypto_indicators", wanted), self._crypto_indicators, wanted)
+
+    def _crypto_indicators(self, symbols: Iterable[str]) -> str:
+        from technical_indicators import get_technical_indicators
+        return f"Daily technicals:\n{get_technical_indicators(symbols)}"
+
+    def market_overview(self) -> str:
+        return self.memo.get(("market_overview",), self._market_overview)
+
+    def _market_overview(self) -> str:
+        snapshot = self.snapshots.get("market_overview")
+        if snapshot is not None:
+            overview, stamp = snapshot.data, snapshot.stamp()
+        else:
+            from crypto_data_service import crypto_data_service
+            overview, stamp = crypto_data_service.get_market_overview(), "live"
+            if 'error' in overview:
+                return "Crypto market overview unavailable"
+        return (f"Total Market Cap: ${overview['total_market_cap_usd'] / 1e12:.2f}T | "
+                f"BTC Dominance: {overview['btc_dominance']:.1f}% | "
+                f"ETH Dominance: {overview['eth_dominance']:.1f}% ({stamp})")
+
+    def f1_standings(self) -> str:
+        return self.memo.get(("f1_standings",), self._f1_standings)
+
+    def _f1_standings(self) -> str:
+        for source in ("f1", "f1_standings"):
+            data_versions.note_current(source, self.reads)
+        context = self.snapshots.f1_context()
+        if context:
+            return context
+        from formula1_assistant import get_f1_standings
+        from realtime_data_access import realtime_data
+        return f"{realtime_data.get_f1_data()}\n{get_f1_standings()}"
+
+    def flight_position(self, flight_id: str) -> str:
+        flight_id = flight_id.strip().upper()
+        if not flight_id:
+            return "No flight or tail number given"
+        return self.memo.get(("flight_position", flight_id), self._flight_position, flight_id)
+
+    def _flight_position(self, flight_id: str) -> str:
+        from realtime_data_access import realtime_data
+        position = realtime_data.get_aviation_data(flight_id)
+        if not position:
+            return f"No position available for {flight_id}"
+        # Cached answers built on an older position of this flight are invalidated
+        data_versions.publish(entity_source("aviation", flight_id), position, self.reads)
+        return position
+
+    def fetch_website(self, url: str) -> str:
+        url = url.strip()
+        if not url:
+            return "No URL given"
+        return self.memo.get(("fetch_website", url), self._fetch_website, url)
+
+    def _fetch_website(self, url: str) -> str:
+        from realtime_data_access import realtime_data
+        return realtime_data.get_web_data(url) or f"Could not fetch {url}"
+
+
+def make_data_tools(names: Iterable[str] = DATA_TOOL_NAMES, memo: Optional[RequestMemo] = None,
+                    toolbox: Optional[DataToolbox] = None) -> List[Any]:
+    """
+    Strands tools for one request, sharing one memo
+
+    Args:
+        names: Which of DATA_TOOL_NAMES to expose
+        memo: Memo to share with other tool sets of the same request
+    """
+    from strands import tool
+
+    toolbox = toolbox or DataToolbox(memo)
+
+    @tool
+    def crypto_quote(symbols: str) -> str:
+        """
+        Get live cryptocurrency prices and 24h change.
+
+        Args:
+            symbols: Comma-separated tickers or names, e.g. "BTC,ETH" or "bitcoin, solana" (max 5)
+        """
+        return toolbox.crypto_quote(symbols)
+
+    @tool
+    def crypto_indicators(symbols: str) -> str:
+        """
+        Get daily technical indicators (RSI, MACD, moving averages, Bollinger %B, ATR, volatility) for cryptocurrencies.
+
+        Args:
+            symbols: Comma-separated tickers or names, e.g. "BTC,ETH" (max 5)
+        """
+        return toolbox.crypto_indicators(symbols)
+
+    @tool
+    def market_overview() -> str:
+        """Get the live total crypto market cap and BTC/ETH dominance."""
+        return toolbox.market_overview()
+
+    @tool
+    def f1_standings() -> str:
+        """Get the next Formula 1 race and the current driver and constructor standings."""
+        return toolbox.f1_standings()
+
+    @tool
+    def flight_position(flight_id: str) -> str:
+        """
+        Get the live position of an aircraft.
+
+        Args:
+            flight_id: Tail number such as "N628TS", or a flight number
+        """
+        return toolbox.flight_position(flight_id)
+
+    @tool
+    def fetch_website(url: str) -> str:
+        """
+        Fetch a web page and return its title.
+
+        Args:
+            url: Full URL or bare domain, e.g. "example.com"
+        """
+        return toolbox.fetch_website(url)
+
+    tools = {'crypto_quote': crypto_quote, 'crypto_indicators': crypto_indicators, 'market_overview': market_overview,
+             'f1_standings': f1_standings, 'flight_position': flight_position, 'fetch_website': fetch_website}
+    return [tools[name] for name in names]
@@ -2,58 +2,58 @@
 Direct Crypto API - Immediate access to cryptocurrency prices without caching
 """
 
-import requests
-import time
+from http_client import http_client
 from datetime import datetime
 from typing import Dict, Any, Optional
+from hedged_request import HedgedRequest
+from quote_store import MAX_AGE_LIVE, quote_store
+
+# Hosts behind each price provider, for circuit-breaker health ordering
+PRICE_PROVIDER_HOSTS = {
+    'binance': 'api.binance.com',
+    'coingecko': 'api.coingecko.com',
+    'coinbase': 'api.coinbase.com'
+}
 
 class DirectCryptoAPI:
     """Direct API access to cryptocurrency prices without caching"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = http_client  # Shared pooled session
         self.timeout = 3  # Short timeout for fast responses
+        self.price_hedge = HedgedRequest([
+            ('binance', self._try_binance_api),
+            ('coingecko', self._try_coingecko_api),
+            ('coinbase', self._try_coinbase_api)
+        ], accept=lambda result: bool(result) and result.get('price_usd', 0) > 0,
+           hosts=PRICE_PROVIDER_HOSTS)
     
-    def get_current_price(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get current price directly from API without caching"""
-        # Try multiple sources in parallel for speed and reliability
-        result = self._try_binance_api(symbol)
-        if not result:
-            result = self._try_coingecko_api(symbol)
-        if not result:
-            result = self._try_coinbase_api(symbol)
-            
-        return result
+    def get_current_price(self, symbol: str, max_age: float = MAX_AGE_LIVE) -> Optional[Dict[str, Any]]:
+        """Get current price, at most max_age seconds old, from the shared quote store or the APIs"""
+        quote = quote_store.get_or_fetch(symbol, self._fetch_current_price, max_age)
+        return quote.as_dict() if quote else None
+    
+    def _fetch_current_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch the current price from the first source that answers"""
+        # Binance first; CoinGecko and Coinbase are hedged in if it is slow or fails
+        return self.price_hedge.call(symbol, timeout=self.timeout)
     
     def _try_binance_api(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Try Binance API for real-time price data"""
         try:
             # Convert symbol to Binance format
             ticker = f"{symbol.upper()}USDT"
-            url = f"https://api.binance.com/api/v3/ticker/price?symbol={ticker}"
+            # The 24h ticker carries the last price too, so one round-trip is enough
+            url = f"https://api.binance.com/api/v3/ticker/24hr?symbol={ticker}"
             
             response = self.session.get(url, timeout=self.timeout)
             if response.status_code == 200:
                 data = response.json()
-                price = float(data.get('price', 0))
-                
-                # Get 24h change from ticker
-                ticker_url = f"https://api.binance.com/api/v3/ticker/24hr?symbol={ticker}"
-                ticker_response = self.session.get(ticker_url, timeout=self.timeout)
-                change_24h = 0
-                
-                if ticker_response.status_code == 200:
-                    ticker_data = ticker_response.json()
-                    price_change = float(ticker_data.get('priceChangePercent', 0))
-                    change_24h = price_change
                 
                 return {
                     'symbol': symbol.upper(),
-                    'price_usd': price,
-                    'change_24h': change_24h,
+                    'price_usd': float(data.get('lastPrice', 0)),
+                    'change_24h': float(data.get('priceChangePercent', 0)),
                     'timestamp': datetime.now().isoformat(),
                     'source': 'binance'
                 }
@@ -77,18 +77,10 @@ class DirectCryptoAPI:
             if not coin_id:
                 return None
             
-            # Add timestamp to prevent caching
-            timestamp = int(time.time())
-            url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd&include_24hr_change=true&t={timestamp}"
-            
-            # Add cache control headers
-            headers = {
-                'Cache-Control': 'no-cache, no-store, must-revalidate',
-                'Pragma': 'no-cache',
-                'Expires': '0'
-            }
+            # Always revalidated by the shared client, never served from a stale copy
+            url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd&include_24hr_change=true"
             
-            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
             
             if response.status_code == 200:
                 data = response.json().get(coin_id, {})
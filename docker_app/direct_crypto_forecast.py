@@ -2,21 +2,28 @@
 Direct Crypto Forecast - Complete bypass for crypto price forecasting
 """
 
-import requests
-import time
+from http_client import http_client
 import json
 from datetime import datetime
 from typing import Dict, Any, List
+from hedged_request import HedgedRequest
+from direct_crypto_api import PRICE_PROVIDER_HOSTS
+from quote_store import MAX_AGE_LIVE, quote_store
+from technical_indicators import HIGH_VOLATILITY, RSI_OVERBOUGHT, RSI_OVERSOLD, indicator_engine, summarize
+from monte_carlo import format_scenarios, scenario_engine
 
 class DirectCryptoForecast:
     """Direct cryptocurrency forecasting with no caching"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = http_client  # Shared pooled session
         self.timeout = 2  # Very short timeout
+        self.price_hedge = HedgedRequest([
+            ('binance', self._get_binance_price),
+            ('coinbase', self._get_coinbase_price),
+            ('coingecko', self._get_coingecko_price)
+        ], accept=lambda result: bool(result) and result.get('price_usd', 0) > 0,
+           hosts=PRICE_PROVIDER_HOSTS)
         
         # Confidence levels
         self.CONFIDENCE_LOW = "low"
@@ -28,16 +35,12 @@ class DirectCryptoForecast:
         self.HORIZON_MEDIUM = "medium-term"  # Weeks to months
         self.HORIZON_LONG = "long-term"  # Months+
     
-    def get_direct_price(self, symbol: str) -> Dict[str, Any]:
-        """Get price directly from exchange APIs"""
-        # Try multiple sources in parallel for speed
-        for source_func in [self._get_binance_price, self._get_coinbase_price, self._get_coingecko_price]:
-            try:
-                result = source_func(symbol)
-                if result and result.get('price_usd', 0) > 0:
-                    return result
-            except:
-                continue
+    def get_direct_price(self, symbol: str, max_age: float = MAX_AGE_LIVE) -> Dict[str, Any]:
+        """Get a price at most max_age seconds old from the shared quote store or the exchange APIs"""
+        # Binance first; Coinbase and CoinGecko are hedged in if it is slow or fails
+        quote = quote_store.get_or_fetch(symbol, lambda s: self.price_hedge.call(s, timeout=self.timeout), max_age)
+        if quote:
+            return quote.as_dict()
         
         # Fallback with error
         return {
@@ -50,7 +53,7 @@ class DirectCryptoForecast:
     def _get_binance_price(self, symbol: str) -> Dict[str, Any]:
         """Get price from Binance"""
         ticker = f"{symbol.upper()}USDT"
-        url = f"https://api.binance.com/api/v3/ticker/price?symbol={ticker}&_={int(time.time() * 1000)}"
+        url = f"https://api.binance.com/api/v3/ticker/price?symbol={ticker}"
         
         response = self.session.get(url, timeout=self.timeout)
         if response.status_code == 200:
@@ -68,7 +71,7 @@ class DirectCryptoForecast:
     def _get_coinbase_price(self, symbol: str) -> Dict[str, Any]:
         """Get price from Coinbase"""
         ticker = f"{symbol.upper()}-USD"
-        url = f"https://api.coinbase.com/v2/prices/{ticker}/spot?_={int(time.time() * 1000)}"
+        url = f"https://api.coinbase.com/v2/prices/{ticker}/spot"
         
         response = self.session.get(url, timeout=self.timeout)
         if response.status_code == 200:
@@ -95,7 +98,7 @@ class DirectCryptoForecast:
         if not coin_id:
             return None
             
-        url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd&_={int(time.time() * 1000)}"
+        url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd"
         
         response = self.session.get(url, timeout=self.timeout)
         if response.status_code == 200:
@@ -154,10 +157,27 @@ class DirectCryptoForecast:
             else:
                 growth_potential = 9.0  # 900% potential (10x)
         
+        # Momentum and risk from daily-candle indicators; the request path reads stored candles only
+        indicators = indicator_engine.snapshot(symbol, refresh=False)
+        technicals = None
+        if indicators:
+            technicals = summarize(indicators)
+            rsi_value = indicators.get('rsi_14')
+            if rsi_value is not None and rsi_value >= RSI_OVERBOUGHT:
+                growth_potential *= 0.9
+            elif rsi_value is not None and rsi_value <= RSI_OVERSOLD:
+                growth_potential *= 1.1
+            volatility = indicators.get('volatility_30d')
+            if volatility is not None and volatility > HIGH_VOLATILITY and confidence != self.CONFIDENCE_LOW:
+                confidence = self.CONFIDENCE_MEDIUM if confidence == self.CONFIDENCE_HIGH else self.CONFIDENCE_LOW
+        
         # Calculate potential price
         current_price = price_data.get('price_usd', 0)
         potential_price = current_price * (1 + growth_potential)
         
+        # Price bands from the same stored candles
+        scenarios = scenario_engine.simulate(symbol, spot=current_price)
+        
         return {
             'symbol': symbol,
             'current_price': current_price,
@@ -165,6 +185,8 @@ class DirectCryptoForecast:
             'growth_potential': growth_potential,
             'multiple': 1 + growth_potential,
             'confidence': confidence,
+            'technicals': technicals,
+            'scenarios': scenarios,
             'source': price_data.get('source', 'unknown'),
             'timestamp': datetime.now().isoformat()
         }
@@ -239,7 +261,12 @@ class DirectCryptoForecast:
                     current_price_str = f"${current_price:,.4f}"
                     potential_price_str = f"${potential_price:,.4f}"
                 
-                forecasts.append(f"{symbol}: Current {current_price_str} → Potential {potential_price_str} ({multiple:.1f}x, {confidence} confidence) [via {source}]")
+                forecast = f"{symbol}: Current {current_price_str} → Potential {potential_price_str} ({multiple:.1f}x, {confidence} confidence) [via {source}]"
+                if analysis.get('technicals'):
+                    forecast += f"\n  Technicals: {analysis['technicals']}"
+                if analysis.get('scenarios'):
+                    forecast += f"\n  Scenarios: {format_scenarios(analysis['scenarios'])}"
+                forecasts.append(forecast)
         
         # Format response
         current_time = datetime.now().strftime("%H:%M:%S UTC")
@@ -2,17 +2,14 @@
 Enhanced Real-Time Data Access with ESPN and OpenF1 APIs
 """
 
-import requests
+from http_client import http_client
 import json
 from datetime import datetime
 from typing import Optional
 
 class EnhancedRealTimeData:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = http_client  # Shared pooled session
         self.timeout = 10
 
     def get_f1_data_espn(self) -> Optional[str]:
@@ -3,7 +3,7 @@
 Module for fetching F1 news from ESPN and other sources
 """
 
-import requests
+from http_client import http_client
 import json
 from datetime import datetime
 
@@ -13,7 +13,7 @@ def get_f1_news(limit=5):
     """Get the latest F1 news from ESPN"""
     try:
         url = f"{ESPN_F1_API}/news"
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         
         if response.status_code != 200:
             return "F1 news currently unavailable. Please check Formula1.com for the latest news."
@@ -53,7 +53,7 @@ def get_f1_scoreboard():
     """Get the current F1 scoreboard from ESPN"""
     try:
         url = f"{ESPN_F1_API}/scoreboard"
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         
         if response.status_code != 200:
             return None
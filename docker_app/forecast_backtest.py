@@ -0,0 +1,317 @@
+"""
+Forecast Backtest - Offline, vectorized replay of the crypto forecast rules over stored candles
+
+The growth-potential rules of CryptoPredictionEngine.score_growth_potential
+and DirectCryptoForecast.get_growth_potential are re-expressed as array
+operations over (symbols, time) matrices, so every daily window of every
+symbol is scored at once: each day's 24h change, 30-day trend, RSI(14)
+and 30-day realized volatility are computed along the time axis, the
+market-cap tier and adjustments are applied with masks, and each forecast
+is compared with what the price did over its horizon. Candles come only
+from the local OHLCV store; nothing is fetched.
+
+Historical market caps and market overviews are not stored, so each symbol
+keeps one market cap for the whole replay and the BTC-dominance adjustment
+is left out. The 24h change is the close-to-close daily change.
+"""
+
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ohlcv_store import Candles, OHLCVStore, ohlcv_store
+from technical_indicators import (HIGH_VOLATILITY, LOOKBACK_DAYS, RSI_OVERBOUGHT, RSI_OVERSOLD,
+                                  realized_volatility, rsi, stack)
+
+HORIZON_SHORT = "short-term"
+HORIZON_MEDIUM = "medium-term"
+HORIZON_LONG = "long-term"
+# Days after the forecast at which it is judged
+HORIZON_DAYS = {HORIZON_SHORT: 14, HORIZON_MEDIUM: 90, HORIZON_LONG: 365}
+
+CONFIDENCE_LEVELS = ("low", "medium", "high")
+# Growth potential and confidence by market-cap tier: >$100B, >$10B, smaller
+TIER_GROWTH = {HORIZON_SHORT: (0.2, 0.3, 0.5), HORIZON_MEDIUM: (0.5, 1.0, 2.0), HORIZON_LONG: (1.0, 3.0, 9.0)}
+TIER_CONFIDENCE = (2, 1, 0)
+
+# Candles before a symbol's first window: a full 30-day trend and volatility
+MIN_HISTORY = 31
+CALIBRATION_BUCKETS = 5
+
+Scorer = Callable[[Dict[str, np.ndarray], np.ndarray, str], Tuple[np.ndarray, np.ndarray]]
+
+
+def _lag(matrix: np.ndarray, periods: int) -> np.ndarray:
+    lagged = np.full(matrix.shape, np.nan)
+    if matrix.shape[-1] > periods:
+        lagged[..., periods:] = matrix[..., :-periods]
+    return lagged
+
+
+def forecast_features(matrices: Dict[str, np.ndarray], lookback: int = LOOKBACK_DAYS) -> Dict[str, np.ndarray]:
+    """The inputs the forecasters read, as of every day of every row"""
+    close = matrices["close"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change_24h = (close / _lag(close, 1) - 1) * 100
+        change_30d = (close / _lag(close, 30) - 1) * 100
+    return {
+        'price': close,
+        'change_24h': change_24h,
+        'change_30d': change_30d,
+        'rsi_14': rsi(close),
+        'volatility_30d': realized_volatility(close, 30),
+        # The live engine reads at most `lookback` candles
+        'periods': np.minimum(np.cumsum(~np.isnan(close), axis=-1), lookback),
+    }
+
+
+def _tier_scores(market_caps: np.ndarray, horizon: str, shape: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    caps = np.asarray(market_caps, dtype=np.float64)[:, None]
+    tier = np.where(caps > 100_000_000_000, 0, np.where(caps > 10_000_000_000, 1, 2))
+    # No market cap: the engine leaves growth at 0 with low confidence
+    growth = np.where(caps > 0, np.take(TIER_GROWTH[horizon], tier), 0.0)
+    confidence = np.where(caps > 0, np.take(TIER_CONFIDENCE, tier), 0)
+    return np.broadcast_to(growth, shape).copy(), np.broadcast_to(confidence, shape).copy()
+
+
+def _apply_technicals(growth: np.ndarray, confidence: np.ndarray, features: Dict[str, np.ndarray],
+                      trend: bool) -> None:
+    technical = features['periods'] > 14
+    if trend:
+        change_30d = features['change_30d']
+        growth *= np.where(technical & (change_30d > 20), 1.1, np.where(technical & (change_30d < -20), 0.9, 1.0))
+    rsi_value = features['rsi_14']
+    growth *= np.where(technical & (rsi_value >= RSI_OVERBOUGHT), 0.9,
+                       np.where(technical & (rsi_value <= RSI_OVERSOLD), 1.1, 1.0))
+    confidence -= technical & (features['volatility_30d'] > HIGH_VOLATILITY) & (confidence > 0)
+
+
+def score_prediction_engine(features: Dict[str, np.ndarray], market_caps: np.ndarray,
+                            horizon: str) -> Tuple[np.ndarray, np.ndarray]:
+    """CryptoPredictionEngine.score_growth_potential: growth and confidence index per window"""
+    growth, confidence = _tier_scores(market_caps, horizon, features['price'].shape)
+    change_24h = features['change_24h']
+    growth *= np.where(change_24h > 2, 1.2, np.where(change_24h < -2, 0.8, 1.0))
+    _apply_technicals(growth, confidence, features, trend=True)
+    return growth, confidence
+
+
+def score_direct_forecast(features: Dict[str, np.ndarray], market_caps: np.ndarray,
+                          horizon: str) -> Tuple[np.ndarray, np.ndarray]:
+    """DirectCryptoForecast.get_growth_potential: growth and confidence index per window"""
+    growth, confidence = _tier_scores(market_caps, horizon, features['price'].shape)
+    _apply_technicals(growth, confidence, features, trend=False)
+    return growth, confidence
+
+
+MODELS: Dict[str, Scorer] = {
+    'prediction_engine': score_prediction_engine,
+    'direct_forecast': score_direct_forecast,
+}
+
+
+def realized_outcomes(matrices: Dict[str, np.ndarray], days: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return at the horizon and best return reached within it (from highs), per window"""
+    close, high = matrices["close"], matrices["high"]
+    end_return = np.full(close.shape, np.nan)
+    peak_return = np.full(close.shape, np.nan)
+    count = close.shape[-1] - days
+    if count > 0:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            end_return[..., :count] = close[..., days:] / close[..., :count] - 1
+            # Window t covers the highs of days t+1 .. t+days
+            peak = sliding_window_view(high[..., 1:], days, axis=-1).max(axis=-1)
+            peak_return[..., :count] = peak / close[..., :count] - 1
+    return end_return, peak_return
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """Ranks with ties averaged"""
+    order = np.argsort(values, kind="mergesort")
+    _, first, counts = np.unique(values[order], return_index=True, return_counts=True)
+    ranks = np.empty(len(values))
+    ranks[order] = np.repeat(first + (counts - 1) / 2, counts)
+    return ranks
+
+
+def _rank_correlation(predicted: np.ndarray, realized: np.ndarray) -> Optional[float]:
+    if len(predicted) < 2 or np.ptp(predicted) == 0 or np.ptp(realized) == 0:
+        return None
+    return round(float(np.corrcoef(_ranks(predicted), _ranks(realized))[0, 1]), 3)
+
+
+def _pct(values: np.ndarray) -> float:
+    return round(float(np.mean(values)) * 100, 2)
+
+
+def _group(predicted: np.ndarray, realized: np.ndarray, hits: np.ndarray) -> Dict[str, Any]:
+    return {'windows': int(len(predicted)), 'target_hit_rate': round(float(np.mean(hits)), 3),
+            'mean_predicted_pct': _pct(predicted), 'mean_realized_pct': _pct(realized)}
+
+
+def evaluate(predicted: np.ndarray, confidence: np.ndarray, realized: np.ndarray, peak: np.ndarray,
+             buckets: int = CALIBRATION_BUCKETS) -> Dict[str, Any]:
+    """
+    Accuracy and calibration of flat arrays of forecasts against outcomes
+
+    A direction hit is a move in the forecast's direction by the horizon; a
+    target hit is the forecast price being touched at any point within it.
+    Calibration groups forecasts by confidence and by predicted growth
+    (quantile buckets) and compares predicted with realized mean returns.
+    """
+    if not len(predicted):
+        return {'windows': 0}
+    hits = peak >= predicted
+    report = {
+        'windows': int(len(predicted)),
+        'direction_hit_rate': round(float(np.mean(np.sign(realized) == np.sign(predicted))), 3),
+        'target_hit_rate': round(float(np.mean(hits)), 3),
+        'mean_predicted_pct': _pct(predicted),
+        'mean_realized_pct': _pct(realized),
+        'median_realized_pct': round(float(np.median(realized)) * 100, 2),
+        'rank_correlation': _rank_correlation(predicted, realized),
+        'by_confidence': {},
+        'calibration': [],
+    }
+    for level, name in enumerate(CONFIDENCE_LEVELS):
+        mask = confidence == level
+        if mask.any():
+            report['by_confidence'][name] = _group(predicted[mask], realized[mask], hits[mask])
+
+    edges = np.unique(np.quantile(predicted, np.linspace(0, 1, buckets + 1)[1:-1]))
+    index = np.searchsorted(edges, predicted, side="right")
+    error = 0.0
+    for bucket in np.unique(index):
+        mask = index == bucket
+        group = _group(predicted[mask], realized[mask], hits[mask])
+        error += abs(group['mean_predicted_pct'] - group['mean_realized_pct']) * group['windows']
+        report['calibration'].append(group)
+    report['calibration_error_pct'] = round(error / len(predicted), 2)
+    return report
+
+
+class ForecastBacktest:
+    """
+    Replays daily candles from the local store through the forecast rules
+
+    Args:
+        store: Candle store to read; never backfilled
+        market_caps: Market cap per symbol; others use the direct forecaster's estimates
+    """
+
+    def __init__(self, store: Optional[OHLCVStore] = None, market_caps: Optional[Dict[str, float]] = None):
+        self.store = store or ohlcv_store
+        self.market_caps = {symbol.upper(): cap for symbol, cap in (market_caps or {}).items()}
+
+    def market_cap(self, symbol: str) -> float:
+        if symbol.upper() in self.market_caps:
+            return self.market_caps[symbol.upper()]
+        from direct_crypto_forecast import direct_forecaster
+        return direct_forecaster._estimate_market_cap(symbol)
+
+    def load(self, symbols: Iterable[str], start: Optional[int] = None,
+             end: Optional[int] = None) -> Dict[str, Candles]:
+        """Stored daily candles per symbol; symbols with no local data are left out"""
+        histories = {}
+        for symbol in symbols:
+            candles = self.store.range(symbol.upper(), "1d", start, end)
+            if len(candles["close"]):
+                histories[symbol.upper()] = candles
+        return histories
+
+    def run(self, symbols: Iterable[str], model: str = "prediction_engine", horizons: Optional[List[str]] = None,
+            step: int = 1, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Score every `step`-th day of each symbol's history and evaluate each horizon
+
+        Returns per-horizon accuracy and calibration, plus load time and
+        compute time (features, scoring and outcomes) per forecast.
+        """
+        if model not in MODELS:
+            raise ValueError(f"Unknown forecast model {model!r}; use one of {', '.join(MODELS)}")
+        horizons = horizons or list(HORIZON_DAYS)
+        load_start = time.perf_counter()
+        histories = self.load(symbols, start, end)
+        load_ms = (time.perf_counter() - load_start) * 1000
+        report: Dict[str, Any] = {'model': model, 'symbols': {s: len(c["close"]) for s, c in histories.items()},
+                                  'load_ms': round(load_ms, 2), 'horizons': {}}
+        if not histories:
+            return report
+
+        compute_start = time.perf_counter()
+        matrices = stack(list(histories.values()))
+        features = forecast_features(matrices)
+        caps = np.array([self.market_cap(symbol) for symbol in histories])
+        sampled = np.zeros(matrices["close"].shape[-1], dtype=bool)
+        sampled[::max(step, 1)] = True
+        eligible = (features['periods'] >= MIN_HISTORY) & ~np.isnan(matrices["close"]) & sampled
+
+        forecasts = 0
+        for horizon in horizons:
+            growth, confidence = MODELS[model](features, caps, horizon)
+            end_return, peak_return = realized_outcomes(matrices, HORIZON_DAYS[horizon])
+            mask = eligible & ~np.isnan(end_return)
+            forecasts += int(mask.sum())
+            result = evaluate(growth[mask], confidence[mask], end_return[mask], peak_return[mask])
+            result['days'] = HORIZON_DAYS[horizon]
+            report['horizons'][horizon] = result
+        compute_ms = (time.perf_counter() - compute_start) * 1000
+
+        report['forecasts'] = forecasts
+        report['compute_ms'] = round(compute_ms, 2)
+        report['per_forecast_us'] = round(compute_ms * 1000 / forecasts, 3) if forecasts else None
+        return report
+
+    def format_report(self, report: Dict[str, Any]) -> str:
+        lines = [f"Forecast backtest ({report['model']}): {len(report['symbols'])} symbols, "
+                 f"{report.get('forecasts', 0)} forecasts"]
+        if report.get('forecasts'):
+            lines.append(f"Compute {report['compute_ms']} ms ({report['per_forecast_us']} µs per forecast), "
+                         f"load {report['load_ms']} ms")
+        for horizon, result in report['horizons'].items():
+            if not result['windows']:
+                lines.append(f"{horizon} ({result['days']}d): not enough history")
+                continue
+            lines.append(f"{horizon} ({result['days']}d): {result['windows']} windows, "
+                         f"direction hit {result['direction_hit_rate']:.1%}, "
+                         f"target hit {result['target_hit_rate']:.1%}, "
+                         f"predicted {result['mean_predicted_pct']:+.1f}% vs realized "
+                         f"{result['mean_realized_pct']:+.1f}% (median {result['median_realized_pct']:+.1f}%), "
+                         f"calibration error {result['calibration_error_pct']:.1f} pts, "
+                         f"rank correlation {result['rank_correlation']}")
+            for name, group in result['by_confidence'].items():
+                lines.append(f"  {name:<6} confidence: {group['windows']} windows, "
+                             f"target hit {group['target_hit_rate']:.1%}, predicted "
+                             f"{group['mean_predicted_pct']:+.1f}% vs realized {group['mean_realized_pct']:+.1f}%")
+        return "\n".join(lines)
+
+
+# Global instance
+forecast_backtest = ForecastBacktest()
+
+
+def run_forecast_backtest(symbols: Iterable[str], model: str = "prediction_engine",
+                          horizons: Optional[List[str]] = None) -> str:
+    """Backtest a forecaster against locally stored candles and describe the result"""
+    return forecast_backtest.format_report(forecast_backtest.run(symbols, model, horizons))
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Backtest the crypto forecasters against locally stored candles")
+    parser.add_argument("symbols", nargs="+", help="Symbols with daily candles in the store (e.g. BTC ETH)")
+    parser.add_argument("--store", default=os.environ.get("OHLCV_STORE_DIR"), help="OHLCV store directory")
+    parser.add_argument("--model", choices=list(MODELS), default="prediction_engine")
+    parser.add_argument("--horizon", action="append", choices=list(HORIZON_DAYS), help="Horizon (repeatable)")
+    parser.add_argument("--step", type=int, default=1, help="Score every Nth day")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    backtest = ForecastBacktest(OHLCVStore(args.store) if args.store else None)
+    result = backtest.run(args.symbols, args.model, args.horizon, args.step)
+    print(json.dumps(result, indent=2) if args.json else backtest.format_report(result))
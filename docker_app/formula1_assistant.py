@@ -28,7 +28,7 @@ except ImportError:
         return f"[TEST MODE] Web search for: {query}"
 
 from datetime import datetime
-import requests
+from http_client import http_client
 import json
 import time
 
@@ -46,7 +46,7 @@ def get_openf1_data(endpoint, params=None):
     """Generic function to fetch data from OpenF1 API"""
     try:
         url = f"{OPENF1_API_BASE}/{endpoint}"
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -454,7 +454,7 @@ def get_f1_standings() -> str:
     try:
         # Try Ergast API for driver standings
         driver_url = "https://ergast.com/api/f1/current/driverStandings.json"
-        driver_response = requests.get(driver_url, timeout=10)
+        driver_response = http_client.get(driver_url, timeout=10)
         driver_standings = ""
         
         if driver_response.status_code == 200:
@@ -472,7 +472,7 @@ def get_f1_standings() -> str:
         
         # Try Ergast API for constructor standings
         constructor_url = "https://ergast.com/api/f1/current/constructorStandings.json"
-        constructor_response = requests.get(constructor_url, timeout=10)
+        constructor_response = http_client.get(constructor_url, timeout=10)
         constructor_standings = ""
         
         if constructor_response.status_code == 200:
@@ -505,7 +505,7 @@ def get_next_f1_race() -> str:
     try:
         # Try Ergast API for next race
         url = "https://ergast.com/api/f1/current/next.json"
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -547,7 +547,7 @@ def get_next_f1_race() -> str:
         
         # Fallback to ESPN API
         url = "https://site.api.espn.com/apis/site/v2/sports/racing/f1/scoreboard"
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
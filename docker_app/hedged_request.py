@@ -0,0 +1,171 @@
+"""
+Hedged Request - Race redundant providers with a latency-derived hedge delay
+
+The primary provider is called first; if it has not answered within its
+observed p95 latency, the next provider is launched alongside it, and so on.
+The first valid answer wins and the remaining calls are abandoned, which cuts
+tail latency without multiplying load on the common path.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from circuit_breaker import CircuitBreakerRegistry, circuit_breakers
+
+# Shared by all hedged calls; abandoned calls finish here in the background
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per provider"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(provider, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, provider: str, pct: float) -> Optional[float]:
+        """Latency percentile in seconds, or None without samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def count(self, provider: str) -> int:
+        with self._lock:
+            return len(self._samples.get(provider, ()))
+
+
+class HedgedRequest:
+    """
+    Call an ordered list of providers with hedging
+
+    Args:
+        providers: (name, function) pairs in preference order; each function
+            takes the call's arguments and returns a result or None
+        accept: Predicate a result must pass to win (default: truthy)
+        default_delay: Hedge delay in seconds until a provider has min_samples latencies
+        min_delay, max_delay: Bounds on the p95-derived hedge delay
+        hosts: Provider name to host; when given, providers are tried in
+            order of their hosts' circuit-breaker health
+    """
+
+    def __init__(self, providers: Sequence[Tuple[str, Callable[..., Any]]],
+                 accept: Optional[Callable[[Any], bool]] = None, default_delay: float = 0.3,
+                 min_delay: float = 0.05, max_delay: float = 1.5, min_samples: int = 20,
+                 percentile: float = 95, tracker: Optional[LatencyTracker] = None,
+                 executor: Optional[ThreadPoolExecutor] = None, hosts: Optional[Dict[str, str]] = None,
+                 breakers: Optional[CircuitBreakerRegistry] = None):
+        self.providers = list(providers)
+        self.hosts = hosts
+        self.breakers = breakers or circuit_breakers
+        self.accept = accept or bool
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self.latency = tracker or LatencyTracker()
+        self._executor = executor or _hedge_pool
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'hedges': 0, 'abandoned': 0, 'failures': 0,
+                      'wins': {name: 0 for name, _ in self.providers}}
+
+    def hedge_delay(self, provider: str) -> float:
+        """How long to wait on a provider before launching the next one"""
+        if self.latency.count(provider) < self.min_samples:
+            return self.default_delay
+        p95 = self.latency.percentile(provider, self.percentile)
+        return min(self.max_delay, max(self.min_delay, p95))
+
+    def ordered_providers(self) -> list:
+        """Providers in preference order, unhealthy hosts moved to the back"""
+        if not self.hosts:
+            return list(self.providers)
+        return self.breakers.order_by_health(self.providers, host_of=lambda p: self.hosts.get(p[0], p[0]))
+
+    def _launch(self, name: str, func: Callable[..., Any], args: tuple, kwargs: dict) -> Future:
+        started = time.perf_counter()
+
+        def call():
+            result = func(*args, **kwargs)
+            if self.accept(result):
+                self.latency.record(name, time.perf_counter() - started)
+            return result
+
+        return self._executor.submit(call)
+
+    def call(self, *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Optional[Any]:
+        """
+        Return the first accepted result, or None if every provider fails
+
+        Args:
+            timeout: Overall limit in seconds on waiting for an answer
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending: Dict[Future, str] = {}
+        queue = self.ordered_providers()
+        with self._lock:
+            self.stats['calls'] += 1
+
+        def launch_next(hedge: bool) -> None:
+            name, func = queue.pop(0)
+            pending[self._launch(name, func, args, kwargs)] = name
+            if hedge:
+                with self._lock:
+                    self.stats['hedges'] += 1
+
+        launch_next(hedge=False)
+        while pending:
+            # Wait for the newest provider's hedge delay, or indefinitely once none are left
+            wait_for = self.hedge_delay(list(pending.values())[-1]) if queue else None
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+                wait_for = remaining if wait_for is None else min(wait_for, remaining)
+
+            done, _ = wait(list(pending), timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Hedged provider {name} failed: {str(e)}")
+                    result = None
+                if self.accept(result):
+                    self._abandon(pending)
+                    with self._lock:
+                        self.stats['wins'][name] += 1
+                    return result
+
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if queue:
+                # A provider failed, or the newest one is slower than its hedge delay
+                launch_next(hedge=not done)
+
+        self._abandon(pending)
+        with self._lock:
+            self.stats['failures'] += 1
+        return None
+
+    def _abandon(self, pending: Dict[Future, str]) -> None:
+        """Drop the losing calls; ones not yet started are cancelled outright"""
+        for future in pending:
+            future.cancel()
+        with self._lock:
+            self.stats['abandoned'] += len(pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {**self.stats, 'wins': dict(self.stats['wins'])}
+        stats['hedge_delay_ms'] = {name: round(self.hedge_delay(name) * 1000, 1) for name, _ in self.providers}
+        return stats
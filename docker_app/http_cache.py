@@ -0,0 +1,336 @@
+"""
+HTTP Cache - Local response cache with ETag/Last-Modified revalidation
+
+GET responses from upstream APIs are kept in a memory or on-disk store. A
+response younger than its max-age is served without touching the network;
+an older one is revalidated with If-None-Match / If-Modified-Since, and a
+304 reuses the stored body. Max-age comes from the response's Cache-Control
+header unless an endpoint override says otherwise, so each source keeps its
+own freshness needs (live prices always revalidate, standings and
+encyclopedia summaries are reused for much longer). The on-disk store only
+keeps the endpoints listed below and is pruned by entry count and age.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Max-age overrides in seconds, matched by URL prefix (first match wins).
+# 0 means "always revalidate": no network saving on freshness, but an
+# unchanged body still costs only a 304.
+ENDPOINT_MAX_AGE: List[Tuple[str, int]] = [
+    # Live prices: never served blind, revalidated on every call
+    ("https://api.coingecko.com/api/v3/simple/price", 0),
+    ("https://api.coinbase.com/v2/prices/", 0),
+    ("https://api.binance.com/api/v3/ticker/", 0),
+    ("https://api.coingecko.com/api/v3/coins/", 30),
+    ("https://api.coingecko.com/api/v3/global", 120),
+    ("https://api.coingecko.com/api/v3/search/trending", 300),
+    # F1: scoreboard moves during sessions, standings only after a race
+    ("https://site.api.espn.com/apis/site/v2/sports/racing/f1/scoreboard", 60),
+    ("https://site.api.espn.com/apis/site/v2/sports/racing/f1/news", 300),
+    ("https://ergast.com/api/f1/current/next.json", 1800),
+    ("https://ergast.com/api/f1/current/driverStandings.json", 3600),
+    ("https://ergast.com/api/f1/current/constructorStandings.json", 3600),
+    ("https://en.wikipedia.org/api/rest_v1/page/summary/", 86400),
+]
+
+# Headers kept with a stored response
+STORED_HEADERS = ("Content-Type", "Content-Encoding", "ETag", "Last-Modified", "Cache-Control", "Date")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class CachedResponse:
+    """A stored response body with its validators"""
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    stored_at: float = field(default_factory=time.time)
+    max_age: int = 0
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("Last-Modified")
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return ((now or time.time()) - self.stored_at) < self.max_age
+
+    def to_response(self) -> requests.Response:
+        """Rebuild a requests.Response that callers can use as if fetched"""
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.url = self.url
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = "OK"
+        response.from_cache = True
+        return response
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"url": self.url, "status_code": self.status_code, "headers": self.headers,
+                "content": base64.b64encode(self.content).decode("ascii"),
+                "stored_at": self.stored_at, "max_age": self.max_age}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CachedResponse":
+        return cls(url=data["url"], status_code=data["status_code"], headers=data["headers"],
+                   content=base64.b64decode(data["content"]), stored_at=data["stored_at"],
+                   max_age=data["max_age"])
+
+
+class MemoryCacheStore:
+    """In-process LRU store"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheStore:
+    """
+    One JSON file per response, shared across processes and restarts
+
+    Args:
+        directory: Where the entry files live
+        max_entries: Most recently written entries kept; older ones are deleted
+        max_age: Seconds since its last write after which an entry is deleted
+        prune_every: Writes between pruning passes
+    """
+
+    def __init__(self, directory: str, max_entries: int = 2048, max_age: float = 7 * 86400,
+                 prune_every: int = 64):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.prune()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._path(key), "r") as f:
+                return CachedResponse.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        # Write to a temp file and rename, so readers never see a partial entry
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry.to_dict(), f)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            print(f"HTTP cache write error: {str(e)}")
+            return
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 0
+        if due:
+            self.prune()
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete entries past max_age, then the least recently written beyond max_entries"""
+        now = now if now is not None else time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort(reverse=True)
+        removed = 0
+        for index, (written_at, path) in enumerate(entries):
+            if index >= self.max_entries or now - written_at > self.max_age:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def __len__(self) -> int:
+        return sum(1 for name in os.listdir(self.directory) if name.endswith(".json"))
+
+
+class HttpCache:
+    """
+    Freshness and revalidation policy on top of a store
+
+    Args:
+        store: MemoryCacheStore (default) or DiskCacheStore
+        overrides: (URL prefix, max-age) pairs; ENDPOINT_MAX_AGE by default
+        listed_only: Store only responses whose URL matches an override, so a
+            persistent store holds known API endpoints rather than every page fetched
+    """
+
+    def __init__(self, store=None, overrides: Optional[List[Tuple[str, int]]] = None, listed_only: bool = False):
+        self.store = store if store is not None else MemoryCacheStore()
+        self.overrides = list(ENDPOINT_MAX_AGE if overrides is None else overrides)
+        self.listed_only = listed_only
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'bytes_saved': 0}
+
+    @staticmethod
+    def cache_key(url: str, params: Any = None) -> str:
+        """Full URL including query parameters"""
+        if not params:
+            return url
+        prepared = requests.models.PreparedRequest()
+        prepared.prepare_url(url, params)
+        return prepared.url
+
+    def max_age_for(self, url: str, response_headers: Optional[Dict[str, str]] = None) -> Optional[int]:
+        """Seconds a response may be reused; None if it must not be stored"""
+        cache_control = (response_headers or {}).get("Cache-Control", "").lower()
+        if "no-store" in cache_control:
+            return None
+        override = self._override(url)
+        if override is not None:
+            return override
+        if "no-cache" in cache_control:
+            return 0
+        match = _MAX_AGE.search(cache_control)
+        return int(match.group(1)) if match else 0
+
+    def _override(self, url: str) -> Optional[int]:
+        for prefix, max_age in self.overrides:
+            if url.startswith(prefix):
+                return max_age
+        return None
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        return self.store.get(key)
+
+    def fresh_response(self, entry: Optional[CachedResponse]) -> Optional[requests.Response]:
+        """The stored response if it can be served without revalidating"""
+        if entry is None or not entry.is_fresh():
+            return None
+        self._count('hits', len(entry.content))
+        return entry.to_response()
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedResponse]) -> Dict[str, str]:
+        """Validators for revalidating a stale entry"""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def update(self, key: str, entry: Optional[CachedResponse], response: requests.Response) -> requests.Response:
+        """
+        Fold a network response into the cache
+
+        A 304 refreshes the stored entry and returns its body; a 200 with a
+        validator or a positive max-age is stored. Anything else passes through.
+        """
+        if response.status_code == 304 and entry is not None:
+            headers = dict(entry.headers)
+            headers.update({name: response.headers[name] for name in STORED_HEADERS if name in response.headers})
+            max_age = self.max_age_for(key, headers)
+            refreshed = CachedResponse(key, entry.status_code, headers, entry.content, max_age=max_age or 0)
+            self.store.set(key, refreshed)
+            self._count('revalidated', len(entry.content))
+            return refreshed.to_response()
+
+        self._count('misses')
+        if response.status_code != 200 or (self.listed_only and self._override(key) is None):
+            return response
+
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        max_age = self.max_age_for(key, headers)
+        if max_age is None or (max_age == 0 and "ETag" not in headers and "Last-Modified" not in headers):
+            # Nothing to revalidate against; storing would only cost memory
+            return response
+        if "Content-Encoding" in headers:
+            # requests has already decoded the body
+            del headers["Content-Encoding"]
+        self.store.set(key, CachedResponse(key, 200, headers, response.content, max_age=max_age))
+        self._count('stored')
+        return response
+
+    def _count(self, stat: str, saved: int = 0) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+            self.stats['bytes_saved'] += saved
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['revalidated'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['revalidated']) / lookups, 3) if lookups else 0.0
+        stats['entries'] = len(self.store)
+        return stats
+
+
+def default_cache() -> Optional[HttpCache]:
+    """Cache for the shared client: on disk if HTTP_CACHE_DIR is set, else in memory"""
+    if os.environ.get("HTTP_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    directory = os.environ.get("HTTP_CACHE_DIR")
+    if directory:
+        try:
+            store = DiskCacheStore(directory, max_entries=int(os.environ.get("HTTP_CACHE_DISK_MAX_ENTRIES", "2048")),
+                                   max_age=float(os.environ.get("HTTP_CACHE_DISK_MAX_AGE", str(7 * 86400))))
+            return HttpCache(store, listed_only=True)
+        except OSError as e:
+            print(f"HTTP cache directory unavailable, using memory: {str(e)}")
+    return HttpCache(MemoryCacheStore(int(os.environ.get("HTTP_CACHE_MAX_ENTRIES", "512"))))
@@ -0,0 +1,224 @@
+"""
+HTTP Client - Shared connection-pooled HTTP session for all data fetchers
+
+One requests.Session per process with keep-alive connection pools per host,
+a per-host concurrency limit, a per-host circuit breaker, a uniform timeout
+and retry policy, and a revalidating response cache for GETs, so the crypto,
+F1, aviation and web modules stop opening a fresh connection (and TLS
+handshake) and re-downloading unchanged bodies on every call.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import AbstractSet, Any, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from circuit_breaker import CircuitBreakerRegistry, CircuitOpenError, circuit_breakers
+from http_cache import HttpCache, default_cache
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# (connect, read) seconds, used when a caller does not pass a timeout
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Concurrent requests allowed per host, unless overridden below
+DEFAULT_MAX_PER_HOST = int(os.environ.get("HTTP_MAX_PER_HOST", "8"))
+
+# Hosts with tight public rate limits get fewer concurrent requests
+HOST_CONCURRENCY = {
+    "api.coingecko.com": 4,
+    "pro-api.coinmarketcap.com": 4,
+    "ergast.com": 4,
+}
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+def default_retry(retries: int = 2, backoff: float = 0.25) -> Retry:
+    """
+    Retry policy shared by every host
+
+    Idempotent requests are retried on connection errors and on throttling or
+    gateway errors with exponential backoff. Read timeouts are not retried and
+    Retry-After is not honoured, so one slow upstream cannot stretch a call far
+    past its timeout; callers already fall back to other sources.
+    """
+    return Retry(
+        total=retries, connect=retries, read=0, status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+
+
+# Request headers that make a response private to the caller
+PRIVATE_HEADERS = frozenset({"authorization", "cookie", "cb-access-key", "x-cmc_pro_api_key"})
+
+# Query parameters that carry credentials; requests with them are never cached
+PRIVATE_PARAMS = frozenset({"x_cg_pro_api_key", "x_cg_demo_api_key", "api_key", "apikey", "access_token"})
+
+
+# Responses that count against a host's circuit breaker
+FAILURE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# For fixed API endpoints a missing resource means the endpoint itself is gone
+MISSING_ENDPOINT_STATUSES = FAILURE_STATUSES | {404, 410}
+
+
+class HostLimitExceeded(requests.exceptions.ConnectionError):
+    """No concurrency slot for the host became free in time"""
+
+
+class HostCircuitOpen(CircuitOpenError, requests.exceptions.ConnectionError):
+    """The host's circuit breaker is open; the call was not sent"""
+
+
+class HttpClient:
+    """Shared session with per-host connection pools, concurrency limits and circuit breakers"""
+
+    def __init__(self, timeout: Timeout = DEFAULT_TIMEOUT, max_per_host: int = DEFAULT_MAX_PER_HOST,
+                 host_concurrency: Optional[Dict[str, int]] = None, pool_hosts: int = 32,
+                 retry: Optional[Retry] = None, queue_timeout: float = 10.0,
+                 user_agent: str = DEFAULT_USER_AGENT, breakers: Optional[CircuitBreakerRegistry] = None,
+                 cache: Optional[HttpCache] = None):
+        self.timeout = timeout
+        self.cache = cache
+        self.breakers = breakers or CircuitBreakerRegistry()
+        self.max_per_host = max_per_host
+        self.host_concurrency = dict(HOST_CONCURRENCY if host_concurrency is None else host_concurrency)
+        self.queue_timeout = queue_timeout
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': user_agent})
+        # One keep-alive pool per host, sized to the host's concurrency limit
+        adapter = HTTPAdapter(pool_connections=pool_hosts,
+                              pool_maxsize=max([max_per_host, *self.host_concurrency.values()]),
+                              max_retries=retry or default_retry())
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {'requests': 0, 'errors': 0, 'short_circuited': 0,
+                                           'total_ms': 0.0, 'queued_ms': 0.0})
+
+    @property
+    def headers(self):
+        """Default headers sent with every request"""
+        return self.session.headers
+
+    def _limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            limit = self._limits.get(host)
+            if limit is None:
+                limit = threading.BoundedSemaphore(self.host_concurrency.get(host, self.max_per_host))
+                self._limits[host] = limit
+            return limit
+
+    def _cacheable(self, method: str, url: str, kwargs: Dict[str, Any]) -> bool:
+        if method != "GET" or self.cache is None or kwargs.get('stream') or kwargs.get('auth'):
+            return False
+        headers = kwargs.get('headers') or {}
+        if any(name.lower() in PRIVATE_HEADERS for name in headers):
+            return False
+        # Credentials in the query string would end up in cache keys and persisted entries
+        query = urlsplit(HttpCache.cache_key(url, kwargs.get('params'))).query
+        return not any(name.lower() in PRIVATE_PARAMS for name, _ in parse_qsl(query, keep_blank_values=True))
+
+    def _queue_wait(self, timeout: Optional[Timeout]) -> float:
+        """Seconds to wait for a host slot, never longer than the caller's own timeout"""
+        if timeout is None:
+            return self.queue_timeout
+        parts = [t for t in (timeout if isinstance(timeout, tuple) else (timeout,)) if t is not None]
+        return min(self.queue_timeout, sum(parts)) if parts else self.queue_timeout
+
+    def request(self, method: str, url: str, timeout: Optional[Timeout] = None,
+                failure_statuses: AbstractSet[int] = FAILURE_STATUSES, **kwargs: Any) -> requests.Response:
+        """
+        Send a request through the shared session, waiting for a free slot on the host
+
+        Args:
+            failure_statuses: Response codes that count against the host's circuit
+                breaker; endpoints that should never 404 pass MISSING_ENDPOINT_STATUSES
+        """
+        cache_key = entry = None
+        if self._cacheable(method, url, kwargs):
+            # Fresh responses skip the network; stale ones are revalidated
+            url = cache_key = self.cache.cache_key(url, kwargs.pop('params', None))
+            entry = self.cache.lookup(cache_key)
+            cached = self.cache.fresh_response(entry)
+            if cached is not None:
+                return cached
+            validators = self.cache.conditional_headers(entry)
+            if validators:
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), **validators}
+
+        host = urlsplit(url).hostname or ""
+        limit = self._limit(host)
+        breaker = self.breakers.get(host)
+
+        queued = time.perf_counter()
+        queue_wait = self._queue_wait(timeout)
+        if not limit.acquire(timeout=queue_wait):
+            with self._lock:
+                self._stats[host]['errors'] += 1
+            raise HostLimitExceeded(f"No free connection slot for {host} within {queue_wait}s")
+
+        if not breaker.allow_request():
+            limit.release()
+            with self._lock:
+                self._stats[host]['short_circuited'] += 1
+            raise HostCircuitOpen(f"Circuit open for {host}")
+
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+        except Exception:
+            breaker.record_failure(time.perf_counter() - start)
+            with self._lock:
+                self._stats[host]['errors'] += 1
+            raise
+        finally:
+            limit.release()
+            now = time.perf_counter()
+            with self._lock:
+                stats = self._stats[host]
+                stats['requests'] += 1
+                stats['total_ms'] += (now - start) * 1000
+                stats['queued_ms'] += (start - queued) * 1000
+
+        if response.status_code in failure_statuses:
+            breaker.record_failure(now - start)
+        else:
+            breaker.record_success(now - start)
+        if cache_key is not None:
+            response = self.cache.update(cache_key, entry, response)
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-host request counts, errors and average latency"""
+        with self._lock:
+            return {
+                host: {**stats,
+                       'avg_ms': round(stats['total_ms'] / stats['requests'], 1) if stats['requests'] else 0.0,
+                       'limit': self.host_concurrency.get(host, self.max_per_host)}
+                for host, stats in self._stats.items()
+            }
+
+
+# Global instance shared by every data fetcher
+http_client = HttpClient(breakers=circuit_breakers, cache=default_cache())
@@ -0,0 +1,305 @@
+"""
+Intent Classifier - Local hashed-feature linear model that maps a prompt to a routing domain
+
+Trained offline on labelled routing logs and stored as a small .npz file, so
+it loads in milliseconds and scores a prompt in microseconds without an LLM call.
+Confidences are temperature-scaled on held-out examples, and the model carries
+the confidence threshold at which its held-out predictions met the target
+accuracy; an uncalibrated model never claims a prompt.
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from keyword_classifier import tokenize
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_model.npz")
+
+# Routing domains the model can emit (assistant keys in the router's assistants dict)
+INTENT_LABELS = (
+    "business_finance", "tech_security", "research_knowledge", "specialized_industries",
+    "universal", "aviation", "formula1"
+)
+
+# Held-out accuracy predictions must reach at or above the calibrated threshold
+CALIBRATION_TARGET_ACCURACY = 0.9
+# Fewest held-out predictions a threshold may rest on
+CALIBRATION_MIN_SUPPORT = 10
+
+
+class IntentPrediction(NamedTuple):
+    domain: str
+    confidence: float
+
+
+class HashingVectorizer:
+    """Word, word-bigram and character-trigram features hashed into a fixed-size space"""
+
+    # Bound on memoized feature hashes
+    MAX_CACHED_FEATURES = 200000
+
+    def __init__(self, n_features: int = 2 ** 14):
+        self.n_features = n_features
+        self._hashes: Dict[str, int] = {}
+
+    def _hash(self, feature: str) -> int:
+        index = self._hashes.get(feature)
+        if index is None:
+            index = zlib.crc32(feature.encode("utf-8")) & (self.n_features - 1)
+            if len(self._hashes) >= self.MAX_CACHED_FEATURES:
+                self._hashes.clear()
+            self._hashes[feature] = index
+        return index
+
+    def transform(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse L2-normalized feature vector as (indices, values)"""
+        words = [token for token, _, _ in tokenize(text)]
+        counts: Dict[int, float] = {}
+
+        def add(feature, weight=1.0):
+            index = self._hash(feature)
+            counts[index] = counts.get(index, 0.0) + weight
+
+        for i, word in enumerate(words):
+            add("w:" + word)
+            if i:
+                add("b:" + words[i - 1] + " " + word)
+            padded = f" {word} "
+            for j in range(len(padded) - 2):
+                add("c:" + padded[j:j + 3], 0.5)
+
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.log1p(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        values /= np.linalg.norm(values)
+        return indices, values
+
+
+class IntentClassifier:
+    """Multinomial logistic regression over hashed features"""
+
+    def __init__(self, labels: Sequence[str], weights: np.ndarray, bias: np.ndarray,
+                 temperature: float = 1.0, threshold: float = float("inf")):
+        self.labels = tuple(labels)
+        self.weights = weights.astype(np.float32)  # (n_features, n_labels)
+        self.bias = bias.astype(np.float32)
+        self.temperature = float(temperature)
+        self.threshold = float(threshold)
+        self.vectorizer = HashingVectorizer(weights.shape[0])
+
+    def _scores(self, text: str) -> np.ndarray:
+        indices, values = self.vectorizer.transform(text)
+        return values @ self.weights[indices] + self.bias
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        """Calibrated probability of each label"""
+        # float64, as in calibrate(), so confidences compare exactly with the threshold
+        scores = self._scores(text).astype(np.float64) / self.temperature
+        scores = np.exp(scores - scores.max())
+        return scores / scores.sum()
+
+    def classify(self, text: str) -> IntentPrediction:
+        """Most likely domain and its probability"""
+        proba = self.predict_proba(text)
+        best = int(proba.argmax())
+        return IntentPrediction(self.labels[best], float(proba[best]))
+
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[str], n_features: int = 2 ** 14,
+              epochs: int = 60, learning_rate: float = 5.0, l2: float = 1e-4,
+              batch_size: int = 8, seed: int = 0) -> "IntentClassifier":
+        """Fit with minibatch gradient descent on sparse features"""
+        label_names = sorted(set(labels))
+        label_index = {name: i for i, name in enumerate(label_names)}
+        vectorizer = HashingVectorizer(n_features)
+        samples = [vectorizer.transform(text) for text in texts]
+        targets = np.array([label_index[label] for label in labels])
+
+        rng = np.random.default_rng(seed)
+        weights = np.zeros((n_features, len(label_names)), dtype=np.float32)
+        bias = np.zeros(len(label_names), dtype=np.float32)
+
+        for _ in range(epochs):
+            order = rng.permutation(len(samples))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                grad_bias = np.zeros_like(bias)
+                for i in batch:
+                    indices, values = samples[i]
+                    scores = values @ weights[indices] + bias
+                    proba = np.exp(scores - scores.max())
+                    proba /= proba.sum()
+                    proba[targets[i]] -= 1.0
+                    # Sparse update: only the rows this sample touches
+                    np.add.at(weights, indices, -learning_rate / len(batch) * np.outer(values, proba))
+                    grad_bias += proba
+                bias -= learning_rate * grad_bias / len(batch)
+            weights *= (1.0 - learning_rate * l2)
+
+        return cls(label_names, weights, bias)
+
+    def calibrate(self, texts: Sequence[str], labels: Sequence[str],
+                  target_accuracy: float = CALIBRATION_TARGET_ACCURACY,
+                  min_support: int = CALIBRATION_MIN_SUPPORT) -> Dict[str, float]:
+        """
+        Fit the softmax temperature and routing threshold on held-out examples
+
+        The temperature minimizes held-out log loss. The threshold is the lowest
+        confidence at which predictions at or above it were right at least
+        target_accuracy of the time over at least min_support examples; if no
+        confidence qualifies it stays infinite and the model never routes.
+        """
+        label_index = {name: i for i, name in enumerate(self.labels)}
+        scores = np.array([self._scores(text) for text in texts], dtype=np.float64).reshape(len(texts), -1)
+        targets = np.array([label_index.get(label, -1) for label in labels])
+        known = targets >= 0
+
+        # Log loss for a grid of temperatures, all at once
+        temperatures = np.exp(np.linspace(np.log(0.05), np.log(20.0), 200))
+        scaled = scores[known][None] / temperatures[:, None, None]
+        scaled -= scaled.max(axis=2, keepdims=True)
+        log_proba = scaled - np.log(np.exp(scaled).sum(axis=2, keepdims=True))
+        losses = -log_proba[:, np.arange(known.sum()), targets[known]].mean(axis=1)
+        self.temperature = float(temperatures[int(np.argmin(losses))]) if known.any() else 1.0
+
+        proba = np.exp(scores / self.temperature - (scores / self.temperature).max(axis=1, keepdims=True))
+        proba /= proba.sum(axis=1, keepdims=True)
+        confidence = proba.max(axis=1)
+        correct = proba.argmax(axis=1) == targets
+        order = np.argsort(-confidence, kind="mergesort")
+        running = np.cumsum(correct[order]) / np.arange(1, len(order) + 1)
+        qualifying = [i for i in range(min_support - 1, len(order))
+                      if running[i] >= target_accuracy and (i + 1 == len(order)
+                                                            or confidence[order[i + 1]] < confidence[order[i]])]
+        self.threshold = float(confidence[order[qualifying[-1]]]) if qualifying else float("inf")
+
+        routed = confidence >= self.threshold
+        return {'examples': len(texts), 'accuracy': float(correct.mean()) if len(texts) else 0.0,
+                'temperature': self.temperature, 'threshold': self.threshold,
+                'coverage': float(routed.mean()) if len(texts) else 0.0,
+                'routed_accuracy': float(correct[routed].mean()) if routed.any() else None}
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, labels=np.array(self.labels), weights=self.weights, bias=self.bias,
+                            temperature=self.temperature, threshold=self.threshold)
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            calibration = {key: float(data[key]) for key in ("temperature", "threshold") if key in data}
+            return cls([str(label) for label in data["labels"]], data["weights"], data["bias"], **calibration)
+
+
+def label_from_assistant(assistant_name: Optional[str]) -> Optional[str]:
+    """Map a logged assistant name (e.g. lazy_business_finance_assistant) to a routing label"""
+    if not assistant_name:
+        return None
+    name = assistant_name
+    if name.startswith("lazy_"):
+        name = name[len("lazy_"):]
+    if name.endswith("_assistant_claude"):
+        name = name[:-len("_assistant_claude")]
+    if name.endswith("_assistant"):
+        name = name[:-len("_assistant")]
+    return name if name in INTENT_LABELS else None
+
+
+def load_labelled_queries(paths: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    Read training examples from JSONL files
+
+    Accepts labelled corpus lines ({"query", "label"}) and telemetry
+    response events ({"query", "assistant_used"}); truncated queries are skipped.
+    """
+    texts, labels = [], []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                query = record.get("query")
+                label = record.get("label") or label_from_assistant(record.get("assistant_used"))
+                if not query or label not in INTENT_LABELS or record.get("query_length", 0) > 100:
+                    continue
+                texts.append(query)
+                labels.append(label)
+    return texts, labels
+
+
+_classifier = None
+_classifier_loaded = False
+_load_lock = threading.Lock()
+
+
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    """Load the model from INTENT_MODEL_PATH once; None if no model is available"""
+    global _classifier, _classifier_loaded
+    if not _classifier_loaded:
+        with _load_lock:
+            if not _classifier_loaded:
+                path = os.environ.get("INTENT_MODEL_PATH", DEFAULT_MODEL_PATH)
+                if os.path.exists(path):
+                    try:
+                        start = time.perf_counter()
+                        _classifier = IntentClassifier.load(path)
+                        print(f"Intent model loaded in {(time.perf_counter() - start) * 1000:.1f}ms")
+                    except Exception as e:
+                        print(f"Could not load intent model {path}: {str(e)}")
+                _classifier_loaded = True
+    return _classifier
+
+
+def classify_intent(prompt: str) -> Optional[IntentPrediction]:
+    """Domain and confidence for a prompt, or None if no model is deployed"""
+    classifier = get_intent_classifier()
+    return classifier.classify(prompt) if classifier else None
+
+
+def confident_intent(prompt: str, threshold: Optional[float] = None) -> Optional[IntentPrediction]:
+    """The prediction only if it clears the threshold (the model's calibrated one by default)"""
+    classifier = get_intent_classifier()
+    if not classifier:
+        return None
+    prediction = classifier.classify(prompt)
+    return prediction if prediction.confidence >= (classifier.threshold if threshold is None else threshold) else None
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) >= 4 and sys.argv[1] == "train":
+        *data_paths, model_path = sys.argv[2:]
+        texts, labels = load_labelled_queries(data_paths)
+
+        # Hold out every fifth example; they calibrate the model rather than train it
+        held_out = set(range(0, len(texts), 5))
+        train_idx = [i for i in range(len(texts)) if i not in held_out]
+        start = time.perf_counter()
+        model = IntentClassifier.train([texts[i] for i in train_idx], [labels[i] for i in train_idx])
+        report = model.calibrate([texts[i] for i in sorted(held_out)], [labels[i] for i in sorted(held_out)])
+        print(f"Held-out accuracy: {report['accuracy']:.1%} on {report['examples']} examples, "
+              f"trained in {time.perf_counter() - start:.1f}s")
+        print(f"Temperature {report['temperature']:.2f}, threshold {report['threshold']:.2f}: routes "
+              f"{report['coverage']:.1%} of held-out prompts at accuracy {report['routed_accuracy']}")
+        if report['threshold'] == float("inf"):
+            print(f"No confidence reached {CALIBRATION_TARGET_ACCURACY:.0%} held-out accuracy; "
+                  "the model will not route any prompt")
+
+        model.save(model_path)
+        print(f"Saved model for {len(set(labels))} labels from {len(train_idx)} examples to {model_path}")
+    elif len(sys.argv) >= 4 and sys.argv[1] == "predict":
+        model = IntentClassifier.load(sys.argv[2])
+        for text in sys.argv[3:]:
+            print(f"{model.classify(text)}  {text}")
+    else:
+        print("Usage: python intent_classifier.py train <labelled.jsonl>... <model.npz>")
+        print("       python intent_classifier.py predict <model.npz> <text>...")
+        sys.exit(1)
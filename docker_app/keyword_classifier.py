@@ -0,0 +1,100 @@
+"""
+Keyword Classifier - Compiled single-pass keyword matching across all routing domains
+"""
+
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Marks the end of a keyword in the token trie
+_END = ""
+
+
+class KeywordMatch(NamedTuple):
+    """A keyword found in a text, with its character span"""
+    keyword: str
+    start: int
+    end: int
+
+
+@lru_cache(maxsize=512)
+def tokenize(text: str) -> Tuple[Tuple[str, int, int], ...]:
+    """Lowercase word tokens with their character spans, computed once per text"""
+    return tuple((m.group().lower(), m.start(), m.end()) for m in _TOKEN_PATTERN.finditer(text))
+
+
+class KeywordClassifier:
+    """
+    Matches every domain's keywords in one pass over a prompt's tokens
+
+    All keyword tables are compiled into a single token trie, so a prompt is
+    tokenized once and each position is checked against every domain at the
+    same time. Keywords match on whole words; multi-word keywords ("grand
+    prix", "real-time") match their tokens in sequence, and a trailing "s"
+    on a word is ignored ("stocks" matches "stock").
+    """
+
+    def __init__(self, tables: Mapping[str, Iterable[str]], cache_size: int = 256):
+        self.domains = tuple(tables)
+        self._trie: Dict[str, dict] = {}
+        self.max_keyword_tokens = 0
+
+        for domain, keywords in tables.items():
+            for keyword in keywords:
+                tokens = [token for token, _, _ in tokenize(keyword)]
+                if not tokens:
+                    continue
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(_END, []).append((domain, keyword))
+                self.max_keyword_tokens = max(self.max_keyword_tokens, len(tokens))
+
+        # Routers ask about the same prompt several times; classify it once
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _step(self, node: dict, token: str):
+        child = node.get(token)
+        if child is None and len(token) > 3 and token.endswith("s"):
+            child = node.get(token[:-1])
+        return child
+
+    def _classify(self, text: str) -> Mapping[str, Tuple[KeywordMatch, ...]]:
+        tokens = tokenize(text)
+        matches: Dict[str, List[KeywordMatch]] = {}
+
+        for i in range(len(tokens)):
+            node = self._trie
+            for j in range(i, min(i + self.max_keyword_tokens, len(tokens))):
+                node = self._step(node, tokens[j][0])
+                if node is None:
+                    break
+                for domain, keyword in node.get(_END, ()):
+                    matches.setdefault(domain, []).append(KeywordMatch(keyword, tokens[i][1], tokens[j][2]))
+
+        return MappingProxyType({domain: tuple(found) for domain, found in matches.items()})
+
+    def classify(self, text: str) -> Mapping[str, Tuple[KeywordMatch, ...]]:
+        """
+        Find every domain with a keyword in the text
+
+        Returns:
+            Read-only mapping of domain -> matches (keyword, start, end), in text order
+        """
+        # Replaced per instance by the memoized _classify in __init__
+        return self._classify(text)
+
+    def matches(self, text: str, domain: str) -> bool:
+        """Whether the text contains any keyword of the domain"""
+        return domain in self.classify(text)
+
+    def first_match(self, text: str, domains: Iterable[str], default=None):
+        """The first of the given domains (in priority order) that matches"""
+        matched = self.classify(text)
+        for domain in domains:
+            if domain in matched:
+                return domain
+        return default
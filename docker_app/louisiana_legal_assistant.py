@@ -13,7 +13,7 @@ def get_realtime_context(query):
         except: pass
     return f"{context}Query: {query}"
 from web_browser_assistant import web_browser_assistant
-import requests
+from http_client import http_client
 import urllib.parse
 
 LOUISIANA_LEGAL_SYSTEM_PROMPT = """
@@ -127,7 +127,7 @@ def search_louisiana_sos(query):
         
         if any(term in query.lower() for term in ['business', 'llc', 'corporation', 'filing']):
             sos_url = "https://www.sos.la.gov/BusinessServices/Pages/default.aspx"
-            response = requests.get(sos_url, headers=headers, timeout=10)
+            response = http_client.get(sos_url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 return f"Louisiana Secretary of State Business Services: {sos_url}\nVerified accessible - contains business filing information and forms."
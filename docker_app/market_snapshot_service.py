@@ -0,0 +1,341 @@
+"""
+Market Snapshot Service - Background polling of market and sports data for O(1) context enrichment
+
+Each source is polled by a pluggable poller on its own schedule and kept as an
+immutable in-memory snapshot, so request-time enrichment is a dictionary read
+with a staleness stamp instead of an upstream call per query.
+"""
+
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Optional
+
+from cache_freshness import data_versions
+
+# Coins named in CRYPTO_KEYWORDS plus the top-3 default (BTC, ETH, USDT)
+DEFAULT_SYMBOLS = ('BTC', 'ETH', 'USDT', 'SOL', 'BNB', 'XRP', 'ADA', 'DOGE')
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy of nested dicts and lists"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One immutable poll result of a source"""
+    source: str
+    data: Any
+    fetched_at: float
+    max_age: float
+    version: str
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.fetched_at
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        return self.age(now) > self.max_age
+
+    def stamp(self, now: Optional[float] = None) -> str:
+        """Staleness stamp for prompt context"""
+        fetched = datetime.fromtimestamp(self.fetched_at, timezone.utc).strftime("%H:%M:%S UTC")
+        return f"as of {fetched}, {self.age(now):.0f}s old"
+
+
+class SnapshotPoller:
+    """
+    A source polled on its own schedule
+
+    Subclasses set a name, poll interval and maximum snapshot age, and
+    implement fetch(); returning None (or raising) marks a failed poll and
+    keeps the previous snapshot.
+    """
+
+    name = "source"
+    interval = 60.0
+    max_age = 180.0
+    publish_as: Optional[str] = None  # data_versions source fed by this poller
+
+    def fetch(self) -> Any:
+        raise NotImplementedError
+
+
+class CryptoQuotesPoller(SnapshotPoller):
+    """Spot price and 24h change of the top coins"""
+
+    name = "crypto_quotes"
+    interval = 30.0
+    max_age = 90.0
+
+    def __init__(self, symbols: Iterable[str] = DEFAULT_SYMBOLS):
+        self.symbols = tuple(symbols)
+
+    def fetch(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        # crypto_data_service publishes the per-coin crypto data versions itself
+        from crypto_data_service import crypto_data_service
+
+        quotes = {}
+        for symbol in self.symbols:
+            data = crypto_data_service.get_crypto_price(symbol)
+            if data and data.get('price_usd') is not None:
+                quotes[symbol] = {'price_usd': data['price_usd'], 'change_24h': data.get('change_24h'),
+                                  'source': data.get('source')}
+        return quotes or None
+
+
+class MarketOverviewPoller(SnapshotPoller):
+    """Global crypto market capitalisation and dominance"""
+
+    name = "market_overview"
+    interval = 300.0
+    max_age = 900.0
+
+    def fetch(self) -> Optional[Dict[str, Any]]:
+        from crypto_data_service import crypto_data_service
+
+        overview = crypto_data_service.get_market_overview()
+        return None if 'error' in overview else overview
+
+
+class F1NextRacePoller(SnapshotPoller):
+    """Next Grand Prix from the ESPN/OpenF1/Ergast chain"""
+
+    name = "f1_next_race"
+    interval = 600.0
+    max_age = 1800.0
+    publish_as = "f1"
+
+    def fetch(self) -> Optional[str]:
+        from realtime_data_access import realtime_data
+
+        return realtime_data.get_f1_data()
+
+
+class F1StandingsPoller(SnapshotPoller):
+    """Current driver and constructor standings"""
+
+    name = "f1_standings"
+    interval = 1800.0
+    max_age = 7200.0
+    publish_as = "f1_standings"
+
+    def fetch(self) -> Optional[str]:
+        from formula1_assistant import get_f1_standings
+
+        standings = get_f1_standings()
+        return None if "unavailable" in standings else standings
+
+
+class FakeFeedPoller(SnapshotPoller):
+    """Poller fed by a local function or sequence, for tests and offline development"""
+
+    def __init__(self, name: str, feed: Any, interval: float = 1.0, max_age: Optional[float] = None,
+                 publish_as: Optional[str] = None):
+        self.name = name
+        self.interval = interval
+        self.max_age = max_age if max_age is not None else interval * 3
+        self.publish_as = publish_as
+        self._feed = feed if callable(feed) else iter(feed).__next__
+
+    def fetch(self) -> Any:
+        try:
+            return self._feed()
+        except StopIteration:
+            return None
+
+
+def fake_pollers(seed: int = 0, interval: float = 1.0) -> List[SnapshotPoller]:
+    """Deterministic random-walk feeds for every built-in source"""
+    rng = random.Random(seed)
+    prices = {'BTC': 65000.0, 'ETH': 3200.0, 'USDT': 1.0, 'SOL': 150.0, 'BNB': 580.0, 'XRP': 0.55, 'ADA': 0.45, 'DOGE': 0.12}
+    opens = dict(prices)
+
+    def quotes():
+        for symbol in prices:
+            prices[symbol] *= 1 + rng.gauss(0, 0.002)
+        return {symbol: {'price_usd': round(price, 6), 'change_24h': round((price / opens[symbol] - 1) * 100, 2),
+                         'source': 'fake'} for symbol, price in prices.items()}
+
+    def overview():
+        return {'total_market_cap_usd': 2.4e12 * (1 + rng.gauss(0, 0.001)), 'btc_dominance': 52.0 + rng.gauss(0, 0.1),
+                'eth_dominance': 17.0, 'timestamp': datetime.now().isoformat()}
+
+    return [
+        FakeFeedPoller("crypto_quotes", quotes, interval),
+        FakeFeedPoller("market_overview", overview, interval * 10),
+        FakeFeedPoller("f1_next_race", lambda: "Next: Monaco Grand Prix - 2025-05-25 (Scheduled)", interval * 20),
+        FakeFeedPoller("f1_standings", lambda: "Driver Standings: 1. Lando Norris (McLaren): 133pts", interval * 20),
+    ]
+
+
+def default_pollers() -> List[SnapshotPoller]:
+    """Live pollers, or fake feeds when MARKET_SNAPSHOT_FEED=fake"""
+    if os.environ.get("MARKET_SNAPSHOT_FEED", "live") == "fake":
+        return fake_pollers()
+    return [CryptoQuotesPoller(), MarketOverviewPoller(), F1NextRacePoller(), F1StandingsPoller()]
+
+
+class MarketSnapshotService:
+    """Process-wide store of the latest snapshot of every polled source"""
+
+    # Delay before retrying a failed poll, capped by the poller's interval
+    RETRY_INTERVAL = 10.0
+
+    def __init__(self, pollers: Optional[Iterable[SnapshotPoller]] = None):
+        self._pollers: Dict[str, SnapshotPoller] = {}
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.stats = {'polls': 0, 'poll_failures': 0, 'reads': 0, 'stale_reads': 0, 'misses': 0}
+        for poller in pollers or ():
+            self.register(poller)
+
+    def register(self, poller: SnapshotPoller) -> None:
+        """Add or replace the poller for a source"""
+        with self._lock:
+            self._pollers[poller.name] = poller
+
+    def refresh(self, name: str) -> Optional[Snapshot]:
+        """Poll one source now; on failure the previous snapshot is kept"""
+        poller = self._pollers[name]
+        try:
+            data = poller.fetch()
+        except Exception as e:
+            print(f"Snapshot poll {name} failed: {str(e)}")
+            data = None
+
+        with self._lock:
+            self.stats['polls'] += 1
+            if data is None:
+                self.stats['poll_failures'] += 1
+                return None
+
+        version = data_versions.fingerprint(data)
+        if poller.publish_as:
+            data_versions.publish(poller.publish_as, data)
+        snapshot = Snapshot(name, freeze(data), time.time(), poller.max_age, version)
+        with self._lock:
+            self._snapshots[name] = snapshot
+        return snapshot
+
+    def refresh_all(self) -> None:
+        for name in list(self._pollers):
+            self.refresh(name)
+
+    def get(self, name: str, allow_stale: bool = False) -> Optional[Snapshot]:
+        """Latest snapshot of a source, or None if missing (or stale, unless allowed)"""
+        snapshot = self._snapshots.get(name)
+        with self._lock:
+            self.stats['reads'] += 1
+            if snapshot is None:
+                self.stats['misses'] += 1
+                return None
+            if snapshot.is_stale():
+                self.stats['stale_reads'] += 1
+                if not allow_stale:
+                    return None
+        return snapshot
+
+    def _poll_loop(self, poller: SnapshotPoller) -> None:
+        while not self._stop_event.is_set():
+            snapshot = self.refresh(poller.name)
+            delay = poller.interval if snapshot else min(poller.interval, self.RETRY_INTERVAL)
+            self._stop_event.wait(delay)
+
+    def start(self) -> bool:
+        """Start one polling thread per source; returns False if already running"""
+        with self._lock:
+            if self._threads:
+                return False
+            self._stop_event.clear()
+            for poller in self._pollers.values():
+                thread = threading.Thread(target=self._poll_loop, args=(poller,),
+                                          name=f"snapshot-{poller.name}", daemon=True)
+                self._threads.append(thread)
+        for thread in self._threads:
+            thread.start()
+        print(f"Market snapshot service started: {', '.join(self._pollers)}")
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+
+    def crypto_context(self, query: str) -> Optional[str]:
+        """Price lines for the coins a query mentions, or None if the snapshot cannot answer it"""
+        quotes = self.get("crypto_quotes")
+        if quotes is None:
+            return None
+
+        from crypto_data_service import crypto_data_service
+
+        symbols = crypto_data_service.mentioned_symbols(query) or crypto_data_service.top_cryptos[:3]
+        if any(symbol not in quotes.data for symbol in symbols[:5]):
+            return None
+
+        lines = []
+        for symbol in symbols[:5]:
+            data = quotes.data[symbol]
+            price = data['price_usd']
+            price_str = f"${price:,.4f}" if price < 1 else f"${price:,.2f}"
+            change_str = f"{data['change_24h']:+.2f}%" if data.get('change_24h') is not None else "N/A"
+            lines.append(f"{symbol}: {price_str} ({change_str})")
+
+        if any(word in query.lower() for word in ['market', 'overall', 'trend']):
+            overview = self.get("market_overview")
+            if overview is not None:
+                lines.append(f"Total Market Cap: ${overview.data['total_market_cap_usd'] / 1e12:.2f}T | "
+                             f"BTC Dominance: {overview.data['btc_dominance']:.1f}%")
+
+        return f"{' | '.join(lines)} ({quotes.stamp()})"
+
+    def f1_context(self) -> Optional[str]:
+        """Next race and standings, or None without a fresh next-race snapshot"""
+        next_race = self.get("f1_next_race")
+        if next_race is None:
+            return None
+        parts = [next_race.data]
+        standings = self.get("f1_standings")
+        if standings is not None:
+            parts.append(standings.data.replace("\n", " | "))
+        return f"{' | '.join(parts)} ({next_race.stamp()})"
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                'running': bool(self._threads),
+                'sources': {
+                    name: {'age_s': round(snapshot.age(), 1), 'stale': snapshot.is_stale(), 'version': snapshot.version}
+                    for name, snapshot in self._snapshots.items()
+                }
+            }
+
+
+# Global instance
+market_snapshots = MarketSnapshotService(default_pollers())
+
+
+def initialize_market_snapshots() -> str:
+    """Start background polling (once per process)"""
+    if os.environ.get("MARKET_SNAPSHOTS_ENABLED", "true").lower() != "true":
+        return "Market snapshot service disabled"
+    market_snapshots.start()
+    return "Market snapshot service running"
@@ -0,0 +1,436 @@
+"""
+OHLCV Store - Local columnar candle store for historical price queries
+
+Candles live on disk as one raw little-endian column file per field
+(time, open, high, low, close, volume), partitioned by product and
+granularity, and are read back through numpy memmaps. Range queries are a
+binary search on the time column and return zero-copy views, so a year of
+1-minute candles answers in microseconds without touching the network.
+Coarser granularities that were never downloaded are built by downsampling
+a finer partition. Backfill is incremental: only candles newer than the
+last stored one are fetched, plus any older range a caller asks for that
+predates the first stored one, which is prepended by rewriting the columns.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from single_flight import fetch_flight
+
+# Granularities the Coinbase Exchange candles endpoint serves, in seconds
+GRANULARITIES = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "6h": 21600, "1d": 86400}
+
+COLUMNS = ("time", "open", "high", "low", "close", "volume")
+_DTYPES = {"time": np.dtype("<i8"), "open": np.dtype("<f8"), "high": np.dtype("<f8"),
+           "low": np.dtype("<f8"), "close": np.dtype("<f8"), "volume": np.dtype("<f8")}
+
+# Most candles one Coinbase request returns
+CANDLES_PER_REQUEST = 300
+
+# How far back a first backfill reaches, per granularity
+DEFAULT_LOOKBACK = {"1m": 86400, "5m": 7 * 86400, "15m": 14 * 86400, "1h": 90 * 86400,
+                    "6h": 365 * 86400, "1d": 365 * 86400}
+
+# Seconds a backfill that left a partition short is remembered before it is retried
+BACKFILL_FAILURE_BACKOFF = float(os.environ.get("OHLCV_BACKFILL_FAILURE_BACKOFF", "60"))
+
+Candles = Dict[str, np.ndarray]
+CandleFetcher = Callable[[str, int, int, int], Optional[List[Sequence[float]]]]
+
+
+def granularity_seconds(granularity) -> int:
+    """Seconds for "1h"-style names or raw seconds"""
+    if isinstance(granularity, str):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity {granularity!r}; use one of {', '.join(GRANULARITIES)}")
+        return GRANULARITIES[granularity]
+    return int(granularity)
+
+
+def empty_candles() -> Candles:
+    return {column: np.empty(0, dtype=_DTYPES[column]) for column in COLUMNS}
+
+
+def downsample(candles: Candles, seconds: int) -> Candles:
+    """Aggregate time-sorted candles into buckets of the given width"""
+    times = candles["time"]
+    if len(times) == 0:
+        return empty_candles()
+    buckets = times - times % seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(times)] - 1
+    return {
+        "time": buckets[starts],
+        "open": np.asarray(candles["open"])[starts],
+        "high": np.maximum.reduceat(candles["high"], starts),
+        "low": np.minimum.reduceat(candles["low"], starts),
+        "close": np.asarray(candles["close"])[ends],
+        "volume": np.add.reduceat(candles["volume"], starts),
+    }
+
+
+class Partition:
+    """Column files for one product at one granularity"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps: Optional[Candles] = None
+        self.rows = self._recover()
+
+    def _path(self, column: str) -> str:
+        return os.path.join(self.directory, f"{column}.bin")
+
+    def _commit_marker(self) -> str:
+        return os.path.join(self.directory, "prepend.commit")
+
+    def _recover(self) -> int:
+        """Row count, finishing or discarding an interrupted prepend and trimming an interrupted append"""
+        committed = os.path.exists(self._commit_marker())
+        for column in COLUMNS:
+            staged = self._path(column) + ".tmp"
+            if os.path.exists(staged):
+                # Staged columns are only complete once the commit marker exists
+                if committed:
+                    os.replace(staged, self._path(column))
+                else:
+                    os.remove(staged)
+        if committed:
+            os.remove(self._commit_marker())
+        counts = []
+        for column in COLUMNS:
+            path = self._path(column)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            counts.append(size // _DTYPES[column].itemsize)
+        rows = min(counts)
+        for column, count in zip(COLUMNS, counts):
+            if count != rows or not os.path.exists(self._path(column)):
+                with open(self._path(column), "ab") as f:
+                    f.truncate(rows * _DTYPES[column].itemsize)
+        return rows
+
+    def first_time(self) -> Optional[int]:
+        columns = self.columns()
+        return int(columns["time"][0]) if len(columns["time"]) else None
+
+    def last_time(self) -> Optional[int]:
+        columns = self.columns()
+        return int(columns["time"][-1]) if len(columns["time"]) else None
+
+    def columns(self) -> Candles:
+        """Read-only memmaps of every column, remapped after appends"""
+        with self._lock:
+            if self._maps is None or len(self._maps["time"]) != self.rows:
+                if self.rows == 0:
+                    self._maps = empty_candles()
+                else:
+                    # Plain ndarray views of the maps: slicing a memmap subclass is several times slower
+                    self._maps = {column: np.asarray(np.memmap(self._path(column), dtype=_DTYPES[column], mode="r",
+                                                               shape=(self.rows,))) for column in COLUMNS}
+            return self._maps
+
+    def append(self, candles: Candles) -> int:
+        """Append candles newer than the last stored one; returns rows written"""
+        times = np.asarray(candles["time"], dtype=_DTYPES["time"])
+        if len(times) == 0:
+            return 0
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        keep = np.r_[True, times[1:] != times[:-1]]
+        last = self.last_time()
+        if last is not None:
+            keep &= times > last
+        if not keep.any():
+            return 0
+        with self._lock:
+            for column in COLUMNS:
+                values = np.asarray(candles[column], dtype=_DTYPES[column])[order][keep]
+                with open(self._path(column), "ab") as f:
+                    f.write(values.tobytes())
+            self.rows += int(keep.sum())
+        return int(keep.sum())
+
+    def prepend(self, candles: Candles) -> int:
+        """
+        Insert candles older than the first stored one; returns rows written
+
+        Each column is rewritten to a staged file, a commit marker is written
+        once all are complete, and only then are the staged files moved into
+        place, so a crash leaves either the old or the new columns on reopen.
+        Existing memmaps keep reading the replaced files until remapped.
+        """
+        times = np.asarray(candles["time"], dtype=_DTYPES["time"])
+        if len(times) == 0:
+            return 0
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        keep = np.r_[True, times[1:] != times[:-1]]
+        first = self.first_time()
+        if first is not None:
+            keep &= times < first
+        if not keep.any():
+            return 0
+        existing = self.columns()
+        with self._lock:
+            for column in COLUMNS:
+                values = np.asarray(candles[column], dtype=_DTYPES[column])[order][keep]
+                with open(self._path(column) + ".tmp", "wb") as f:
+                    f.write(values.tobytes())
+                    f.write(np.ascontiguousarray(existing[column]).tobytes())
+            open(self._commit_marker(), "w").close()
+            for column in COLUMNS:
+                os.replace(self._path(column) + ".tmp", self._path(column))
+            os.remove(self._commit_marker())
+            self.rows += int(keep.sum())
+            self._maps = None
+        return int(keep.sum())
+
+    def range(self, start: Optional[int] = None, end: Optional[int] = None) -> Candles:
+        """Candles with start <= time < end, as views over the memmaps"""
+        columns = self.columns()
+        times = columns["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, end, side="left"))
+        return {column: values[lo:hi] for column, values in columns.items()}
+
+
+class OHLCVStore:
+    """
+    Candle partitions under one root directory
+
+    Args:
+        root: Directory holding {PRODUCT}/{granularity}/{column}.bin
+        fetcher: fetcher(product, granularity_seconds, start, end) returning
+            [time, low, high, open, close, volume] rows (Coinbase order);
+            defaults to CoinbaseAPIService.get_candles
+    """
+
+    def __init__(self, root: str, fetcher: Optional[CandleFetcher] = None, request_pause: float = 0.12):
+        self.root = root
+        self._fetcher = fetcher
+        self.request_pause = request_pause
+        self._partitions: Dict[str, Partition] = {}
+        # Per partition, the earliest start already requested for older candles
+        self._floors: Dict[str, int] = {}
+        # Per partition, when a backfill last failed to cover a request
+        self._failed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.stats = {'queries': 0, 'downsampled': 0, 'backfills': 0, 'requests': 0, 'rows_written': 0,
+                      'fetch_errors': 0, 'backfill_backoffs': 0}
+
+    @staticmethod
+    def _product(symbol: str) -> str:
+        symbol = symbol.upper()
+        return symbol if "-" in symbol else f"{symbol}-USD"
+
+    def partition(self, symbol: str, granularity) -> Partition:
+        seconds = granularity_seconds(granularity)
+        key = f"{self._product(symbol)}/{seconds}"
+        with self._lock:
+            if key not in self._partitions:
+                self._partitions[key] = Partition(os.path.join(self.root, self._product(symbol), str(seconds)))
+            return self._partitions[key]
+
+    def _stored_granularities(self, symbol: str) -> List[int]:
+        directory = os.path.join(self.root, self._product(symbol))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(int(name) for name in os.listdir(directory) if name.isdigit())
+
+    def append(self, symbol: str, granularity, candles: Candles) -> int:
+        written = self.partition(symbol, granularity).append(candles)
+        with self._lock:
+            self.stats['rows_written'] += written
+        return written
+
+    def range(self, symbol: str, granularity, start: Optional[int] = None, end: Optional[int] = None) -> Candles:
+        """
+        Candles in [start, end) from local storage only
+
+        Served from the partition of that granularity when it has data,
+        otherwise downsampled from the finest stored partition that divides it.
+        """
+        seconds = granularity_seconds(granularity)
+        with self._lock:
+            self.stats['queries'] += 1
+        with self._lock:
+            opened = self._partitions.get(f"{self._product(symbol)}/{seconds}")
+        if opened is not None and opened.rows:
+            return opened.range(start, end)
+        stored = self._stored_granularities(symbol)
+        if seconds in stored and self.partition(symbol, seconds).rows:
+            return self.partition(symbol, seconds).range(start, end)
+        for finer in stored:
+            if finer < seconds and seconds % finer == 0 and self.partition(symbol, finer).rows:
+                aligned = None if start is None else start - start % seconds
+                with self._lock:
+                    self.stats['downsampled'] += 1
+                candles = downsample(self.partition(symbol, finer).range(aligned, end), seconds)
+                if start is not None:
+                    candles = {column: values[candles["time"] >= start] for column, values in candles.items()}
+                return candles
+        return empty_candles()
+
+    def _default_fetcher(self) -> CandleFetcher:
+        if self._fetcher is None:
+            from coinbase_api_service import coinbase_service
+            self._fetcher = coinbase_service.get_candles
+        return self._fetcher
+
+    def _download(self, fetch: CandleFetcher, product: str, seconds: int, start: int, end: int,
+                  max_requests: int, newest_first: bool = False):
+        """
+        Candles for [start, end), one request at a time
+
+        Yields one candles dict per request, or None once a request fails.
+        newest_first walks backwards from end, so a partial download stays
+        contiguous with candles stored after it.
+        """
+        step = CANDLES_PER_REQUEST * seconds
+        if newest_first:
+            bounds = [(max(hi - step, start), hi) for hi in range(end, start, -step)]
+        else:
+            bounds = [(lo, min(lo + step, end)) for lo in range(start, end, step)]
+        for index, (lo, hi) in enumerate(bounds[:max_requests]):
+            if index:
+                time.sleep(self.request_pause)
+            with self._lock:
+                self.stats['requests'] += 1
+            try:
+                rows = fetch(product, seconds, lo, hi)
+            except Exception as e:
+                print(f"OHLCV backfill error for {product}: {str(e)}")
+                rows = None
+            if rows is None:
+                with self._lock:
+                    self.stats['fetch_errors'] += 1
+                yield None
+                return
+            data = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+            data = data[(data[:, 0] >= lo) & (data[:, 0] < hi)]
+            yield {"time": data[:, 0].astype(np.int64), "low": data[:, 1], "high": data[:, 2],
+                   "open": data[:, 3], "close": data[:, 4], "volume": data[:, 5]}
+
+    def backfill(self, symbol: str, granularity, lookback: Optional[int] = None, now: Optional[float] = None,
+                 max_requests: int = 2000, fetcher: Optional[CandleFetcher] = None) -> int:
+        """
+        Download the candles of the last `lookback` seconds that are not stored yet
+
+        Candles newer than the last stored one are appended. If an explicit
+        lookback reaches further back than the first stored candle (the
+        default one only sizes a new partition), the older range is
+        downloaded too and prepended, once per depth: a range the exchange had
+        nothing for is not requested again. Only completed candles are stored.
+        Concurrent backfills of the same partition share one run. Returns
+        rows written.
+        """
+        product, seconds = self._product(symbol), granularity_seconds(granularity)
+        name = next((n for n, s in GRANULARITIES.items() if s == seconds), str(seconds))
+        deepen = lookback is not None
+        lookback = DEFAULT_LOOKBACK.get(name, 300 * seconds) if lookback is None else lookback
+
+        fetch = fetcher or self._default_fetcher()
+        key = f"{product}/{seconds}"
+
+        def run() -> int:
+            partition = self.partition(product, seconds)
+            current = int(now if now is not None else time.time())
+            complete_before = current - current % seconds
+            wanted = complete_before - lookback
+            written = 0
+
+            first = partition.first_time()
+            with self._lock:
+                floor = self._floors.get(key)
+            if deepen and first is not None and wanted < first and (floor is None or wanted < floor):
+                older, complete = [], True
+                for candles in self._download(fetch, product, seconds, wanted, first, max_requests,
+                                              newest_first=True):
+                    if candles is None:
+                        complete = False
+                        break
+                    older.append(candles)
+                if older:
+                    written += partition.prepend({column: np.concatenate([c[column] for c in older])
+                                                  for column in COLUMNS})
+                if complete:
+                    with self._lock:
+                        self._floors[key] = min(wanted, self._floors.get(key, wanted))
+
+            last = partition.last_time()
+            start = last + seconds if last is not None else wanted
+            for candles in self._download(fetch, product, seconds, start, complete_before, max_requests):
+                if candles is None:
+                    break
+                written += partition.append(candles)
+            with self._lock:
+                self.stats['backfills'] += 1
+                self.stats['rows_written'] += written
+            return written
+
+        return fetch_flight.do(f"ohlcv_backfill:{id(self)}:{product}:{seconds}", run)
+
+    def history(self, symbol: str, granularity="1d", periods: int = 30, now: Optional[float] = None,
+                fetcher: Optional[CandleFetcher] = None) -> Candles:
+        """
+        The last `periods` candles, backfilling first only if the stored range falls short
+
+        At most one small request per granularity period once a symbol has
+        been seen at this depth; a deeper request than before downloads the
+        older candles once. A backfill that leaves the range short (unknown
+        symbol, endpoint down) is not retried for BACKFILL_FAILURE_BACKOFF
+        seconds; callers get whatever is stored meanwhile.
+        """
+        seconds = granularity_seconds(granularity)
+        current = int(now if now is not None else time.time())
+        end = current - current % seconds
+        start = end - periods * seconds
+        partition = self.partition(symbol, seconds)
+        key = f"{self._product(symbol)}/{seconds}"
+        if self._short(partition, key, start, current, seconds):
+            with self._lock:
+                backing_off = time.time() - self._failed_at.get(key, 0.0) < BACKFILL_FAILURE_BACKOFF
+                if backing_off:
+                    self.stats['backfill_backoffs'] += 1
+            if not backing_off:
+                self.backfill(symbol, seconds, lookback=max(periods, 1) * seconds, now=current, fetcher=fetcher)
+                short = self._short(partition, key, start, current, seconds)
+                with self._lock:
+                    if short:
+                        self._failed_at[key] = time.time()
+                    else:
+                        self._failed_at.pop(key, None)
+        return self.range(symbol, seconds, start, end)
+
+    def _short(self, partition: Partition, key: str, start: int, current: int, seconds: int) -> bool:
+        """Whether the stored candles are missing recent periods or start after `start`"""
+        first, last = partition.first_time(), partition.last_time()
+        with self._lock:
+            floor = self._floors.get(key)
+        behind = last is None or last + 2 * seconds <= current
+        shallow = first is not None and start < first and (floor is None or start < floor)
+        return behind or shallow
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['partitions'] = {key: partition.rows for key, partition in self._partitions.items()}
+        return stats
+
+
+def candles_to_records(candles: Candles, product: str) -> List[Dict[str, Any]]:
+    """Daily-price records in the shape get_historical_prices returns"""
+    return [{'date': datetime.fromtimestamp(int(t), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+             'price': float(close), 'currency_pair': product}
+            for t, close in zip(candles["time"], candles["close"])]
+
+
+# Global instance
+ohlcv_store = OHLCVStore(os.environ.get("OHLCV_STORE_DIR", os.path.join(tempfile.gettempdir(), "ohlcv_store")))
@@ -2,10 +2,16 @@
 Optimized Smart Router - Improved routing logic with better maintainability
 """
 
-import re
-from router_config import ROUTING_RULES
+from router_config import ROUTING_RULES, contains_keywords, has_n_number
 from typing import Dict, Callable, Tuple, Optional, Any
 
+# Rules checked by the early returns in smart_route
+HIGH_PRIORITY_RULES = ("time", "aviation", "formula1")
+
+# Remaining rules sorted by priority (highest first) once at import
+SORTED_ROUTING_RULES = tuple(sorted((rule for rule in ROUTING_RULES if rule[0] not in HIGH_PRIORITY_RULES),
+                                    key=lambda rule: rule[4], reverse=True))
+
 def smart_route(prompt: str, datetime_context: str, assistants: Dict[str, Callable]) -> Tuple[Optional[Callable], Optional[str]]:
     """
     Smart routing based on priority and specificity with early returns for high-priority rules
@@ -27,8 +33,7 @@ def smart_route(prompt: str, datetime_context: str, assistants: Dict[str, Callab
         
         # Aviation queries (priority - 90)
         if has_n_number(prompt) or contains_keywords(prompt, "aviation") or \
-           any(re.search(rf'\b{word}\b', prompt.lower()) for word in ["flight status", "flight tracker", "aircraft", "airport"]) or \
-           re.search(r'\bpilot\b|\bairport\b|\bfaa\b', prompt.lower()) is not None:
+           contains_keywords(prompt, "aviation_context"):
             if "aviation" in assistants:
                 print(f"Router: '{prompt[:50]}...' -> aviation (Rule: aviation, Priority: 90)")
                 return assistants["aviation"], f"{datetime_context}{prompt}"
@@ -37,7 +42,7 @@ def smart_route(prompt: str, datetime_context: str, assistants: Dict[str, Callab
         if contains_keywords(prompt, "formula1"):
             if "formula1" in assistants:
                 print(f"Router: '{prompt[:50]}...' -> formula1 (Rule: formula1, Priority: 80)")
-                return assistants["formula1"], f"{datetime_context}IMPORTANT: You have access to live F1 data. Use the real-time race information provided above to make informed predictions and analysis.\n\n{prompt}"
+                return assistants["formula1"], f"{datetime_context}IMPORTANT: Base predictions and analysis on the live F1 data supplied with this query.\n\n{prompt}"
     except Exception as e:
         print(f"Error in high-priority routing: {str(e)}")
     
@@ -47,15 +52,8 @@ def smart_route(prompt: str, datetime_context: str, assistants: Dict[str, Callab
     matched_rule = None
     all_matches = []
     
-    # Sort rules by priority (highest first) for faster matching
-    sorted_rules = sorted(ROUTING_RULES, key=lambda rule: rule[4], reverse=True)
-    
     # Check each rule in order of priority
-    for name, condition_func, assistant_key, prompt_formatter, priority in sorted_rules:
-        # Skip already checked high-priority rules
-        if name in ["time", "aviation", "formula1"]:
-            continue
-            
+    for name, condition_func, assistant_key, prompt_formatter, priority in SORTED_ROUTING_RULES:
         try:
             if condition_func(prompt):
                 all_matches.append((name, priority))
@@ -0,0 +1,192 @@
+"""
+Quote Store - One in-memory crypto quote store with per-caller freshness
+
+Every price path (crypto data service, direct API, direct forecast, Coinbase
+batch quotes) reads and writes the same store, keyed by (symbol, quote
+currency). Each caller states how old a quote it will accept, so a forecast
+that needs a price under 5 seconds old and a context line that is happy with
+one under a minute share fetches instead of each going upstream. Every quote
+keeps its source and fetch time. A price-only write (a spot quote, a ticker
+tick) keeps the 24h change, market cap and volume of the quote it replaces.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from single_flight import fetch_flight
+
+# Freshness requirements callers pick from, in seconds
+MAX_AGE_LIVE = 5.0        # Forecasts and "price right now" answers
+MAX_AGE_STANDARD = 30.0   # Context lines and market summaries
+MAX_AGE_RELAXED = 60.0    # Background analysis
+
+DEFAULT_QUOTE = "USD"
+
+# Market details a newer price-only write inherits from the quote it replaces
+DETAIL_FIELDS = ('change_24h', 'market_cap', 'volume_24h')
+# Details older than this are dropped rather than carried forward
+DETAIL_MAX_AGE = 300.0
+
+
+@dataclass(frozen=True)
+class Quote:
+    """A price with its provenance"""
+    symbol: str
+    quote: str
+    price: float
+    source: str
+    fetched_at: float
+    change_24h: Optional[float] = None
+    payload: Dict[str, Any] = field(default_factory=dict, compare=False)
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.fetched_at
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The source's payload with the normalized price fields callers rely on"""
+        data = {**self.payload, 'symbol': self.symbol, 'price_usd': self.price, 'source': self.source}
+        if self.quote != DEFAULT_QUOTE:
+            data['quote_currency'] = self.quote
+        if self.change_24h is not None:
+            data['change_24h'] = self.change_24h
+        data.setdefault('timestamp', time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.fetched_at)))
+        return data
+
+
+class QuoteStore:
+    """
+    Thread-safe quote store with lock striping
+
+    Keys hash onto a fixed number of stripes, each with its own dict and
+    lock, so concurrent readers of different symbols do not contend.
+    """
+
+    def __init__(self, stripes: int = 16, default_max_age: float = MAX_AGE_STANDARD,
+                 clock: Callable[[], float] = time.time):
+        self.default_max_age = default_max_age
+        self._clock = clock
+        self._stripes: List[Tuple[Dict[Tuple[str, str], Quote], threading.Lock]] = [
+            ({}, threading.Lock()) for _ in range(stripes)
+        ]
+        self._stats_lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'upstream_calls': 0, 'upstream_failures': 0, 'writes': 0}
+        self.source_writes: Dict[str, int] = {}
+
+    @staticmethod
+    def _key(symbol: str, quote: str) -> Tuple[str, str]:
+        return symbol.upper(), quote.upper()
+
+    def _stripe(self, key: Tuple[str, str]) -> Tuple[Dict[Tuple[str, str], Quote], threading.Lock]:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def peek(self, symbol: str, quote: str = DEFAULT_QUOTE) -> Optional[Quote]:
+        """Latest quote regardless of age, without touching the stats"""
+        key = self._key(symbol, quote)
+        entries, lock = self._stripe(key)
+        with lock:
+            return entries.get(key)
+
+    def get(self, symbol: str, quote: str = DEFAULT_QUOTE, max_age: Optional[float] = None) -> Optional[Quote]:
+        """The stored quote if it is younger than max_age seconds"""
+        entry = self.peek(symbol, quote)
+        max_age = self.default_max_age if max_age is None else max_age
+        if entry is None:
+            self._count('misses')
+            return None
+        if entry.age(self._clock()) >= max_age:
+            self._count('stale')
+            return None
+        self._count('hits')
+        return entry
+
+    def put(self, symbol: str, price: float, source: str, quote: str = DEFAULT_QUOTE,
+            change_24h: Optional[float] = None, payload: Optional[Dict[str, Any]] = None,
+            fetched_at: Optional[float] = None) -> Quote:
+        """Record a fetched price; an older fetch never replaces a newer one"""
+        key = self._key(symbol, quote)
+        entry = Quote(key[0], key[1], float(price), source or "unknown",
+                      self._clock() if fetched_at is None else fetched_at, change_24h, dict(payload or {}))
+        entries, lock = self._stripe(key)
+        with lock:
+            current = entries.get(key)
+            if current is not None and current.fetched_at > entry.fetched_at:
+                return current
+            if current is not None and entry.fetched_at - current.fetched_at < DETAIL_MAX_AGE:
+                entry = self._with_details(entry, current)
+            entries[key] = entry
+        with self._stats_lock:
+            self.stats['writes'] += 1
+            self.source_writes[entry.source] = self.source_writes.get(entry.source, 0) + 1
+        return entry
+
+    @staticmethod
+    def _with_details(entry: Quote, previous: Quote) -> Quote:
+        """entry with the market details it lacks taken from previous"""
+        details = {name: previous.payload[name] for name in DETAIL_FIELDS
+                   if entry.payload.get(name) is None and previous.payload.get(name) is not None}
+        change_24h = previous.change_24h if entry.change_24h is None else entry.change_24h
+        if not details and change_24h == entry.change_24h:
+            return entry
+        return replace(entry, change_24h=change_24h, payload={**entry.payload, **details})
+
+    def put_payload(self, symbol: str, payload: Dict[str, Any], quote: str = DEFAULT_QUOTE) -> Optional[Quote]:
+        """Record a price-service result ({'price_usd', 'change_24h', 'source', ...})"""
+        price = payload.get('price_usd') if payload else None
+        if not price or price <= 0:
+            return None
+        return self.put(symbol, price, payload.get('source', 'unknown'), quote,
+                        payload.get('change_24h'), payload)
+
+    def get_or_fetch(self, symbol: str, fetch: Callable[[str], Optional[Dict[str, Any]]],
+                     max_age: Optional[float] = None, quote: str = DEFAULT_QUOTE) -> Optional[Quote]:
+        """
+        A quote no older than max_age, fetching through fetch(symbol) if needed
+
+        Concurrent misses for the same key share one upstream call.
+        """
+        entry = self.get(symbol, quote, max_age)
+        if entry is not None:
+            return entry
+
+        def load() -> Optional[Quote]:
+            self._count('upstream_calls')
+            stored = self.put_payload(symbol, fetch(symbol), quote)
+            if stored is None:
+                self._count('upstream_failures')
+            return stored
+
+        key = self._key(symbol, quote)
+        return fetch_flight.do(f"quote_store:{id(self)}:{key[0]}-{key[1]}", load)
+
+    def prices(self, quote: str = DEFAULT_QUOTE) -> Dict[str, float]:
+        """Latest price of every symbol, for data-version fingerprints"""
+        quote = quote.upper()
+        prices = {}
+        for entries, lock in self._stripes:
+            with lock:
+                prices.update({symbol: entry.price for (symbol, q), entry in entries.items() if q == quote})
+        return dict(sorted(prices.items()))
+
+    def clear(self) -> None:
+        for entries, lock in self._stripes:
+            with lock:
+                entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = {**self.stats, 'writes_by_source': dict(self.source_writes)}
+        lookups = stats['hits'] + stats['misses'] + stats['stale']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['entries'] = sum(len(entries) for entries, _ in self._stripes)
+        return stats
+
+
+# Global instance shared by every price path
+quote_store = QuoteStore(stripes=int(os.environ.get("QUOTE_STORE_STRIPES", "16")))
@@ -3,22 +3,49 @@ Centralized Real-Time Data Access Module for Continuum Assistant
 Provides unified access to live data sources for all assistants
 """
 
-import requests
+from http_client import http_client
 import json
+import os
 import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import urllib.parse
+from cache_freshness import data_versions, entity_source
+from market_snapshot_service import market_snapshots
+
+# Latency budget for all real-time sources of one query, in seconds
+REALTIME_DATA_BUDGET = float(os.environ.get("REALTIME_DATA_BUDGET", "2.5"))
+
+# Oldest last-known-good snapshot served in place of a late source, in seconds
+REALTIME_SNAPSHOT_MAX_AGE = float(os.environ.get("REALTIME_SNAPSHOT_MAX_AGE", "900"))
+
+# Most last-known-good snapshots kept; query-dependent sources add one per distinct query
+REALTIME_SNAPSHOT_MAX_ENTRIES = int(os.environ.get("REALTIME_SNAPSHOT_MAX_ENTRIES", "512"))
+
+# Sources whose results feed cache invalidation
+PUBLISHED_SOURCES = ("f1", "aviation")
+
+# Shared by all requests; sources that miss a deadline finish here in the background
+_source_pool = ThreadPoolExecutor(max_workers=int(os.environ.get("REALTIME_DATA_WORKERS", "8")),
+                                  thread_name_prefix="realtime-source")
 
 class RealTimeDataAccess:
     """Centralized real-time data access for all assistants"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.session = http_client  # Shared pooled session
         self.timeout = 10
+        # Keyed by (source, fetch args): crypto, web and aviation results depend on the query
+        self._last_good: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._stats_lock = threading.Lock()
+        self.source_stats = defaultdict(lambda: {
+            'calls': 0, 'ok': 0, 'empty': 0, 'errors': 0, 'late': 0, 'stale_served': 0,
+            'last_ms': 0.0, 'max_ms': 0.0, 'total_ms': 0.0
+        })
         
     def get_current_datetime(self) -> str:
         """Get current datetime formatted for context"""
@@ -35,63 +62,74 @@ class RealTimeDataAccess:
         
         return f"{context}Query: {query}"
     
-    def get_relevant_realtime_data(self, query: str, assistant_type: str) -> str:
-        """Get relevant real-time data based on query content and assistant type"""
-        data_parts = []
+    def get_relevant_realtime_data(self, query: str, assistant_type: str, budget: Optional[float] = None) -> str:
+        """
+        Get relevant real-time data based on query content and assistant type
+        
+        Network sources are fetched concurrently under one latency budget
+        (REALTIME_DATA_BUDGET seconds). A source that misses the deadline is
+        replaced with its last known-good snapshot, or dropped if there is none;
+        it keeps running in the background and refreshes the snapshot when it
+        finishes.
+        """
+        budget = REALTIME_DATA_BUDGET if budget is None else budget
         query_lower = query.lower()
         
         # Always provide basic date/time context for all assistants
         current_date = datetime.now().strftime("%Y-%m-%d")
         current_time = datetime.now().strftime("%H:%M:%S")
         
+        # Ordered output slots: plain text, or a network source fetched below
+        slots = []
+        
         # Financial/Crypto data
         if any(word in query_lower for word in ['price', 'crypto', 'bitcoin', 'ethereum', 'stock', 'market']) or assistant_type == "business_finance":
-            crypto_data = self.get_crypto_prices(query)
-            if crypto_data:
-                data_parts.append(f"CRYPTO PRICES: {crypto_data}")
+            snapshot_text = market_snapshots.crypto_context(query)
+            if snapshot_text:
+                slots.append(f"CRYPTO PRICES: {snapshot_text}")
             else:
-                # Provide fallback crypto data if API fails
-                data_parts.append("CRYPTO PRICES: BTC: $61,245.32 (+1.2%) | ETH: $3,024.18 (-0.5%) | SOL: $142.87 (+3.1%) | Data from CoinGecko")
+                # Fallback crypto data if the API fails
+                slots.append(("crypto", "CRYPTO PRICES", self.get_crypto_prices, (query,),
+                              "BTC: $61,245.32 (+1.2%) | ETH: $3,024.18 (-0.5%) | SOL: $142.87 (+3.1%) | Data from CoinGecko"))
         
         # F1/Sports data - always provide F1 context for racing queries
         if any(word in query_lower for word in ['f1', 'formula', 'race', 'grand prix', 'motorsport', 'next']) or assistant_type == "specialized_industries":
-            f1_data = self.get_f1_data()
-            if f1_data:
-                data_parts.append(f"F1 DATA: {f1_data}")
+            snapshot_text = market_snapshots.f1_context()
+            if snapshot_text:
+                slots.append(f"F1 DATA: {snapshot_text}")
             else:
-                # Provide fallback F1 data if API fails
+                # Fallback F1 data if the APIs fail
                 current_year = datetime.now().year
-                data_parts.append(f"F1 DATA: {current_year} Formula 1 Season in progress. Next race: Miami Grand Prix (May 5-7). Current leaders: Max Verstappen (Red Bull), Lando Norris (McLaren), Charles Leclerc (Ferrari). Data from Formula1.com")
+                slots.append(("f1", "F1 DATA", self.get_f1_data, (),
+                              f"{current_year} Formula 1 Season in progress. Next race: Miami Grand Prix (May 5-7). Current leaders: Max Verstappen (Red Bull), Lando Norris (McLaren), Charles Leclerc (Ferrari). Data from Formula1.com"))
                 
         # Tech/Security data for tech_security assistant
         if assistant_type == "tech_security":
-            data_parts.append(f"TECH UPDATES: Latest security advisories and patches as of {current_date}. Check CISA.gov for critical vulnerabilities.")
+            slots.append(f"TECH UPDATES: Latest security advisories and patches as of {current_date}. Check CISA.gov for critical vulnerabilities.")
             
         # Research data for research_knowledge assistant
         if assistant_type == "research_knowledge":
-            data_parts.append(f"RESEARCH DATA: Latest academic publications and web data as of {current_date}. Current search indexes updated.")
+            slots.append(f"RESEARCH DATA: Latest academic publications and web data as of {current_date}. Current search indexes updated.")
             
         # Universal assistant gets comprehensive data
         if assistant_type == "universal":
-            data_parts.append(f"COMPREHENSIVE DATA: Real-time market, news, and trend data available as of {current_date} {current_time}.")
+            slots.append(f"COMPREHENSIVE DATA: Real-time market, news, and trend data available as of {current_date} {current_time}.")
         
         # Weather data for location-based queries
         if any(word in query_lower for word in ['weather', 'temperature', 'forecast']):
             weather_data = self.get_weather_data(query)
             if weather_data:
-                data_parts.append(f"WEATHER: {weather_data}")
+                slots.append(f"WEATHER: {weather_data}")
         
         # News/Current events
         if any(word in query_lower for word in ['news', 'current', 'latest', 'today', 'recent']):
             news_data = self.get_current_news(query)
             if news_data:
-                data_parts.append(f"CURRENT NEWS: {news_data}")
+                slots.append(f"CURRENT NEWS: {news_data}")
         
         # Web/Company data
         if any(domain in query_lower for domain in ['.com', '.org', '.net', 'website', 'company']):
-            web_data = self.get_web_data(query)
-            if web_data:
-                data_parts.append(f"WEB DATA: {web_data}")
+            slots.append(("web", "WEB DATA", self.get_web_data, (query,), None))
         
         # Aviation data - detect N-numbers for flight position
         flight_id = None
@@ -101,23 +139,134 @@ class RealTimeDataAccess:
                 break
         
         if flight_id or any(word in query_lower for word in ['flight', 'airport', 'aviation', 'aircraft']):
-            try:
-                from aviation_data_access import aviation_data
-                if flight_id:
-                    aviation_info = aviation_data.get_flight_position(flight_id)
-                else:
-                    aviation_info = "FlightAware.com | FlightRadar24.com | ADS-B Exchange"
-                data_parts.append(f"AVIATION: {aviation_info}")
-            except:
-                data_parts.append("AVIATION: Check flight tracking services")
+            slots.append(("aviation", "AVIATION", self.get_aviation_data, (flight_id,), "Check flight tracking services"))
         
         # AWS/Tech updates
         if assistant_type == "aws" or any(word in query_lower for word in ['aws', 'amazon web services', 'cloud']):
             aws_data = self.get_aws_updates()
             if aws_data:
-                data_parts.append(f"AWS UPDATES: {aws_data}")
+                slots.append(f"AWS UPDATES: {aws_data}")
         
-        return "\n\n".join(data_parts)
+        return "\n\n".join(self._fan_out(slots, budget))
+    
+    def _fan_out(self, slots: List[Any], budget: float) -> List[str]:
+        """Fetch every network source concurrently and fill the slots in order"""
+        futures = {}
+        for slot in slots:
+            if isinstance(slot, tuple):
+                source, _, fetch, args, _ = slot
+                futures[source] = _source_pool.submit(self._timed_fetch, source, fetch, *args)
+        
+        if futures:
+            wait(futures.values(), timeout=budget)
+        
+        data_parts = []
+        timings = []
+        for slot in slots:
+            if not isinstance(slot, tuple):
+                data_parts.append(slot)
+                continue
+            
+            source, label, _, args, fallback = slot
+            future = futures[source]
+            result = None
+            if future.done():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Real-time source {source} failed: {str(e)}")
+                timings.append(f"{source}={self.source_stats[source]['last_ms']:.0f}ms")
+            else:
+                self._count(source, "late")
+                timings.append(f"{source}=late")
+            
+            if result:
+                if source in PUBLISHED_SOURCES:
+                    data_versions.publish(self._version_source(source, args), result)
+                data_parts.append(f"{label}: {result}")
+                continue
+            
+            # Missed the deadline or failed: serve the last known-good snapshot
+            snapshot = self._snapshot(source, args)
+            if snapshot:
+                text, snapshot_result = snapshot
+                if source in PUBLISHED_SOURCES:
+                    # Tag answers with the delayed data they see, without rolling the source back
+                    data_versions.record(self._version_source(source, args), snapshot_result)
+                self._count(source, "stale_served")
+                data_parts.append(f"{label} (delayed): {text}")
+            elif future.done() and fallback:
+                data_parts.append(f"{label}: {fallback}")
+        
+        if timings:
+            print(f"Real-time sources: {', '.join(timings)} (budget {budget * 1000:.0f}ms)")
+        return data_parts
+    
+    def _timed_fetch(self, source: str, fetch, *args) -> Optional[str]:
+        """Run one source, record how long it took and keep successful results as the snapshot"""
+        start = time.perf_counter()
+        outcome = "errors"
+        try:
+            result = fetch(*args)
+            outcome = "ok" if result else "empty"
+            if result:
+                self._keep_snapshot((source, args), result)
+            return result
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._stats_lock:
+                stats = self.source_stats[source]
+                stats['calls'] += 1
+                stats[outcome] += 1
+                stats['last_ms'] = elapsed_ms
+                stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+                stats['total_ms'] += elapsed_ms
+    
+    def _keep_snapshot(self, key: tuple, result: str) -> None:
+        """Store a last-known-good result, dropping expired and least recently written ones"""
+        now = time.time()
+        with self._stats_lock:
+            self._last_good.pop(key, None)
+            self._last_good[key] = (now, result)
+            # Oldest first: expired entries sit at the front
+            while self._last_good:
+                oldest_key, (fetched_at, _) = next(iter(self._last_good.items()))
+                if now - fetched_at <= REALTIME_SNAPSHOT_MAX_AGE and len(self._last_good) <= REALTIME_SNAPSHOT_MAX_ENTRIES:
+                    break
+                del self._last_good[oldest_key]
+    
+    @staticmethod
+    def _version_source(source: str, args: tuple) -> str:
+        """Versioned per flight for aviation; f1 is one dataset"""
+        return entity_source(source, args[0] if source == "aviation" and args else None)
+    
+    def _count(self, source: str, counter: str) -> None:
+        with self._stats_lock:
+            self.source_stats[source][counter] += 1
+    
+    def _snapshot(self, source: str, args: tuple) -> Optional[Tuple[str, str]]:
+        """Last successful result of a source for the same arguments, stamped with its age, and the raw result"""
+        with self._stats_lock:
+            entry = self._last_good.get((source, args))
+        if not entry or time.time() - entry[0] > REALTIME_SNAPSHOT_MAX_AGE:
+            return None
+        fetched_at, result = entry
+        return f"{result} (as of {datetime.fromtimestamp(fetched_at).strftime('%H:%M:%S')})", result
+    
+    def get_source_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-source call counts, outcomes and timings"""
+        with self._stats_lock:
+            return {
+                source: {**stats, 'avg_ms': round(stats['total_ms'] / stats['calls'], 1) if stats['calls'] else 0.0}
+                for source, stats in self.source_stats.items()
+            }
+    
+    def get_aviation_data(self, flight_id: Optional[str]) -> Optional[str]:
+        """Flight position for an N-number, or tracking services for general aviation queries"""
+        if not flight_id:
+            return "FlightAware.com | FlightRadar24.com | ADS-B Exchange"
+        from aviation_data_access import aviation_data
+        return aviation_data.get_flight_position(flight_id)
     
     def get_crypto_prices(self, query: str) -> Optional[str]:
         """Get cryptocurrency prices from enhanced crypto data service"""
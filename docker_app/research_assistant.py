@@ -1,6 +1,6 @@
 from strands import Agent, tool
 from realtime_data_access import enhance_query_with_realtime
-import requests
+from http_client import http_client
 import urllib.parse
 import json
 import re
@@ -144,7 +144,7 @@ def search_wikipedia(query):
     """Search Wikipedia for information"""
     try:
         search_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{urllib.parse.quote(query)}"
-        response = requests.get(search_url, timeout=10)
+        response = http_client.get(search_url, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -161,7 +161,7 @@ def direct_web_access(query):
     if 'infascination' in query.lower():
         try:
             headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-            response = requests.get('https://infascination.com', headers=headers, timeout=10)
+            response = http_client.get('https://infascination.com', headers=headers, timeout=10)
             
             if response.status_code == 200:
                 return f"Website Access: https://infascination.com\nStatus: Accessible\nNote: Charter numbers typically not displayed on company websites - check official business registrations."
@@ -2,20 +2,181 @@ import time
 import hashlib
 import json
 import os
+import threading
+from collections import OrderedDict
+from decimal import Decimal
 import boto3
+from boto3.dynamodb.types import Binary
+from cache_freshness import data_versions as version_registry
+from cache_compression import PayloadCodec, load_zdict
+
+def normalize_query(query):
+    """Case- and whitespace-insensitive form of a query used for cache keys"""
+    return " ".join(query.lower().split())
+
+def query_fingerprint(query):
+    """Stable hash of the normalized query, so repeats can be counted without keeping the text"""
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()[:32]
+
+class LocalCacheTier:
+    """Bounded in-process LRU cache with per-entry TTL and an approximate byte budget"""
+
+    # Rough per-entry cost of the key, OrderedDict node and entry tuple
+    ENTRY_OVERHEAD = 200
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._lock = threading.Lock()
+        self.bytes_held = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def estimate_size(cls, key, value):
+        """Approximate memory held by an entry"""
+        if isinstance(value, (bytes, bytearray)):
+            value_size = len(value)
+        elif isinstance(value, str):
+            value_size = len(value.encode('utf-8'))
+        else:
+            value_size = len(json.dumps(value, default=str))
+        return len(key) + value_size + cls.ENTRY_OVERHEAD
+
+    def get(self, key, now=None):
+        """Get a live value and mark it most recently used"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, size = entry
+            if expires_at <= now:
+                self._remove(key, size)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl, now=None, size=None):
+        """Store a value for ttl seconds, evicting least recently used entries over budget"""
+        now = now if now is not None else time.time()
+        size = size if size is not None else self.estimate_size(key, value)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, self._entries[key][2])
+
+            # Entries larger than the whole budget are never held
+            if size > self.max_bytes:
+                return False
+
+            self._entries[key] = (value, now + ttl, size)
+            self.bytes_held += size
+
+            # Drop an expired entry from the cold end first (amortized O(1))
+            oldest_key = next(iter(self._entries))
+            oldest_value, oldest_expiry, oldest_size = self._entries[oldest_key]
+            if oldest_expiry <= now and oldest_key != key:
+                self._remove(oldest_key, oldest_size)
+                self.expirations += 1
+
+            while len(self._entries) > self.max_entries or self.bytes_held > self.max_bytes:
+                evicted_key, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.bytes_held -= evicted_size
+                self.evictions += 1
+            return True
+
+    def delete(self, key):
+        """Remove a key if present"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, self._entries[key][2])
+
+    def _remove(self, key, size):
+        del self._entries[key]
+        self.bytes_held -= size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get_stats(self):
+        """Get size, eviction and hit ratio statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes_held': self.bytes_held,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
 
 class ResponseCache:
-    def __init__(self, ttl=300):  # 5 minutes TTL by default
-        self.local_cache = {}
-        self.timestamps = {}
+    # DynamoDB request limits
+    BATCH_WRITE_LIMIT = 25
+    BATCH_GET_LIMIT = 100
+
+    def __init__(self, ttl=300, dynamodb=None):  # 5 minutes TTL by default
+        self.local_cache = LocalCacheTier(
+            max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "1000")),
+            max_bytes=int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        )
         self.ttl = ttl
+        
+        # Payloads are compressed on both tiers; oversized entries are not cached at all
+        self.codec = PayloadCodec(
+            zdict=load_zdict(),
+            min_size=int(os.environ.get("RESPONSE_CACHE_COMPRESS_MIN_BYTES", "512"))
+        )
+        self.max_item_bytes = int(os.environ.get("RESPONSE_CACHE_MAX_ITEM_BYTES", str(300 * 1024)))
+        
+        # Keys DynamoDB recently had nothing for, so repeated misses skip the round trip
+        self.negative_ttl = float(os.environ.get("RESPONSE_CACHE_NEGATIVE_TTL", "5"))
+        self.remote_misses = LocalCacheTier(
+            max_entries=int(os.environ.get("RESPONSE_CACHE_NEGATIVE_MAX_ENTRIES", "10000")),
+            max_bytes=4 * 1024 * 1024
+        )
+        self.oversized_skipped = 0
         self.region = os.environ.get("AWS_REGION", "us-west-2")
         self.table_name = os.environ.get("RESPONSE_CACHE_TABLE", "response-cache")
+        self.flush_interval = float(os.environ.get("RESPONSE_CACHE_FLUSH_INTERVAL", "1.0"))
+        self.max_pending = int(os.environ.get("RESPONSE_CACHE_MAX_PENDING", "1000"))
+        endpoint_url = os.environ.get("DYNAMODB_ENDPOINT_URL")
+        
+        # Write-behind queue drained by a background worker
+        self._pending = OrderedDict()  # key -> DynamoDB item
+        self._in_flight = {}  # key -> item taken off the queue but not yet written
+        self._pending_lock = threading.Lock()
+        self._flush_event = threading.Event()
+        self._write_lock = threading.Lock()
+        self._worker = None
+        self.write_stats = {'queued': 0, 'written': 0, 'batches': 0, 'dropped': 0, 'errors': 0}
+        self.invalidations = 0
         
-        # Initialize DynamoDB client if in production
-        if not os.environ.get("LOCAL_DEV"):
+        # Initialize DynamoDB client if in production or pointed at a local stand-in
+        if dynamodb is not None:
+            self.dynamodb = dynamodb
+            self.table = self.dynamodb.Table(self.table_name)
+            self.enabled = True
+        elif not os.environ.get("LOCAL_DEV") or endpoint_url:
             try:
-                self.dynamodb = boto3.resource('dynamodb', region_name=self.region)
+                self.dynamodb = boto3.resource('dynamodb', region_name=self.region, endpoint_url=endpoint_url)
                 self.table = self.dynamodb.Table(self.table_name)
                 self.enabled = True
             except Exception as e:
@@ -24,12 +185,16 @@ class ResponseCache:
         else:
             self.enabled = False
     
-    def get_cache_key(self, query, model=None, user_id=None):
+    def get_cache_key(self, query, model=None, user_id=None, namespace=None):
         """Generate a cache key from query and optional parameters"""
         # Normalize inputs
-        query = query.strip().lower()
+        query = normalize_query(query)
         components = [query]
         
+        # Entries written outside a user session (e.g. pre-warmed answers) never share keys with users
+        if namespace:
+            components.insert(0, f"{namespace}#")
+        
         if model:
             components.append(str(model))
         
@@ -44,68 +209,266 @@ class ResponseCache:
         """Get response from cache"""
         # Check local cache first
         current_time = time.time()
-        if key in self.local_cache and current_time - self.timestamps.get(key, 0) < self.ttl:
-            print(f"Cache hit (local): {key[:8]}...")
-            return self.local_cache[key]
+        entry = self.local_cache.get(key, current_time)
+        if entry is not None:
+            payload, versions = entry
+            if not version_registry.is_current(versions):
+                self._invalidate(key)
+                return None
+            response = self.codec.decode(payload)
+            if response is not None:
+                print(f"Cache hit (local): {key[:8]}...")
+                return response
+            # Undecodable local copy (e.g. another dictionary); DynamoDB may still hold a good one
+            self.local_cache.delete(key)
         
         # If not in local cache, try DynamoDB
         if self.enabled:
+            item = self._queued(key)
+            if item is None and self.remote_misses.get(key, current_time) is not None:
+                return None
             try:
-                response = self.table.get_item(Key={'cache_key': key})
-                if 'Item' in response:
-                    item = response['Item']
-                    timestamp = item.get('timestamp', 0)
-                    
-                    # Check if item is still valid
-                    if current_time - timestamp < self.ttl:
-                        # Update local cache
-                        self.local_cache[key] = item['response']
-                        self.timestamps[key] = timestamp
+                if item is None:
+                    response = self.table.get_item(Key={'cache_key': key})
+                    item = response.get('Item')
+                if item is not None:
+                    response = self._accept_item(item, current_time)
+                    if response is not None:
                         print(f"Cache hit (DynamoDB): {key[:8]}...")
-                        return item['response']
+                        return response
             except Exception as e:
                 print(f"Error retrieving from cache: {str(e)}")
+            # Misses and errors alike: the next lookups stay local for a few seconds
+            self.remote_misses.set(key, True, self.negative_ttl, current_time)
         
         return None
     
-    def set(self, key, response):
-        """Store response in cache"""
+    def get_many(self, keys):
+        """Get several responses at once, using BatchGetItem for local misses"""
         current_time = time.time()
+        results = {}
+        missing = []
         
-        # Update local cache
-        self.local_cache[key] = response
-        self.timestamps[key] = current_time
+        for key in dict.fromkeys(keys):
+            entry = self.local_cache.get(key, current_time)
+            response = None
+            if entry is not None and version_registry.is_current(entry[1]):
+                response = self.codec.decode(entry[0])
+            if response is not None:
+                results[key] = response
+            else:
+                missing.append(key)
         
-        # Update DynamoDB if enabled
-        if self.enabled:
+        if not self.enabled or not missing:
+            return results
+        
+        # Unflushed writes are served straight from the queue
+        pending = {key: item for key, item in ((key, self._queued(key)) for key in missing) if item is not None}
+        for key, item in pending.items():
+            response = self._accept_item(item, current_time)
+            if response is not None:
+                results[key] = response
+        missing = [key for key in missing if key not in pending]
+        
+        for start in range(0, len(missing), self.BATCH_GET_LIMIT):
+            request_keys = [{'cache_key': key} for key in missing[start:start + self.BATCH_GET_LIMIT]]
             try:
-                self.table.put_item(
-                    Item={
-                        'cache_key': key,
-                        'response': response,
-                        'timestamp': current_time,
-                        'ttl': int(current_time + self.ttl * 2)  # TTL for DynamoDB auto-deletion
-                    }
-                )
+                for item in self._batch_get(request_keys):
+                    response = self._accept_item(item, current_time)
+                    if response is not None:
+                        results[item['cache_key']] = response
             except Exception as e:
-                print(f"Error storing in cache: {str(e)}")
+                print(f"Error batch retrieving from cache: {str(e)}")
         
-        # Clean up local cache periodically
-        if len(self.local_cache) > 1000:
-            self._cleanup_local_cache()
+        return results
+    
+    def warmup(self, keys, background=True):
+        """Pull keys from DynamoDB into the local tier, off the request thread by default"""
+        if not background:
+            return len(self.get_many(keys))
+        thread = threading.Thread(target=self.get_many, args=(list(keys),), daemon=True)
+        thread.start()
+        return thread
     
-    def _cleanup_local_cache(self):
-        """Remove expired items from local cache"""
+    def set(self, key, response, ttl=None, data_versions=None):
+        """
+        Store response in cache
+        
+        Args:
+            key: Cache key
+            response: Response text
+            ttl: Lifetime in seconds (defaults to the cache TTL; 0 skips caching)
+            data_versions: Versions of the real-time data the response was built on
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
         current_time = time.time()
-        expired_keys = [k for k, v in self.timestamps.items() if current_time - v > self.ttl]
+        versions = dict(data_versions or {})
         
-        for key in expired_keys:
-            if key in self.local_cache:
-                del self.local_cache[key]
-            if key in self.timestamps:
-                del self.timestamps[key]
+        payload = self.codec.encode(response)
+        if len(payload) > self.max_item_bytes:
+            # Keeps DynamoDB items well under the 400 KB limit
+            self.oversized_skipped += 1
+            print(f"Cache skip (oversized, {len(payload)} bytes): {key[:8]}...")
+            return
         
-        print(f"Cache cleanup: removed {len(expired_keys)} expired entries, {len(self.local_cache)} remaining")
+        # Update local cache
+        self.local_cache.set(key, (payload, versions), ttl, current_time,
+                             size=LocalCacheTier.estimate_size(key, payload))
+        self.remote_misses.delete(key)
+        
+        # Queue the DynamoDB write for the background worker
+        if self.enabled:
+            self._enqueue({
+                'cache_key': key,
+                'payload': Binary(payload),
+                'timestamp': Decimal(str(round(current_time, 3))),
+                'ttl_seconds': int(ttl),
+                'data_versions': versions,
+                'version_owner': version_registry.owner,
+                'ttl': int(current_time + ttl * 2)  # TTL for DynamoDB auto-deletion
+            })
+    
+    def invalidate(self, key):
+        """Drop a key from the local tier and any pending write"""
+        self.local_cache.delete(key)
+        with self._pending_lock:
+            self._pending.pop(key, None)
+            self._in_flight.pop(key, None)
+    
+    def flush(self):
+        """Write all queued items to DynamoDB now"""
+        # Serialized with the worker so in-flight batches finish before this returns
+        with self._write_lock:
+            while self._write_batch():
+                pass
+    
+    def _accept_item(self, item, current_time):
+        """Return an item's response if still valid and promote it to the local tier"""
+        ttl = float(item.get('ttl_seconds', self.ttl))
+        age = current_time - float(item.get('timestamp', 0))
+        if age >= ttl:
+            return None
+        
+        versions = {source: str(version) for source, version in item.get('data_versions', {}).items()}
+        if item.get('version_owner') != version_registry.owner:
+            # Another process's fingerprints; its entry expires by TTL instead
+            versions = {}
+        if not version_registry.is_current(versions):
+            self._invalidate(item['cache_key'])
+            return None
+        
+        # Items written before compression hold plain text
+        if 'payload' in item:
+            payload = bytes(getattr(item['payload'], 'value', item['payload']))
+        else:
+            payload = self.codec.encode(item['response'])
+        response = self.codec.decode(payload)
+        if response is None:
+            return None
+        
+        # Update local cache for the remaining lifetime only
+        self.local_cache.set(item['cache_key'], (payload, versions), ttl - age, current_time,
+                             size=LocalCacheTier.estimate_size(item['cache_key'], payload))
+        return response
+    
+    def _invalidate(self, key):
+        """Drop an entry built on superseded real-time data"""
+        self.invalidate(key)
+        self.invalidations += 1
+        print(f"Cache invalidated (data version): {key[:8]}...")
+    
+    def _batch_get(self, request_keys, max_attempts=3):
+        """BatchGetItem with retries for unprocessed keys"""
+        items = []
+        request = {self.table_name: {'Keys': request_keys}}
+        for attempt in range(max_attempts):
+            response = self.dynamodb.batch_get_item(RequestItems=request)
+            items.extend(response.get('Responses', {}).get(self.table_name, []))
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                break
+            time.sleep(0.05 * (2 ** attempt))
+        return items
+    
+    def _queued(self, key):
+        """A write for key that DynamoDB may not have yet: queued or in a batch being written"""
+        with self._pending_lock:
+            return self._pending.get(key) or self._in_flight.get(key)
+    
+    def _enqueue(self, item):
+        with self._pending_lock:
+            self._pending.pop(item['cache_key'], None)
+            self._pending[item['cache_key']] = item
+            self.write_stats['queued'] += 1
+            
+            # Bound memory if DynamoDB is slow or unavailable
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+                self.write_stats['dropped'] += 1
+            
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._write_behind_worker, daemon=True)
+                self._worker.start()
+            
+            if len(self._pending) >= self.BATCH_WRITE_LIMIT:
+                self._flush_event.set()
+    
+    def _write_behind_worker(self):
+        """Flush queued writes every flush_interval, or as soon as a full batch is ready"""
+        while True:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+    
+    def _write_batch(self, max_attempts=3):
+        """Write up to one BatchWriteItem worth of queued items; returns False when the queue is empty"""
+        with self._pending_lock:
+            if not self._pending:
+                return False
+            batch = []
+            while self._pending and len(batch) < self.BATCH_WRITE_LIMIT:
+                batch.append(self._pending.popitem(last=False)[1])
+            # Readers keep seeing these until the write returns
+            for item in batch:
+                self._in_flight[item['cache_key']] = item
+        
+        request = {self.table_name: [{'PutRequest': {'Item': item}} for item in batch]}
+        try:
+            for attempt in range(max_attempts):
+                response = self.dynamodb.batch_write_item(RequestItems=request)
+                request = response.get('UnprocessedItems') or {}
+                if not request:
+                    break
+                time.sleep(0.05 * (2 ** attempt))
+            
+            unprocessed = len(request.get(self.table_name, []))
+            self.write_stats['batches'] += 1
+            self.write_stats['written'] += len(batch) - unprocessed
+            self.write_stats['dropped'] += unprocessed
+        except Exception as e:
+            self.write_stats['errors'] += 1
+            self.write_stats['dropped'] += len(batch)
+            print(f"Error storing in cache: {str(e)}")
+        finally:
+            with self._pending_lock:
+                for item in batch:
+                    if self._in_flight.get(item['cache_key']) is item:
+                        del self._in_flight[item['cache_key']]
+        return True
+    
+    def get_stats(self):
+        """Get local tier, write-behind and compression statistics"""
+        with self._pending_lock:
+            write_stats = dict(self.write_stats, pending=len(self._pending), in_flight=len(self._in_flight))
+        return {
+            'local': self.local_cache.get_stats(),
+            'write_behind': write_stats,
+            'compression': dict(self.codec.get_stats(), oversized_skipped=self.oversized_skipped),
+            'remote_misses': self.remote_misses.get_stats(),
+            'invalidations': self.invalidations
+        }
 
 # Global instance
-response_cache = ResponseCache()
\ No newline at end of file
+response_cache = ResponseCache()
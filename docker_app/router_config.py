@@ -3,6 +3,7 @@ Router Configuration - Centralized routing rules
 """
 
 import re
+from keyword_classifier import KeywordClassifier
 
 # Domain-specific keywords for routing
 DOMAINS = {
@@ -17,7 +18,34 @@ DOMAINS = {
     "english": ["grammar", "write", "essay", "paragraph", "sentence", "word", "language", "literature", "text"],
     "aws": ["aws", "amazon web services", "ec2", "s3", "lambda", "cloud", "serverless", "iam", "vpc"],
     "legal": ["law", "legal", "attorney", "lawyer", "court", "judge", "case", "statute", "regulation"],
-    "prediction": ["predict", "forecast", "will", "future", "next", "expect", "anticipate", "projection", "trend"]
+    "prediction": ["predict", "forecast", "will", "future", "next", "expect", "anticipate", "projection", "trend"],
+    # Broader domains used by the unified router
+    "finance": ["finance", "money", "invest", "stock", "market", "fund", "portfolio", "asset",
+                "wealth", "crypto", "bitcoin", "ethereum", "economy", "economic"],
+    "tech": ["code", "programming", "software", "technology", "cyber", "security", "hack",
+             "encryption", "aws", "cloud", "ai", "artificial intelligence", "machine learning"]
+}
+
+# Supplementary term lists used by individual routing rules
+ROUTE_TERMS = {
+    "aviation_context": ["flight", "flight status", "flight tracker", "aircraft", "airport", "pilot", "faa",
+                         "747", "737", "777", "787", "a320", "a380", "busiest airports", "pilots navigate"],
+    "realtime": ["current", "today", "now", "latest", "real-time"],
+    "formula1_terms": ["f1", "grand prix", "formula one", "racing", "driver", "team", "lap", "circuit"],
+    "crypto_forecast": ["crypto forecast", "bitcoin prediction", "ethereum prediction", "price prediction",
+                        "crypto price", "btc forecast", "eth forecast", "crypto analysis"],
+    "crypto_terms": ["crypto", "cryptocurrency", "cryptocurrencies", "bitcoin", "ethereum", "btc", "eth",
+                     "blockchain", "token", "coin", "wallet"]
+}
+
+# Query types reported in telemetry, in priority order
+QUERY_TYPES = {
+    "crypto": ["crypto", "bitcoin", "ethereum", "token", "blockchain", "coin", "cryptocurrency"],
+    "finance": ["finance", "stock", "market", "investment", "portfolio"],
+    "aviation": ["flight", "aircraft", "airport", "aviation", "plane"],
+    "formula1": ["f1", "formula 1", "racing", "grand prix", "driver"],
+    "tech": ["code", "programming", "software", "algorithm", "api"],
+    "prediction": ["predict", "prediction", "forecast", "forecasting", "future", "will", "expect"]
 }
 
 # N-number pattern for aviation
@@ -30,53 +58,22 @@ def is_n_number(word):
     # Must be at least 4 characters (N + at least 3 digits/letters)
     return bool(re.match(r'^N[0-9][0-9A-Z]{2,}$', word))
 
-# Precompiled regex patterns for keyword matching
-_DOMAIN_PATTERNS = {}
-
-def _initialize_patterns():
-    """Initialize precompiled regex patterns for all domains"""
-    global _DOMAIN_PATTERNS
-    if not _DOMAIN_PATTERNS:
-        for domain_name, keywords in DOMAINS.items():
-            _DOMAIN_PATTERNS[domain_name] = {
-                'single_words': set(),
-                'multi_words': []
-            }
-            
-            for keyword in keywords:
-                if ' ' not in keyword:
-                    _DOMAIN_PATTERNS[domain_name]['single_words'].add(keyword)
-                else:
-                    # Precompile regex for multi-word phrases
-                    pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-                    _DOMAIN_PATTERNS[domain_name]['multi_words'].append(pattern)
-
-# Initialize patterns on module load
-_initialize_patterns()
+# All keyword tables compiled into one classifier, shared by every router
+_classifier = KeywordClassifier({**DOMAINS, **ROUTE_TERMS})
+_query_type_classifier = KeywordClassifier(QUERY_TYPES)
 
 # Domain detection functions
 def contains_keywords(text, domain):
-    """Check if text contains any keywords for the specified domain (optimized)"""
-    text_lower = text.lower()
-    
-    # Get patterns for the domain
-    patterns = _DOMAIN_PATTERNS.get(domain)
-    if not patterns:
-        return False
-    
-    # Extract words only once
-    words = set(re.findall(r'\b\w+\b', text_lower))
-    
-    # Check single-word matches (fast set operation)
-    if any(word in patterns['single_words'] for word in words):
-        return True
-    
-    # Check multi-word patterns
-    for pattern in patterns['multi_words']:
-        if pattern.search(text_lower):
-            return True
-    
-    return False
+    """Check if text contains any keywords for the specified domain (classified once per text)"""
+    return _classifier.matches(text, domain)
+
+def classify(text):
+    """All domains and route term lists matched by the text, with match spans"""
+    return _classifier.classify(text)
+
+def detect_query_type(text):
+    """Detect the telemetry query type of a text"""
+    return _query_type_classifier.first_match(text, QUERY_TYPES, "general")
 
 def contains_word_in_list(text, word_list):
     """Check if text contains any word from the list as whole words"""
@@ -126,14 +123,8 @@ ROUTING_RULES = [
     ("aviation", 
      lambda text: has_n_number(text) or \
                  contains_keywords(text, "aviation") or \
-                 any(re.search(rf'\b{word}\b', text.lower()) for word in ["flight status", "flight tracker", "aircraft", "airport"]) or \
-                 re.search(r'\bpilot\b', text.lower()) is not None or \
-                 re.search(r'\bairport\b', text.lower()) is not None or \
-                 re.search(r'\bfaa\b', text.lower()) is not None or \
-                 (re.search(r'\bjfk\b', text.lower()) is not None and re.search(r'\blax\b', text.lower()) is not None) or \
-                 re.search(r'\b747\b|\b737\b|\b777\b|\b787\b|\ba320\b|\ba380\b', text.lower()) is not None or \
-                 ("busiest airports" in text.lower()) or \
-                 ("pilots navigate" in text.lower()), 
+                 contains_keywords(text, "aviation_context") or \
+                 (re.search(r'\bjfk\b', text.lower()) is not None and re.search(r'\blax\b', text.lower()) is not None), 
      "aviation", 
      lambda text, datetime: f"{datetime}{text}", 
      90),
@@ -142,7 +133,7 @@ ROUTING_RULES = [
     ("formula1", 
      lambda text: contains_keywords(text, "formula1"), 
      "formula1", 
-     lambda text, datetime: f"{datetime}IMPORTANT: You have access to live F1 data. Use the real-time race information provided above to make informed predictions and analysis.\n\n{text}", 
+     lambda text, datetime: f"{datetime}IMPORTANT: Base predictions and analysis on the live F1 data supplied with this query.\n\n{text}", 
      80),
     
     # Prediction queries (universal assistant)
@@ -156,7 +147,7 @@ ROUTING_RULES = [
     ("crypto", 
      lambda text: contains_keywords(text, "crypto"), 
      "financial", 
-     lambda text, datetime: f"{datetime}IMPORTANT: You have access to live crypto price data. Use the real-time market information provided above for accurate analysis.\n\nFocus on cryptocurrency analysis and forecasting.\n\n{text}", 
+     lambda text, datetime: f"{datetime}IMPORTANT: Look up current prices with your crypto_quote and crypto_indicators tools; never quote prices from memory.\n\nFocus on cryptocurrency analysis and forecasting.\n\n{text}", 
      75),
     
     # Financial queries
@@ -210,7 +201,7 @@ ROUTING_RULES = [
     
     # Real-time queries
     ("realtime", 
-     lambda text: any(re.search(rf'\b{word}\b', text.lower()) for word in ["current", "today", "now", "latest", "real-time"]), 
+     lambda text: contains_keywords(text, "realtime"), 
      "research", 
      lambda text, datetime: f"{datetime}{text}", 
      30),
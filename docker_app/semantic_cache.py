@@ -0,0 +1,208 @@
+"""
+Semantic Cache - Near-duplicate prompt lookup in front of the response cache
+"""
+
+import os
+import re
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Words that carry no routing or answer signal
+STOPWORDS = {
+    "a", "an", "the", "of", "to", "for", "in", "on", "at", "by", "with", "and", "or",
+    "is", "are", "was", "were", "be", "been", "am", "do", "does", "did", "can", "could",
+    "would", "should", "please", "me", "my", "i", "you", "your", "what", "whats",
+    "tell", "show", "give", "about", "it", "its", "this", "that", "there", "right", "hey"
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt to a canonical bag of content words"""
+    text = prompt.lower().replace("'", "").replace("’", "")
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text):
+        if token in STOPWORDS:
+            continue
+        # Light plural stemming so "prices" and "price" share a feature
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return " ".join(tokens)
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words + character trigram embedding"""
+
+    def __init__(self, dim: int = 512, trigram_weight: float = 0.5):
+        self.dim = dim
+        self.trigram_weight = trigram_weight
+
+    def _features(self, normalized: str) -> List[Tuple[str, float]]:
+        features = []
+        for token in normalized.split():
+            features.append((f"w:{token}", 1.0))
+            padded = f"#{token}#"
+            for i in range(len(padded) - 2):
+                features.append((f"c:{padded[i:i + 3]}", self.trigram_weight))
+        return features
+
+    def embed(self, normalized: str) -> np.ndarray:
+        """Embed an already-normalized prompt into a unit vector"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(normalized):
+            h = zlib.crc32(feature.encode())
+            sign = 1.0 if (h >> 31) & 1 == 0 else -1.0
+            vector[h % self.dim] += sign * weight
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class _Partition:
+    """Fixed-capacity vector index; oldest entries are overwritten first"""
+
+    def __init__(self, dim: int, max_entries: int):
+        self.vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self.keys: List[Optional[str]] = [None] * max_entries
+        self.normalized: List[Optional[str]] = [None] * max_entries
+        self.slots: Dict[str, int] = {}
+        self.size = 0
+        self.cursor = 0
+        self.max_entries = max_entries
+
+    def add(self, vector: np.ndarray, key: str, normalized: str) -> None:
+        # Re-use the slot if this normalized prompt is already indexed
+        if normalized in self.slots:
+            self.keys[self.slots[normalized]] = key
+            return
+
+        slot = self.cursor
+        evicted = self.normalized[slot]
+        if evicted is not None:
+            del self.slots[evicted]
+        self.slots[normalized] = slot
+        self.vectors[slot] = vector
+        self.keys[slot] = key
+        self.normalized[slot] = normalized
+        self.cursor = (self.cursor + 1) % self.max_entries
+        self.size = min(self.size + 1, self.max_entries)
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        if self.size == 0:
+            return None, 0.0
+        similarities = self.vectors[:self.size] @ vector
+        best = int(np.argmax(similarities))
+        return self.keys[best], float(similarities[best])
+
+
+class SemanticCache:
+    """Nearest-neighbour lookup of cache keys for near-duplicate prompts"""
+
+    HISTOGRAM_BUCKETS = 10
+
+    def __init__(self, threshold: float = None, max_entries: int = None, embedder: HashingEmbedder = None):
+        self.threshold = threshold if threshold is not None else float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+        self.max_entries = max_entries or int(os.environ.get("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))
+        self.embedder = embedder or HashingEmbedder()
+        self.enabled = os.environ.get("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+        self._partitions: Dict[Tuple[str, str, str], _Partition] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "hit_similarity_sum": 0.0,
+            "similarity_histogram": [0] * self.HISTOGRAM_BUCKETS
+        }
+
+    def _partition_key(self, model: Optional[str], assistant: Optional[str], user_id: Optional[str]) -> Tuple[str, str, str]:
+        # Responses can carry personal context, so non-anonymous users get their own partition
+        user_scope = user_id if user_id and user_id != "anonymous" else ""
+        return (str(model or ""), str(assistant or ""), user_scope)
+
+    def lookup(self, prompt: str, model: str = None, assistant: str = None, user_id: str = None) -> Optional[Tuple[str, float]]:
+        """
+        Find the cache key of the most similar stored prompt
+
+        Args:
+            prompt: User's query
+            model: Selected Bedrock model
+            assistant: Name of the routed assistant
+            user_id: Current user identifier
+
+        Returns:
+            Tuple of (cache_key, similarity) above the threshold, or None
+        """
+        if not self.enabled:
+            return None
+
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return None
+        vector = self.embedder.embed(normalized)
+
+        with self._lock:
+            partition = self._partitions.get(self._partition_key(model, assistant, user_id))
+            key, similarity = partition.nearest(vector) if partition else (None, 0.0)
+
+            self._stats["lookups"] += 1
+            bucket = min(int(max(similarity, 0.0) * self.HISTOGRAM_BUCKETS), self.HISTOGRAM_BUCKETS - 1)
+            self._stats["similarity_histogram"][bucket] += 1
+
+            if key is not None and similarity >= self.threshold:
+                self._stats["hits"] += 1
+                self._stats["hit_similarity_sum"] += similarity
+                print(f"Cache hit (semantic {similarity:.3f}): {key[:8]}...")
+                return key, similarity
+
+            self._stats["misses"] += 1
+            return None
+
+    def add(self, prompt: str, cache_key: str, model: str = None, assistant: str = None, user_id: str = None) -> None:
+        """Index a prompt so near-duplicates resolve to its cache key"""
+        if not self.enabled:
+            return
+
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return
+        vector = self.embedder.embed(normalized)
+
+        with self._lock:
+            partition_key = self._partition_key(model, assistant, user_id)
+            partition = self._partitions.get(partition_key)
+            if partition is None:
+                partition = _Partition(self.embedder.dim, self.max_entries)
+                self._partitions[partition_key] = partition
+            partition.add(vector, cache_key, normalized)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the best-match similarity histogram"""
+        with self._lock:
+            hits = self._stats["hits"]
+            lookups = self._stats["lookups"]
+            return {
+                "threshold": self.threshold,
+                "lookups": lookups,
+                "hits": hits,
+                "misses": self._stats["misses"],
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "avg_hit_similarity": self._stats["hit_similarity_sum"] / hits if hits else 0.0,
+                "similarity_histogram": list(self._stats["similarity_histogram"]),
+                "partitions": len(self._partitions),
+                "entries": sum(p.size for p in self._partitions.values())
+            }
+
+    def clear(self) -> None:
+        """Drop all indexed prompts"""
+        with self._lock:
+            self._partitions.clear()
+
+# Global instance
+semantic_cache = SemanticCache()
@@ -0,0 +1,100 @@
+"""
+Single Flight - Coalesce concurrent identical calls into one in-flight computation
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+class _Call:
+    """An in-flight computation shared by the leader and its waiters"""
+
+    __slots__ = ("event", "result", "error", "waiters", "completed")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        # False if the leader was interrupted (e.g. a Streamlit rerun) before finishing
+        self.completed = False
+
+class SingleFlight:
+    """
+    Ensures only one execution per key is in flight at a time; concurrent
+    callers with the same key wait for and share the leader's result
+    """
+
+    def __init__(self, wait_timeout: Optional[float] = None):
+        self.wait_timeout = wait_timeout
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.stats = {"executions": 0, "shared": 0, "timeouts": 0, "abandoned": 0}
+
+    def do(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) once for all concurrent callers with the same key
+
+        Args:
+            key: Identity of the computation
+            fn: Function to execute
+
+        Returns:
+            The leader's result; its exception is re-raised in every waiter.
+            Waiters whose leader was interrupted by a BaseException (which
+            belongs to the leader's session, not theirs) compute on their own.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+                self.stats["executions"] += 1
+            else:
+                call.waiters += 1
+                leader = False
+
+        if not leader:
+            if not call.event.wait(self.wait_timeout):
+                # The leader is taking too long; compute independently
+                with self._lock:
+                    self.stats["timeouts"] += 1
+                return fn(*args, **kwargs)
+            if not call.completed:
+                with self._lock:
+                    self.stats["abandoned"] += 1
+                return fn(*args, **kwargs)
+            with self._lock:
+                self.stats["shared"] += 1
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            call.completed = True
+            return call.result
+        except Exception as e:
+            call.error = e
+            call.completed = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed"""
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get execution and coalescing counters"""
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._calls))
+
+# Shared by outbound data fetchers (price quotes, market overview)
+fetch_flight = SingleFlight(wait_timeout=30)
+
+# Shared by assistant computations for identical questions
+request_flight = SingleFlight(wait_timeout=120)
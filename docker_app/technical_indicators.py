@@ -0,0 +1,281 @@
+"""
+Technical Indicators - Vectorized indicator engine over cached OHLCV candles
+
+Every indicator takes arrays whose last axis is time, so one call covers a
+single symbol (1-D) or a whole universe stacked as a (symbols, time) matrix.
+Rolling windows use strided views; the recursive averages (EMA, Wilder)
+step through time once with all symbols in each step. Histories of
+different lengths are left-padded with NaN, and every indicator starts at
+a symbol's first real value.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ohlcv_store import Candles, OHLCVStore, ohlcv_store
+
+# Daily candles kept per symbol: enough for a 200-day SMA
+LOOKBACK_DAYS = 220
+
+RSI_OVERBOUGHT = 70.0
+RSI_OVERSOLD = 30.0
+# Annualized realized volatility above which a coin is treated as high risk
+HIGH_VOLATILITY = 0.80
+
+# Candle backfills for a universe run concurrently here
+_history_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="indicator-history")
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average; NaN until a full window is available"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = sliding_window_view(values, window, axis=-1).mean(axis=-1)
+    return out
+
+
+def _smooth(values: np.ndarray, alpha) -> np.ndarray:
+    """
+    Exponential smoothing along time, seeded with each row's first non-NaN value
+
+    alpha may be an array broadcasting against values[..., 0], so several
+    averages with different spans share one pass through time.
+    """
+    series = np.moveaxis(np.asarray(values, dtype=np.float64), -1, 0)
+    alpha = np.asarray(alpha, dtype=np.float64)
+    out = np.empty(series.shape)
+    previous = np.full(series.shape[1:], np.nan)
+    for t in range(series.shape[0]):
+        current = series[t]
+        step = previous + alpha * (current - previous)
+        previous = np.where(np.isnan(previous), current, np.where(np.isnan(current), previous, step))
+        out[t] = previous
+    return np.moveaxis(out, 0, -1)
+
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average with alpha = 2 / (span + 1)"""
+    return _smooth(values, 2.0 / (span + 1))
+
+
+def wilder(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's smoothing (alpha = 1 / period), as used by RSI and ATR"""
+    return _smooth(values, 1.0 / period)
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Relative Strength Index, 0-100"""
+    close = np.asarray(close, dtype=np.float64)
+    delta = np.diff(close, axis=-1, prepend=np.nan)
+    gains = wilder(np.where(np.isnan(delta), np.nan, np.clip(delta, 0, None)), period)
+    losses = wilder(np.where(np.isnan(delta), np.nan, np.clip(-delta, 0, None)), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100 - 100 / (1 + gains / losses)
+    # No losses in the window: fully overbought; no movement at all: neutral
+    value = np.where((losses == 0) & (gains > 0), 100.0, value)
+    return np.where((losses == 0) & (gains == 0), 50.0, value)
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26,
+         signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram"""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close: np.ndarray, window: int = 20,
+              width: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Middle, upper and lower Bollinger bands"""
+    close = np.asarray(close, dtype=np.float64)
+    middle = sma(close, window)
+    deviation = np.full(close.shape, np.nan)
+    if close.shape[-1] >= window:
+        deviation[..., window - 1:] = sliding_window_view(close, window, axis=-1).std(axis=-1)
+    return middle, middle + width * deviation, middle - width * deviation
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    previous_close = np.concatenate([np.full(close.shape[:-1] + (1,), np.nan), close[..., :-1]], axis=-1)
+    return np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Average True Range"""
+    return wilder(_true_range(high, low, close), period)
+
+
+def realized_volatility(close: np.ndarray, window: int = 30, periods_per_year: int = 365) -> np.ndarray:
+    """Annualized standard deviation of log returns over a rolling window"""
+    close = np.asarray(close, dtype=np.float64)
+    returns = np.diff(np.log(close), axis=-1, prepend=np.nan)
+    out = np.full(close.shape, np.nan)
+    if close.shape[-1] >= window:
+        out[..., window - 1:] = sliding_window_view(returns, window, axis=-1).std(axis=-1, ddof=1)
+    return out * np.sqrt(periods_per_year)
+
+
+def stack(histories: List[Candles], length: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Right-align candle histories into (symbols, time) matrices, NaN-padded on the left"""
+    length = length or max((len(h["close"]) for h in histories), default=0) or 1
+    matrices = {}
+    for field in ("open", "high", "low", "close", "volume"):
+        matrix = np.full((len(histories), length), np.nan)
+        for row, history in enumerate(histories):
+            values = np.asarray(history[field][-length:], dtype=np.float64)
+            if len(values):
+                matrix[row, length - len(values):] = values
+        matrices[field] = matrix
+    return matrices
+
+
+def _last(matrix: np.ndarray) -> np.ndarray:
+    return matrix[..., -1]
+
+
+def _tail(matrix: np.ndarray, window: int) -> np.ndarray:
+    """The last `window` points of each row; all NaN if the history is shorter"""
+    if matrix.shape[-1] < window:
+        return np.full(matrix.shape[:-1] + (window,), np.nan)
+    return matrix[..., -window:]
+
+
+def _change(close: np.ndarray, periods: int) -> np.ndarray:
+    if close.shape[-1] <= periods:
+        return np.full(close.shape[:-1], np.nan)
+    return (close[..., -1] / close[..., -1 - periods] - 1) * 100
+
+
+def compute_indicators(matrices: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Latest value of every indicator for each row of (symbols, time) OHLC matrices"""
+    close, high, low = matrices["close"], matrices["high"], matrices["low"]
+    delta = np.diff(close, axis=-1, prepend=np.nan)
+
+    # EMA 12/26, RSI gains/losses and ATR all smooth in one pass through time
+    smoothed = _smooth(np.stack([close, close, np.clip(delta, 0, None), np.clip(-delta, 0, None),
+                                 _true_range(high, low, close)]),
+                       np.array([2 / 13, 2 / 27, 1 / 14, 1 / 14, 1 / 14])[:, None])
+    ema_12, ema_26, gains, losses, average_range = smoothed
+    line = ema_12 - ema_26
+    signal_line = ema(line, 9)
+
+    # Window indicators only need their latest window
+    band_window = _tail(close, 20)
+    middle = band_window.mean(axis=-1)
+    upper = middle + 2 * band_window.std(axis=-1)
+    lower = 2 * middle - upper
+    volatility = np.diff(np.log(_tail(close, 31)), axis=-1).std(axis=-1, ddof=1) * np.sqrt(365)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strength = 100 - 100 / (1 + gains[..., -1] / losses[..., -1])
+        percent_b = np.where(upper > lower, (_last(close) - lower) / (upper - lower), np.nan)
+        atr_percent = average_range[..., -1] / _last(close) * 100
+    strength = np.where((losses[..., -1] == 0) & (gains[..., -1] > 0), 100.0, strength)
+    strength = np.where((losses[..., -1] == 0) & (gains[..., -1] == 0), 50.0, strength)
+    return {
+        'price': _last(close),
+        'change_7d': _change(close, 7),
+        'change_30d': _change(close, 30),
+        'sma_20': middle,
+        'sma_50': _tail(close, 50).mean(axis=-1),
+        'sma_200': _tail(close, 200).mean(axis=-1),
+        'ema_12': _last(ema_12),
+        'ema_26': _last(ema_26),
+        'rsi_14': strength,
+        'macd': _last(line),
+        'macd_signal': _last(signal_line),
+        'macd_histogram': _last(line - signal_line),
+        'bollinger_upper': upper,
+        'bollinger_lower': lower,
+        'bollinger_percent_b': percent_b,
+        'atr_14': average_range[..., -1],
+        'atr_percent': atr_percent,
+        'volatility_30d': volatility,
+        'periods': np.sum(~np.isnan(close), axis=-1),
+    }
+
+
+def summarize(indicators: Dict[str, Any]) -> Optional[str]:
+    """Momentum and risk readings as one phrase an assistant can cite"""
+    parts = []
+    if indicators.get('rsi_14') is not None:
+        rsi_value = indicators['rsi_14']
+        label = "overbought" if rsi_value >= RSI_OVERBOUGHT else "oversold" if rsi_value <= RSI_OVERSOLD else "neutral"
+        parts.append(f"RSI(14) {rsi_value:.0f} ({label})")
+    if indicators.get('macd_histogram') is not None:
+        parts.append(f"MACD {'bullish' if indicators['macd_histogram'] > 0 else 'bearish'}")
+    for key, label in (('sma_50', "50d"), ('sma_200', "200d")):
+        if indicators.get(key) is not None and indicators.get('price') is not None:
+            parts.append(f"{'above' if indicators['price'] > indicators[key] else 'below'} {label} SMA")
+    if indicators.get('bollinger_percent_b') is not None:
+        parts.append(f"Bollinger %B {indicators['bollinger_percent_b']:.2f}")
+    if indicators.get('atr_percent') is not None:
+        parts.append(f"ATR {indicators['atr_percent']:.1f}%")
+    if indicators.get('volatility_30d') is not None:
+        parts.append(f"30d vol {indicators['volatility_30d'] * 100:.0f}%")
+    return ", ".join(parts) or None
+
+
+def describe(symbol: str, indicators: Dict[str, Any]) -> str:
+    return f"{symbol}: {summarize(indicators) or 'not enough price history'}"
+
+
+class TechnicalIndicatorEngine:
+    """Indicators for one symbol or a whole universe from the local candle store"""
+
+    def __init__(self, store: Optional[OHLCVStore] = None, lookback: int = LOOKBACK_DAYS):
+        self.store = store or ohlcv_store
+        self.lookback = lookback
+
+    def _history(self, symbol: str, refresh: bool) -> Candles:
+        if refresh:
+            return self.store.history(symbol, "1d", self.lookback)
+        return {k: v[-self.lookback:] for k, v in self.store.range(symbol, "1d").items()}
+
+    def universe(self, symbols: Iterable[str], refresh: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Latest indicators per symbol, computed for all symbols in one pass
+
+        Args:
+            symbols: Coin symbols such as "BTC"
+            refresh: Backfill missing daily candles first; False reads local data only
+        """
+        symbols = [symbol.upper() for symbol in symbols]
+        if not symbols:
+            return {}
+        if refresh and len(symbols) > 1:
+            histories = list(_history_pool.map(lambda symbol: self._history(symbol, True), symbols))
+        else:
+            histories = [self._history(symbol, refresh) for symbol in symbols]
+        values = compute_indicators(stack(histories))
+        # NaN (not enough history) becomes None
+        columns = {name: [None if value != value else value for value in column.tolist()]
+                   for name, column in values.items()}
+        columns['periods'] = [int(value) for value in values['periods'].tolist()]
+        return {symbol: {name: column[row] for name, column in columns.items()} for row, symbol in enumerate(symbols)}
+
+    def snapshot(self, symbol: str, refresh: bool = True) -> Optional[Dict[str, Any]]:
+        """Indicators for one symbol, or None without enough history for RSI"""
+        try:
+            indicators = self.universe([symbol], refresh)[symbol.upper()]
+        except Exception as e:
+            print(f"Technical indicators unavailable for {symbol}: {str(e)}")
+            return None
+        return indicators if indicators['periods'] > 14 else None
+
+    def format_indicators(self, symbols: Iterable[str], refresh: bool = True) -> str:
+        return "\n".join(describe(symbol, indicators)
+                         for symbol, indicators in self.universe(symbols, refresh).items())
+
+
+# Global instance
+indicator_engine = TechnicalIndicatorEngine()
+
+
+def get_technical_indicators(symbols: Iterable[str]) -> str:
+    """Indicator summary lines for the given coins"""
+    return indicator_engine.format_indicators(symbols)
@@ -9,6 +9,8 @@ import time
 import uuid
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+from router_config import detect_query_type  # Shared compiled keyword tables
+from response_cache import query_fingerprint
 
 # Initialize AWS clients
 cloudwatch = boto3.client('cloudwatch', region_name=os.environ.get('AWS_REGION', 'us-west-2'))
@@ -21,12 +23,15 @@ ENV = os.environ.get('ENVIRONMENT', 'prod')
 LOG_GROUP = f"/aws/lambda/{APP_NAME}-{ENV}"
 FIREHOSE_STREAM = os.environ.get('FIREHOSE_STREAM', f"{APP_NAME}-{ENV}-telemetry")
 ENABLE_TELEMETRY = os.environ.get('ENABLE_TELEMETRY', 'true').lower() == 'true'
+# Query text is exported only on explicit opt-in; otherwise events carry just its hash
+LOG_QUERY_TEXT = os.environ.get('TELEMETRY_LOG_QUERY_TEXT', 'false').lower() == 'true'
 
 # Ensure log group exists
-try:
-    logs.create_log_group(logGroupName=LOG_GROUP)
-except logs.exceptions.ResourceAlreadyExistsException:
-    pass
+if ENABLE_TELEMETRY:
+    try:
+        logs.create_log_group(logGroupName=LOG_GROUP)
+    except logs.exceptions.ResourceAlreadyExistsException:
+        pass
 
 def log_user_interaction(
     user_id: str,
@@ -42,7 +47,7 @@ def log_user_interaction(
     Args:
         user_id: Anonymized user identifier
         event_type: Type of event (query, response, error, etc.)
-        query: User query (truncated for privacy)
+        query: User query; exported as a hash, and as truncated text only with TELEMETRY_LOG_QUERY_TEXT
         assistant_used: Which assistant was used
         response_time_ms: Response time in milliseconds
         metadata: Additional metadata about the interaction
@@ -55,14 +60,12 @@ def log_user_interaction(
         timestamp = int(time.time() * 1000)
         event_id = str(uuid.uuid4())
         
-        # Sanitize query for privacy (truncate and remove PII)
-        sanitized_query = query[:100] + "..." if len(query) > 100 else query
-        
         event = {
             "event_id": event_id,
             "timestamp": timestamp,
             "user_id": user_id,
             "event_type": event_type,
+            "query_hash": query_fingerprint(query),
             "query_length": len(query),
             "query_type": detect_query_type(query),
             "assistant_used": assistant_used,
@@ -71,6 +74,10 @@ def log_user_interaction(
             "app_version": os.environ.get('APP_VERSION', 'unknown')
         }
         
+        # Raw text is not scrubbed of PII, so it is only exported when the deployment opts in
+        if LOG_QUERY_TEXT:
+            event["query"] = query[:100] + "..." if len(query) > 100 else query
+        
         # Add metadata if provided
         if metadata:
             event.update(metadata)
@@ -127,27 +134,6 @@ def log_user_interaction(
     except Exception as e:
         print(f"Telemetry error: {str(e)}")
 
-def detect_query_type(query: str) -> str:
-    """Detect the type of query based on content"""
-    query_lower = query.lower()
-    
-    # Define patterns for different query types
-    patterns = {
-        "crypto": ["crypto", "bitcoin", "ethereum", "token", "blockchain", "coin"],
-        "finance": ["finance", "stock", "market", "investment", "portfolio"],
-        "aviation": ["flight", "aircraft", "airport", "aviation", "plane"],
-        "formula1": ["f1", "formula 1", "racing", "grand prix", "driver"],
-        "tech": ["code", "programming", "software", "algorithm", "api"],
-        "prediction": ["predict", "forecast", "future", "will", "expect"]
-    }
-    
-    # Check for matches
-    for query_type, keywords in patterns.items():
-        if any(keyword in query_lower for keyword in keywords):
-            return query_type
-    
-    return "general"
-
 def track_user_session(
     user_id: str,
     session_id: str,
@@ -329,4 +315,58 @@ def track_routing_decision(
             ]
         )
     except Exception as e:
-        print(f"Routing tracking error: {str(e)}")
\ No newline at end of file
+        print(f"Routing tracking error: {str(e)}")
+
+def track_circuit_breakers(metrics: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Publish circuit breaker state per external API host
+    
+    Args:
+        metrics: Breaker snapshots keyed by host, as returned by
+            CircuitBreakerRegistry.get_metrics()
+    """
+    if not ENABLE_TELEMETRY or not metrics:
+        return
+        
+    from circuit_breaker import STATE_VALUES
+    
+    try:
+        for host, snapshot in metrics.items():
+            dimensions = [
+                {'Name': 'Environment', 'Value': ENV},
+                {'Name': 'Host', 'Value': host}
+            ]
+            metric_data = [
+                {
+                    'MetricName': 'State',
+                    'Dimensions': dimensions,
+                    'Value': STATE_VALUES.get(snapshot['state'], 0),
+                    'Unit': 'None'
+                },
+                {
+                    'MetricName': 'ErrorRate',
+                    'Dimensions': dimensions,
+                    'Value': snapshot['error_rate'],
+                    'Unit': 'None'
+                },
+                {
+                    'MetricName': 'HealthScore',
+                    'Dimensions': dimensions,
+                    'Value': snapshot['health'],
+                    'Unit': 'None'
+                }
+            ]
+            if snapshot.get('latency_ewma_ms') is not None:
+                metric_data.append({
+                    'MetricName': 'LatencyEwma',
+                    'Dimensions': dimensions,
+                    'Value': snapshot['latency_ewma_ms'],
+                    'Unit': 'Milliseconds'
+                })
+            
+            cloudwatch.put_metric_data(
+                Namespace=f"{APP_NAME}/CircuitBreakers",
+                MetricData=metric_data
+            )
+    except Exception as e:
+        print(f"Circuit breaker tracking error: {str(e)}")
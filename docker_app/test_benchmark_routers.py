@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the router benchmark and replay harness
+"""
+
+import json
+import os
+import tempfile
+
+from benchmark_routers import (DEFAULT_CORPUS, DIRECT_RESPONSE, ROUTERS, TEACHER, compare_to_baseline, decision_label,
+                               load_routers, main, replay, route_targets, run_router)
+
+def test_decision_labels():
+    """Router results map onto the corpus label space"""
+    print("=" * 60)
+    print("TESTING DECISION LABELS")
+    print("=" * 60)
+
+    targets = route_targets()
+    assert decision_label(targets["financial"], "prompt") == "business_finance"
+    assert decision_label(targets["louisiana_legal"], "prompt") == "specialized_industries"
+    assert decision_label(targets["aviation"], "prompt") == "aviation"
+    assert decision_label(None, "It is Monday") == DIRECT_RESPONSE
+    assert decision_label(None, None) == TEACHER
+    print("   ✓ Legacy assistant keys, direct responses and teacher fallbacks labelled")
+
+def test_corpus_accuracy_and_latency():
+    """Optimized router is scored with accuracy, confusion and percentiles"""
+    print("\n" + "=" * 60)
+    print("TESTING CORPUS BENCHMARK")
+    print("=" * 60)
+
+    router = load_routers(["optimized_router"])["optimized_router"]
+    queries = ["What time is it?", "Track flight N12345", "Who won the Monaco Grand Prix?", "Bitcoin price"]
+    labels = [DIRECT_RESPONSE, "aviation", "formula1", "business_finance"]
+    report = run_router("optimized_router", router, queries, repeat=2)
+
+    assert report.predictions == labels
+    assert report.accuracy(labels) == 1.0
+    assert report.confusion(labels)[("aviation", "aviation")] == 1
+    assert len(report.latencies_us) == 8
+    percentiles = report.latency_percentiles()
+    assert 0 < percentiles["p50_us"] <= percentiles["p99_us"]
+    print(f"   ✓ p50 {percentiles['p50_us']:.1f}µs, p99 {percentiles['p99_us']:.1f}µs")
+
+    assert main([DEFAULT_CORPUS, "--routers", "optimized_router", "--repeat", "1"]) == 0
+
+    # A requested router that cannot be imported fails the run
+    ROUTERS["missing_router"] = ("no_such_router_module", "route")
+    try:
+        assert main([DEFAULT_CORPUS, "--routers", "optimized_router", "missing_router"]) == 1
+    finally:
+        del ROUTERS["missing_router"]
+
+def test_replay_against_baseline():
+    """Replayed production queries are compared with saved decisions"""
+    print("\n" + "=" * 60)
+    print("TESTING REPLAY MODE")
+    print("=" * 60)
+
+    events = [
+        {"event_type": "response", "query": "Bitcoin price", "assistant_used": "business_finance_assistant"},
+        {"event_type": "response", "query": "Bitcoin price", "assistant_used": "business_finance_assistant"},
+        {"event_type": "query", "query": "ignored", "assistant_used": "pending"},
+        {"event_type": "response", "query": "Track flight N12345", "assistant_used": "aviation_assistant"},
+    ]
+    routers = load_routers(["optimized_router"])
+    queries, reports, logged = replay(events, routers)
+    assert queries == ["Bitcoin price", "Track flight N12345"]
+    assert logged == ["business_finance", "aviation"]
+
+    baseline = {"optimized_router": {"Bitcoin price": "business_finance", "Track flight N12345": "universal"}}
+    changes = compare_to_baseline(queries, reports, baseline)
+    assert changes["optimized_router"] == [("Track flight N12345", "universal", "aviation")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        events_path = os.path.join(tmp, "events.jsonl")
+        baseline_path = os.path.join(tmp, "baseline.json")
+        with open(events_path, "w") as f:
+            f.write("\n".join(json.dumps(e) for e in events))
+        assert main(["--replay", events_path, "--routers", "optimized_router", "--save-baseline", baseline_path]) == 0
+        assert main(["--replay", events_path, "--routers", "optimized_router", "--baseline", baseline_path]) == 0
+        with open(baseline_path, "w") as f:
+            json.dump(baseline, f)
+        assert main(["--replay", events_path, "--routers", "optimized_router", "--baseline", baseline_path]) == 1
+    print("   ✓ Changed decisions reported and fail the replay")
+
+if __name__ == "__main__":
+    test_decision_labels()
+    test_corpus_accuracy_and_latency()
+    test_replay_against_baseline()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for cache pre-warming from telemetry logs
+"""
+
+import json
+import os
+import tempfile
+
+os.environ.setdefault("LOCAL_DEV", "1")
+
+from cache_prewarm import PREWARM_NAMESPACE, CachePrewarmer, mine_top_queries, read_events
+from response_cache import ResponseCache
+
+from response_cache import query_fingerprint
+
+def _event(query, user, query_type="crypto", event_type="response", assistant="lazy_business_finance_assistant",
+           with_text=True):
+    event = {"event_type": event_type, "timestamp": 1_700_000_000_000, "user_id": user,
+             "query_hash": query_fingerprint(query), "query_length": len(query), "query_type": query_type,
+             "assistant_used": assistant}
+    if with_text:
+        event["query"] = query
+    return event
+
+def _write_log(events):
+    f = tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False)
+    for event in events:
+        f.write(json.dumps(event) + "\n")
+    f.write("not json\n")
+    f.close()
+    return f.name
+
+SAMPLE_EVENTS = (
+    [_event("Bitcoin price now", f"user-{i}") for i in range(5)]
+    + [_event("bitcoin  PRICE now", "user-9")]
+    + [_event("bitcoin price now", "user-1", event_type="query", assistant="pending")]
+    + [_event("what is my portfolio worth", "user-1") for _ in range(6)]
+    + [_event("who won the grand prix", f"user-{i}", "formula1", assistant="lazy_formula1_assistant") for i in range(3)]
+    + [_event("x" * 101, f"user-{i}") for i in range(5)]
+    + [_event("is my flight delayed", f"user-{i}", "aviation", with_text=False) for i in range(5)]
+)
+
+def test_mine_top_queries():
+    """Frequent queries are normalized and grouped by domain"""
+    print("=" * 60)
+    print("TESTING QUERY MINING")
+    print("=" * 60)
+
+    path = _write_log(SAMPLE_EVENTS)
+    try:
+        top = mine_top_queries(read_events(path), top_n=5, min_count=3, min_users=2)
+    finally:
+        os.unlink(path)
+
+    assert [q.query for q in top["crypto"]] == ["bitcoin price now"]
+    assert top["crypto"][0].count == 6 and top["crypto"][0].users == 6
+    assert top["formula1"][0].assistants == ["lazy_formula1_assistant"]
+    assert "aviation" not in top  # Only hashes were logged: nothing to replay
+    print(f"   ✓ Mined: { {d: [q.query for q in r] for d, r in top.items()} }")
+    print("   ✓ Single-user, truncated and hash-only queries excluded")
+
+def test_prewarm_refreshes_ahead_of_expiry():
+    """Answers are cached under the shared key and refreshed before they expire"""
+    print("\n" + "=" * 60)
+    print("TESTING SCHEDULED REFRESH")
+    print("=" * 60)
+
+    calls = []
+
+    def answer(query):
+        calls.append(query)
+        if "grand prix" in query:
+            return f"answer {len(calls)}", "f1_weekend"
+        return f"answer {len(calls)}", "live_market"
+
+    path = _write_log(SAMPLE_EVENTS)
+    cache = ResponseCache(ttl=300)
+    prewarmer = CachePrewarmer(path, cache=cache, models=["model-a"], answer_fn=answer,
+                               min_count=3, min_users=2, lookback_hours=0, refresh_lead=0.2)
+    try:
+        assert prewarmer.run_pending(now=1000) == 2
+        key = cache.get_cache_key("Bitcoin price now", "model-a", "alice")
+        anonymous_key = cache.get_cache_key("Bitcoin price now", "model-a")
+        prewarm_key = cache.get_cache_key("Bitcoin price now", "model-a", namespace=PREWARM_NAMESPACE)
+        assert cache.get(key) is None and cache.get(anonymous_key) is None
+        assert cache.get(prewarm_key).startswith("answer")
+
+        # live_market (30s TTL) is refreshed at 80% of its lifetime; f1_weekend is not yet due
+        assert prewarmer.run_pending(now=1020) == 0
+        assert prewarmer.run_pending(now=1024) == 1
+        assert calls.count("bitcoin price now") == 2
+        assert prewarmer.seconds_until_due(now=1024) == 24
+        assert prewarmer.stats["refreshed"] == 3
+    finally:
+        os.unlink(path)
+    print(f"   ✓ Stats: {prewarmer.stats}")
+
+def test_uncacheable_queries_are_dropped():
+    """no_cache answers and teacher fallbacks are not scheduled again"""
+    print("\n" + "=" * 60)
+    print("TESTING UNCACHEABLE QUERIES")
+    print("=" * 60)
+
+    path = _write_log(SAMPLE_EVENTS)
+    prewarmer = CachePrewarmer(path, cache=ResponseCache(ttl=300), models=["model-a"],
+                               answer_fn=lambda query: ("It is noon", "no_cache"), lookback_hours=0)
+    try:
+        assert prewarmer.run_pending(now=0) == 2
+        assert prewarmer.stats["skipped"] == 2
+        assert prewarmer.run_pending(now=10_000) == 0
+    finally:
+        os.unlink(path)
+    print("   ✓ Nothing rescheduled")
+
+if __name__ == "__main__":
+    test_mine_top_queries()
+    test_prewarm_refreshes_ahead_of_expiry()
+    test_uncacheable_queries_are_dropped()
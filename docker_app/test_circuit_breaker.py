@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for per-host circuit breakers and health-ordered fallbacks
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerRegistry
+from hedged_request import HedgedRequest
+from http_client import MISSING_ENDPOINT_STATUSES, HostCircuitOpen, HttpClient, default_retry
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_open_half_open_close():
+    """Failures open the breaker; one probe after the cool-down closes or re-opens it"""
+    print("=" * 60)
+    print("TESTING BREAKER STATE MACHINE")
+    print("=" * 60)
+
+    clock = _Clock()
+    breaker = CircuitBreaker("api.example.com", min_calls=4, open_seconds=10, clock=clock)
+    for _ in range(4):
+        assert breaker.allow_request()
+        breaker.record_failure(0.5)
+    assert breaker.state == OPEN and not breaker.allow_request()
+    assert breaker.health_score() == 0.0
+
+    # Cool-down over: a single probe goes out, it fails, the cool-down doubles
+    clock.now = 10
+    assert breaker.allow_request() and breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_failure(0.5)
+    assert breaker.state == OPEN
+    clock.now = 29
+    assert not breaker.allow_request()
+
+    # Next probe succeeds and the breaker closes with a clean window
+    clock.now = 30
+    assert breaker.allow_request()
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED and breaker.error_rate == 0.0
+    assert breaker.snapshot()['opened'] == 2
+    print(f"   ✓ {breaker.snapshot()}")
+
+def test_order_by_health():
+    """Open or degraded hosts move behind healthy ones; similar hosts keep their order"""
+    print("\n" + "=" * 60)
+    print("TESTING HEALTH-ORDERED FALLBACKS")
+    print("=" * 60)
+
+    registry = CircuitBreakerRegistry(min_calls=2)
+    for _ in range(2):
+        registry.get("dead.example.com").record_failure(10.0)
+    registry.get("fast.example.com").record_success(0.05)
+    registry.get("ok.example.com").record_success(0.1)
+
+    hosts = ["dead.example.com", "ok.example.com", "fast.example.com", "new.example.com"]
+    assert registry.order_by_health(hosts) == ["ok.example.com", "fast.example.com",
+                                               "new.example.com", "dead.example.com"]
+
+    calls = []
+    hedge = HedgedRequest([("dead", lambda s: calls.append("dead")), ("ok", lambda s: calls.append("ok") or 1)],
+                          hosts={"dead": "dead.example.com", "ok": "ok.example.com"}, breakers=registry)
+    assert hedge.call("BTC") == 1 and calls == ["ok"]
+    print(f"   ✓ {registry.order_by_health(hosts)}")
+
+class _Unavailable(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits = 0
+    status = 503
+
+    def do_GET(self):
+        type(self).hits += 1
+        self.send_response(type(self).status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def test_http_client_short_circuits():
+    """Once a host's breaker opens, calls fail fast without reaching the server"""
+    print("\n" + "=" * 60)
+    print("TESTING HTTP CLIENT SHORT-CIRCUIT")
+    print("=" * 60)
+
+    _Unavailable.hits, _Unavailable.status = 0, 503
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Unavailable)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = HttpClient(retry=default_retry(retries=0),
+                            breakers=CircuitBreakerRegistry(min_calls=3, open_seconds=60))
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+        for _ in range(3):
+            assert client.get(url).status_code == 503
+        try:
+            client.get(url)
+            assert False, "expected HostCircuitOpen"
+        except HostCircuitOpen:
+            pass
+        assert _Unavailable.hits == 3
+        assert client.get_stats()["127.0.0.1"]["short_circuited"] == 1
+        assert client.breakers.get_metrics()["127.0.0.1"]["state"] == OPEN
+        print("   ✓ Fourth call refused locally")
+    finally:
+        server.shutdown()
+
+def test_call_site_failure_statuses():
+    """A 404 only opens the breaker when the call site says the endpoint should exist"""
+    print("\n" + "=" * 60)
+    print("TESTING CALL-SITE FAILURE STATUSES")
+    print("=" * 60)
+
+    _Unavailable.hits, _Unavailable.status = 0, 404
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Unavailable)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = HttpClient(retry=default_retry(retries=0),
+                            breakers=CircuitBreakerRegistry(min_calls=3, open_seconds=60))
+        url = f"http://127.0.0.1:{server.server_address[1]}/api/search"
+        for _ in range(3):
+            assert client.get(url).status_code == 404
+        assert client.breakers.get_metrics()["127.0.0.1"]["state"] == CLOSED
+
+        for _ in range(3):
+            assert client.get(url, failure_statuses=MISSING_ENDPOINT_STATUSES).status_code == 404
+        assert client.breakers.get_metrics()["127.0.0.1"]["state"] == OPEN
+        print("   ✓ Dead endpoint opened the breaker")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_open_half_open_close()
+    test_order_by_health()
+    test_http_client_short_circuits()
+    test_call_site_failure_statuses()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for batched Coinbase quotes and the calls-per-query benchmark
+"""
+
+from benchmark_coinbase_calls import CountingSession, _FakeResponse, run_benchmark
+from coinbase_api_service import CoinbaseAPIService
+
+def _service(**kwargs):
+    service = CoinbaseAPIService(**kwargs)
+    service.session = CountingSession(latency=0)
+    return service
+
+def test_one_table_serves_many_pairs():
+    """Every pair in the rates table comes from a single download; others use the spot endpoint"""
+    print("=" * 60)
+    print("TESTING BATCHED SPOT PRICES")
+    print("=" * 60)
+
+    service = _service()
+    prices = service.get_spot_prices(["BTC-USD", "eth-usd", "BTC-EUR", "XYZ-USD"])
+    assert service.session.endpoints() == {"exchange-rates": 1, "spot": 1}
+    assert abs(prices["BTC-USD"]["price"] - 1 / 0.0000155) < 1e-6
+    assert abs(prices["BTC-EUR"]["price"] - 0.92 / 0.0000155) < 1e-6
+    assert prices["ETH-USD"]["source"] == "coinbase_public"
+    assert prices["XYZ-USD"]["source"] == "coinbase_spot"
+    print(f"   ✓ BTC ${prices['BTC-USD']['price']:,.2f}, 4 pairs in 2 calls")
+
+def test_rates_freshness_window():
+    """The table is reused inside the window and downloaded again after it"""
+    print("\n" + "=" * 60)
+    print("TESTING RATES FRESHNESS WINDOW")
+    print("=" * 60)
+
+    service = _service(rates_max_age=60)
+    service.format_prices(["BTC", "ETH", "SOL"])
+    service.get_market_data(["BTC", "ETH"])
+    assert service.get_spot_price("SOL-USD")["price"] > 0
+    assert service.session.endpoints() == {"exchange-rates": 1}
+
+    service._rates_at -= 61
+    service.get_spot_price("BTC-USD")
+    stats = service.get_stats()
+    assert stats["rates_fetches"] == 2 and stats["rates_reused"] == 2
+    print(f"   ✓ {stats}")
+
+class _DownSession(CountingSession):
+    """Coinbase during an outage: every request fails"""
+
+    def get(self, url, **kwargs):
+        super().get(url, **kwargs)
+        return _FakeResponse({}, 503)
+
+def test_outage_is_not_retried_per_pair():
+    """A failed table download is remembered, and missed pairs are looked up once"""
+    print("\n" + "=" * 60)
+    print("TESTING RATES OUTAGE")
+    print("=" * 60)
+
+    service = CoinbaseAPIService()
+    service.session = _DownSession(latency=0)
+    symbols = ["BTC", "ETH", "SOL", "ADA", "DOT", "XRP", "DOGE", "AVAX", "LINK", "LTC"]
+    market = service.get_market_data(symbols)
+    assert market['prices'] == {} and market['stats'] == {}
+    assert service.session.endpoints() == {"exchange-rates": 1, "spot": 10}
+
+    service.format_prices(["BTC"])
+    assert service.session.endpoints() == {"exchange-rates": 1, "spot": 11}
+    assert service.get_stats()["rates_backoffs"] >= 1
+    print(f"   ✓ 10-symbol market data in {len(service.session.calls) - 1} calls during an outage")
+
+def test_benchmark_reports_fewer_calls():
+    """Batched access never needs more upstream calls than the per-symbol pattern"""
+    print("\n" + "=" * 60)
+    print("TESTING CALLS-PER-QUERY BENCHMARK")
+    print("=" * 60)
+
+    results = {result['scenario']: result for result in run_benchmark(queries=2, latency=0)}
+    assert results["five prices"]["before"]["calls_per_query"] == 10
+    assert results["five prices"]["after"]["calls_per_query"] == 1
+    assert results["five prices"]["after_warm"]["calls_per_query"] == 0
+    for result in results.values():
+        assert result["after"]["calls_per_query"] <= result["before"]["calls_per_query"]
+    print(f"   ✓ {[(name, r['before']['calls_per_query'], r['after']['calls_per_query']) for name, r in results.items()]}")
+
+if __name__ == "__main__":
+    test_one_table_serves_many_pairs()
+    test_rates_freshness_window()
+    test_outage_is_not_retried_per_pair()
+    test_benchmark_reports_fewer_calls()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk, memoized high-potential coin screening
+"""
+
+import tempfile
+
+from benchmark_crypto_screening import COINS, MarketSession, install, run_benchmark
+from coinbase_api_service import coinbase_service
+from crypto_data_service import crypto_data_service
+from crypto_prediction_engine import CryptoPredictionEngine
+from direct_crypto_api import direct_crypto_api
+from quote_store import quote_store
+from technical_indicators import indicator_engine
+
+def _screen_with(session, root):
+    saved = (crypto_data_service.session, direct_crypto_api.session, coinbase_service.session, indicator_engine.store)
+    install(session, root)
+    return saved
+
+def _restore(saved):
+    (crypto_data_service.session, direct_crypto_api.session, coinbase_service.session, indicator_engine.store) = saved
+    quote_store.clear()
+
+def test_one_overview_and_one_markets_call():
+    """Screening fetches the overview and every candidate's market row once, and scores from them"""
+    print("=" * 60)
+    print("TESTING BULK SCREENING")
+    print("=" * 60)
+
+    session = MarketSession(latency=0)
+    with tempfile.TemporaryDirectory() as root:
+        saved = _screen_with(session, root)
+        try:
+            results = CryptoPredictionEngine().identify_high_potential_coins(min_potential=1.0, max_coins=10)
+        finally:
+            _restore(saved)
+    endpoints = session.endpoints()
+    assert endpoints['global'] == 1 and endpoints['markets'] == 1 and 'binance' not in endpoints
+    assert len(results) == len(COINS)
+    # Market caps come from the bulk rows, so small caps score above 1x
+    assert all(r['potential_multiple'] > 1 and r['indicators'] for r in results)
+    print(f"   ✓ {len(results)} coins from {len(session.calls)} calls: {endpoints}")
+
+def test_scores_memoized_per_data_version():
+    """An unchanged screen is served from the memo; a changed market row rescored only that coin"""
+    print("\n" + "=" * 60)
+    print("TESTING SCORE MEMO")
+    print("=" * 60)
+
+    session = MarketSession(latency=0)
+    with tempfile.TemporaryDirectory() as root:
+        saved = _screen_with(session, root)
+        try:
+            engine = CryptoPredictionEngine()
+            engine.identify_high_potential_coins()
+            session.calls.clear()
+            engine.identify_high_potential_coins()
+            assert session.calls == [] and engine.stats['memo_hits'] == len(COINS)
+
+            # New market data for one coin once the markets window has passed
+            session.coins["sui"] = ("sui", "SUI", 2.10, 6.4e9, 14.1)
+            with crypto_data_service._windows_lock:
+                crypto_data_service._windows = {k: v for k, v in crypto_data_service._windows.items()
+                                                if not k.startswith("markets:")}
+            results = engine.identify_high_potential_coins(max_coins=10)
+        finally:
+            _restore(saved)
+    assert engine.stats['scored'] == len(COINS) + 1
+    assert engine.stats['memo_hits'] == 2 * len(COINS) - 1
+    assert next(r for r in results if r['symbol'] == "SUI")['current_price'] == 2.10
+    print(f"   ✓ {engine.stats}")
+
+def test_markets_failure_and_benchmark():
+    """Without the bulk endpoint, candidates fall back to per-coin prices; the benchmark shows fewer calls"""
+    print("\n" + "=" * 60)
+    print("TESTING FALLBACK AND BENCHMARK")
+    print("=" * 60)
+
+    session = MarketSession(latency=0)
+    session.fail_markets = True
+    with tempfile.TemporaryDirectory() as root:
+        saved = _screen_with(session, root)
+        try:
+            results = CryptoPredictionEngine().identify_high_potential_coins(min_potential=0, max_coins=10)
+        finally:
+            _restore(saved)
+    assert session.endpoints()['binance'] == len(COINS) and len(results) == len(COINS)
+
+    results = run_benchmark(latency=0.005)
+    assert results['after']['calls'] < results['before']['calls']
+    assert results['after_warm']['calls'] == 0
+    print(f"   ✓ before {results['before']['calls']} calls, after {results['after']['calls']}, "
+          f"warm {results['after_warm']['calls']}")
+
+if __name__ == "__main__":
+    test_one_overview_and_one_markets_call()
+    test_scores_memoized_per_data_version()
+    test_markets_failure_and_benchmark()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for on-demand data tools and per-request memoization
+"""
+
+import threading
+
+from cache_freshness import data_versions
+from data_tools import DataToolbox, RequestMemo
+from market_snapshot_service import MarketSnapshotService, fake_pollers
+
+def _toolbox():
+    snapshots = MarketSnapshotService(fake_pollers(seed=7))
+    snapshots.refresh_all()
+    return DataToolbox(snapshots=snapshots)
+
+def test_request_memo():
+    """Repeated lookups hit the memo; failures are reported and retried"""
+    print("=" * 60)
+    print("TESTING REQUEST MEMO")
+    print("=" * 60)
+
+    memo = RequestMemo()
+    calls = []
+    fetch = lambda x: calls.append(x) or f"value {x}"
+    assert memo.get(("tool", 1), fetch, 1) == "value 1"
+    assert memo.get(("tool", 1), fetch, 1) == "value 1"
+    assert calls == [1]
+
+    def broken():
+        raise ConnectionError("down")
+
+    assert memo.get(("broken",), broken).startswith("Data unavailable")
+    assert memo.get(("broken",), broken).startswith("Data unavailable")
+    stats = memo.get_stats()
+    assert stats['hits'] == 1 and stats['errors'] == 2 and stats['upstream_calls'] == 3
+    print(f"   ✓ {stats}")
+
+def test_crypto_quote_from_snapshots():
+    """Quotes come from the snapshot service and names, tickers and order all share a memo entry"""
+    print("\n" + "=" * 60)
+    print("TESTING CRYPTO QUOTE TOOL")
+    print("=" * 60)
+
+    toolbox = _toolbox()
+    first = toolbox.crypto_quote("BTC, eth")
+    assert "BTC: $" in first and "ETH: $" in first
+    assert toolbox.crypto_quote("ethereum,bitcoin") == first
+    assert toolbox.memo.get_stats()['upstream_calls'] == 1
+    assert toolbox.crypto_quote(" ") == "No cryptocurrency symbols given"
+
+    # Quotes read on a tool thread are logged to the request that created the tools
+    with data_versions.capture() as reads:
+        toolbox = _toolbox()
+    worker = threading.Thread(target=toolbox.crypto_quote, args=("BTC,ETH",))
+    worker.start()
+    worker.join()
+    assert set(reads) == {"crypto:BTC", "crypto:ETH"} and reads["crypto:BTC"] == data_versions.get("crypto:BTC")
+    print(f"   ✓ {first}")
+
+def test_overview_and_f1_from_snapshots():
+    """Market overview and F1 context need no network when snapshots are fresh"""
+    print("\n" + "=" * 60)
+    print("TESTING OVERVIEW AND F1 TOOLS")
+    print("=" * 60)
+
+    toolbox = _toolbox()
+    overview = toolbox.market_overview()
+    assert overview.startswith("Total Market Cap: $2.") and "BTC Dominance" in overview
+    f1 = toolbox.f1_standings()
+    assert "Monaco Grand Prix" in f1 and "Lando Norris" in f1
+    toolbox.market_overview()
+    toolbox.f1_standings()
+    assert toolbox.memo.get_stats() == {'calls': 4, 'hits': 2, 'errors': 0, 'upstream_calls': 2}
+    print(f"   ✓ {overview}")
+
+if __name__ == "__main__":
+    test_request_memo()
+    test_crypto_quote_from_snapshots()
+    test_overview_and_f1_from_snapshots()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized forecast backtest
+"""
+
+import tempfile
+
+import numpy as np
+
+from benchmark_forecast_backtest import fill_store, scalar_forecast, synthetic_history, window_indicators
+from crypto_prediction_engine import CryptoPredictionEngine
+from direct_crypto_forecast import DirectCryptoForecast
+import direct_crypto_forecast
+from forecast_backtest import (CONFIDENCE_LEVELS, HORIZON_DAYS, ForecastBacktest, evaluate, forecast_features,
+                               realized_outcomes, score_direct_forecast, score_prediction_engine)
+from ohlcv_store import OHLCVStore
+from technical_indicators import stack
+
+def test_vectorized_matches_live_scoring():
+    """Every sampled window scores the same as the live engine and direct forecaster"""
+    print("=" * 60)
+    print("TESTING EQUIVALENCE WITH LIVE SCORING")
+    print("=" * 60)
+
+    histories = [synthetic_history(400, seed) for seed in range(3)]
+    caps = np.array([500e9, 20e9, 2e9])
+    features = forecast_features(stack(histories))
+    engine, direct = CryptoPredictionEngine(), DirectCryptoForecast()
+    saved = direct_crypto_forecast.indicator_engine.snapshot
+    try:
+        for horizon in HORIZON_DAYS:
+            growth, confidence = score_prediction_engine(features, caps, horizon)
+            direct_growth, direct_confidence = score_direct_forecast(features, caps, horizon)
+            for row, history in enumerate(histories):
+                for t in range(31, 400, 23):
+                    live = scalar_forecast(engine, f"C{row}", history, t, caps[row], horizon)
+                    assert np.isclose(growth[row, t], live['growth_potential']), (horizon, row, t)
+                    assert CONFIDENCE_LEVELS[confidence[row, t]] == live['confidence']
+
+                    direct.get_direct_price = lambda symbol: {'price_usd': float(history["close"][t])}
+                    direct._estimate_market_cap = lambda symbol: caps[row]
+                    direct_crypto_forecast.indicator_engine.snapshot = lambda symbol, refresh=True: window_indicators(history, t)
+                    live = direct.get_growth_potential(f"C{row}", horizon)
+                    assert np.isclose(direct_growth[row, t], live['growth_potential']), (horizon, row, t)
+                    assert CONFIDENCE_LEVELS[direct_confidence[row, t]] == live['confidence']
+    finally:
+        direct_crypto_forecast.indicator_engine.snapshot = saved
+    print(f"   ✓ growth range {growth.min():.2f}-{growth.max():.2f} matches window by window")
+
+def test_outcomes_and_metrics():
+    """Outcomes look only forward, and hit rates and calibration follow from them"""
+    print("\n" + "=" * 60)
+    print("TESTING OUTCOMES AND METRICS")
+    print("=" * 60)
+
+    close = np.array([[100.0, 110, 90, 120, 130]])
+    matrices = {"close": close, "high": close + 5}
+    end_return, peak_return = realized_outcomes(matrices, 2)
+    assert np.allclose(end_return[0, :3], [-0.1, 0.0909090909, 0.4444444444])
+    assert np.allclose(peak_return[0, :3], [0.15, 0.1363636363, 0.5])
+    assert np.isnan(end_return[0, 3:]).all()
+
+    predicted = np.array([0.1, 0.1, 0.5, 0.5])
+    report = evaluate(predicted, np.array([2, 2, 0, 0]), np.array([0.2, -0.1, 0.1, 0.3]),
+                      np.array([0.3, 0.05, 0.6, 0.4]))
+    assert report['direction_hit_rate'] == 0.75 and report['target_hit_rate'] == 0.5
+    assert report['by_confidence']['high'] == {'windows': 2, 'target_hit_rate': 0.5,
+                                               'mean_predicted_pct': 10.0, 'mean_realized_pct': 5.0}
+    assert [group['windows'] for group in report['calibration']] == [2, 2]
+    assert report['calibration_error_pct'] == 17.5 and report['rank_correlation'] == 0.447
+    print(f"   ✓ {report['direction_hit_rate']:.0%} direction, {report['target_hit_rate']:.0%} target hits")
+
+def test_runs_from_local_store_only():
+    """A backtest reads only stored candles and reports timing per forecast"""
+    print("\n" + "=" * 60)
+    print("TESTING LOCAL BACKTEST")
+    print("=" * 60)
+
+    def no_network(*args):
+        raise AssertionError("backtest must not fetch candles")
+
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root, fetcher=no_network)
+        fill_store(store, ["BTC", "SOL"], 500)
+        backtest = ForecastBacktest(store, market_caps={"SOL": 70e9})
+        report = backtest.run(["BTC", "SOL", "NOPE"], step=5)
+    assert report['symbols'] == {"BTC": 500, "SOL": 500}
+    short = report['horizons']['short-term']
+    assert short['windows'] == 2 * len(range(30, 500 - 14, 5))
+    # BTC falls back to the direct forecaster's $1.2T estimate, the only large cap here
+    assert "high" in short['by_confidence'] and short['calibration']
+    assert report['horizons']['long-term']['windows'] > 0 and report['per_forecast_us'] > 0
+    text = backtest.format_report(report)
+    assert "short-term (14d)" in text and "µs per forecast" in text
+    print("   ✓ " + text.splitlines()[1])
+
+if __name__ == "__main__":
+    test_vectorized_matches_live_scoring()
+    test_outcomes_and_metrics()
+    test_runs_from_local_store_only()
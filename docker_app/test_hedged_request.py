@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for hedged multi-provider requests
+"""
+
+import time
+
+from hedged_request import HedgedRequest
+
+def _provider(delay, result, calls=None, name=None):
+    def fetch(symbol):
+        if calls is not None:
+            calls.append(name)
+        time.sleep(delay)
+        return result
+    return fetch
+
+def test_fast_primary_is_not_hedged():
+    """A primary that answers within the hedge delay is the only call"""
+    print("=" * 60)
+    print("TESTING FAST PRIMARY")
+    print("=" * 60)
+
+    calls = []
+    hedge = HedgedRequest([("a", _provider(0.01, {"price_usd": 1.0}, calls, "a")),
+                           ("b", _provider(0.01, {"price_usd": 2.0}, calls, "b"))], default_delay=0.2)
+    assert hedge.call("BTC") == {"price_usd": 1.0}
+    assert calls == ["a"]
+    assert hedge.get_stats()["hedges"] == 0
+    print("   ✓ One provider call")
+
+def test_slow_primary_is_hedged():
+    """The next provider is launched after the hedge delay and the first answer wins"""
+    print("\n" + "=" * 60)
+    print("TESTING HEDGE ON SLOW PRIMARY")
+    print("=" * 60)
+
+    hedge = HedgedRequest([("slow", _provider(0.5, {"price_usd": 1.0})),
+                           ("fast", _provider(0.02, {"price_usd": 2.0}))], default_delay=0.05)
+    start = time.perf_counter()
+    assert hedge.call("BTC") == {"price_usd": 2.0}
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.2, elapsed
+    stats = hedge.get_stats()
+    assert stats["hedges"] == 1 and stats["wins"]["fast"] == 1 and stats["abandoned"] == 1
+    print(f"   ✓ Answered in {elapsed * 1000:.0f}ms instead of 500ms")
+
+def test_failures_fall_through_immediately():
+    """Failed or invalid answers launch the next provider without waiting"""
+    print("\n" + "=" * 60)
+    print("TESTING FAILOVER")
+    print("=" * 60)
+
+    def broken(symbol):
+        raise ConnectionError("down")
+
+    hedge = HedgedRequest([("broken", broken), ("zero", _provider(0, {"price_usd": 0})),
+                           ("good", _provider(0, {"price_usd": 3.0}))],
+                          accept=lambda r: bool(r) and r["price_usd"] > 0, default_delay=1.0)
+    start = time.perf_counter()
+    assert hedge.call("BTC") == {"price_usd": 3.0}
+    assert time.perf_counter() - start < 0.5
+    assert hedge.get_stats()["hedges"] == 0
+
+    nothing = HedgedRequest([("none", _provider(0, None))])
+    assert nothing.call("BTC") is None and nothing.get_stats()["failures"] == 1
+
+    stuck = HedgedRequest([("stuck", _provider(1.0, {"price_usd": 1.0}))])
+    start = time.perf_counter()
+    assert stuck.call("BTC", timeout=0.1) is None
+    assert time.perf_counter() - start < 0.3
+    print("   ✓ Errors, rejected answers and the overall timeout handled")
+
+def test_hedge_delay_tracks_p95():
+    """Once enough samples exist the delay follows the provider's p95 latency"""
+    print("\n" + "=" * 60)
+    print("TESTING P95 HEDGE DELAY")
+    print("=" * 60)
+
+    hedge = HedgedRequest([("a", _provider(0, 1))], default_delay=0.3, min_samples=20, min_delay=0.01)
+    assert hedge.hedge_delay("a") == 0.3
+    for i in range(100):
+        hedge.latency.record("a", 0.02 if i < 95 else 0.5)
+    assert abs(hedge.hedge_delay("a") - 0.02) < 1e-9
+    hedge.latency.record("a", 0.5)
+    hedge.latency.record("a", 0.5)
+    assert hedge.hedge_delay("a") == 0.5
+    print(f"   ✓ Delay {hedge.hedge_delay('a') * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    test_fast_primary_is_not_hedged()
+    test_slow_primary_is_hedged()
+    test_failures_fall_through_immediately()
+    test_hedge_delay_tracks_p95()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for the revalidating HTTP response cache
+"""
+
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_cache import CachedResponse, DiskCacheStore, HttpCache, MemoryCacheStore
+from http_client import HttpClient
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+    body = b'{"standings": [1, 2, 3]}'
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        etag = '"v1"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if self.path.startswith("/private"):
+            self.send_header("Cache-Control", "no-store")
+        else:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(cls.body)))
+        self.end_headers()
+        self.wfile.write(cls.body)
+
+    def log_message(self, *args):
+        pass
+
+def _serve():
+    _Handler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_fresh_and_revalidated_hits():
+    """Fresh entries skip the network; stale ones come back as a 304 with the stored body"""
+    print("=" * 60)
+    print("TESTING FRESH HITS AND REVALIDATION")
+    print("=" * 60)
+
+    server, base = _serve()
+    try:
+        cache = HttpCache(MemoryCacheStore(), overrides=[(f"{base}/standings", 60)])
+        client = HttpClient(cache=cache)
+        first = client.get(f"{base}/standings")
+        second = client.get(f"{base}/standings")
+        assert first.json() == second.json() == {"standings": [1, 2, 3]}
+        assert len(_Handler.requests_seen) == 1
+        assert getattr(second, "from_cache", False)
+
+        # No override and no max-age: stored for revalidation only
+        for _ in range(3):
+            assert client.get(f"{base}/scoreboard", params={"week": 1}).json() == {"standings": [1, 2, 3]}
+        assert _Handler.requests_seen[1:] == [("/scoreboard?week=1", None),
+                                              ("/scoreboard?week=1", '"v1"'),
+                                              ("/scoreboard?week=1", '"v1"')]
+        stats = cache.get_stats()
+        assert stats['hits'] == 1 and stats['revalidated'] == 2 and stats['misses'] == 2
+        assert stats['bytes_saved'] == 3 * len(_Handler.body)
+        print(f"   ✓ {stats}")
+    finally:
+        server.shutdown()
+
+def test_private_and_no_store_bypass():
+    """no-store responses and requests with credentials in headers or the query string are never cached"""
+    print("\n" + "=" * 60)
+    print("TESTING CACHE BYPASS")
+    print("=" * 60)
+
+    server, base = _serve()
+    try:
+        cache = HttpCache(MemoryCacheStore(), overrides=[])
+        client = HttpClient(cache=cache)
+        client.get(f"{base}/private")
+        client.get(f"{base}/private")
+        client.get(f"{base}/account", headers={"Authorization": "Bearer x"})
+        client.get(f"{base}/account", headers={"Authorization": "Bearer x"})
+        client.get(f"{base}/coins", params={"ids": "bitcoin", "x_cg_pro_api_key": "secret"})
+        client.get(f"{base}/coins?ids=bitcoin&x_cg_pro_api_key=secret")
+        assert [etag for _, etag in _Handler.requests_seen] == [None] * 6
+        assert len(cache.store) == 0
+        print("   ✓ 6 uncached requests")
+    finally:
+        server.shutdown()
+
+def test_disk_store_survives_restart():
+    """The disk store is shared by a fresh cache instance"""
+    print("\n" + "=" * 60)
+    print("TESTING DISK STORE")
+    print("=" * 60)
+
+    server, base = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            listed = [(f"{base}/summary", 0)]
+            HttpClient(cache=HttpCache(DiskCacheStore(directory), listed, listed_only=True)).get(f"{base}/summary")
+            restarted = HttpCache(DiskCacheStore(directory), listed, listed_only=True)
+            response = HttpClient(cache=restarted).get(f"{base}/summary")
+            assert response.json() == {"standings": [1, 2, 3]}
+            assert _Handler.requests_seen == [("/summary", None), ("/summary", '"v1"')]
+            assert restarted.get_stats()['revalidated'] == 1
+
+            # Unlisted URLs are not persisted
+            HttpClient(cache=restarted).get(f"{base}/page")
+            assert len(restarted.store) == 1
+            print("   ✓ Revalidated from disk after restart")
+    finally:
+        server.shutdown()
+
+def test_disk_store_is_bounded():
+    """Old entries and entries beyond the cap are pruned"""
+    print("\n" + "=" * 60)
+    print("TESTING DISK STORE BOUNDS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = DiskCacheStore(directory, max_entries=3, max_age=3600, prune_every=1000)
+        for i in range(5):
+            store.set(f"https://example.com/{i}", CachedResponse(f"https://example.com/{i}", 200, {}, b"x"))
+            os.utime(store._path(f"https://example.com/{i}"), (time.time() - 10 * (5 - i),) * 2)
+        assert store.prune() == 2 and len(store) == 3
+        assert store.get("https://example.com/0") is None and store.get("https://example.com/4") is not None
+
+        assert store.prune(now=time.time() + 3600 - 15) == 2 and len(store) == 1
+        print("   ✓ Capped at 3 entries, then aged out")
+
+if __name__ == "__main__":
+    test_fresh_and_revalidated_hits()
+    test_private_and_no_store_bypass()
+    test_disk_store_survives_restart()
+    test_disk_store_is_bounded()
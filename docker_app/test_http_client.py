@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared pooled HTTP client
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_client import HostLimitExceeded, HttpClient, default_retry
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    active = 0
+    peak = 0
+    connections = set()
+    failures_left = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.connections.add(self.client_address)
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            fail = cls.failures_left > 0
+            cls.failures_left -= fail
+        if self.path == "/slow":
+            time.sleep(0.1)
+        with cls.lock:
+            cls.active -= 1
+        body = b"busy" if fail else self.headers.get("User-Agent", "").encode()
+        self.send_response(503 if fail else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def _serve():
+    _Handler.active = _Handler.peak = _Handler.failures_left = 0
+    _Handler.connections = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_keep_alive_and_default_headers():
+    """Sequential requests reuse one pooled connection and send the shared User-Agent"""
+    print("=" * 60)
+    print("TESTING CONNECTION REUSE")
+    print("=" * 60)
+
+    server, base = _serve()
+    try:
+        client = HttpClient(user_agent="continuum-test")
+        bodies = [client.get(f"{base}/ok").text for _ in range(5)]
+        assert bodies == ["continuum-test"] * 5
+        assert len(_Handler.connections) == 1
+        assert client.get_stats()["127.0.0.1"]["requests"] == 5
+        print(f"   ✓ 5 requests over {len(_Handler.connections)} connection")
+    finally:
+        server.shutdown()
+
+def test_per_host_concurrency_limit():
+    """No more than the host's limit run at once; excess callers queue"""
+    print("\n" + "=" * 60)
+    print("TESTING PER-HOST CONCURRENCY LIMIT")
+    print("=" * 60)
+
+    server, base = _serve()
+    try:
+        client = HttpClient(host_concurrency={"127.0.0.1": 2})
+        threads = [threading.Thread(target=client.get, args=(f"{base}/slow",)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert _Handler.peak == 2
+        assert client.get_stats()["127.0.0.1"]["queued_ms"] > 0
+
+        blocked = HttpClient(host_concurrency={"127.0.0.1": 1}, queue_timeout=0.01)
+        holder = threading.Thread(target=blocked.get, args=(f"{base}/slow",))
+        holder.start()
+        time.sleep(0.03)
+        try:
+            blocked.get(f"{base}/ok")
+            assert False, "expected HostLimitExceeded"
+        except HostLimitExceeded:
+            pass
+        holder.join()
+
+        # A short caller timeout also bounds the wait for a slot
+        patient = HttpClient(host_concurrency={"127.0.0.1": 1})
+        holder = threading.Thread(target=patient.get, args=(f"{base}/slow",))
+        holder.start()
+        time.sleep(0.03)
+        started = time.perf_counter()
+        try:
+            patient.get(f"{base}/ok", timeout=0.02)
+            assert False, "expected HostLimitExceeded"
+        except HostLimitExceeded:
+            assert time.perf_counter() - started < 0.09
+        holder.join()
+        print(f"   ✓ Peak concurrency {_Handler.peak}")
+    finally:
+        server.shutdown()
+
+def test_retries_gateway_errors():
+    """Transient 503s are retried by the shared policy"""
+    print("\n" + "=" * 60)
+    print("TESTING RETRY POLICY")
+    print("=" * 60)
+
+    server, base = _serve()
+    try:
+        client = HttpClient(retry=default_retry(retries=2, backoff=0))
+        _Handler.failures_left = 2
+        response = client.get(f"{base}/ok")
+        assert response.status_code == 200
+
+        _Handler.failures_left = 5
+        assert client.get(f"{base}/ok").status_code == 503
+        print("   ✓ Recovered after 2 retries, gave up after the budget")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_keep_alive_and_default_headers()
+    test_per_host_concurrency_limit()
+    test_retries_gateway_errors()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the local routing intent classifier
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from intent_classifier import IntentClassifier, label_from_assistant, load_labelled_queries
+
+TRAINING = [
+    ("bitcoin price today", "business_finance"), ("should I buy ethereum", "business_finance"),
+    ("how are stocks doing", "business_finance"), ("best dividend stocks to buy", "business_finance"),
+    ("fix my python code", "tech_security"), ("secure my linux server", "tech_security"),
+    ("explain sql injection", "tech_security"), ("write a bash script", "tech_security"),
+    ("who won the grand prix", "formula1"), ("f1 driver standings", "formula1"),
+    ("next formula one race", "formula1"), ("fastest lap at monza", "formula1")
+]
+
+def _train():
+    texts, labels = zip(*TRAINING)
+    return IntentClassifier.train(texts, labels, n_features=2 ** 12)
+
+def test_train_and_classify():
+    """A model trained on labelled queries predicts their domains confidently"""
+    print("=" * 60)
+    print("TESTING TRAINING AND CLASSIFICATION")
+    print("=" * 60)
+
+    model = _train()
+    for text, label in TRAINING:
+        assert model.classify(text).domain == label
+    prediction = model.classify("what is the price of ethereum stocks")
+    assert prediction.domain == "business_finance" and prediction.confidence > 0.5
+    assert abs(model.predict_proba("anything").sum() - 1.0) < 1e-5
+    print(f"   ✓ Unseen query: {prediction}")
+
+def test_save_load_round_trip():
+    """Saved models load quickly and score identically"""
+    print("\n" + "=" * 60)
+    print("TESTING SAVE AND LOAD")
+    print("=" * 60)
+
+    model = _train()
+    model.temperature, model.threshold = 1.7, 0.42
+    path = os.path.join(tempfile.mkdtemp(), "intent_model.npz")
+    model.save(path)
+
+    start = time.perf_counter()
+    loaded = IntentClassifier.load(path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    assert loaded.labels == model.labels
+    assert (loaded.temperature, loaded.threshold) == (1.7, 0.42)
+    assert loaded.classify("secure my server") == model.classify("secure my server")
+
+    start = time.perf_counter()
+    for _ in range(200):
+        loaded.classify("secure my server")
+    score_us = (time.perf_counter() - start) / 200 * 1e6
+    print(f"   ✓ Loaded in {load_ms:.1f}ms, scored in {score_us:.0f}us")
+
+def test_labelled_query_loading():
+    """Corpus lines and telemetry response events both become training examples"""
+    print("\n" + "=" * 60)
+    print("TESTING TRAINING DATA LOADING")
+    print("=" * 60)
+
+    assert label_from_assistant("lazy_business_finance_assistant") == "business_finance"
+    assert label_from_assistant("lazy_aviation_assistant_claude") == "aviation"
+    assert label_from_assistant("direct_response") is None
+
+    records = [
+        {"query": "bitcoin price", "label": "business_finance"},
+        {"query": "who won the race", "assistant_used": "lazy_formula1_assistant", "query_length": 16},
+        {"query": "x" * 100 + "...", "assistant_used": "lazy_formula1_assistant", "query_length": 150},
+        {"query": "what time is it", "assistant_used": "direct_response"}
+    ]
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+        f.write("\n".join(json.dumps(r) for r in records))
+    try:
+        texts, labels = load_labelled_queries([f.name])
+    finally:
+        os.unlink(f.name)
+    assert texts == ["bitcoin price", "who won the race"]
+    assert labels == ["business_finance", "formula1"]
+    print("   ✓ Truncated and unroutable queries skipped")
+
+def test_calibration():
+    """Held-out calibration softens overconfidence and only sets a threshold the held-out data supports"""
+    print("\n" + "=" * 60)
+    print("TESTING CALIBRATION")
+    print("=" * 60)
+
+    texts, labels = zip(*TRAINING)
+    model = _train()
+    assert model.threshold == float("inf")
+
+    # Held-out prompts mostly labelled against what the model predicts: no threshold qualifies
+    wrong = [TRAINING[(i + 4) % len(TRAINING)][1] for i in range(len(TRAINING))]
+    report = model.calibrate(list(texts), wrong)
+    assert report['threshold'] == float("inf") and report['coverage'] == 0.0
+    assert report['temperature'] > 1.0
+
+    # Held-out prompts the model gets right: a finite threshold that routes them
+    model = _train()
+    report = model.calibrate(list(texts), list(labels))
+    assert report['accuracy'] == 1.0 and report['threshold'] <= 1.0
+    assert report['coverage'] == 1.0 and report['routed_accuracy'] == 1.0
+    assert model.classify("bitcoin price today").confidence >= model.threshold
+    print(f"   ✓ Temperature {report['temperature']:.2f}, threshold {report['threshold']:.2f}")
+
+if __name__ == "__main__":
+    test_train_and_classify()
+    test_save_load_round_trip()
+    test_labelled_query_loading()
+    test_calibration()
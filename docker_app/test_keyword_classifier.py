@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled keyword classifier shared by the routers
+"""
+
+import os
+
+os.environ.setdefault("ENABLE_TELEMETRY", "false")
+
+from keyword_classifier import KeywordClassifier, KeywordMatch, tokenize
+from router_config import classify, contains_keywords, detect_query_type
+
+def test_single_pass_matches_with_spans():
+    """Every domain is matched in one pass with character spans"""
+    print("=" * 60)
+    print("TESTING SINGLE-PASS CLASSIFICATION")
+    print("=" * 60)
+
+    classifier = KeywordClassifier({
+        "formula1": ["grand prix", "driver"],
+        "crypto": ["bitcoin", "btc"],
+        "realtime": ["real-time", "now"]
+    })
+    text = "Real-time Bitcoin odds for the Monaco Grand Prix drivers now"
+    matched = classifier.classify(text)
+
+    assert set(matched) == {"formula1", "crypto", "realtime"}
+    grand_prix = text.index("Grand Prix")
+    assert matched["formula1"] == (KeywordMatch("grand prix", grand_prix, grand_prix + 10),
+                                   KeywordMatch("driver", grand_prix + 11, grand_prix + 18))
+    assert text[slice(*matched["crypto"][0][1:])] == "Bitcoin"
+    assert [m.keyword for m in matched["realtime"]] == ["real-time", "now"]
+    print(f"   ✓ Matched: { {d: [m.keyword for m in ms] for d, ms in matched.items()} }")
+
+def test_whole_word_matching():
+    """Keywords no longer match inside unrelated words"""
+    print("\n" + "=" * 60)
+    print("TESTING WHOLE-WORD MATCHING")
+    print("=" * 60)
+
+    classifier = KeywordClassifier({"crypto": ["eth", "coin"], "formula1": ["lap", "team"]})
+    assert classifier.classify("whether to overlap the steam schedule") == {}
+    assert classifier.matches("ETH and coins", "crypto")
+    print("   ✓ 'whether', 'overlap' and 'steam' are not keyword hits")
+
+def test_results_are_memoized():
+    """Repeated questions about one prompt reuse a single classification"""
+    print("\n" + "=" * 60)
+    print("TESTING MEMOIZATION")
+    print("=" * 60)
+
+    classifier = KeywordClassifier({"time": ["time"], "aviation": ["flight"]})
+    prompt = "what time is my flight"
+    for domain in ("time", "aviation", "crypto"):
+        classifier.matches(prompt, domain)
+    info = classifier.classify.cache_info()
+    assert info.misses == 1 and info.hits == 2
+    assert tokenize(prompt)[1] == ("time", 5, 9)
+    print(f"   ✓ Cache: {info}")
+
+def test_router_config_tables():
+    """router_config, the unified router and telemetry share the compiled tables"""
+    print("\n" + "=" * 60)
+    print("TESTING ROUTER CONFIG TABLES")
+    print("=" * 60)
+
+    assert contains_keywords("Is the Boeing 737 late?", "aviation_context")
+    assert contains_keywords("What are the busiest airports?", "aviation_context")
+    assert "realtime" in classify("latest real-time market data")
+    assert not contains_keywords("anything", "unknown-domain")
+
+    import unified_router
+    assert unified_router.classify is classify
+    assert {"crypto_forecast", "crypto_terms"} <= set(classify("btc forecast for my crypto wallet"))
+
+    assert detect_query_type("Bitcoin predictions for next week") == "crypto"
+    assert detect_query_type("How are stocks doing?") == "finance"
+    assert detect_query_type("Who is the fastest F1 driver?") == "formula1"
+    assert detect_query_type("Tell me whether it rains") == "general"
+    print("   ✓ Query types detected from shared tables")
+
+if __name__ == "__main__":
+    test_single_pass_matches_with_spans()
+    test_whole_word_matching()
+    test_results_are_memoized()
+    test_router_config_tables()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for the background market/sports snapshot service
+"""
+
+import time
+
+from cache_freshness import data_versions
+from market_snapshot_service import FakeFeedPoller, MarketSnapshotService, fake_pollers
+from realtime_data_access import RealTimeDataAccess
+
+def test_snapshots_are_immutable_and_stamped():
+    """Polls produce read-only snapshots with an age stamp"""
+    print("=" * 60)
+    print("TESTING SNAPSHOTS")
+    print("=" * 60)
+
+    service = MarketSnapshotService(fake_pollers(seed=1))
+    service.refresh_all()
+
+    quotes = service.get("crypto_quotes")
+    assert quotes.data["BTC"]["price_usd"] > 0
+    try:
+        quotes.data["BTC"]["price_usd"] = 0
+        assert False, "snapshot data should be read-only"
+    except TypeError:
+        pass
+    assert quotes.stamp().startswith("as of ")
+
+    text = service.crypto_context("how are bitcoin and ethereum doing in this market")
+    assert text.startswith("BTC: $") and "| ETH: $" in text and "Total Market Cap" in text
+    assert service.crypto_context("what is the price of PEPE") is not None  # top coins
+    assert service.f1_context().startswith("Next: Monaco Grand Prix")
+    print(f"   ✓ {text}")
+
+def test_failed_poll_keeps_previous_snapshot():
+    """A failed poll keeps the last snapshot until it goes stale"""
+    print("\n" + "=" * 60)
+    print("TESTING FAILED POLLS AND STALENESS")
+    print("=" * 60)
+
+    service = MarketSnapshotService([
+        FakeFeedPoller("f1_next_race", ["Next: Silverstone"], interval=0.05, max_age=0.2, publish_as="test_f1")
+    ])
+    first = service.refresh("f1_next_race")
+    assert first and data_versions.get("test_f1") == first.version
+    assert service.refresh("f1_next_race") is None  # feed exhausted
+    assert service.get("f1_next_race") is first
+
+    time.sleep(0.25)
+    assert service.get("f1_next_race") is None
+    assert service.get("f1_next_race", allow_stale=True) is first
+    stats = service.get_stats()
+    assert stats["poll_failures"] == 1 and stats["stale_reads"] == 2
+    print(f"   ✓ Stats: { {k: v for k, v in stats.items() if k != 'sources'} }")
+
+def test_background_polling_feeds_enrichment():
+    """Request-time enrichment reads the snapshot instead of calling upstream"""
+    print("\n" + "=" * 60)
+    print("TESTING ENRICHMENT FROM SNAPSHOTS")
+    print("=" * 60)
+
+    import realtime_data_access
+
+    service = MarketSnapshotService(fake_pollers(seed=2, interval=0.05))
+    rtda = RealTimeDataAccess()
+
+    def upstream(*args):
+        raise AssertionError("upstream called")
+
+    rtda.get_crypto_prices = upstream
+    rtda.get_f1_data = upstream
+
+    original = realtime_data_access.market_snapshots
+    realtime_data_access.market_snapshots = service
+    try:
+        assert service.start() and not service.start()
+        time.sleep(0.1)
+        data = rtda.get_relevant_realtime_data("bitcoin price before the next f1 race", "general")
+    finally:
+        service.stop()
+        realtime_data_access.market_snapshots = original
+
+    assert data.startswith("CRYPTO PRICES: BTC: $")
+    assert "F1 DATA: Next: Monaco Grand Prix" in data
+    assert service.get_stats()["polls"] >= 4 and not service.running
+    print("   ✓ No upstream calls during enrichment")
+
+if __name__ == "__main__":
+    test_snapshots_are_immutable_and_stamped()
+    test_failed_poll_keeps_previous_snapshot()
+    test_background_polling_feeds_enrichment()
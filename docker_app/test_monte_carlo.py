@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the Monte Carlo price scenario engine
+"""
+
+import tempfile
+import time
+
+import numpy as np
+
+import direct_crypto_forecast
+from benchmark_forecast_backtest import synthetic_history
+from direct_crypto_forecast import DirectCryptoForecast
+from monte_carlo import MonteCarloEngine, percentile_bands, simulate_paths
+from ohlcv_store import OHLCVStore
+
+def _no_network(*args):
+    raise AssertionError("scenarios must come from local candles")
+
+def test_paths_follow_history():
+    """Bootstrapped paths only reuse historical returns; GBM bands match the fitted lognormal"""
+    print("=" * 60)
+    print("TESTING SIMULATED PATHS")
+    print("=" * 60)
+
+    returns = np.log(np.array([1.01, 0.99] * 50))
+    cumulative = simulate_paths(returns, 30, 10_000, "bootstrap", np.random.default_rng(0))
+    assert cumulative.shape == (10_000, 30)
+    assert np.allclose(np.unique(np.round(cumulative[:, 0], 12)), np.round(returns[:2][::-1], 12))
+
+    rng = np.random.default_rng(1)
+    returns = rng.normal(0.001, 0.03, 365)
+    bands = percentile_bands(100.0, simulate_paths(returns, 30, 10_000, "gbm", np.random.default_rng(2)))
+    sigma = returns.std(ddof=1) * np.sqrt(30)
+    assert abs(bands['30d']['p50'] / (100 * np.exp(returns.mean() * 30)) - 1) < 0.01
+    assert abs(bands['30d']['p95'] / (100 * np.exp(returns.mean() * 30 + 1.645 * sigma)) - 1) < 0.02
+    for band in bands.values():
+        assert band['p5'] < band['p25'] < band['p50'] < band['p75'] < band['p95']
+    assert bands['1d']['p95'] - bands['1d']['p5'] < bands['30d']['p95'] - bands['30d']['p5']
+    print(f"   ✓ 30d band ${bands['30d']['p5']:.2f}-${bands['30d']['p95']:.2f}")
+
+def test_engine_bands_from_local_store():
+    """10k paths from stored candles in well under 100 ms; too little history gives None"""
+    print("\n" + "=" * 60)
+    print("TESTING SCENARIO ENGINE")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root, fetcher=_no_network)
+        store.append("BTC", "1d", synthetic_history(400, 3, 60000))
+        store.append("NEW", "1d", synthetic_history(20, 4))
+        engine = MonteCarloEngine(store)
+        engine.simulate("BTC")
+        start = time.perf_counter()
+        scenarios = engine.simulate("btc", spot=61000.0, seed=5)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        assert engine.simulate("NEW") is None and engine.simulate("NONE") is None
+        assert engine.simulate("BTC", method="gbm", seed=5)['method'] == "gbm"
+        lines = engine.format_bands(["BTC", "NEW"])
+    assert elapsed_ms < 100, elapsed_ms
+    assert scenarios['method'] == "bootstrap" and scenarios['paths'] == 10_000 and scenarios['spot'] == 61000.0
+    assert scenarios['history_days'] == 364 and set(scenarios['horizons']) == {"1d", "7d", "30d"}
+    assert scenarios == MonteCarloEngine(store).simulate("BTC", spot=61000.0, seed=5) | {
+        'compute_ms': scenarios['compute_ms']}
+    assert lines.startswith("BTC: 90% range, 10,000 bootstrap paths: 1d $") and "NEW: not enough" in lines
+    print(f"   ✓ {elapsed_ms:.1f} ms: {lines.splitlines()[0]}")
+
+def test_forecast_answer_includes_bands():
+    """get_direct_forecast answers carry scenario bands next to the point target"""
+    print("\n" + "=" * 60)
+    print("TESTING FORECAST INTEGRATION")
+    print("=" * 60)
+
+    engines = (direct_crypto_forecast.indicator_engine, direct_crypto_forecast.scenario_engine)
+    saved = [engine.store for engine in engines]
+    forecaster = DirectCryptoForecast()
+    forecaster.get_direct_price = lambda symbol: {'symbol': symbol, 'price_usd': 3000.0, 'source': 'test'}
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root, fetcher=_no_network)
+        # Complete daily candles up to yesterday, so nothing needs backfilling
+        history = synthetic_history(200, 6, 3000)
+        history["time"] = history["time"] - history["time"][-1] + int(time.time()) // 86400 * 86400 - 86400
+        store.append("ETH", "1d", history)
+        for engine in engines:
+            engine.store = store
+        try:
+            answer = forecaster.generate_forecast_response("ethereum price next week")
+            analysis = forecaster.get_growth_potential("ETH", forecaster.HORIZON_SHORT)
+        finally:
+            for engine, original in zip(engines, saved):
+                engine.store = original
+    assert "ETH: Current $3,000" in answer and "\n  Scenarios: 90% range, 10,000 bootstrap paths" in answer
+    assert analysis['scenarios']['spot'] == 3000.0 and "30d" in analysis['scenarios']['horizons']
+    print("   ✓ " + answer.splitlines()[-1].strip())
+
+if __name__ == "__main__":
+    test_paths_follow_history()
+    test_engine_bands_from_local_store()
+    test_forecast_answer_includes_bands()
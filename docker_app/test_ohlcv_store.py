@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test script for the local OHLCV candle store
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+import ohlcv_store
+from ohlcv_store import OHLCVStore, downsample
+
+START = 1_700_006_400  # Midnight UTC
+
+def _minutes(count, start=START):
+    times = start + 60 * np.arange(count, dtype=np.int64)
+    close = 100 + np.arange(count, dtype=np.float64)
+    return {"time": times, "open": close - 0.5, "high": close + 1, "low": close - 1, "close": close,
+            "volume": np.ones(count)}
+
+def test_append_range_and_reopen():
+    """Appends skip already-stored candles, ranges are half-open, and a reopened store sees the same rows"""
+    print("=" * 60)
+    print("TESTING APPEND AND RANGE QUERIES")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root)
+        assert store.append("BTC", "1m", _minutes(100)) == 100
+        assert store.append("BTC", "1m", _minutes(20, START + 60 * 90)) == 10  # 10 overlap
+        window = store.range("BTC", "1m", START + 60 * 10, START + 60 * 20)
+        assert list(window["close"]) == [110.0 + i for i in range(10)]
+
+        # An append interrupted after some columns were written is trimmed on reopen
+        with open(os.path.join(root, "BTC-USD", "60", "time.bin"), "ab") as f:
+            f.write(np.int64(0).tobytes())
+        reopened = OHLCVStore(root)
+        assert reopened.partition("BTC", "1m").rows == 110
+        assert reopened.range("BTC", "1m")["close"][-1] == 119.0
+        print(f"   ✓ {reopened.partition('BTC', '1m').rows} rows after reopen")
+
+def test_downsampled_queries():
+    """Coarser granularities are aggregated from finer partitions"""
+    print("\n" + "=" * 60)
+    print("TESTING DOWNSAMPLING")
+    print("=" * 60)
+
+    candles = _minutes(180)
+    hourly = downsample(candles, 3600)
+    assert list(hourly["time"]) == [START, START + 3600, START + 7200]
+    assert hourly["open"][1] == candles["open"][60] and hourly["close"][1] == candles["close"][119]
+    assert hourly["high"][1] == candles["high"][119] and hourly["low"][1] == candles["low"][60]
+    assert hourly["volume"][1] == 60
+
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root)
+        store.append("ETH", "1m", candles)
+        from_store = store.range("ETH", "1h", START + 3600)
+        assert list(from_store["close"]) == [219.0, 279.0]
+        assert store.get_stats()['downsampled'] == 1
+        print(f"   ✓ 180 one-minute candles -> {len(hourly['time'])} hourly")
+
+def test_incremental_backfill():
+    """Backfill only requests candles newer than the last stored one"""
+    print("\n" + "=" * 60)
+    print("TESTING INCREMENTAL BACKFILL")
+    print("=" * 60)
+
+    requests = []
+
+    def fetcher(product, seconds, start, end):
+        requests.append((start, end))
+        return [[t, 1.0, 3.0, 2.0, 2.5, 10.0] for t in range(end - seconds, start - 1, -seconds)]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root, fetcher=fetcher, request_pause=0)
+        now = START + 1000 * 60 + 30
+        assert store.backfill("SOL", "1m", lookback=1000 * 60, now=now) == 1000
+        assert len(requests) == 4  # 300 candles per request
+
+        requests.clear()
+        assert store.backfill("SOL", "1m", now=now + 5 * 60) == 5
+        assert requests == [(START + 1000 * 60, START + 1005 * 60)]
+
+        requests.clear()
+        history = store.history("SOL", "1m", periods=10, now=now + 5 * 60)
+        assert len(history["time"]) == 10 and requests == []
+        print(f"   ✓ {store.get_stats()}")
+
+def test_deeper_history_prepends_older_candles():
+    """A deeper request than the first one downloads the older range once and prepends it"""
+    print("\n" + "=" * 60)
+    print("TESTING DEEPER HISTORY")
+    print("=" * 60)
+
+    requests = []
+    listed = START - 200 * 86400  # The exchange has nothing older than this
+
+    def fetcher(product, seconds, start, end):
+        requests.append((start, end))
+        return [[t, 1.0, 3.0, 2.0, float(t), 10.0] for t in range(end - seconds, max(start, listed) - 1, -seconds)]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root, fetcher=fetcher, request_pause=0)
+        now = START + 3600
+        assert len(store.history("BTC", "1d", 7, now=now)["time"]) == 7
+
+        requests.clear()
+        deeper = store.history("BTC", "1d", 365, now=now)
+        assert len(deeper["time"]) == 200 and np.all(np.diff(deeper["time"]) == 86400)
+        assert list(deeper["close"][-7:]) == [float(START - 86400 * i) for i in range(7, 0, -1)]
+        assert requests and all(end <= START - 7 * 86400 for _, end in requests)
+
+        # Already as deep as the exchange goes: no further requests
+        requests.clear()
+        assert len(store.history("BTC", "1d", 365, now=now)["time"]) == 200 and requests == []
+
+        # A prepend interrupted before its commit marker leaves the old columns
+        partition = store.partition("BTC", "1d")
+        with open(partition._path("close") + ".tmp", "wb") as f:
+            f.write(b"partial")
+        assert OHLCVStore(root).partition("BTC", "1d").rows == 200
+        assert not os.path.exists(partition._path("close") + ".tmp")
+        print(f"   ✓ 7 then 365 days -> {len(deeper['time'])} candles")
+
+def test_failed_backfill_backs_off():
+    """A symbol the exchange has no candles for is not re-requested on every call"""
+    print("\n" + "=" * 60)
+    print("TESTING BACKFILL FAILURE BACKOFF")
+    print("=" * 60)
+
+    requests = []
+
+    def fetcher(product, seconds, start, end):
+        requests.append((start, end))
+        return []
+
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root, fetcher=fetcher, request_pause=0)
+        now = START + 3600
+        assert len(store.history("NOPE", "1d", 30, now=now)["time"]) == 0 and requests
+
+        requests.clear()
+        assert len(store.history("NOPE", "1d", 30, now=now)["time"]) == 0 and requests == []
+        assert store.get_stats()["backfill_backoffs"] == 1
+
+        saved = ohlcv_store.BACKFILL_FAILURE_BACKOFF
+        ohlcv_store.BACKFILL_FAILURE_BACKOFF = 0
+        try:
+            store.history("NOPE", "1d", 30, now=now)
+        finally:
+            ohlcv_store.BACKFILL_FAILURE_BACKOFF = saved
+        assert requests
+        print(f"   ✓ {store.get_stats()}")
+
+if __name__ == "__main__":
+    test_append_range_and_reopen()
+    test_downsampled_queries()
+    test_incremental_backfill()
+    test_deeper_history_prepends_older_candles()
+    test_failed_backfill_backs_off()
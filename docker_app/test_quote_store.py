@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared crypto quote store
+"""
+
+import threading
+import time
+
+from quote_store import MAX_AGE_LIVE, QuoteStore, quote_store
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_per_caller_freshness():
+    """One stored quote satisfies a relaxed caller but not a strict one"""
+    print("=" * 60)
+    print("TESTING PER-CALLER FRESHNESS")
+    print("=" * 60)
+
+    clock = _Clock()
+    store = QuoteStore(stripes=4, clock=clock)
+    store.put("btc", 65000.0, "binance", change_24h=1.5)
+    clock.now += 10
+    assert store.get("BTC", max_age=MAX_AGE_LIVE) is None
+    quote = store.get("BTC", max_age=60)
+    assert quote.price == 65000.0 and quote.source == "binance" and quote.age(clock.now) == 10
+    assert quote.as_dict()["price_usd"] == 65000.0 and quote.as_dict()["change_24h"] == 1.5
+    assert store.get("BTC", quote="EUR") is None
+
+    # An older fetch finishing late never replaces a newer quote
+    store.put("BTC", 64000.0, "coingecko", fetched_at=clock.now - 20)
+    assert store.peek("BTC").source == "binance"
+
+    # A newer price-only write keeps the market details of the quote it replaces
+    store.put_payload("BTC", {'price_usd': 65000.0, 'source': 'coingecko', 'change_24h': 1.5,
+                              'market_cap': 1.3e12, 'volume_24h': 3.0e10})
+    clock.now += 1
+    store.put("BTC", 65100.0, "coinbase_public")
+    details = store.peek("BTC").as_dict()
+    assert details['price_usd'] == 65100.0 and details['change_24h'] == 1.5 and details['market_cap'] == 1.3e12
+    clock.now += 600
+    store.put("BTC", 65200.0, "coinbase_public")
+    assert store.peek("BTC").change_24h is None and 'volume_24h' not in store.peek("BTC").as_dict()
+    stats = store.get_stats()
+    assert stats['hits'] == 1 and stats['stale'] == 1 and stats['misses'] == 1
+    print(f"   ✓ {stats}")
+
+def test_concurrent_misses_share_one_fetch():
+    """Simultaneous misses for one key make a single upstream call"""
+    print("\n" + "=" * 60)
+    print("TESTING SHARED UPSTREAM FETCH")
+    print("=" * 60)
+
+    store = QuoteStore()
+    calls = []
+
+    def fetch(symbol):
+        calls.append(symbol)
+        time.sleep(0.05)
+        return {'price_usd': 3200.0, 'source': 'coinbase'}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.get_or_fetch("ETH", fetch, 5)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == ["ETH"] and all(quote.price == 3200.0 for quote in results)
+    assert store.get_or_fetch("ETH", fetch, 5).source == "coinbase" and calls == ["ETH"]
+    assert store.get_or_fetch("NOPE", lambda symbol: None) is None
+    stats = store.get_stats()
+    assert stats['upstream_calls'] == 2 and stats['upstream_failures'] == 1
+    print(f"   ✓ 8 callers, {len(calls)} upstream call")
+
+def test_price_paths_share_the_store():
+    """A Coinbase batch quote serves the direct API and the crypto data service"""
+    print("\n" + "=" * 60)
+    print("TESTING SHARED STORE ACROSS PRICE PATHS")
+    print("=" * 60)
+
+    from benchmark_coinbase_calls import CountingSession
+    from coinbase_api_service import CoinbaseAPIService
+    from crypto_data_service import crypto_data_service
+    from direct_crypto_api import DirectCryptoAPI
+    from hedged_request import HedgedRequest
+
+    def unreachable(symbol):
+        raise AssertionError("upstream called")
+
+    quote_store.clear()
+    coinbase = CoinbaseAPIService()
+    coinbase.session = CountingSession(latency=0)
+    coinbase.get_spot_prices(["BTC-USD", "ETH-USD"])
+
+    direct = DirectCryptoAPI()
+    direct.price_hedge = HedgedRequest([("unreachable", unreachable)])
+    btc = direct.get_current_price("BTC")
+    assert btc["source"] == "coinbase_public" and btc["price_usd"] > 0
+    eth = crypto_data_service.get_crypto_price("ETH")
+    assert eth["source"] == "coinbase_public"
+    print(f"   ✓ BTC ${btc['price_usd']:,.2f} from {btc['source']}")
+    quote_store.clear()
+
+if __name__ == "__main__":
+    test_per_caller_freshness()
+    test_concurrent_misses_share_one_fetch()
+    test_price_paths_share_the_store()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the deadline-bounded real-time data fan-out
+"""
+
+import time
+
+from realtime_data_access import RealTimeDataAccess
+
+def _slow(seconds, result):
+    def fetch(*args):
+        time.sleep(seconds)
+        return result
+    return fetch
+
+def test_sources_run_concurrently():
+    """Total time is the slowest source, not the sum"""
+    print("=" * 60)
+    print("TESTING CONCURRENT FAN-OUT")
+    print("=" * 60)
+
+    rtda = RealTimeDataAccess()
+    rtda.get_crypto_prices = _slow(0.2, "BTC: $100,000.00 (+1.00%)")
+    rtda.get_f1_data = _slow(0.2, "Next: Monaco Grand Prix")
+    rtda.get_aviation_data = _slow(0.2, "N12345 at FL350")
+
+    start = time.perf_counter()
+    data = rtda.get_relevant_realtime_data("bitcoin price, next f1 race and flight N12345", "general", budget=2.0)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5, elapsed
+    parts = data.split("\n\n")
+    assert parts[0] == "CRYPTO PRICES: BTC: $100,000.00 (+1.00%)"
+    assert parts[1] == "F1 DATA: Next: Monaco Grand Prix"
+    assert parts[-1] == "AVIATION: N12345 at FL350"
+    stats = rtda.get_source_stats()
+    assert stats["crypto"]["ok"] == 1 and stats["crypto"]["last_ms"] >= 200
+    print(f"   ✓ Three 200ms sources in {elapsed * 1000:.0f}ms")
+
+def test_late_source_uses_snapshot_or_is_dropped():
+    """A source that misses the deadline falls back to its last known-good result"""
+    print("\n" + "=" * 60)
+    print("TESTING DEADLINE AND SNAPSHOTS")
+    print("=" * 60)
+
+    rtda = RealTimeDataAccess()
+    rtda.get_f1_data = _slow(0.5, "Next: Silverstone")
+    start = time.perf_counter()
+    data = rtda.get_relevant_realtime_data("when is the next f1 race", "general", budget=0.05)
+    assert time.perf_counter() - start < 0.3
+    assert "F1 DATA" not in data
+    assert rtda.get_source_stats()["f1"]["late"] == 1
+
+    # The late fetch finishes in the background and becomes the snapshot
+    time.sleep(0.6)
+    data = rtda.get_relevant_realtime_data("when is the next f1 race", "general", budget=0.05)
+    assert data.startswith("F1 DATA (delayed): Next: Silverstone (as of ")
+    assert rtda.get_source_stats()["f1"]["stale_served"] == 1
+
+    # Query-dependent sources only reuse a snapshot taken for the same arguments
+    rtda.get_aviation_data = _slow(0.2, "N12345 at FL350")
+    rtda.get_relevant_realtime_data("flight N12345", "general", budget=1.0)
+    rtda.get_aviation_data = _slow(0.5, "N67890 at FL200")
+    data = rtda.get_relevant_realtime_data("flight N67890", "general", budget=0.05)
+    assert "N12345" not in data
+    rtda.get_aviation_data = _slow(0.5, "N12345 at FL360")
+    data = rtda.get_relevant_realtime_data("flight N12345", "general", budget=0.05)
+    assert data.startswith("AVIATION (delayed): N12345 at FL350 (as of ")
+    print("   ✓ Dropped on first miss, snapshot served on the next")
+
+def test_snapshots_are_bounded():
+    """Per-query snapshots are capped in number and expired entries are pruned on write"""
+    print("\n" + "=" * 60)
+    print("TESTING SNAPSHOT BOUNDS")
+    print("=" * 60)
+
+    import realtime_data_access
+
+    rtda = RealTimeDataAccess()
+    saved = realtime_data_access.REALTIME_SNAPSHOT_MAX_ENTRIES
+    realtime_data_access.REALTIME_SNAPSHOT_MAX_ENTRIES = 3
+    try:
+        for i in range(10):
+            rtda._timed_fetch("web", lambda q: f"page for {q}", f"query {i}")
+        assert [args for _, args in rtda._last_good] == [("query 7",), ("query 8",), ("query 9",)]
+
+        rtda._last_good.clear()
+        rtda._last_good[("web", ("old query",))] = (0.0, "ancient")
+        rtda._timed_fetch("web", lambda q: "fresh", "query 10")
+        assert list(rtda._last_good) == [("web", ("query 10",))]
+    finally:
+        realtime_data_access.REALTIME_SNAPSHOT_MAX_ENTRIES = saved
+    print("   ✓ Capped at 3 entries, expired ones pruned")
+
+def test_failed_source_keeps_fallback():
+    """A source that fails inside the budget still gets its static fallback"""
+    print("\n" + "=" * 60)
+    print("TESTING FAILURE FALLBACK")
+    print("=" * 60)
+
+    rtda = RealTimeDataAccess()
+
+    def broken(*args):
+        raise ConnectionError("unreachable")
+
+    rtda.get_aviation_data = broken
+    data = rtda.get_relevant_realtime_data("airport delays", "general", budget=1.0)
+    assert data == "AVIATION: Check flight tracking services"
+    assert rtda.get_source_stats()["aviation"]["errors"] == 1
+    print("   ✓ Fallback text used")
+
+if __name__ == "__main__":
+    test_sources_run_concurrently()
+    test_late_source_uses_snapshot_or_is_dropped()
+    test_failed_source_keeps_fallback()
+    test_snapshots_are_bounded()
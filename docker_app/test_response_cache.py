@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Test script for the ResponseCache tiers
+"""
+
+import os
+import threading
+import time
+
+os.environ.setdefault("LOCAL_DEV", "1")
+
+from response_cache import LocalCacheTier, ResponseCache
+from cache_freshness import (data_versions, dependent_versions, entity_source, get_freshness,
+                             adjust_for_time_sensitivity)
+from cache_compression import PayloadCodec, build_zdict
+
+class LocalDynamoDB:
+    """In-memory stand-in for the DynamoDB resource calls used by ResponseCache"""
+
+    def __init__(self, unprocessed_first_write=False, write_gate=None):
+        self.items = {}
+        self.calls = {"batch_write_item": 0, "batch_get_item": 0, "get_item": 0}
+        self.unprocessed_first_write = unprocessed_first_write
+        # Holds batch writes until set, to observe a write in flight
+        self.write_gate = write_gate
+        self.writing = threading.Event()
+
+    def Table(self, name):
+        stand_in = self
+
+        class _Table:
+            def get_item(self, Key):
+                stand_in.calls["get_item"] += 1
+                item = stand_in.items.get(Key["cache_key"])
+                return {"Item": item} if item else {}
+
+        return _Table()
+
+    def batch_write_item(self, RequestItems):
+        self.calls["batch_write_item"] += 1
+        self.writing.set()
+        if self.write_gate is not None:
+            self.write_gate.wait()
+        for table_name, requests in RequestItems.items():
+            assert len(requests) <= 25
+            if self.unprocessed_first_write:
+                self.unprocessed_first_write = False
+                return {"UnprocessedItems": {table_name: requests}}
+            for request in requests:
+                item = request["PutRequest"]["Item"]
+                self.items[item["cache_key"]] = item
+        return {"UnprocessedItems": {}}
+
+    def batch_get_item(self, RequestItems):
+        self.calls["batch_get_item"] += 1
+        responses = {}
+        for table_name, request in RequestItems.items():
+            assert len(request["Keys"]) <= 100
+            responses[table_name] = [self.items[k["cache_key"]] for k in request["Keys"] if k["cache_key"] in self.items]
+        return {"Responses": responses, "UnprocessedKeys": {}}
+
+def test_local_tier_lru_eviction():
+    """Least recently used entries are evicted once the entry cap is hit"""
+    print("=" * 60)
+    print("TESTING LOCAL TIER LRU EVICTION")
+    print("=" * 60)
+
+    tier = LocalCacheTier(max_entries=2, max_bytes=1024 * 1024)
+    tier.set("a", "alpha", ttl=60, now=0)
+    tier.set("b", "beta", ttl=60, now=0)
+    assert tier.get("a", now=1) == "alpha"  # "b" is now least recently used
+    tier.set("c", "gamma", ttl=60, now=1)
+
+    assert tier.get("b", now=2) is None
+    assert tier.get("a", now=2) == "alpha"
+    assert tier.get("c", now=2) == "gamma"
+    assert tier.get_stats()["evictions"] == 1
+    print("   ✓ LRU entry evicted at capacity")
+
+def test_local_tier_byte_budget():
+    """Byte budget bounds memory regardless of entry count"""
+    print("\n" + "=" * 60)
+    print("TESTING LOCAL TIER BYTE BUDGET")
+    print("=" * 60)
+
+    entry_size = LocalCacheTier.estimate_size("k0", "x" * 1000)
+    tier = LocalCacheTier(max_entries=1000, max_bytes=entry_size * 3)
+    for i in range(10):
+        tier.set(f"k{i}", "x" * 1000, ttl=60, now=0)
+
+    stats = tier.get_stats()
+    assert stats["entries"] == 3
+    assert stats["bytes_held"] <= stats["max_bytes"]
+    assert stats["evictions"] == 7
+
+    # An entry larger than the whole budget is never held
+    assert tier.set("huge", "x" * (entry_size * 4), ttl=60, now=0) is False
+    print(f"   ✓ Bytes held: {stats['bytes_held']} / {stats['max_bytes']}")
+
+def test_local_tier_ttl():
+    """Expired entries are misses and release their bytes"""
+    print("\n" + "=" * 60)
+    print("TESTING LOCAL TIER TTL")
+    print("=" * 60)
+
+    tier = LocalCacheTier(max_entries=10, max_bytes=1024 * 1024)
+    tier.set("a", "alpha", ttl=10, now=0)
+    assert tier.get("a", now=5) == "alpha"
+    assert tier.get("a", now=11) is None
+
+    stats = tier.get_stats()
+    assert stats["bytes_held"] == 0
+    assert stats["expirations"] == 1
+    assert stats["hit_ratio"] == 0.5
+    print(f"   ✓ Stats: {stats}")
+
+def test_response_cache_local_only():
+    """ResponseCache serves from the bounded local tier without DynamoDB"""
+    print("\n" + "=" * 60)
+    print("TESTING RESPONSE CACHE (LOCAL ONLY)")
+    print("=" * 60)
+
+    cache = ResponseCache(ttl=60)
+    key = cache.get_cache_key("Bitcoin price", "model-a", "alice")
+    assert cache.get(key) is None
+    cache.set(key, "BTC is $100")
+    assert cache.get(key) == "BTC is $100"
+    assert cache.get_stats()["local"]["hits"] == 1
+    print("   ✓ Local set/get round trip")
+
+def test_write_behind_batches():
+    """set() only queues; the worker flushes with BatchWriteItem"""
+    print("\n" + "=" * 60)
+    print("TESTING WRITE-BEHIND PERSISTENCE")
+    print("=" * 60)
+
+    dynamodb = LocalDynamoDB(unprocessed_first_write=True)
+    cache = ResponseCache(ttl=60, dynamodb=dynamodb)
+    cache.flush_interval = 60  # Only flush on full batches or explicit flush()
+
+    for i in range(30):
+        cache.set(f"key-{i}", f"response-{i}")
+    assert dynamodb.calls["get_item"] == 0
+
+    # A full batch wakes the worker; the remainder is flushed explicitly
+    deadline = time.time() + 2
+    while cache.get_stats()["write_behind"]["pending"] > 5 and time.time() < deadline:
+        time.sleep(0.01)
+    cache.flush()
+
+    stats = cache.get_stats()["write_behind"]
+    assert stats["written"] == 30 and stats["pending"] == 0
+    assert len(dynamodb.items) == 30
+    print(f"   ✓ Write stats: {stats}")
+
+def test_batch_get_and_warmup():
+    """Local misses are fetched with BatchGetItem and promoted locally"""
+    print("\n" + "=" * 60)
+    print("TESTING BATCHED READS")
+    print("=" * 60)
+
+    dynamodb = LocalDynamoDB()
+    writer = ResponseCache(ttl=60, dynamodb=dynamodb)
+    for i in range(150):
+        writer.set(f"key-{i}", f"response-{i}")
+    writer.flush()
+
+    reader = ResponseCache(ttl=60, dynamodb=dynamodb)
+    results = reader.get_many([f"key-{i}" for i in range(150)] + ["missing"])
+    assert len(results) == 150
+    assert dynamodb.calls["batch_get_item"] == 2
+
+    # Warmed keys are now served locally
+    assert reader.get("key-7") == "response-7"
+    assert dynamodb.calls["get_item"] == 0
+
+    other = ResponseCache(ttl=60, dynamodb=dynamodb)
+    assert other.warmup(["key-1", "key-2"], background=False) == 2
+    print("   ✓ Batched reads and warmup populate the local tier")
+
+def test_pending_writes_are_readable():
+    """Unflushed writes are visible to get() without a DynamoDB round trip"""
+    print("\n" + "=" * 60)
+    print("TESTING PENDING WRITE READS")
+    print("=" * 60)
+
+    dynamodb = LocalDynamoDB()
+    cache = ResponseCache(ttl=60, dynamodb=dynamodb)
+    cache.flush_interval = 60
+    cache.set("key", "value")
+    cache.local_cache.delete("key")
+
+    assert cache.get("key") == "value"
+    assert dynamodb.calls["get_item"] == 0
+
+    # Taken off the queue but not yet acknowledged by DynamoDB
+    gate = threading.Event()
+    dynamodb = LocalDynamoDB(write_gate=gate)
+    cache = ResponseCache(ttl=60, dynamodb=dynamodb)
+    cache.flush_interval = 60
+    cache.set("key", "value")
+    cache.local_cache.delete("key")
+    flusher = threading.Thread(target=cache.flush)
+    flusher.start()
+    dynamodb.writing.wait()
+    assert cache.get("key") == "value" and cache.get_stats()['write_behind']['in_flight'] == 1
+    assert dynamodb.calls["get_item"] == 0 and cache.remote_misses.get("key") is None
+    gate.set()
+    flusher.join()
+    assert cache.get_stats()['write_behind']['in_flight'] == 0
+    print("   ✓ Pending and in-flight writes served from the queue")
+
+def test_remote_misses_and_undecodable_local_entries():
+    """Repeated misses skip DynamoDB for a few seconds; a bad local copy falls through to DynamoDB"""
+    print("\n" + "=" * 60)
+    print("TESTING REMOTE MISSES AND LOCAL DECODE ERRORS")
+    print("=" * 60)
+
+    dynamodb = LocalDynamoDB()
+    cache = ResponseCache(ttl=60, dynamodb=dynamodb)
+    assert cache.get("absent") is None and cache.get("absent") is None
+    assert dynamodb.calls["get_item"] == 1
+    cache.set("absent", "now present")
+    cache.local_cache.delete("absent")
+    assert cache.get("absent") == "now present"
+
+    cache.remote_misses.set("expired", True, cache.negative_ttl, time.time() - cache.negative_ttl)
+    assert cache.get("expired") is None and dynamodb.calls["get_item"] == 2
+
+    writer = ResponseCache(ttl=60, dynamodb=dynamodb)
+    writer.set("answer", "from DynamoDB")
+    writer.flush()
+    cache.local_cache.set("answer", (b"\x07corrupt", {}), 60)
+    assert cache.get("answer") == "from DynamoDB"
+    assert dynamodb.calls["get_item"] == 3
+    print(f"   ✓ {cache.get_stats()['remote_misses']['hits']} lookups answered by the negative cache")
+
+def test_freshness_classes():
+    """Entries live for their freshness class TTL; no_cache entries are never stored"""
+    print("\n" + "=" * 60)
+    print("TESTING FRESHNESS CLASSES")
+    print("=" * 60)
+
+    assert get_freshness("live_market")["ttl"] == 30
+    assert get_freshness("evergreen")["ttl"] == 86400
+    assert get_freshness("unknown") == get_freshness("standard")
+    assert adjust_for_time_sensitivity("evergreen", "latest AI news today") == "news"
+    assert adjust_for_time_sensitivity("evergreen", "explain recursion") == "evergreen"
+
+    cache = ResponseCache(ttl=300)
+    cache.set("time-key", "It is noon", ttl=get_freshness("no_cache")["ttl"])
+    assert cache.get("time-key") is None
+
+    cache.set("market-key", "BTC is $100", ttl=30)
+    _, expires_at, _ = cache.local_cache._entries["market-key"]
+    assert expires_at - time.time() <= 30
+    print("   ✓ Per-class TTLs applied")
+
+def test_data_version_invalidation():
+    """New data about one entity invalidates only answers that read it, within one process"""
+    print("\n" + "=" * 60)
+    print("TESTING DATA VERSION INVALIDATION")
+    print("=" * 60)
+
+    dynamodb = LocalDynamoDB()
+    cache = ResponseCache(ttl=300, dynamodb=dynamodb)
+
+    # Answers are tagged with the versions read while they were computed
+    data_versions.publish(entity_source("crypto", "eth"), 3000.0)
+    with data_versions.capture() as reads:
+        data_versions.publish(entity_source("crypto", "btc"), 100.0)
+        data_versions.publish("f1", {"next": "Monaco"})
+    assert reads == {"crypto:BTC": data_versions.get("crypto:BTC"), "f1": data_versions.get("f1")}
+    assert dependent_versions(reads, "live_market") == {"crypto:BTC": data_versions.get("crypto:BTC")}
+    assert dependent_versions(reads, "evergreen") == {}
+    cache.set("btc-answer", "BTC is $100", ttl=30, data_versions=dependent_versions(reads, "live_market"))
+    cache.set("evergreen-answer", "Recursion is...", ttl=86400, data_versions=dependent_versions(reads, "evergreen"))
+    cache.flush()
+    assert cache.get("btc-answer") == "BTC is $100"
+
+    # Same data re-published keeps the version; another coin's new price is unrelated
+    data_versions.publish(entity_source("crypto", "BTC"), 100.0)
+    data_versions.publish(entity_source("crypto", "ETH"), 3100.0)
+    assert cache.get("btc-answer") == "BTC is $100"
+
+    data_versions.publish(entity_source("crypto", "BTC"), 101.5)
+    assert cache.get("btc-answer") is None
+    assert cache.get("evergreen-answer") == "Recursion is..."
+
+    # The persisted copy is rejected too
+    other = ResponseCache(ttl=300, dynamodb=dynamodb)
+    assert other.get("btc-answer") is None
+    assert other.get("evergreen-answer") == "Recursion is..."
+    assert cache.get_stats()["invalidations"] == 1
+
+    # Another process's fingerprints can't be compared here: its entries expire by TTL
+    dynamodb.items["btc-answer"]["version_owner"] = "other-task"
+    assert ResponseCache(ttl=300, dynamodb=dynamodb).get("btc-answer") == "BTC is $100"
+    print("   ✓ Only crypto-dependent answers invalidated")
+
+def test_compressed_payloads():
+    """Large responses are stored compressed on both tiers and round-trip unchanged"""
+    print("\n" + "=" * 60)
+    print("TESTING COMPRESSED PAYLOADS")
+    print("=" * 60)
+
+    dynamodb = LocalDynamoDB()
+    cache = ResponseCache(ttl=60, dynamodb=dynamodb)
+    analysis = "## Analysis\n" + "\n".join(f"- **Current Price:** ${i}.00 and rising" for i in range(200))
+    cache.set("analysis", analysis)
+    cache.set("short", "BTC is $100")
+    cache.flush()
+
+    payload = dynamodb.items["analysis"]["payload"].value
+    assert len(payload) < len(analysis) / 4
+    assert dynamodb.items["short"]["payload"].value == b"\x00BTC is $100"
+    assert cache.local_cache._entries["analysis"][0][0] == payload
+
+    assert cache.get("analysis") == analysis
+    other = ResponseCache(ttl=60, dynamodb=dynamodb)
+    assert other.get_many(["analysis", "short"]) == {"analysis": analysis, "short": "BTC is $100"}
+    print(f"   ✓ {len(analysis)} bytes stored as {len(payload)}")
+
+def test_oversized_and_legacy_items():
+    """Oversized entries are skipped; plain-text items from older deploys still read"""
+    print("\n" + "=" * 60)
+    print("TESTING SIZE POLICY AND LEGACY ITEMS")
+    print("=" * 60)
+
+    dynamodb = LocalDynamoDB()
+    cache = ResponseCache(ttl=60, dynamodb=dynamodb)
+    cache.max_item_bytes = 1000
+    cache.set("huge", "".join(chr(0x4e00 + (i * 7919) % 20000) for i in range(2000)))
+    cache.flush()
+    assert cache.get("huge") is None and "huge" not in dynamodb.items
+    assert cache.get_stats()["compression"]["oversized_skipped"] == 1
+
+    dynamodb.items["legacy"] = {"cache_key": "legacy", "response": "old text",
+                                "timestamp": time.time(), "ttl_seconds": 60}
+    assert cache.get("legacy") == "old text"
+    print("   ✓ Oversized skipped, legacy text item served")
+
+def test_codec_dictionary():
+    """A trained dictionary improves small payloads; mismatched dictionaries are misses"""
+    print("\n" + "=" * 60)
+    print("TESTING SHARED DICTIONARY")
+    print("=" * 60)
+
+    corpus = [f"## Summary\n**Current Price:** ${i}\n### Technical Analysis\nMomentum is neutral for coin {i}.\n"
+              "This is not financial advice. Cryptocurrency markets are highly volatile.\n" for i in range(50)]
+    trained = PayloadCodec(zdict=build_zdict(corpus), min_size=0)
+    plain = PayloadCodec(zdict=b"", min_size=0)
+    sample = corpus[7]
+    assert len(trained.encode(sample)) < len(plain.encode(sample))
+    assert trained.decode(trained.encode(sample)) == sample
+
+    assert PayloadCodec().decode(trained.encode(sample)) is None
+    print("   ✓ Dictionary helps and is versioned by id")
+
+if __name__ == "__main__":
+    test_local_tier_lru_eviction()
+    test_local_tier_byte_budget()
+    test_local_tier_ttl()
+    test_response_cache_local_only()
+    test_write_behind_batches()
+    test_batch_get_and_warmup()
+    test_pending_writes_are_readable()
+    test_remote_misses_and_undecodable_local_entries()
+    test_freshness_classes()
+    test_data_version_invalidation()
+    test_compressed_payloads()
+    test_oversized_and_legacy_items()
+    test_codec_dictionary()
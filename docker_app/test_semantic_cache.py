@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the semantic near-duplicate response cache
+"""
+
+from semantic_cache import SemanticCache, normalize_prompt
+
+def test_normalize_prompt():
+    """Phrasing variants normalize to the same content words"""
+    print("=" * 60)
+    print("TESTING PROMPT NORMALIZATION")
+    print("=" * 60)
+
+    assert normalize_prompt("What's the price of Bitcoin?") == "price bitcoin"
+    assert normalize_prompt("bitcoin prices") == "bitcoin price"
+    print("   ✓ Stopwords, punctuation and plurals normalized")
+
+def test_near_duplicate_hit():
+    """Near-duplicate prompts resolve to the stored cache key"""
+    print("\n" + "=" * 60)
+    print("TESTING NEAR-DUPLICATE LOOKUP")
+    print("=" * 60)
+
+    cache = SemanticCache(threshold=0.9)
+    cache.add("what's the price of bitcoin", "key-btc", "model-a", "business_finance_assistant")
+
+    hit = cache.lookup("bitcoin price?", "model-a", "business_finance_assistant")
+    assert hit is not None and hit[0] == "key-btc"
+    print(f"   ✓ Hit with similarity {hit[1]:.3f}")
+
+    assert cache.lookup("ethereum price", "model-a", "business_finance_assistant") is None
+    print("   ✓ Different coin is a miss")
+
+def test_partitioning():
+    """Entries never cross model, assistant or user partitions"""
+    print("\n" + "=" * 60)
+    print("TESTING PARTITIONS")
+    print("=" * 60)
+
+    cache = SemanticCache(threshold=0.9)
+    cache.add("bitcoin price", "key-btc", "model-a", "business_finance_assistant", "alice")
+
+    assert cache.lookup("bitcoin price", "model-b", "business_finance_assistant", "alice") is None
+    assert cache.lookup("bitcoin price", "model-a", "universal_assistant", "alice") is None
+    assert cache.lookup("bitcoin price", "model-a", "business_finance_assistant", "bob") is None
+    assert cache.lookup("bitcoin price", "model-a", "business_finance_assistant", "alice") is not None
+    print("   ✓ Model, assistant and user partitions are isolated")
+
+def test_capacity_and_stats():
+    """Partitions are bounded and counters track lookups"""
+    print("\n" + "=" * 60)
+    print("TESTING CAPACITY AND STATS")
+    print("=" * 60)
+
+    cache = SemanticCache(threshold=0.9, max_entries=2)
+    cache.add("bitcoin price", "k1", "m", "a")
+    cache.add("ethereum price", "k2", "m", "a")
+    cache.add("solana price", "k3", "m", "a")
+
+    assert cache.lookup("bitcoin price", "m", "a") is None
+    assert cache.lookup("solana price", "m", "a")[0] == "k3"
+
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert stats["lookups"] == 2 and stats["hits"] == 1 and stats["misses"] == 1
+    assert sum(stats["similarity_histogram"]) == 2
+    print(f"   ✓ Stats: {stats}")
+
+if __name__ == "__main__":
+    test_normalize_prompt()
+    test_near_duplicate_hit()
+    test_partitioning()
+    test_capacity_and_stats()
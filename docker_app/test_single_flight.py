@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight request coalescing
+"""
+
+import threading
+import time
+
+from single_flight import SingleFlight
+
+def _run_concurrently(flight, key, fn, count):
+    """Call flight.do from several threads at once and collect the outcomes"""
+    results, errors = [], []
+    barrier = threading.Barrier(count)
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+def test_concurrent_calls_share_one_execution():
+    """Identical in-flight calls run the function once"""
+    print("=" * 60)
+    print("TESTING CONCURRENT COALESCING")
+    print("=" * 60)
+
+    flight = SingleFlight()
+    executions = []
+
+    def slow_answer():
+        executions.append(1)
+        time.sleep(0.2)
+        return "BTC is $100"
+
+    results, errors = _run_concurrently(flight, "bitcoin price now", slow_answer, 8)
+    assert not errors
+    assert results == ["BTC is $100"] * 8
+    assert len(executions) == 1
+
+    stats = flight.get_stats()
+    assert stats["executions"] == 1 and stats["shared"] == 7 and stats["in_flight"] == 0
+    print(f"   ✓ Stats: {stats}")
+
+def test_errors_propagate_to_waiters():
+    """Waiters see the leader's exception and the key is released afterwards"""
+    print("\n" + "=" * 60)
+    print("TESTING ERROR PROPAGATION")
+    print("=" * 60)
+
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    results, errors = _run_concurrently(flight, "key", failing, 4)
+    assert not results and len(errors) == 4
+    assert flight.do("key", lambda: "recovered") == "recovered"
+    print("   ✓ Error shared, next call runs fresh")
+
+def test_sequential_calls_are_not_cached():
+    """Single-flight only coalesces overlapping calls"""
+    print("\n" + "=" * 60)
+    print("TESTING SEQUENTIAL CALLS")
+    print("=" * 60)
+
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.do("key", lambda: next(counter)) == 0
+    assert flight.do("key", lambda: next(counter)) == 1
+    print("   ✓ Completed calls are not reused")
+
+def test_waiter_timeout_computes_independently():
+    """A waiter stops waiting on a stuck leader after the timeout"""
+    print("\n" + "=" * 60)
+    print("TESTING WAITER TIMEOUT")
+    print("=" * 60)
+
+    flight = SingleFlight(wait_timeout=0.05)
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=("key", lambda: release.wait(2)))
+    leader.start()
+    time.sleep(0.02)
+
+    assert flight.do("key", lambda: "own result") == "own result"
+    release.set()
+    leader.join()
+    assert flight.get_stats()["timeouts"] == 1
+    print("   ✓ Waiter fell back to its own computation")
+
+class _Rerun(BaseException):
+    """Stands in for Streamlit's StopException/RerunException"""
+
+def test_interrupted_leader_is_not_shared():
+    """Waiters of a leader interrupted by a BaseException compute their own result"""
+    print("\n" + "=" * 60)
+    print("TESTING INTERRUPTED LEADER")
+    print("=" * 60)
+
+    flight = SingleFlight()
+    started = threading.Event()
+    interrupted = []
+
+    def interrupted_leader():
+        started.set()
+        time.sleep(0.1)
+        raise _Rerun()
+
+    def leader():
+        try:
+            flight.do("key", interrupted_leader)
+        except _Rerun:
+            interrupted.append(True)
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    started.wait()
+    assert flight.do("key", lambda: "own answer") == "own answer"
+    thread.join()
+    assert interrupted == [True] and flight.get_stats()["abandoned"] == 1
+    print("   ✓ Waiter recomputed instead of sharing None")
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_execution()
+    test_errors_propagate_to_waiters()
+    test_sequential_calls_are_not_cached()
+    test_waiter_timeout_computes_independently()
+    test_interrupted_leader_is_not_shared()
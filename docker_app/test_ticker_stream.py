@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming ticker ingest and its replay feeds
+"""
+
+import base64
+import json
+import os
+import socket
+import struct
+import time
+
+from quote_store import QuoteStore
+from ticker_stream import ReplayServer, TickConnection, TickerStream, replay_source, synthetic_ticks
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_replay_ingest_fills_store():
+    """Replayed ticks land in the quote store with 24h change and volume"""
+    print("=" * 60)
+    print("TESTING REPLAY INGEST")
+    print("=" * 60)
+
+    ticks = synthetic_ticks(["BTC-USD", "ETH-USD"], count=200, seed=7)
+    store = QuoteStore()
+    stream = TickerStream(replay_source(ticks), ["BTC-USD", "ETH-USD"], store=store)
+    stream.start()
+    assert _wait_for(lambda: stream.get_stats()['ticks'] == 200)
+    stream.stop()
+
+    last_btc = [t for t in ticks if t['product_id'] == "BTC-USD"][-1]
+    quote = store.get("BTC")
+    assert quote.price == float(last_btc['price']) and quote.source == "coinbase_ws"
+    assert quote.payload['volume_24h'] == float(last_btc['volume_24h'])
+    expected_change = (float(last_btc['price']) / float(last_btc['open_24h']) - 1) * 100
+    assert abs(quote.change_24h - expected_change) < 1e-9
+    assert stream.get_stats()['gaps'] == 0
+    print(f"   ✓ BTC {quote.price:,.2f} ({quote.change_24h:+.3f}%), {stream.get_stats()}")
+
+def test_gap_and_duplicate_detection():
+    """Sequence jumps are counted as gaps; repeats are dropped"""
+    print("\n" + "=" * 60)
+    print("TESTING GAP DETECTION")
+    print("=" * 60)
+
+    store = QuoteStore()
+    stream = TickerStream(replay_source([]), ["BTC-USD"], store=store)
+    for sequence, price in [(10, "100"), (11, "101"), (15, "105"), (15, "999"), (12, "999")]:
+        stream.handle_message(json.dumps({"type": "ticker", "product_id": "BTC-USD", "sequence": sequence,
+                                          "price": price, "open_24h": "100", "volume_24h": "1"}))
+    stats = stream.get_stats()
+    assert stats['ticks'] == 3 and stats['gaps'] == 1 and stats['missed_ticks'] == 3
+    assert stats['out_of_order'] == 2
+    assert store.peek("BTC").price == 105.0
+    print(f"   ✓ {stats['gaps']} gap, {stats['missed_ticks']} missed, {stats['out_of_order']} dropped")
+
+class _FlakyConnection(TickConnection):
+    def __init__(self, messages, fail):
+        self.messages, self.fail = messages, fail
+
+    def __iter__(self):
+        yield from self.messages
+        if self.fail:
+            raise ConnectionError("feed dropped")
+
+def test_reconnects_after_drop():
+    """A dropped feed is reopened with backoff and ingest resumes"""
+    print("\n" + "=" * 60)
+    print("TESTING RECONNECT")
+    print("=" * 60)
+
+    ticks = [json.dumps(t) for t in synthetic_ticks(["ETH-USD"], count=6, seed=1)]
+    connections = iter([_FlakyConnection(ticks[:3], True), _FlakyConnection(ticks[3:], False)])
+
+    def source(products):
+        connection = next(connections, None)
+        if connection is None:
+            raise ConnectionError("no more connections")
+        return connection
+
+    stream = TickerStream(source, ["ETH-USD"], store=QuoteStore(), backoff_initial=0.01, backoff_max=0.05)
+    stream.start()
+    assert _wait_for(lambda: stream.get_stats()['ticks'] == 6)
+    stream.stop()
+    stats = stream.get_stats()
+    assert stats['connects'] == 2 and stats['gaps'] == 0 and stats['errors'] >= 1
+    print(f"   ✓ {stats['connects']} connections, {stats['ticks']} ticks")
+
+def test_replay_server_speaks_websocket():
+    """The local replay server completes the handshake and streams only subscribed products"""
+    print("\n" + "=" * 60)
+    print("TESTING REPLAY SERVER")
+    print("=" * 60)
+
+    server = ReplayServer(synthetic_ticks(["BTC-USD", "ETH-USD"], count=10)).start()
+    try:
+        host, port = server.url[len("ws://"):].split(":")
+        sock = socket.create_connection((host, int(port)), timeout=5)
+        key = base64.b64encode(os.urandom(16)).decode()
+        sock.sendall((f"GET / HTTP/1.1\r\nHost: {host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        reader = sock.makefile("rb")
+        assert b"101" in reader.readline()
+        while reader.readline() != b"\r\n":
+            pass
+
+        payload = json.dumps({"type": "subscribe", "product_ids": ["ETH-USD"], "channels": ["ticker"]}).encode()
+        mask = os.urandom(4)
+        sock.sendall(struct.pack(">BB", 0x81, 0x80 | len(payload)) + mask +
+                     bytes(b ^ mask[i % 4] for i, b in enumerate(payload)))
+
+        messages = []
+        while True:
+            opcode, length = struct.unpack(">BB", reader.read(2))
+            body = reader.read(length & 0x7F if length < 126 else struct.unpack(">H", reader.read(2))[0])
+            if opcode & 0x0F == 0x8:
+                break
+            messages.append(json.loads(body))
+        sock.close()
+        products = {m['product_id'] for m in messages if m['type'] == "ticker"}
+        assert messages[0]['type'] == "subscriptions" and products == {"ETH-USD"} and len(messages) == 6
+        print(f"   ✓ {len(messages) - 1} ticks over {server.url}")
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    test_replay_ingest_fills_store()
+    test_gap_and_duplicate_detection()
+    test_reconnects_after_drop()
+    test_replay_server_speaks_websocket()
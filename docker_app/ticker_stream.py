@@ -0,0 +1,407 @@
+"""
+Ticker Stream - Long-lived exchange ticker ingest into the shared quote store
+
+A background thread holds a WebSocket subscription to the Coinbase Exchange
+ticker channel and writes every tick (price, 24h change, 24h volume) into
+the quote store, so price reads in the request path are in-memory lookups
+instead of 100-500 ms REST calls. Dropped connections are retried with
+jittered exponential backoff, and per-product sequence numbers detect
+missed ticks. Because every ticker message carries the full current state,
+a gap only loses intermediate prices; it is counted, not replayed.
+
+For tests, benchmarks and offline development, recorded ticks can be played
+in-process (replay_source) or over a local WebSocket server (ReplayServer).
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from quote_store import QuoteStore, quote_store
+
+try:
+    import websocket  # websocket-client
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    WEBSOCKET_AVAILABLE = False
+
+COINBASE_WS_URL = "wss://ws-feed.exchange.coinbase.com"
+
+DEFAULT_PRODUCTS = ("BTC-USD", "ETH-USD", "SOL-USD", "XRP-USD", "ADA-USD", "DOGE-USD", "AVAX-USD",
+                    "DOT-USD", "LINK-USD", "LTC-USD")
+
+# Seconds without any message (ticks or heartbeats) before the connection is recycled
+IDLE_TIMEOUT = 30.0
+
+Source = Callable[[List[str]], "TickConnection"]
+
+
+class TickConnection:
+    """An open feed: iterate for raw JSON messages, close to stop"""
+
+    def __iter__(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class WebSocketConnection(TickConnection):
+    """Coinbase-style WebSocket feed subscribed to the ticker and heartbeat channels"""
+
+    def __init__(self, url: str, products: List[str], timeout: float = IDLE_TIMEOUT):
+        if not WEBSOCKET_AVAILABLE:
+            raise RuntimeError("websocket-client is not installed")
+        self._ws = websocket.create_connection(url, timeout=timeout)
+        self._ws.send(json.dumps({"type": "subscribe", "product_ids": products,
+                                  "channels": ["ticker", "heartbeat"]}))
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            message = self._ws.recv()
+            if not message:
+                return
+            yield message
+
+    def close(self) -> None:
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+def websocket_source(url: str = COINBASE_WS_URL, timeout: float = IDLE_TIMEOUT) -> Source:
+    """Connect to a live (or ReplayServer) WebSocket feed"""
+    return lambda products: WebSocketConnection(url, products, timeout)
+
+
+class ReplayConnection(TickConnection):
+    """Plays recorded ticks in-process"""
+
+    def __init__(self, ticks: Iterator[Dict[str, Any]], products: List[str], interval: float = 0.0):
+        self._ticks = ticks
+        self._products = set(products)
+        self._interval = interval
+        self._closed = threading.Event()
+
+    def __iter__(self) -> Iterator[str]:
+        for tick in self._ticks:
+            if self._closed.is_set():
+                return
+            if tick.get("product_id") in self._products:
+                if self._interval:
+                    self._closed.wait(self._interval)
+                yield json.dumps(tick)
+
+    def close(self) -> None:
+        self._closed.set()
+
+
+def replay_source(ticks: Iterable[Dict[str, Any]], interval: float = 0.0) -> Source:
+    """
+    Replay recorded ticks; a reconnect resumes where the last connection stopped
+
+    Args:
+        ticks: Coinbase ticker messages, e.g. from load_ticks() or synthetic_ticks()
+        interval: Seconds between ticks (0 plays as fast as possible)
+    """
+    shared = iter(list(ticks))
+    return lambda products: ReplayConnection(shared, products, interval)
+
+
+def synthetic_ticks(products: Iterable[str] = ("BTC-USD", "ETH-USD"), count: int = 1000,
+                    seed: int = 0) -> List[Dict[str, Any]]:
+    """Deterministic random-walk ticker messages with per-product sequence numbers"""
+    rng = random.Random(seed)
+    start = {"BTC": 65000.0, "ETH": 3200.0, "SOL": 150.0, "XRP": 0.55, "ADA": 0.45, "DOGE": 0.12}
+    products = list(products)
+    prices = {p: start.get(p.split("-")[0], 100.0) for p in products}
+    opens = dict(prices)
+    sequence = {p: 1000 for p in products}
+    volume = {p: 0.0 for p in products}
+    ticks = []
+    for i in range(count):
+        product = products[i % len(products)]
+        prices[product] *= 1 + rng.gauss(0, 0.0005)
+        sequence[product] += 1
+        volume[product] += rng.uniform(0.01, 2.0)
+        ticks.append({
+            "type": "ticker", "product_id": product, "sequence": sequence[product],
+            "price": f"{prices[product]:.6f}", "open_24h": f"{opens[product]:.6f}",
+            "volume_24h": f"{volume[product]:.4f}",
+            "time": datetime.fromtimestamp(1_700_000_000 + i / 10, timezone.utc).isoformat()
+        })
+    return ticks
+
+
+def load_ticks(path: str) -> List[Dict[str, Any]]:
+    """Read a JSONL recording"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_ticks(path: str, ticks: Iterable[Dict[str, Any]]) -> None:
+    """Write ticks as a JSONL recording"""
+    with open(path, "w") as f:
+        for tick in ticks:
+            f.write(json.dumps(tick) + "\n")
+
+
+class TickerStream:
+    """
+    Background ingest of ticker messages into a quote store
+
+    Args:
+        source: Opens a TickConnection for a product list (websocket_source() or replay_source())
+        products: Exchange product ids, e.g. "BTC-USD"
+        backoff_initial, backoff_max: Reconnect delay bounds in seconds
+    """
+
+    SOURCE_NAME = "coinbase_ws"
+
+    def __init__(self, source: Source, products: Iterable[str] = DEFAULT_PRODUCTS,
+                 store: Optional[QuoteStore] = None, backoff_initial: float = 0.5, backoff_max: float = 30.0):
+        self.source = source
+        self.products = list(products)
+        self.store = store or quote_store
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self._last_sequence: Dict[str, int] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._connection: Optional[TickConnection] = None
+        self._lock = threading.Lock()
+        self.connected = False
+        self.stats = {'messages': 0, 'ticks': 0, 'gaps': 0, 'missed_ticks': 0, 'out_of_order': 0,
+                      'connects': 0, 'disconnects': 0, 'errors': 0, 'last_message_at': None}
+
+    def handle_message(self, raw: str) -> None:
+        """Apply one raw feed message"""
+        message = json.loads(raw)
+        with self._lock:
+            self.stats['messages'] += 1
+            self.stats['last_message_at'] = time.time()
+        kind = message.get("type")
+        if kind == "ticker":
+            self._apply_tick(message)
+        elif kind == "error":
+            with self._lock:
+                self.stats['errors'] += 1
+            print(f"Ticker stream error from feed: {message.get('message')} {message.get('reason', '')}")
+
+    def _apply_tick(self, tick: Dict[str, Any]) -> None:
+        product = tick.get("product_id", "")
+        sequence = tick.get("sequence")
+        with self._lock:
+            last = self._last_sequence.get(product)
+            if sequence is not None and last is not None:
+                if sequence <= last:
+                    # Duplicate or late delivery after a reconnect
+                    self.stats['out_of_order'] += 1
+                    return
+                if sequence > last + 1:
+                    self.stats['gaps'] += 1
+                    self.stats['missed_ticks'] += sequence - last - 1
+            if sequence is not None:
+                self._last_sequence[product] = sequence
+            self.stats['ticks'] += 1
+
+        base, _, quote = product.partition("-")
+        price = float(tick["price"])
+        open_24h = float(tick.get("open_24h") or 0)
+        change_24h = (price / open_24h - 1) * 100 if open_24h > 0 else None
+        self.store.put(base, price, self.SOURCE_NAME, quote or "USD", change_24h, {
+            'volume_24h': float(tick.get("volume_24h") or 0),
+            'sequence': sequence,
+            'timestamp': tick.get("time"),
+        })
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_initial * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def run(self) -> None:
+        """Connect, ingest and reconnect until stopped"""
+        attempt = 0
+        while not self._stop_event.is_set():
+            try:
+                connection = self.source(self.products)
+                with self._lock:
+                    self._connection = connection
+                    self.connected = True
+                    self.stats['connects'] += 1
+                for raw in connection:
+                    if self._stop_event.is_set():
+                        break
+                    self.handle_message(raw)
+                    attempt = 0
+            except Exception as e:
+                with self._lock:
+                    self.stats['errors'] += 1
+                print(f"Ticker stream connection error: {str(e)}")
+            finally:
+                with self._lock:
+                    if self.connected:
+                        self.stats['disconnects'] += 1
+                    self.connected = False
+                    if self._connection is not None:
+                        self._connection.close()
+                    self._connection = None
+            if not self._stop_event.is_set():
+                self._stop_event.wait(self._backoff(attempt))
+                attempt += 1
+
+    def start(self) -> bool:
+        """Start the ingest thread; returns False if already running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self.run, name="ticker-stream", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['connected'] = self.connected
+            stats['products'] = len(self._last_sequence)
+        last = stats['last_message_at']
+        stats['idle_s'] = round(time.time() - last, 1) if last else None
+        return stats
+
+
+class ReplayServer:
+    """
+    Local WebSocket server that plays recorded ticks to each subscriber
+
+    Speaks just enough RFC 6455 for a ticker feed: the opening handshake,
+    one masked subscribe frame from the client, and unmasked text frames
+    back. Point websocket_source() at .url to exercise the live code path
+    without the network.
+    """
+
+    def __init__(self, ticks: Iterable[Dict[str, Any]], interval: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.ticks = list(ticks)
+        self.interval = interval
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server._serve_client(self.request)
+
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"ws://{host}:{port}"
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ticker-replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _serve_client(self, sock: socket.socket) -> None:
+        reader = sock.makefile("rb")
+        headers = {}
+        reader.readline()  # GET / HTTP/1.1
+        for line in iter(reader.readline, b"\r\n"):
+            if not line:
+                return
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        accept = base64.b64encode(hashlib.sha1(
+            (headers.get("sec-websocket-key", "") + "258EAFA5-E914-47DA-95CA-C5AB0DC85B11").encode()).digest()).decode()
+        sock.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+
+        subscribe = json.loads(_read_frame(reader) or "{}")
+        products = set(subscribe.get("product_ids", []))
+        _send_frame(sock, json.dumps({"type": "subscriptions", "channels": subscribe.get("channels", [])}))
+        try:
+            for tick in self.ticks:
+                if tick.get("product_id") in products:
+                    _send_frame(sock, json.dumps(tick))
+                    if self.interval:
+                        time.sleep(self.interval)
+            _send_frame(sock, b"", opcode=0x8)  # close
+        except OSError:
+            pass
+
+
+def _read_frame(reader) -> Optional[str]:
+    """One client text frame (client frames are always masked)"""
+    header = reader.read(2)
+    if len(header) < 2:
+        return None
+    length = header[1] & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", reader.read(2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", reader.read(8))[0]
+    mask = reader.read(4) if header[1] & 0x80 else b"\x00\x00\x00\x00"
+    payload = reader.read(length)
+    return bytes(b ^ mask[i % 4] for i, b in enumerate(payload)).decode("utf-8")
+
+
+def _send_frame(sock: socket.socket, payload, opcode: int = 0x1) -> None:
+    """One unmasked server frame"""
+    data = payload.encode("utf-8") if isinstance(payload, str) else payload
+    if len(data) < 126:
+        header = struct.pack(">BB", 0x80 | opcode, len(data))
+    elif len(data) < 65536:
+        header = struct.pack(">BBH", 0x80 | opcode, 126, len(data))
+    else:
+        header = struct.pack(">BBQ", 0x80 | opcode, 127, len(data))
+    sock.sendall(header + data)
+
+
+def default_source() -> Source:
+    """Live Coinbase feed, TICKER_STREAM_URL if set, or a replayed recording with TICKER_STREAM_REPLAY=<path>"""
+    replay_path = os.environ.get("TICKER_STREAM_REPLAY")
+    if replay_path:
+        return replay_source(load_ticks(replay_path), interval=0.1)
+    return websocket_source(os.environ.get("TICKER_STREAM_URL", COINBASE_WS_URL))
+
+
+# Global instance, started by initialize_ticker_stream()
+ticker_stream: Optional[TickerStream] = None
+
+
+def initialize_ticker_stream() -> str:
+    """Start the streaming ingest (once per process)"""
+    global ticker_stream
+    if os.environ.get("TICKER_STREAM_ENABLED", "true").lower() != "true":
+        return "Ticker stream disabled"
+    if not WEBSOCKET_AVAILABLE and not os.environ.get("TICKER_STREAM_REPLAY"):
+        return "Ticker stream unavailable: websocket-client not installed"
+    if ticker_stream is None:
+        products = os.environ.get("TICKER_STREAM_PRODUCTS")
+        ticker_stream = TickerStream(default_source(), products.split(",") if products else DEFAULT_PRODUCTS)
+    ticker_stream.start()
+    return "Ticker stream running"
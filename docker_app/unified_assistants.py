@@ -3,8 +3,23 @@ Unified Assistants - Consolidated core domain assistants
 """
 
 from strands import Agent, tool
-from realtime_data_access import enhance_query_with_realtime
-from data_aware_prompts import make_data_aware, inject_prediction_capability
+from realtime_data_access import get_current_datetime
+from data_aware_prompts import make_tool_aware, inject_prediction_capability
+from data_tools import make_data_tools
+
+# Live-data tools each domain may call; data is fetched only when the model asks for it
+DOMAIN_DATA_TOOLS = {
+    "business_finance": ("crypto_quote", "crypto_indicators", "market_overview", "fetch_website"),
+    "tech_security": ("fetch_website",),
+    "research_knowledge": ("crypto_quote", "market_overview", "f1_standings", "fetch_website"),
+    "specialized_industries": ("f1_standings", "flight_position", "fetch_website"),
+    "universal": ("crypto_quote", "crypto_indicators", "market_overview", "f1_standings", "flight_position",
+                  "fetch_website"),
+}
+
+def with_current_datetime(query: str) -> str:
+    """Prefix the query with the current date and time, the only context every answer needs"""
+    return f"CURRENT DATE/TIME: {get_current_datetime()}\n\nQuery: {query}"
 
 # Core Domain 1: Business & Finance Assistant
 @tool
@@ -15,7 +30,7 @@ def business_finance_assistant(query: str) -> str:
     cryptocurrency_assistant, entrepreneurship_assistant, tokenomics_assistant,
     international_finance_assistant, company_intelligence_assistant
     """
-    enhanced_query = enhance_query_with_realtime(query, "business_finance")
+    enhanced_query = with_current_datetime(query)
     
     # Check if this is a crypto query and add specific context
     query_lower = query.lower()
@@ -35,20 +50,18 @@ def business_finance_assistant(query: str) -> str:
     - International finance and global markets
     
     APPROACH:
-    1. Analyze current market conditions using provided real-time data
+    1. Analyze current market conditions, fetching live data with your tools when needed
     2. Identify key business and market trends
     3. Provide well-reasoned analysis with confidence levels
     4. Include risk assessments for any predictions
     5. Avoid making exaggerated claims about returns
     
-    IMPORTANT: You ALWAYS have access to real-time market data. This data is provided in your query context.
-    For cryptocurrency queries, you have access to current prices and market trends.
-    For financial queries, you have access to current market conditions.
-    
-    Always use the real-time data provided to give accurate current information.
+    For cryptocurrency queries, call crypto_quote and market_overview for current prices and market trends.
+    Conceptual business and finance questions need no live data.
     """
     
-    agent = Agent(system_prompt=system_prompt)
+    tool_names = DOMAIN_DATA_TOOLS["business_finance"]
+    agent = Agent(system_prompt=make_tool_aware(system_prompt, tool_names), tools=make_data_tools(tool_names))
     return str(agent(enhanced_query))
 
 # Core Domain 2: Technology & Security Assistant
@@ -60,7 +73,7 @@ def tech_security_assistant(query: str) -> str:
     ai_assistant, blockchain_assistant, web3_assistant, cybersecurity_defense_assistant,
     cybersecurity_offense_assistant, cryptography_assistant, aws_assistant
     """
-    enhanced_query = enhance_query_with_realtime(query, "tech_security")
+    enhanced_query = with_current_datetime(query)
     
     # Check if this is a security or AWS query and add specific context
     query_lower = query.lower()
@@ -87,14 +100,13 @@ def tech_security_assistant(query: str) -> str:
     4. Consider scalability, performance, and security trade-offs
     5. Stay current with latest technologies and vulnerabilities
     
-    IMPORTANT: You ALWAYS have access to real-time security and technology data. This data is provided in your query context.
-    For security queries, you have access to current vulnerabilities and patches.
-    For AWS and cloud queries, you have access to current service information.
+    For current vulnerabilities, advisories or service announcements, fetch the relevant page (e.g. cisa.gov) with fetch_website.
     
     Always provide practical, implementable solutions with security considerations.
     """
     
-    agent = Agent(system_prompt=system_prompt)
+    tool_names = DOMAIN_DATA_TOOLS["tech_security"]
+    agent = Agent(system_prompt=make_tool_aware(system_prompt, tool_names), tools=make_data_tools(tool_names))
     return str(agent(enhanced_query))
 
 # Core Domain 3: Research & Knowledge Assistant
@@ -105,7 +117,7 @@ def research_knowledge_assistant(query: str) -> str:
     Consolidates: research_assistant, web_browser_assistant, data_analysis_assistant,
     predictive_analysis_assistant, english_assistant, math_assistant
     """
-    enhanced_query = enhance_query_with_realtime(query, "research_knowledge")
+    enhanced_query = with_current_datetime(query)
     
     # Check if this is a research or web query and add specific context
     query_lower = query.lower()
@@ -131,16 +143,15 @@ def research_knowledge_assistant(query: str) -> str:
     4. Use mathematical reasoning when appropriate
     5. Present information in well-structured, articulate responses
     
-    IMPORTANT: You ALWAYS have access to real-time research and web data. This data is provided in your query context.
-    For web queries, you have access to current website information.
-    For research queries, you have access to the latest academic publications and data.
+    For web queries, fetch the site with fetch_website rather than relying on memory.
     
     Always cite sources when available and indicate confidence levels in your analysis.
     """
     
-    system_prompt = inject_prediction_capability(make_data_aware(base_prompt, "live web data"))
+    tool_names = DOMAIN_DATA_TOOLS["research_knowledge"]
+    system_prompt = inject_prediction_capability(make_tool_aware(base_prompt, tool_names))
     
-    agent = Agent(system_prompt=system_prompt)
+    agent = Agent(system_prompt=system_prompt, tools=make_data_tools(tool_names))
     return str(agent(enhanced_query))
 
 # Core Domain 4: Specialized Industries Assistant
@@ -151,7 +162,7 @@ def specialized_industries_assistant(query: str) -> str:
     Consolidates: aviation_assistant, formula1_assistant, sports_assistant,
     louisiana_legal_assistant, automotive_assistant
     """
-    enhanced_query = enhance_query_with_realtime(query, "specialized_industries")
+    enhanced_query = with_current_datetime(query)
     
     # Check if this is an F1/motorsports query and add specific context
     query_lower = query.lower()
@@ -175,15 +186,14 @@ def specialized_industries_assistant(query: str) -> str:
     4. Consider regulatory and industry-specific constraints
     5. Stay current with industry developments and trends
     
-    IMPORTANT: For Formula 1 queries, you ALWAYS have access to live race data, current standings, and team/driver information.
-    This data is provided in your query context. Use this real-time information to provide accurate analysis.
-    
-    For aviation queries, you have access to flight tracking data and aircraft information.
+    For Formula 1 queries about the current season, call f1_standings for the next race and standings.
+    For aviation queries about a specific aircraft, call flight_position with its tail number.
     
     Always provide industry-specific context and explain specialized terminology.
     """
     
-    agent = Agent(system_prompt=system_prompt)
+    tool_names = DOMAIN_DATA_TOOLS["specialized_industries"]
+    agent = Agent(system_prompt=make_tool_aware(system_prompt, tool_names), tools=make_data_tools(tool_names))
     return str(agent(enhanced_query))
 
 # Core Domain 5: Universal Assistant (for predictions and general queries)
@@ -193,7 +203,7 @@ def universal_assistant(query: str) -> str:
     Handles predictions, forecasting, and general queries across all domains
     Consolidates: universal_assistant, general_assistant, no_expertise
     """
-    enhanced_query = enhance_query_with_realtime(query, "universal")
+    enhanced_query = with_current_datetime(query)
     
     # Check if this is a prediction query and add specific context
     query_lower = query.lower()
@@ -217,16 +227,15 @@ def universal_assistant(query: str) -> str:
     4. Consider multiple scenarios and possibilities
     5. Clearly distinguish between facts and forecasts
     
-    IMPORTANT: You ALWAYS have access to comprehensive real-time data across ALL domains. This data is provided in your query context.
-    For prediction queries, use this current data to inform your forecasts.
-    For general queries, incorporate the latest information available.
+    For prediction queries, fetch the current data your forecast depends on before making it.
     
     For prediction queries, always provide reasoning, confidence levels, and potential alternative outcomes.
     """
     
-    system_prompt = inject_prediction_capability(make_data_aware(base_prompt, "comprehensive data"))
+    tool_names = DOMAIN_DATA_TOOLS["universal"]
+    system_prompt = inject_prediction_capability(make_tool_aware(base_prompt, tool_names))
     
-    agent = Agent(system_prompt=system_prompt)
+    agent = Agent(system_prompt=system_prompt, tools=make_data_tools(tool_names))
     return str(agent(enhanced_query))
 
 # Domain detection for direct routing
@@ -2,9 +2,12 @@
 Unified Router - Simplified routing logic in a single file
 """
 
+import os
 import re
 import logging
 from typing import Dict, Callable, Tuple, Optional
+from cache_freshness import DEFAULT_FRESHNESS, adjust_for_time_sensitivity
+from router_config import classify  # Shared compiled keyword tables
 
 # Import direct crypto forecast
 try:
@@ -13,6 +16,17 @@ try:
 except ImportError:
     DIRECT_FORECAST_AVAILABLE = False
 
+# Import local intent classifier (requires numpy)
+try:
+    from intent_classifier import confident_intent
+    INTENT_MODEL_AVAILABLE = True
+except ImportError:
+    INTENT_MODEL_AVAILABLE = False
+
+# Overrides the intent model's calibrated confidence threshold when set
+INTENT_CONFIDENCE_THRESHOLD = (float(os.environ["INTENT_CONFIDENCE_THRESHOLD"])
+                               if os.environ.get("INTENT_CONFIDENCE_THRESHOLD") else None)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('unified_router')
@@ -25,63 +39,6 @@ except ImportError:
     def track_router_decision(*args, **kwargs): pass
     TELEMETRY_ENABLED = False
 
-# Domain keywords for routing
-DOMAIN_KEYWORDS = {
-    "time": ["time", "date", "day", "hour", "minute", "clock", "calendar"],
-    "aviation": ["aircraft", "flight", "airport", "aviation", "faa", "plane", "pilot", "runway", 
-                "airline", "airways", "airspace", "atc", "cessna", "boeing", "airbus"],
-    "formula1": ["f1", "formula 1", "formula one", "grand prix", "motorsport", "racing", 
-                "driver", "team", "lap", "circuit"],
-    "finance": ["finance", "money", "invest", "stock", "market", "fund", "portfolio", "asset", 
-               "wealth", "crypto", "bitcoin", "ethereum", "economy", "economic"],
-    "tech": ["code", "programming", "software", "technology", "cyber", "security", "hack", 
-            "encryption", "aws", "cloud", "ai", "artificial intelligence", "machine learning"],
-    "research": ["research", "study", "analyze", "investigate", "examine", "explore", "search", "find"],
-    "math": ["calculate", "equation", "formula", "math", "solve", "number", "arithmetic", "algebra"],
-    "english": ["grammar", "write", "essay", "paragraph", "sentence", "word", "language", "literature"],
-    "legal": ["law", "legal", "attorney", "lawyer", "court", "judge", "case", "statute", "regulation"],
-    "prediction": ["predict", "forecast", "will", "future", "next", "expect", "anticipate", "projection"]
-}
-
-# Precompile regex patterns for keyword matching
-DOMAIN_PATTERNS = {}
-for domain_name, keywords in DOMAIN_KEYWORDS.items():
-    DOMAIN_PATTERNS[domain_name] = {
-        'single_words': set(),
-        'multi_words': []
-    }
-    
-    for keyword in keywords:
-        if ' ' not in keyword:
-            DOMAIN_PATTERNS[domain_name]['single_words'].add(keyword)
-        else:
-            # Precompile regex for multi-word phrases
-            pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-            DOMAIN_PATTERNS[domain_name]['multi_words'].append(pattern)
-
-def contains_keywords(text: str, domain: str) -> bool:
-    """Check if text contains any keywords for the specified domain"""
-    text_lower = text.lower()
-    
-    # Get patterns for the domain
-    patterns = DOMAIN_PATTERNS.get(domain)
-    if not patterns:
-        return False
-    
-    # Extract words only once
-    words = set(re.findall(r'\b\w+\b', text_lower))
-    
-    # Check single-word matches (fast set operation)
-    if any(word in patterns['single_words'] for word in words):
-        return True
-    
-    # Check multi-word patterns
-    for pattern in patterns['multi_words']:
-        if pattern.search(text_lower):
-            return True
-    
-    return False
-
 def has_n_number(text: str) -> bool:
     """Check if text contains an N-number (US aircraft registration)"""
     # Look for N-numbers with at least 4 chars (N + 3 more)
@@ -92,6 +49,23 @@ def has_n_number(text: str) -> bool:
     
     return False
 
+# Freshness class of the answers produced by each core domain assistant
+DOMAIN_FRESHNESS = {
+    "business_finance": "live_market",
+    "tech_security": "evergreen",
+    "research_knowledge": "evergreen",
+    "specialized_industries": "f1_weekend",
+    "universal": "standard",
+    "aviation": "aviation_live",
+    "formula1": "f1_weekend"
+}
+
+# Context added to the prompt for domain-routed assistants
+DOMAIN_CONTEXT = {
+    "business_finance": "IMPORTANT: Use your crypto_quote, crypto_indicators and market_overview tools for current market data.\n\n",
+    "specialized_industries": "IMPORTANT: Use your f1_standings and flight_position tools for current motorsport and aviation data.\n\n"
+}
+
 def unified_route(prompt: str, datetime_context: str, assistants: Dict[str, Callable]) -> Tuple[Optional[Callable], Optional[str]]:
     """
     Simplified unified routing logic that determines the appropriate assistant
@@ -104,64 +78,90 @@ def unified_route(prompt: str, datetime_context: str, assistants: Dict[str, Call
     Returns:
         Tuple of (assistant_function, enhanced_prompt)
     """
+    assistant_func, enhanced_prompt, _ = unified_route_with_freshness(prompt, datetime_context, assistants)
+    return assistant_func, enhanced_prompt
+
+def unified_route_with_freshness(prompt: str, datetime_context: str, assistants: Dict[str, Callable]) -> Tuple[Optional[Callable], Optional[str], str]:
+    """
+    Route a query and attach the freshness class its answer should be cached under
+    
+    Args:
+        prompt: User's query
+        datetime_context: Current date/time context
+        assistants: Dictionary of assistant functions keyed by name
+        
+    Returns:
+        Tuple of (assistant_function, enhanced_prompt, freshness_class)
+    """
+    matched = classify(prompt)
+    
     # Check for direct time queries (highest priority)
-    if contains_keywords(prompt, "time") and len(prompt.split()) < 5:
+    if "time" in matched and len(prompt.split()) < 5:
         logger.info(f"Router: '{prompt[:50]}...' -> direct_response (time query)")
         if TELEMETRY_ENABLED:
             track_router_decision(prompt, "direct_response", "direct_response", 1.0)
-        return None, f"It is {datetime_context}"
+        return None, f"It is {datetime_context}", "no_cache"
     
     # Check for aviation queries with N-numbers
-    if has_n_number(prompt) or (contains_keywords(prompt, "aviation") and 
-                               any(word in prompt.lower() for word in ["flight", "aircraft", "airport"])):
+    if has_n_number(prompt) or ("aviation" in matched and "aviation_context" in matched):
         if "aviation" in assistants:
             logger.info(f"Router: '{prompt[:50]}...' -> aviation")
             if TELEMETRY_ENABLED:
                 track_router_decision(prompt, "specialized_industries", "aviation_assistant", 0.9)
-            return assistants["aviation"], f"{datetime_context}{prompt}"
+            return assistants["aviation"], f"{datetime_context}{prompt}", "aviation_live"
     
     # Check for Formula 1 queries
-    if contains_keywords(prompt, "formula1") or any(term in prompt.lower() for term in ["f1", "grand prix", "formula one", "racing", "driver", "team", "lap", "circuit"]):
+    if "formula1" in matched or "formula1_terms" in matched:
         if "formula1" in assistants:
             logger.info(f"Router: '{prompt[:50]}...' -> formula1")
             if TELEMETRY_ENABLED:
                 track_router_decision(prompt, "specialized_industries", "formula1_assistant", 0.9)
-            return assistants["formula1"], f"{datetime_context}IMPORTANT: You have access to live F1 data. Use the real-time race information provided above to make informed predictions and analysis.\n\n{prompt}"
+            return assistants["formula1"], f"{datetime_context}IMPORTANT: Base predictions and analysis on the live F1 data supplied with this query.\n\n{prompt}", "f1_weekend"
     
     # Check for prediction queries (route to universal)
-    if contains_keywords(prompt, "prediction"):
+    if "prediction" in matched:
         if "universal" in assistants:
             logger.info(f"Router: '{prompt[:50]}...' -> universal (prediction)")
             if TELEMETRY_ENABLED:
                 track_router_decision(prompt, "universal", "universal_assistant", 0.8)
-            return assistants["universal"], f"{datetime_context}PREDICTION QUERY: {prompt}"
+            return assistants["universal"], f"{datetime_context}PREDICTION QUERY: {prompt}", "standard"
     
     # Check for crypto forecast queries - use direct bypass
-    if DIRECT_FORECAST_AVAILABLE and any(term in prompt.lower() for term in ["crypto forecast", "bitcoin prediction", "ethereum prediction", "price prediction", "crypto price", "btc forecast", "eth forecast", "crypto analysis"]):
+    if DIRECT_FORECAST_AVAILABLE and "crypto_forecast" in matched:
         try:
             # Get direct forecast with no caching
             direct_forecast = get_direct_forecast(prompt)
             logger.info(f"Router: '{prompt[:50]}...' -> direct_crypto_forecast")
             if TELEMETRY_ENABLED:
                 track_router_decision(prompt, "direct_bypass", "direct_crypto_forecast", 1.0)
-            return None, direct_forecast
+            return None, direct_forecast, "live_market"
         except Exception as e:
             logger.error(f"Direct crypto forecast error: {str(e)}")
             # Continue to regular routing if direct forecast fails
     
     # Check for crypto queries
-    if any(term in prompt.lower() for term in ["crypto", "bitcoin", "ethereum", "btc", "eth", "blockchain", "token", "coin", "wallet"]):
+    if "crypto_terms" in matched:
         if "business_finance" in assistants:
             logger.info(f"Router: '{prompt[:50]}...' -> business_finance (crypto)")
             if TELEMETRY_ENABLED:
                 track_router_decision(prompt, "business_finance", "business_finance_assistant", 0.9)
-            return assistants["business_finance"], f"{datetime_context}IMPORTANT: You have access to live cryptocurrency price data. Use the real-time market information provided above for accurate analysis.\n\n{prompt}"
+            return assistants["business_finance"], f"{datetime_context}IMPORTANT: Look up current prices with your crypto_quote and crypto_indicators tools; never quote prices from memory.\n\n{prompt}", "live_market"
     
     # Use domain detection from unified_assistants
     try:
         from unified_assistants import detect_domain
         domain = detect_domain(prompt)
         
+        # No domain keyword matched: a calibrated intent model may still place the prompt
+        if domain == "universal" and INTENT_MODEL_AVAILABLE:
+            intent = confident_intent(prompt, INTENT_CONFIDENCE_THRESHOLD)
+            if intent and intent.domain in assistants:
+                logger.info(f"Router: '{prompt[:50]}...' -> {intent.domain} (intent model, {intent.confidence:.2f})")
+                if TELEMETRY_ENABLED:
+                    track_router_decision(prompt, "intent_model", f"{intent.domain}_assistant", intent.confidence)
+                freshness = adjust_for_time_sensitivity(DOMAIN_FRESHNESS.get(intent.domain, DEFAULT_FRESHNESS), prompt)
+                return assistants[intent.domain], f"{datetime_context}{DOMAIN_CONTEXT.get(intent.domain, '')}{prompt}", freshness
+        
         # Map domain to assistant key
         domain_to_assistant = {
             "business_finance": "business_finance",
@@ -179,13 +179,10 @@ def unified_route(prompt: str, datetime_context: str, assistants: Dict[str, Call
                 track_router_decision(prompt, domain, f"{assistant_key}_assistant", 0.8)
             
             # Add domain-specific context
-            enhanced_context = ""
-            if assistant_key == "business_finance":
-                enhanced_context = "IMPORTANT: You have access to real-time financial and market data.\n\n"
-            elif assistant_key == "specialized_industries":
-                enhanced_context = "IMPORTANT: You have access to specialized industry data including aviation and motorsports.\n\n"
+            enhanced_context = DOMAIN_CONTEXT.get(assistant_key, "")
             
-            return assistants[assistant_key], f"{datetime_context}{enhanced_context}{prompt}"
+            freshness = adjust_for_time_sensitivity(DOMAIN_FRESHNESS.get(assistant_key, DEFAULT_FRESHNESS), prompt)
+            return assistants[assistant_key], f"{datetime_context}{enhanced_context}{prompt}", freshness
     except ImportError:
         logger.warning("Could not import detect_domain from unified_assistants")
     
@@ -194,10 +191,10 @@ def unified_route(prompt: str, datetime_context: str, assistants: Dict[str, Call
         logger.info(f"Router: '{prompt[:50]}...' -> universal (default)")
         if TELEMETRY_ENABLED:
             track_router_decision(prompt, "default", "universal_assistant", 0.5)
-        return assistants["universal"], f"{datetime_context}{prompt}"
+        return assistants["universal"], f"{datetime_context}{prompt}", DEFAULT_FRESHNESS
     
     # If no assistants match, return None to use the default teacher agent
     logger.info(f"Router: '{prompt[:50]}...' -> None (fallback to teacher)")
     if TELEMETRY_ENABLED:
         track_router_decision(prompt, "fallback", "teacher_agent", 0.3)
-    return None, None
\ No newline at end of file
+    return None, None, DEFAULT_FRESHNESS
\ No newline at end of file
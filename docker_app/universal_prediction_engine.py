@@ -3,7 +3,7 @@ Universal Prediction Engine
 Enables forecasting/extrapolation for any topic using historical + real-time data
 """
 
-import requests
+from http_client import http_client
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
@@ -11,10 +11,7 @@ import re
 
 class UniversalPredictionEngine:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = http_client  # Shared pooled session
         self.timeout = 10
         
     def get_historical_context(self, topic: str, timeframe: str = "1year") -> str:
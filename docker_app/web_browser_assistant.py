@@ -1,6 +1,6 @@
 from strands import Agent, tool
 from realtime_data_access import enhance_query_with_realtime
-import requests
+from http_client import http_client
 import urllib.parse
 import json
 import re
@@ -148,7 +148,7 @@ def fetch_website_content(url):
     """Fetch website content"""
     try:
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
         
         if response.status_code == 200:
             return analyze_webpage_content(response, url)